@@ -10,7 +10,9 @@ from app.core.database import Base
 from app.core.config import settings
 from app.models import (
     User, Patient, Doctor, Biometric,
-    Seizure, Medication, Alert, Prediction
+    Seizure, Medication, Alert, Prediction, ClinicalNote, SyncCursor,
+    BiometricRollupMinute, BiometricRollupHour, BiometricRollupDay, RetentionCheckpoint,
+    PatientLatestState
 )
 
 # this is the Alembic Config object, which provides
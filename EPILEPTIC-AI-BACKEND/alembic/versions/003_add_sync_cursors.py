@@ -0,0 +1,38 @@
+"""Add sync_cursors table for incremental HealthKit sync
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'sync_cursors',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('data_type', sa.String(), nullable=False),
+        sa.Column('last_synced_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('patient_id', 'data_type', name='uq_sync_cursors_patient_data_type')
+    )
+    op.create_index(op.f('ix_sync_cursors_id'), 'sync_cursors', ['id'], unique=False)
+    op.create_index(op.f('ix_sync_cursors_patient_id'), 'sync_cursors', ['patient_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_sync_cursors_patient_id'), table_name='sync_cursors')
+    op.drop_index(op.f('ix_sync_cursors_id'), table_name='sync_cursors')
+    op.drop_table('sync_cursors')
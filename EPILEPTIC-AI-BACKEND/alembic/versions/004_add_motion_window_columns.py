@@ -0,0 +1,27 @@
+"""Add motion stream window aggregates to biometrics
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('biometrics', sa.Column('accel_magnitude_mean', sa.Float(), nullable=True))
+    op.add_column('biometrics', sa.Column('accel_energy', sa.Float(), nullable=True))
+    op.add_column('biometrics', sa.Column('accel_dominant_freq', sa.Float(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('biometrics', 'accel_dominant_freq')
+    op.drop_column('biometrics', 'accel_energy')
+    op.drop_column('biometrics', 'accel_magnitude_mean')
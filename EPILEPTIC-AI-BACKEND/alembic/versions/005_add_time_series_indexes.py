@@ -0,0 +1,40 @@
+"""Add composite and partial indexes for per-patient time-series queries
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_biometrics_patient_id_recorded_at', 'biometrics', ['patient_id', 'recorded_at'], unique=False)
+    op.create_index('ix_predictions_patient_id_predicted_at', 'predictions', ['patient_id', 'predicted_at'], unique=False)
+    op.create_index(
+        'ix_alerts_patient_id_triggered_at_is_active', 'alerts',
+        ['patient_id', 'triggered_at', 'is_active'], unique=False
+    )
+    op.create_index(
+        'ix_alerts_active_unacknowledged', 'alerts', ['patient_id', 'triggered_at'], unique=False,
+        postgresql_where=sa.text('is_active AND NOT acknowledged'),
+        sqlite_where=sa.text('is_active = 1 AND acknowledged = 0')
+    )
+    op.create_index('ix_seizures_patient_id_start_time', 'seizures', ['patient_id', 'start_time'], unique=False)
+    op.create_index('ix_clinical_notes_patient_id_created_at', 'clinical_notes', ['patient_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_clinical_notes_patient_id_created_at', table_name='clinical_notes')
+    op.drop_index('ix_seizures_patient_id_start_time', table_name='seizures')
+    op.drop_index('ix_alerts_active_unacknowledged', table_name='alerts')
+    op.drop_index('ix_alerts_patient_id_triggered_at_is_active', table_name='alerts')
+    op.drop_index('ix_predictions_patient_id_predicted_at', table_name='predictions')
+    op.drop_index('ix_biometrics_patient_id_recorded_at', table_name='biometrics')
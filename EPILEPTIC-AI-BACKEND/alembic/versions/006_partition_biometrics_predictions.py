@@ -0,0 +1,117 @@
+"""Range-partition biometrics and predictions by month (PostgreSQL only)
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 12:00:00.000000
+
+Existing rows are copied into monthly partitions named {table}_pYYYY_MM,
+plus a DEFAULT partition for out-of-range timestamps. Future partitions are
+created by app.services.partitioning.ensure_partitions (startup and the
+maintain_partitions task).
+
+PostgreSQL cannot reference a partitioned table by id alone, so the
+alerts.prediction_id foreign key is dropped (the column is kept).
+On other dialects this migration is a no-op.
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+PREMAKE_MONTHS = 3
+
+TABLES = {
+    # table: (partition key, indexes on the parent, foreign keys)
+    'biometrics': (
+        'recorded_at',
+        {
+            'ix_biometrics_id': ['id'],
+            'ix_biometrics_recorded_at': ['recorded_at'],
+            'ix_biometrics_patient_id_recorded_at': ['patient_id', 'recorded_at'],
+        },
+        {'patient_id': 'patients'},
+    ),
+    'predictions': (
+        'predicted_at',
+        {
+            'ix_predictions_id': ['id'],
+            'ix_predictions_patient_id_predicted_at': ['patient_id', 'predicted_at'],
+        },
+        {'patient_id': 'patients', 'alert_id': 'alerts', 'actual_seizure_id': 'seizures'},
+    ),
+}
+
+
+def _add_months(value, months):
+    index = value.year * 12 + (value.month - 1) + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _recreate(table, key, indexes, foreign_keys, old, partitioned):
+    """Create `table` from the renamed `old` table, copy rows, drop `old`"""
+    op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+    op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey')
+    for name in indexes:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+
+    suffix = f' PARTITION BY RANGE ({key})' if partitioned else ''
+    op.execute(f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS){suffix}')
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+
+    if partitioned:
+        op.execute(f'UPDATE {old} SET {key} = COALESCE(created_at, now()) WHERE {key} IS NULL')
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {key} SET NOT NULL')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, {key})')
+
+        oldest = op.get_bind().execute(sa.text(f'SELECT min({key}) FROM {old}')).scalar()
+        now = datetime.utcnow()
+        month = datetime((oldest or now).year, (oldest or now).month, 1)
+        last = _add_months(datetime(now.year, now.month, 1), PREMAKE_MONTHS)
+        while month <= last:
+            end = _add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE {table}_p{month.year:04d}_{month.month:02d} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}+00') TO ('{end.isoformat()}+00')"
+            )
+            month = end
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+    else:
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)')
+
+    for column, target in foreign_keys.items():
+        op.execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fkey '
+            f'FOREIGN KEY ({column}) REFERENCES {target}(id)'
+        )
+    for name, columns in indexes.items():
+        op.create_index(name, table, columns, unique=False)
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+    op.execute(f'DROP TABLE {old} CASCADE')
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('ALTER TABLE alerts DROP CONSTRAINT IF EXISTS alerts_prediction_id_fkey')
+    for table, (key, indexes, foreign_keys) in TABLES.items():
+        _recreate(table, key, indexes, foreign_keys, f'{table}_unpartitioned', partitioned=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table, (key, indexes, foreign_keys) in TABLES.items():
+        _recreate(table, key, indexes, foreign_keys, f'{table}_partitioned', partitioned=False)
+    op.execute(
+        'ALTER TABLE alerts ADD CONSTRAINT alerts_prediction_id_fkey '
+        'FOREIGN KEY (prediction_id) REFERENCES predictions(id)'
+    )
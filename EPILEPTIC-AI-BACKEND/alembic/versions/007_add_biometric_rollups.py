@@ -0,0 +1,52 @@
+"""Add 1-minute, 1-hour and 1-day biometric rollup tables
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+ROLLUP_TABLES = ('biometric_rollups_1m', 'biometric_rollups_1h', 'biometric_rollups_1d')
+SIGNALS = ('heart_rate', 'heart_rate_variability', 'movement_intensity', 'stress_level')
+
+
+def _signal_columns():
+    columns = []
+    for signal in SIGNALS:
+        columns += [
+            sa.Column(f'{signal}_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column(f'{signal}_mean', sa.Float(), nullable=True),
+            sa.Column(f'{signal}_min', sa.Float(), nullable=True),
+            sa.Column(f'{signal}_max', sa.Float(), nullable=True),
+            sa.Column(f'{signal}_sumsq', sa.Float(), nullable=True),
+        ]
+    return columns
+
+
+def upgrade():
+    for table in ROLLUP_TABLES:
+        op.create_table(
+            table,
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('patient_id', sa.Integer(), nullable=False),
+            sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+            *_signal_columns(),
+            sa.ForeignKeyConstraint(['patient_id'], ['patients.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('patient_id', 'bucket_start', name=f'uq_{table}_patient_bucket')
+        )
+        op.create_index(op.f(f'ix_{table}_id'), table, ['id'], unique=False)
+
+
+def downgrade():
+    for table in reversed(ROLLUP_TABLES):
+        op.drop_index(op.f(f'ix_{table}_id'), table_name=table)
+        op.drop_table(table)
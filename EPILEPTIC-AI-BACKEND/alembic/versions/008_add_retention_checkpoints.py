@@ -0,0 +1,38 @@
+"""Add retention_checkpoints table for batched retention cleanup
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'retention_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False),
+        sa.Column('cutoff', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('rows_deleted', sa.Integer(), nullable=False),
+        sa.Column('last_run_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('table_name')
+    )
+    op.create_index(op.f('ix_retention_checkpoints_id'), 'retention_checkpoints', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_retention_checkpoints_id'), table_name='retention_checkpoints')
+    op.drop_table('retention_checkpoints')
@@ -0,0 +1,65 @@
+"""Add patient_latest_state table for O(1) latest lookups
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+SIGNALS = ('heart_rate', 'heart_rate_variability', 'movement_intensity', 'stress_level')
+
+
+def _latest(table, column, time_column, where=''):
+    return (
+        f'(SELECT {column} FROM {table} t WHERE t.patient_id = s.patient_id {where} '
+        f'ORDER BY t.{time_column} DESC, t.id DESC LIMIT 1)'
+    )
+
+
+def upgrade():
+    op.create_table(
+        'patient_latest_state',
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('biometric_recorded_at', sa.DateTime(timezone=True), nullable=True),
+        *[sa.Column(signal, sa.Float(), nullable=True) for signal in SIGNALS],
+        sa.Column('predicted_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('risk_score', sa.Float(), nullable=True),
+        sa.Column('confidence', sa.Float(), nullable=True),
+        sa.Column('risk_level', sa.String(), nullable=True),
+        sa.Column('active_alert_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('patient_id')
+    )
+
+    # Backfill from existing rows (correlated lookups on the patient/time indexes)
+    op.execute('INSERT INTO patient_latest_state (patient_id, active_alert_count) SELECT id, 0 FROM patients')
+    assignments = [
+        "biometric_recorded_at = (SELECT max(recorded_at) FROM biometrics t WHERE t.patient_id = s.patient_id)",
+        "predicted_at = (SELECT max(predicted_at) FROM predictions t WHERE t.patient_id = s.patient_id)",
+        f"risk_score = {_latest('predictions', 'risk_score', 'predicted_at')}",
+        f"confidence = {_latest('predictions', 'confidence', 'predicted_at')}",
+        "risk_level = CASE "
+        "WHEN risk_score >= 0.8 THEN 'critical' WHEN risk_score >= 0.6 THEN 'high' "
+        "WHEN risk_score >= 0.4 THEN 'medium' WHEN risk_score IS NOT NULL THEN 'low' END",
+        "active_alert_count = (SELECT count(*) FROM alerts t WHERE t.patient_id = s.patient_id "
+        "AND t.is_active = true AND (t.resolved = false OR t.resolved IS NULL))",
+    ] + [
+        f"{signal} = {_latest('biometrics', signal, 'recorded_at', f'AND t.{signal} IS NOT NULL')}"
+        for signal in SIGNALS
+    ]
+    # risk_level reads the risk_score set by a previous statement
+    for assignment in assignments:
+        op.execute(f'UPDATE patient_latest_state AS s SET {assignment}')
+
+
+def downgrade():
+    op.drop_table('patient_latest_state')
@@ -0,0 +1,37 @@
+"""Add indexed patients.doctor_id foreign key, backfilled from treating_neurologist
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('patients', sa.Column('doctor_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_patients_doctor_id_doctors', 'patients', 'doctors',
+        ['doctor_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_index(op.f('ix_patients_doctor_id'), 'patients', ['doctor_id'], unique=False)
+
+    # treating_neurologist holds the doctor's email (see fix_patients_db.py)
+    op.execute(
+        'UPDATE patients SET doctor_id = '
+        '(SELECT d.id FROM doctors d WHERE d.email = patients.treating_neurologist) '
+        'WHERE treating_neurologist IS NOT NULL'
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_patients_doctor_id'), table_name='patients')
+    op.drop_constraint('fk_patients_doctor_id_doctors', 'patients', type_='foreignkey')
+    op.drop_column('patients', 'doctor_id')
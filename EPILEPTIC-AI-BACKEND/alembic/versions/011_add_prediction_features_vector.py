@@ -0,0 +1,140 @@
+"""Store prediction features as a versioned float32 vector
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+import json
+import math
+import struct
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+predictions = sa.table(
+    'predictions',
+    sa.column('id', sa.Integer),
+    sa.column('features_used', sa.JSON(none_as_null=True)),
+    sa.column('features_vector', sa.LargeBinary),
+)
+
+# Schema version 1 of app.core.feature_codec, frozen here so that later
+# codec versions do not change what this migration writes or reads
+_V1 = 1
+_V1_FIELDS = (
+    ('heart_rate', 'mean'),
+    ('heart_rate', 'std'),
+    ('heart_rate', 'min'),
+    ('heart_rate', 'max'),
+    ('heart_rate', 'current'),
+    ('heart_rate', 'slope'),
+    ('heart_rate', 'acceleration'),
+    ('heart_rate', 'data_points'),
+    ('heart_rate_variability', 'mean'),
+    ('heart_rate_variability', 'std'),
+    ('heart_rate_variability', 'current'),
+    ('heart_rate_variability', 'slope'),
+    ('heart_rate_variability', 'rmssd'),
+    ('movement', 'intensity_mean'),
+    ('movement', 'intensity_std'),
+    ('movement', 'current'),
+    ('movement', 'slope'),
+    ('stress', 'level_mean'),
+    ('stress', 'level_std'),
+    ('stress', 'max'),
+    ('stress', 'current'),
+    ('stress', 'slope'),
+    ('metadata', 'total_biometric_records'),
+    ('metadata', 'window_minutes'),
+    ('metadata', 'data_completeness'),
+)
+_V1_INTEGER_FIELDS = {
+    ('heart_rate', 'data_points'),
+    ('metadata', 'total_biometric_records'),
+    ('metadata', 'window_minutes'),
+}
+_HEADER = struct.Struct('<HH')
+_V1_VECTOR = struct.Struct(f'<{len(_V1_FIELDS)}f')
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return math.nan
+    return float(value)
+
+
+def _encode_v1(features):
+    if not features:
+        return None
+    values = [_number((features.get(group) or {}).get(key)) for group, key in _V1_FIELDS]
+    return _HEADER.pack(_V1, len(_V1_FIELDS)) + _V1_VECTOR.pack(*values)
+
+
+def _decode_v1(blob):
+    blob = bytes(blob)
+    version, count = _HEADER.unpack_from(blob)
+    if version != _V1 or count != len(_V1_FIELDS):
+        raise ValueError(f'Cannot downgrade feature vector version={version}, count={count}')
+    features = {}
+    for (group, key), value in zip(_V1_FIELDS, _V1_VECTOR.unpack_from(blob, _HEADER.size)):
+        if value != value:  # NaN
+            continue
+        features.setdefault(group, {})[key] = int(value) if (group, key) in _V1_INTEGER_FIELDS else value
+    return features
+
+
+def _convert(source, convert):
+    """
+    Rewrite rows whose `source` column is set, in id-ordered batches: one
+    executemany UPDATE per batch, committed on its own so that locks and
+    WAL stay bounded and an interrupted run keeps the converted batches
+    """
+    column = predictions.c[source]
+    update = predictions.update().where(predictions.c.id == sa.bindparam('row_id')).values(
+        features_used=sa.bindparam('new_features_used'),
+        features_vector=sa.bindparam('new_features_vector'),
+    )
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        last_id = 0
+        while True:
+            rows = connection.execute(
+                sa.select(predictions.c.id, column)
+                .where(column.isnot(None), predictions.c.id > last_id)
+                .order_by(predictions.c.id)
+                .limit(BATCH_SIZE)
+            ).fetchall()
+            if not rows:
+                break
+            connection.execute(update, [
+                {'row_id': row_id, **{f'new_{name}': value for name, value in convert(value).items()}}
+                for row_id, value in rows
+            ])
+            last_id = rows[-1][0]
+
+
+def upgrade():
+    op.add_column('predictions', sa.Column('features_vector', sa.LargeBinary(), nullable=True))
+
+    # Legacy JSON -> vector; timestamps and device source are dropped
+    _convert('features_used', lambda value: {
+        'features_vector': _encode_v1(json.loads(value) if isinstance(value, str) else value),
+        'features_used': None,
+    })
+
+
+def downgrade():
+    _convert('features_vector', lambda value: {
+        'features_used': _decode_v1(value),
+        'features_vector': None,
+    })
+    op.drop_column('predictions', 'features_vector')
@@ -0,0 +1,22 @@
+"""Add (start_time, id) index on seizures for the cross-patient history feed
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_seizures_start_time_id', 'seizures', ['start_time', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_seizures_start_time_id', table_name='seizures')
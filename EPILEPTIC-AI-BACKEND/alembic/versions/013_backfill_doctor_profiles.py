@@ -0,0 +1,37 @@
+"""Create missing doctors rows for users with the doctor role
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Accounts created through POST /users had no doctors row: every doctor
+    # route answered 403 "Doctor profile not found"
+    op.execute(
+        "INSERT INTO doctors (email, full_name, phone, hashed_password, is_active, status, notification_preferences) "
+        "SELECT u.email, u.full_name, u.phone, u.hashed_password, u.is_active, 'available', "
+        "'{\"email\": true, \"sms\": false}' "
+        "FROM users u WHERE u.role = 'doctor' "
+        "AND NOT EXISTS (SELECT 1 FROM doctors d WHERE d.email = u.email)"
+    )
+    # Same backfill as 010 for patients who chose one of these doctors
+    op.execute(
+        'UPDATE patients SET doctor_id = '
+        '(SELECT d.id FROM doctors d WHERE d.email = patients.treating_neurologist) '
+        'WHERE doctor_id IS NULL AND treating_neurologist IS NOT NULL'
+    )
+
+
+def downgrade():
+    # The created profiles cannot be told apart from registered ones
+    pass
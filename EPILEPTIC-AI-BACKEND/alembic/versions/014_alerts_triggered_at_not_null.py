@@ -0,0 +1,25 @@
+"""Make alerts.triggered_at NOT NULL
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyset pages on (triggered_at, id) skip NULLS LAST handling for NOT NULL columns
+    op.execute('UPDATE alerts SET triggered_at = COALESCE(created_at, now()) WHERE triggered_at IS NULL')
+    op.alter_column('alerts', 'triggered_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+
+
+def downgrade():
+    op.alter_column('alerts', 'triggered_at', existing_type=sa.DateTime(timezone=True), nullable=True)
@@ -1,12 +1,14 @@
-from typing import Generator, Union
+from typing import Generator, Optional, Union
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.security import get_current_principal, get_current_user
 from app.models.patient import Patient
 from app.models.doctor import Doctor
 from app.models.user import User, UserRole
+from app.services.principal_cache import Principal
+from app.services.rate_limiter import RateDecision, get_rate_limiter, retry_after_header
 
 def get_current_patient(
     current_user = Depends(get_current_user)
@@ -115,4 +117,57 @@ def get_current_patient_user(
     raise HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
         detail="Patient privileges required"
-    )
\ No newline at end of file
+    )
+
+def get_current_patient_id(
+    principal: Principal = Depends(get_current_principal)
+) -> int:
+    """
+    Patient ID of the caller (users-table patient or legacy Patient account),
+    taken from the token / principal cache without querying the database.
+    """
+    if principal.role != UserRole.PATIENT.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Patient privileges required"
+        )
+    if principal.patient_id is None:
+        raise HTTPException(status_code=404, detail="Patient record not found")
+    return principal.patient_id
+
+def get_doctor_scope(
+    principal: Principal = Depends(get_current_principal)
+) -> Optional[int]:
+    """
+    Doctor ID that scopes patient access: None for admins (every patient),
+    the caller's doctor ID for doctors, taken from the principal cache.
+    """
+    if principal.role == UserRole.ADMIN.value:
+        return None
+    if principal.role != UserRole.DOCTOR.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin or Doctor privileges required"
+        )
+    if principal.doctor_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Doctor profile not found"
+        )
+    return principal.doctor_id
+
+def admit_ingestion(scope: str, patient_id: int, device_id: Optional[str] = None) -> RateDecision:
+    """
+    Admission of an ingestion request. Over the patient/device rate the
+    decision is not allowed: the caller still stores the sample but skips
+    the prediction and defers the write. Only past the hard ceiling is the
+    request rejected with 429.
+    """
+    decision = get_rate_limiter().check(scope, patient_id, device_id)
+    if decision.rejected:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests for this patient, retry later",
+            headers=retry_after_header(decision)
+        )
+    return decision
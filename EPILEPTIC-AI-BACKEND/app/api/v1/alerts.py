@@ -1,62 +1,81 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from datetime import datetime, timedelta
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.pagination import keyset, page_limit, page_of
 from app.models.alert import Alert
 from app.schemas.alert import AlertUpdate, AlertInDB
-from app.api.deps import get_current_patient
+from app.api.deps import get_current_patient_id
 
 router = APIRouter()
 
 @router.get("/", response_model=List[AlertInDB])
 async def get_alerts(
+    response: Response,
     active_only: bool = True,
     days: int = 7,
-    current_patient=Depends(get_current_patient),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped server-side)"),
+    patient_id: int = Depends(get_current_patient_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get alerts"""
     start_date = datetime.utcnow() - timedelta(days=days)
     
-    query = db.query(Alert).filter(
-        Alert.patient_id == current_patient.id,
+    query = select(Alert).where(
+        Alert.patient_id == patient_id,
         Alert.triggered_at >= start_date
     )
     
     if active_only:
-        query = query.filter(Alert.is_active == True)
+        query = query.where(Alert.is_active == True)
     
-    alerts = query.order_by(Alert.triggered_at.desc()).all()
+    limit = page_limit(limit, default=settings.MAX_PAGE_SIZE)
+    result = await db.execute(keyset(query, Alert.triggered_at, Alert.id, cursor, limit))
+    alerts, _ = page_of(result.scalars().all(), "triggered_at", limit, response)
     
     return alerts
 
 @router.get("/unread", response_model=List[AlertInDB])
 async def get_unread_alerts(
-    current_patient=Depends(get_current_patient),
-    db: Session = Depends(get_db)
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped server-side)"),
+    patient_id: int = Depends(get_current_patient_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get unread alerts"""
-    alerts = db.query(Alert).filter(
-        Alert.patient_id == current_patient.id,
-        Alert.is_active == True,
-        Alert.acknowledged == False
-    ).order_by(Alert.triggered_at.desc()).all()
+    limit = page_limit(limit, default=settings.MAX_PAGE_SIZE)
+    result = await db.execute(keyset(
+        select(Alert).where(
+            Alert.patient_id == patient_id,
+            Alert.is_active == True,
+            Alert.acknowledged == False
+        ),
+        Alert.triggered_at, Alert.id, cursor, limit
+    ))
+    alerts, _ = page_of(result.scalars().all(), "triggered_at", limit, response)
     
     return alerts
 
 @router.put("/{alert_id}/acknowledge", response_model=AlertInDB)
 async def acknowledge_alert(
     alert_id: int,
-    current_patient=Depends(get_current_patient),
-    db: Session = Depends(get_db)
+    patient_id: int = Depends(get_current_patient_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Acknowledge an alert"""
-    alert = db.query(Alert).filter(
-        Alert.id == alert_id,
-        Alert.patient_id == current_patient.id
-    ).first()
+    result = await db.execute(
+        select(Alert).where(
+            Alert.id == alert_id,
+            Alert.patient_id == patient_id
+        )
+    )
+    alert = result.scalars().first()
     
     if not alert:
         raise HTTPException(
@@ -66,10 +85,10 @@ async def acknowledge_alert(
     
     alert.acknowledged = True
     alert.acknowledged_at = datetime.utcnow()
-    alert.acknowledged_by = f"patient:{current_patient.id}"
+    alert.acknowledged_by = f"patient:{patient_id}"
     
-    db.commit()
-    db.refresh(alert)
+    await db.commit()
+    await db.refresh(alert)
     
     return alert
 
@@ -77,14 +96,17 @@ async def acknowledge_alert(
 async def resolve_alert(
     alert_id: int,
     alert_update: AlertUpdate,
-    current_patient=Depends(get_current_patient),
-    db: Session = Depends(get_db)
+    patient_id: int = Depends(get_current_patient_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Resolve an alert"""
-    alert = db.query(Alert).filter(
-        Alert.id == alert_id,
-        Alert.patient_id == current_patient.id
-    ).first()
+    result = await db.execute(
+        select(Alert).where(
+            Alert.id == alert_id,
+            Alert.patient_id == patient_id
+        )
+    )
+    alert = result.scalars().first()
     
     if not alert:
         raise HTTPException(
@@ -94,12 +116,12 @@ async def resolve_alert(
     
     alert.resolved = True
     alert.resolved_at = datetime.utcnow()
-    alert.resolved_by = f"patient:{current_patient.id}"
+    alert.resolved_by = f"patient:{patient_id}"
     
     if alert_update.resolution_notes:
         alert.resolution_notes = alert_update.resolution_notes
     
-    db.commit()
-    db.refresh(alert)
+    await db.commit()
+    await db.refresh(alert)
     
     return alert
\ No newline at end of file
@@ -12,6 +12,7 @@ from app.models.doctor import Doctor
 from app.models.user import User, UserRole
 from app.schemas.patient import PatientCreate, PatientInDB, Token, PatientLogin
 from app.schemas.doctor import DoctorCreate, DoctorInDB, DoctorLogin
+from app.services.principal_cache import build_principal, resolve_principal
 
 router = APIRouter()
 
@@ -163,7 +164,8 @@ async def login_patient(
     
     access_token = create_access_token(
         subject=patient.email,
-        user_type="patient"
+        user_type="patient",
+        principal=build_principal(db, resolve_principal(db, patient.email, "patient"))
     )
     
     return {
@@ -197,7 +199,8 @@ async def login_doctor(
     
     access_token = create_access_token(
         subject=doctor.email,
-        user_type="doctor"
+        user_type="doctor",
+        principal=build_principal(db, resolve_principal(db, doctor.email, "doctor"))
     )
     
     return {
@@ -236,7 +239,8 @@ async def login_user(
 
     access_token = create_access_token(
         subject=user.email,
-        user_type=user.role.value
+        user_type=user.role.value,
+        principal=build_principal(db, user)
     )
 
     return {
@@ -1,121 +1,190 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from datetime import datetime, timedelta
 
-from app.core.database import get_db
+from sqlalchemy import insert, select
+
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.pagination import keyset, page_limit, page_of
 from app.models.biometric import Biometric
-from app.schemas.biometric import BiometricCreate, BiometricInDB
-from app.api.deps import get_current_patient, get_current_patient_user
-from app.models.patient import Patient
-from app.models.user import User
+from app.models.patient_latest_state import PatientLatestState
+from app.schemas.biometric import BiometricCreate, BiometricInDB, MotionChunkCreate, MotionChunkResult
+from app.services.motion_service import compute_motion_windows, decode_motion_chunk, store_raw_chunk
+from app.services.write_behind import get_write_behind_buffer, naive_utc
+from app.services.biometric_rollups import update_rollups
+from app.services.patient_state import record_biometrics
+from app.api.deps import get_current_patient, get_current_patient_id, admit_ingestion
 
 router = APIRouter()
 
-@router.post("/", response_model=BiometricInDB)
+def coalesced(biometrics: List[Biometric]) -> JSONResponse:
+    """
+    Over the device rate: the samples go to the write-behind buffer (written
+    with the next batch, picked up by the next prediction) and the request
+    is answered with 202 instead of the stored rows.
+    """
+    buffer = get_write_behind_buffer()
+    for biometric in biometrics:
+        buffer.add(biometric)
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={
+        "status": "coalesced",
+        "samples_stored": len(biometrics),
+        "message": "Samples stored with the next batch and included in the next prediction",
+    })
+
+@router.post("/", response_model=BiometricInDB, responses={202: {"description": "Coalesced: stored with the next batch"}})
 async def create_biometric(
     biometric_data: BiometricCreate,
-    current_patient=Depends(get_current_patient_user),
-    db: Session = Depends(get_db)
+    patient_id: int = Depends(get_current_patient_id),
+    db: AsyncSession = Depends(get_async_db),
+    x_device_id: Optional[str] = Header(None)
 ):
     """Create biometric data"""
-    # Get the actual patient ID from either User or Patient object
-    if isinstance(current_patient, User):
-        # Find the corresponding Patient record by email
-        patient_record = db.query(Patient).filter(Patient.email == current_patient.email).first()
-        if not patient_record:
-            raise HTTPException(status_code=404, detail="Patient record not found")
-        patient_id = patient_record.id
-    else:
-        patient_id = current_patient.id
+    admission = admit_ingestion("ingest", patient_id, x_device_id)
 
     biometric = Biometric(
         patient_id=patient_id,
         **biometric_data.dict()
     )
+    if not admission.allowed:
+        return coalesced([biometric])
     
     db.add(biometric)
-    db.commit()
-    db.refresh(biometric)
+    await db.run_sync(update_rollups, [biometric])
+    await db.run_sync(record_biometrics, [biometric])
+    await db.commit()
+    await db.refresh(biometric)
     
     return biometric
 
-@router.post("/batch", response_model=List[BiometricInDB])
+@router.post("/batch", response_model=List[BiometricInDB], responses={202: {"description": "Coalesced: stored with the next batch"}})
 async def create_biometric_batch(
     biometrics_data: List[BiometricCreate],
-    current_patient=Depends(get_current_patient_user),
-    db: Session = Depends(get_db)
+    patient_id: int = Depends(get_current_patient_id),
+    db: AsyncSession = Depends(get_async_db),
+    x_device_id: Optional[str] = Header(None)
 ):
     """Create multiple biometric data entries"""
-    # Get the actual patient ID from either User or Patient object
-    if isinstance(current_patient, User):
-        patient_record = db.query(Patient).filter(Patient.email == current_patient.email).first()
-        if not patient_record:
-            raise HTTPException(status_code=404, detail="Patient record not found")
-        patient_id = patient_record.id
-    else:
-        patient_id = current_patient.id
-
-    biometrics = []
-
-    for data in biometrics_data:
-        biometric = Biometric(
-            patient_id=patient_id,
-            **data.dict()
-        )
-        db.add(biometric)
-        biometrics.append(biometric)
+    admission = admit_ingestion("ingest", patient_id, x_device_id)
+
+    biometrics = [Biometric(patient_id=patient_id, **data.dict()) for data in biometrics_data]
+    if not admission.allowed:
+        return coalesced(biometrics)
+
+    db.add_all(biometrics)
     
-    db.commit()
+    await db.run_sync(update_rollups, biometrics)
+    await db.run_sync(record_biometrics, biometrics)
+    await db.commit()
     
     for biometric in biometrics:
-        db.refresh(biometric)
+        await db.refresh(biometric)
     
     return biometrics
 
+@router.post("/motion-stream", response_model=MotionChunkResult)
+async def ingest_motion_stream(
+    chunk: MotionChunkCreate,
+    patient_id: int = Depends(get_current_patient_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Ingest a packed high-rate accelerometer chunk.
+
+    Only per-window aggregates are stored in biometrics; the raw samples
+    go to compressed cold storage.
+    """
+    admission = admit_ingestion("ingest", patient_id, chunk.device_id)
+
+    try:
+        samples = decode_motion_chunk(chunk.samples)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if len(samples) > settings.MOTION_MAX_CHUNK_SAMPLES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Chunk exceeds {settings.MOTION_MAX_CHUNK_SAMPLES} samples"
+        )
+
+    started_at = naive_utc(chunk.started_at)
+    windows = compute_motion_windows(samples, chunk.sample_rate_hz, started_at)
+    await asyncio.to_thread(store_raw_chunk, patient_id, samples, chunk.sample_rate_hz, started_at, chunk.device_id)
+
+    rows = [
+        {"patient_id": patient_id, "source": chunk.source, "device_id": chunk.device_id, **window}
+        for window in windows
+    ]
+    if rows:
+        # Over the device rate the windows are written with the next batch
+        if settings.WRITE_BEHIND_ENABLED or not admission.allowed:
+            buffer = get_write_behind_buffer()
+            for row in rows:
+                buffer.add(Biometric(**row))
+        else:
+            await db.execute(insert(Biometric), rows)
+            await db.run_sync(update_rollups, rows)
+            await db.run_sync(record_biometrics, rows)
+            await db.commit()
+
+    return MotionChunkResult(
+        samples_received=len(samples),
+        windows_stored=len(rows),
+        window_seconds=settings.MOTION_WINDOW_SECONDS,
+        max_movement_intensity=max((w["movement_intensity"] for w in windows), default=None),
+        max_dominant_freq=max((w["accel_dominant_freq"] for w in windows), default=None)
+    )
+
 @router.get("/", response_model=List[BiometricInDB])
 async def get_biometrics(
+    response: Response,
     hours: int = 24,
-    current_patient=Depends(get_current_patient_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped server-side)"),
+    patient_id: int = Depends(get_current_patient_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get recent biometric data"""
-    # Get the actual patient ID
-    if isinstance(current_patient, User):
-        patient_record = db.query(Patient).filter(Patient.email == current_patient.email).first()
-        if not patient_record:
-            raise HTTPException(status_code=404, detail="Patient record not found")
-        patient_id = patient_record.id
-    else:
-        patient_id = current_patient.id
-
+    """Get recent biometric data, newest first, one page at a time"""
     start_time = datetime.utcnow() - timedelta(hours=hours)
+    limit = page_limit(limit, settings.TIME_SERIES_MAX_PAGE_SIZE, settings.TIME_SERIES_MAX_PAGE_SIZE)
 
-    biometrics = db.query(Biometric).filter(
-        Biometric.patient_id == patient_id,
-        Biometric.recorded_at >= start_time
-    ).order_by(Biometric.recorded_at.desc()).all()
+    result = await db.execute(keyset(
+        select(Biometric).where(
+            Biometric.patient_id == patient_id,
+            Biometric.recorded_at >= start_time
+        ),
+        Biometric.recorded_at, Biometric.id, cursor, limit
+    ))
+    biometrics, _ = page_of(result.scalars().all(), "recorded_at", limit, response)
 
     return biometrics
 
 @router.get("/latest", response_model=BiometricInDB)
 async def get_latest_biometric(
-    current_patient=Depends(get_current_patient_user),
-    db: Session = Depends(get_db)
+    patient_id: int = Depends(get_current_patient_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get latest biometric data"""
-    # Get the actual patient ID
-    if isinstance(current_patient, User):
-        patient_record = db.query(Patient).filter(Patient.email == current_patient.email).first()
-        if not patient_record:
-            raise HTTPException(status_code=404, detail="Patient record not found")
-        patient_id = patient_record.id
-    else:
-        patient_id = current_patient.id
-
-    biometric = db.query(Biometric).filter(
-        Biometric.patient_id == patient_id
-    ).order_by(Biometric.recorded_at.desc()).first()
+    query = select(Biometric).where(Biometric.patient_id == patient_id)
+
+    # Point lookup on (patient_id, recorded_at) through the latest-state row
+    biometric = None
+    state = await db.get(PatientLatestState, patient_id)
+    if state is not None and state.biometric_recorded_at is not None:
+        result = await db.execute(
+            query.where(Biometric.recorded_at == state.biometric_recorded_at)
+            .order_by(Biometric.id.desc()).limit(1)
+        )
+        biometric = result.scalars().first()
+
+    if biometric is None:
+        # No state yet (rows written before the table existed)
+        result = await db.execute(query.order_by(Biometric.recorded_at.desc()).limit(1))
+        biometric = result.scalars().first()
     
     if not biometric:
         raise HTTPException(
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.pagination import keyset, page_limit, page_of
 from app.models.clinical_note import ClinicalNote
 from app.models.patient import Patient
 from app.schemas.clinical_note import ClinicalNoteCreate, ClinicalNoteUpdate, ClinicalNoteInDB
@@ -45,10 +47,13 @@ async def create_clinical_note(
 @router.get("/patient/{patient_id}", response_model=List[ClinicalNoteInDB], summary="Get patient's clinical notes")
 async def get_patient_clinical_notes(
     patient_id: int,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped server-side)"),
     db: Session = Depends(get_db),
     current_doctor = Depends(get_current_doctor_user)
 ):
-    """Get all clinical notes for a specific patient."""
+    """Get the clinical notes of a specific patient, newest first."""
     patient = db.query(Patient).filter(Patient.id == patient_id).first()
     if not patient:
         raise HTTPException(
@@ -56,9 +61,11 @@ async def get_patient_clinical_notes(
             detail="Patient not found"
         )
 
-    notes = db.query(ClinicalNote).filter(
-        ClinicalNote.patient_id == patient_id
-    ).order_by(ClinicalNote.created_at.desc()).all()
+    limit = page_limit(limit, default=settings.MAX_PAGE_SIZE)
+    notes, _ = page_of(keyset(
+        db.query(ClinicalNote).filter(ClinicalNote.patient_id == patient_id),
+        ClinicalNote.created_at, ClinicalNote.id, cursor, limit
+    ).all(), "created_at", limit, response)
 
     return notes
 
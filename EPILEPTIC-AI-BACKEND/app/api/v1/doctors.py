@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime, timedelta
 
-from app.core.database import get_db
-from app.core.security import get_password_hash
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db
+from app.core.pagination import NEXT_CURSOR_HEADER, keyset, page_limit, page_of
+from app.core.security import get_current_principal, get_password_hash
 from app.models.doctor import Doctor
 from app.models.patient import Patient
 from app.models.user import User, UserRole
@@ -11,7 +15,16 @@ from app.models.medication import Medication
 from app.schemas.doctor import DoctorCreate, DoctorInDB, DoctorUpdate
 from app.schemas.patient import PatientCreateByDoctor, PatientInDB, PatientUpdate
 from app.schemas.medication import MedicationCreate, MedicationUpdate, MedicationInDB
-from app.api.deps import get_current_doctor_user, get_current_admin_or_doctor, get_current_admin
+from app.schemas.dashboard import AlertInboxItem, DashboardStats, PatientMetrics, SeizureHistoryItem, SeizureStatistics
+from app.services.alert_inbox import inbox_page
+from app.services.dashboard_stats import get_dashboard_stats
+from app.services.doctor_assignment import assign_treating_neurologist
+from app.services.patient_metrics import patient_metrics_page
+from app.services.seizure_history import history_page
+from app.services.seizure_statistics import seizure_statistics
+from app.services.write_behind import naive_utc
+from app.api.deps import get_current_doctor_user, get_current_admin_or_doctor, get_current_admin, get_doctor_scope
+from app.websockets.manager import manager
 import json
 
 router = APIRouter()
@@ -22,7 +35,8 @@ router = APIRouter()
 async def create_patient(
     patient_data: PatientCreateByDoctor,
     db: Session = Depends(get_db),
-    current_doctor = Depends(get_current_doctor_user)
+    current_doctor = Depends(get_current_doctor_user),
+    doctor_id: Optional[int] = Depends(get_doctor_scope)
 ):
     """
     Create a new patient. Only accessible by doctors.
@@ -76,7 +90,8 @@ async def create_patient(
         trigger_factors=patient_data.trigger_factors,
         medical_history=patient_data.medical_history,
         emergency_contacts=[],  # Empty initially, patient will add from mobile
-        treating_neurologist=doctor_email,  # FORCE assignment to current doctor
+        doctor_id=doctor_id,  # FORCE assignment to current doctor
+        treating_neurologist=doctor_email,
         hospital=patient_data.hospital,
         hashed_password=get_password_hash(patient_data.password),
         is_active=True,
@@ -92,47 +107,65 @@ async def create_patient(
 
 @router.get("/patients", response_model=List[PatientInDB], summary="Get patients (admin sees all, doctor sees only assigned)")
 async def get_patients_list(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped server-side)"),
+    skip: int = Query(0, ge=0, description="Deprecated offset, ignored when a cursor is given"),
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_admin_or_doctor)
+    current_user = Depends(get_current_admin_or_doctor),
+    doctor_id: Optional[int] = Depends(get_doctor_scope)
 ):
     """
-    Get list of patients.
+    Get list of patients, newest first.
     - Admin users: see all patients
-    - Doctor users: see only patients assigned to them (filtered by treating_neurologist)
+    - Doctor users: see only patients assigned to them (filtered by doctor_id)
     """
-    # Check if user is admin
-    if hasattr(current_user, 'role') and current_user.role == UserRole.ADMIN:
-        # Admin sees all patients
-        patients = db.query(Patient).offset(skip).limit(limit).all()
-        return patients
-
-    # For doctors: filter by treating_neurologist
-    doctor_email = None
-    if isinstance(current_user, Doctor):
-        doctor_email = current_user.email
-    elif hasattr(current_user, 'email'):
-        doctor_email = current_user.email
-
-    if not doctor_email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Could not determine doctor email"
-        )
+    limit = page_limit(limit, default=settings.MAX_PAGE_SIZE)
 
-    # Filter patients by treating_neurologist (doctor's email)
-    patients = db.query(Patient).filter(
-        Patient.treating_neurologist == doctor_email
-    ).offset(skip).limit(limit).all()
+    def paginate(query):
+        query = keyset(query, Patient.created_at, Patient.id, cursor, limit)
+        if skip and not cursor:
+            query = query.offset(skip)
+        patients, _ = page_of(query.all(), "created_at", limit, response)
+        return patients
 
+    # Admin sees all patients
+    if doctor_id is None:
+        return paginate(db.query(Patient))
+
+    # For doctors: indexed filter on the assigned doctor
+    return paginate(db.query(Patient).filter(Patient.doctor_id == doctor_id))
+
+@router.get("/patients/with-metrics", response_model=List[PatientMetrics], summary="Get patients with risk and seizure metrics")
+async def get_patients_with_metrics(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped server-side)"),
+    skip: int = Query(0, ge=0, description="Deprecated offset, ignored when a cursor is given"),
+    sort: str = Query("risk", pattern="^(risk|created_at)$", description="Highest risk first, or newest first"),
+    health_status: Optional[str] = Query(None, pattern="^(critical|high-risk|stable|unknown)$"),
+    db: Session = Depends(get_db),
+    doctor_id: Optional[int] = Depends(get_doctor_scope)
+):
+    """
+    Patients with latest risk score and heart rate, last seizure, total
+    seizures and seizures in the last 30 days, in one query per page
+    whatever the panel size (admins see every patient).
+    """
+    limit = page_limit(limit, default=settings.MAX_PAGE_SIZE)
+    patients, next_cursor = patient_metrics_page(
+        db, doctor_id, limit, cursor=cursor, sort=sort, status=health_status, skip=skip
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return patients
 
 @router.get("/patients/{patient_id}", response_model=PatientInDB, summary="Get patient by ID (admin sees all, doctor sees only assigned)")
 async def get_patient_by_id(
     patient_id: int,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_admin_or_doctor)
+    current_user = Depends(get_current_admin_or_doctor),
+    doctor_id: Optional[int] = Depends(get_doctor_scope)
 ):
     """
     Get patient details by ID.
@@ -140,7 +173,7 @@ async def get_patient_by_id(
     - Doctor users: can only access patients assigned to them
     """
     # If admin, allow access to any patient
-    if hasattr(current_user, 'role') and current_user.role == UserRole.ADMIN:
+    if doctor_id is None:
         patient = db.query(Patient).filter(Patient.id == patient_id).first()
         if not patient:
             raise HTTPException(
@@ -149,17 +182,10 @@ async def get_patient_by_id(
             )
         return patient
 
-    # For doctors: verify patient belongs to them
-    doctor_email = None
-    if isinstance(current_user, Doctor):
-        doctor_email = current_user.email
-    elif hasattr(current_user, 'email'):
-        doctor_email = current_user.email
-
-    # Find patient and verify it belongs to this doctor
+    # For doctors: find patient and verify it belongs to this doctor
     patient = db.query(Patient).filter(
         Patient.id == patient_id,
-        Patient.treating_neurologist == doctor_email
+        Patient.doctor_id == doctor_id
     ).first()
 
     if not patient:
@@ -175,7 +201,8 @@ async def update_patient_by_doctor(
     patient_id: int,
     patient_data: PatientUpdate,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_admin_or_doctor)
+    current_user = Depends(get_current_admin_or_doctor),
+    doctor_id: Optional[int] = Depends(get_doctor_scope)
 ):
     """
     Update patient information.
@@ -191,18 +218,11 @@ async def update_patient_by_doctor(
         )
 
     # For doctors: verify patient belongs to them
-    if not (hasattr(current_user, 'role') and current_user.role == UserRole.ADMIN):
-        doctor_email = None
-        if isinstance(current_user, Doctor):
-            doctor_email = current_user.email
-        elif hasattr(current_user, 'email'):
-            doctor_email = current_user.email
-
-        if patient.treating_neurologist != doctor_email:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You can only update patients assigned to you"
-            )
+    if doctor_id is not None and patient.doctor_id != doctor_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only update patients assigned to you"
+        )
 
     # Update patient data
     update_data = patient_data.dict(exclude_unset=True)
@@ -210,6 +230,10 @@ async def update_patient_by_doctor(
     if "emergency_contacts" in update_data:
         update_data["emergency_contacts"] = [ec.dict() for ec in patient_data.emergency_contacts]
 
+    # Reassignment by email: keep doctor_id in step with treating_neurologist
+    if "treating_neurologist" in update_data:
+        assign_treating_neurologist(db, patient, update_data.pop("treating_neurologist"))
+
     for field, value in update_data.items():
         setattr(patient, field, value)
 
@@ -229,7 +253,8 @@ async def update_patient_by_doctor(
 async def delete_patient_by_doctor(
     patient_id: int,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_admin_or_doctor)
+    current_user = Depends(get_current_admin_or_doctor),
+    doctor_id: Optional[int] = Depends(get_doctor_scope)
 ):
     """
     Delete a patient.
@@ -246,18 +271,11 @@ async def delete_patient_by_doctor(
         )
 
     # For doctors: verify patient belongs to them
-    if not (hasattr(current_user, 'role') and current_user.role == UserRole.ADMIN):
-        doctor_email = None
-        if isinstance(current_user, Doctor):
-            doctor_email = current_user.email
-        elif hasattr(current_user, 'email'):
-            doctor_email = current_user.email
-
-        if patient.treating_neurologist != doctor_email:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You can only delete patients assigned to you"
-            )
+    if doctor_id is not None and patient.doctor_id != doctor_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only delete patients assigned to you"
+        )
 
     # Delete from User table if exists
     user = db.query(User).filter(User.email == patient.email).first()
@@ -270,16 +288,137 @@ async def delete_patient_by_doctor(
 
     return {"message": f"Patient {patient.full_name} deleted successfully"}
 
+# ==================== DASHBOARD ====================
+
+@router.get("/dashboard/stats", response_model=DashboardStats, summary="Dashboard counters for the doctor's patients")
+async def get_dashboard_statistics(
+    db: Session = Depends(get_db),
+    doctor_id: Optional[int] = Depends(get_doctor_scope)
+):
+    """
+    Patients, recent seizures (last 7 / 30 days), critical and high-risk
+    patients and open alerts, computed in one aggregate query and cached
+    per doctor (admins see every patient).
+    """
+    return get_dashboard_stats(db, doctor_id)
+
+@router.get("/seizures/statistics", response_model=SeizureStatistics, summary="Seizure counts per day, week and month")
+async def get_seizure_statistics(
+    days: int = Query(30, ge=1, le=366, description="Number of days up to today"),
+    db: Session = Depends(get_db),
+    doctor_id: Optional[int] = Depends(get_doctor_scope)
+):
+    """
+    Daily, weekly (Monday) and monthly seizure counts of the doctor's
+    patients over the last `days` days, empty buckets included. Series are
+    cached per doctor and range and updated in place on new seizures.
+    """
+    return seizure_statistics(db, doctor_id, days)
+
+@router.get("/history", response_model=List[SeizureHistoryItem], summary="Seizure history across the doctor's patients")
+async def get_seizure_history(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped server-side)"),
+    skip: int = Query(0, ge=0, description="Deprecated offset, ignored when a cursor is given"),
+    patient_id: Optional[int] = Query(None),
+    seizure_type: Optional[str] = Query(None),
+    days: Optional[int] = Query(None, ge=1, description="Only the last N days"),
+    start_date: Optional[datetime] = Query(None, description="Seizures starting at or after"),
+    end_date: Optional[datetime] = Query(None, description="Seizures starting before"),
+    db: Session = Depends(get_db),
+    doctor_id: Optional[int] = Depends(get_doctor_scope)
+):
+    """
+    Seizures of the doctor's patients with patient name and email, newest
+    first, in one joined query per page (admins see every patient).
+    """
+    limit = page_limit(limit, default=settings.MAX_PAGE_SIZE)
+    # Dates with an offset are compared as naive UTC, like utcnow()
+    start_date = naive_utc(start_date) if start_date else None
+    end_date = naive_utc(end_date) if end_date else None
+    if days is not None:
+        since = datetime.utcnow() - timedelta(days=days)
+        start_date = max(start_date, since) if start_date else since
+    seizures, next_cursor = history_page(
+        db, doctor_id, limit, cursor=cursor, patient_id=patient_id, seizure_type=seizure_type,
+        start=start_date, end=end_date, skip=skip
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return seizures
+
+@router.get("/alerts/inbox", response_model=List[AlertInboxItem], summary="Open alerts across the doctor's patients")
+async def get_alert_inbox(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped server-side)"),
+    severity: Optional[str] = Query(None, pattern="^(low|medium|high|critical)$"),
+    db: Session = Depends(get_db),
+    doctor_id: Optional[int] = Depends(get_doctor_scope)
+):
+    """
+    Active, unacknowledged and unresolved alerts of the doctor's patients,
+    newest first, read from the partial index of open alerts (admins see
+    every patient). Changes are pushed on /doctors/alerts/ws.
+    """
+    limit = page_limit(limit, default=settings.MAX_PAGE_SIZE)
+    alerts, next_cursor = inbox_page(db, doctor_id, limit, cursor=cursor, severity=severity)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return alerts
+
+@router.websocket("/alerts/ws")
+async def alert_inbox_socket(websocket: WebSocket, token: str = Query(...)):
+    """
+    Live inbox updates for a doctor: "alert_inbox" messages with event
+    "new" or "resolved". The access token is passed as a query parameter.
+    """
+    # Token resolution may hit the database: keep it off the event loop
+    doctor_id = await run_in_threadpool(_socket_doctor_scope, token)
+    if doctor_id is None:
+        # Admins have no doctor channel
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await manager.connect(websocket, doctor_id, "doctor")
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Any exit (disconnect, send error, cancellation) unregisters the socket
+        manager.disconnect(websocket)
+
+def _socket_doctor_scope(token: str) -> Optional[int]:
+    db = SessionLocal()
+    try:
+        return get_doctor_scope(get_current_principal(db, token))
+    except HTTPException:
+        return None
+    finally:
+        db.close()
+
 # ==================== DOCTOR MANAGEMENT ====================
 
 @router.get("/", response_model=List[DoctorInDB])
 async def get_doctors(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped server-side)"),
+    skip: int = Query(0, ge=0, description="Deprecated offset, ignored when a cursor is given"),
     db: Session = Depends(get_db)
 ):
     """Get list of doctors (public endpoint for patient app)"""
-    doctors = db.query(Doctor).filter(Doctor.is_active == True).offset(skip).limit(limit).all()
+    limit = page_limit(limit, default=settings.MAX_PAGE_SIZE)
+    query = keyset(
+        db.query(Doctor).filter(Doctor.is_active == True),
+        Doctor.created_at, Doctor.id, cursor, limit
+    )
+    if skip and not cursor:
+        query = query.offset(skip)
+    doctors, _ = page_of(query.all(), "created_at", limit, response)
     return doctors
 
 @router.get("/me", response_model=DoctorInDB, summary="Get current doctor profile")
@@ -453,20 +592,14 @@ async def get_patient_medications(
     patient_id: int,
     status_filter: str = None,
     db: Session = Depends(get_db),
-    current_doctor = Depends(get_current_doctor_user)
+    current_doctor = Depends(get_current_doctor_user),
+    doctor_id: Optional[int] = Depends(get_doctor_scope)
 ):
     """Get all medications for a specific patient. Only accessible by the patient's assigned doctor."""
-    # Get doctor's email
-    doctor_email = None
-    if isinstance(current_doctor, Doctor):
-        doctor_email = current_doctor.email
-    elif hasattr(current_doctor, 'email'):
-        doctor_email = current_doctor.email
-
     # Verify patient exists and belongs to this doctor
     patient = db.query(Patient).filter(
         Patient.id == patient_id,
-        Patient.treating_neurologist == doctor_email
+        Patient.doctor_id == doctor_id
     ).first()
 
     if not patient:
@@ -489,20 +622,14 @@ async def create_patient_medication(
     patient_id: int,
     medication_data: MedicationCreate,
     db: Session = Depends(get_db),
-    current_doctor = Depends(get_current_doctor_user)
+    current_doctor = Depends(get_current_doctor_user),
+    doctor_id: Optional[int] = Depends(get_doctor_scope)
 ):
     """Create a new medication for a patient. Only accessible by the patient's assigned doctor."""
-    # Get doctor's email
-    doctor_email = None
-    if isinstance(current_doctor, Doctor):
-        doctor_email = current_doctor.email
-    elif hasattr(current_doctor, 'email'):
-        doctor_email = current_doctor.email
-
     # Verify patient exists and belongs to this doctor
     patient = db.query(Patient).filter(
         Patient.id == patient_id,
-        Patient.treating_neurologist == doctor_email
+        Patient.doctor_id == doctor_id
     ).first()
 
     if not patient:
@@ -531,9 +658,22 @@ async def update_patient_medication(
     medication_id: int,
     medication_data: MedicationUpdate,
     db: Session = Depends(get_db),
-    current_doctor = Depends(get_current_doctor_user)
+    current_doctor = Depends(get_current_doctor_user),
+    doctor_id: Optional[int] = Depends(get_doctor_scope)
 ):
-    """Update a medication for a patient. Only accessible by doctors."""
+    """Update a medication for a patient. Only accessible by the patient's assigned doctor."""
+    # Verify patient exists and belongs to this doctor
+    patient = db.query(Patient).filter(
+        Patient.id == patient_id,
+        Patient.doctor_id == doctor_id
+    ).first()
+
+    if not patient:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Patient not found or not assigned to you"
+        )
+
     # Verify medication exists and belongs to patient
     medication = db.query(Medication).filter(
         Medication.id == medication_id,
@@ -565,9 +705,22 @@ async def delete_patient_medication(
     patient_id: int,
     medication_id: int,
     db: Session = Depends(get_db),
-    current_doctor = Depends(get_current_doctor_user)
+    current_doctor = Depends(get_current_doctor_user),
+    doctor_id: Optional[int] = Depends(get_doctor_scope)
 ):
-    """Delete a medication for a patient. Only accessible by doctors."""
+    """Delete a medication for a patient. Only accessible by the patient's assigned doctor."""
+    # Verify patient exists and belongs to this doctor
+    patient = db.query(Patient).filter(
+        Patient.id == patient_id,
+        Patient.doctor_id == doctor_id
+    ).first()
+
+    if not patient:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Patient not found or not assigned to you"
+        )
+
     # Verify medication exists and belongs to patient
     medication = db.query(Medication).filter(
         Medication.id == medication_id,
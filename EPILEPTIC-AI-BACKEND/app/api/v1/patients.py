@@ -9,6 +9,7 @@ from app.models.patient import Patient
 from app.models.user import User
 from app.schemas.patient import PatientUpdate, PatientInDB, EmergencyContact
 from app.api.deps import get_current_patient_user
+from app.services.doctor_assignment import assign_treating_neurologist
 
 router = APIRouter()
 
@@ -62,6 +63,10 @@ async def update_me(
     if "emergency_contacts" in update_data:
         update_data["emergency_contacts"] = [ec.dict() for ec in patient_update.emergency_contacts]
 
+    # Reassignment by email: keep doctor_id in step with treating_neurologist
+    if "treating_neurologist" in update_data:
+        assign_treating_neurologist(db, patient, update_data.pop("treating_neurologist"))
+
     for field, value in update_data.items():
         setattr(patient, field, value)
 
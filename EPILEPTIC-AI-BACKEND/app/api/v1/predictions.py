@@ -1,62 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from datetime import datetime, timedelta
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.pagination import keyset, page_limit, page_of
+from app.models.patient_latest_state import PatientLatestState
 from app.models.prediction import Prediction
 from app.services.ai_prediction import AIPredictionService
 from app.schemas.prediction import PredictionResult, PredictionCreate
-from app.api.deps import get_current_patient, get_current_patient_user
-from app.models.patient import Patient
-from app.models.user import User
+from app.api.deps import get_current_patient, get_current_patient_id
 
 router = APIRouter()
 prediction_service = AIPredictionService()
 
 @router.get("/", response_model=List[PredictionResult])
 async def get_predictions(
+    response: Response,
     hours: int = 24,
-    current_patient=Depends(get_current_patient_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped server-side)"),
+    patient_id: int = Depends(get_current_patient_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get recent predictions"""
-    # Get patient ID
-    if isinstance(current_patient, User):
-        patient_record = db.query(Patient).filter(Patient.email == current_patient.email).first()
-        if not patient_record:
-            raise HTTPException(status_code=404, detail="Patient record not found")
-        patient_id = patient_record.id
-    else:
-        patient_id = current_patient.id
-
+    """Get recent predictions, newest first, one page at a time"""
     start_time = datetime.utcnow() - timedelta(hours=hours)
+    limit = page_limit(limit, settings.TIME_SERIES_MAX_PAGE_SIZE, settings.TIME_SERIES_MAX_PAGE_SIZE)
 
-    predictions = db.query(Prediction).filter(
-        Prediction.patient_id == patient_id,
-        Prediction.predicted_at >= start_time
-    ).order_by(Prediction.predicted_at.desc()).all()
+    result = await db.execute(keyset(
+        select(Prediction).where(
+            Prediction.patient_id == patient_id,
+            Prediction.predicted_at >= start_time
+        ),
+        Prediction.predicted_at, Prediction.id, cursor, limit
+    ))
+    predictions, _ = page_of(result.scalars().all(), "predicted_at", limit, response)
 
     return predictions
 
 @router.get("/latest", response_model=PredictionResult)
 async def get_latest_prediction(
-    current_patient=Depends(get_current_patient_user),
-    db: Session = Depends(get_db)
+    patient_id: int = Depends(get_current_patient_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get latest prediction"""
-    # Get patient ID
-    if isinstance(current_patient, User):
-        patient_record = db.query(Patient).filter(Patient.email == current_patient.email).first()
-        if not patient_record:
-            raise HTTPException(status_code=404, detail="Patient record not found")
-        patient_id = patient_record.id
-    else:
-        patient_id = current_patient.id
+    query = select(Prediction).where(Prediction.patient_id == patient_id)
+
+    # Point lookup on (patient_id, predicted_at) through the latest-state row
+    prediction = None
+    state = await db.get(PatientLatestState, patient_id)
+    if state is not None and state.predicted_at is not None:
+        result = await db.execute(
+            query.where(Prediction.predicted_at == state.predicted_at)
+            .order_by(Prediction.id.desc()).limit(1)
+        )
+        prediction = result.scalars().first()
 
-    prediction = db.query(Prediction).filter(
-        Prediction.patient_id == patient_id
-    ).order_by(Prediction.predicted_at.desc()).first()
+    if prediction is None:
+        # No state yet (rows written before the table existed)
+        result = await db.execute(query.order_by(Prediction.predicted_at.desc()).limit(1))
+        prediction = result.scalars().first()
 
     if not prediction:
         raise HTTPException(
@@ -68,19 +73,10 @@ async def get_latest_prediction(
 
 @router.post("/analyze")
 async def analyze_biometric_data(
-    current_patient=Depends(get_current_patient_user),
-    db: Session = Depends(get_db)
+    patient_id: int = Depends(get_current_patient_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Analyze biometric data and make prediction"""
-    # Get patient ID
-    if isinstance(current_patient, User):
-        patient_record = db.query(Patient).filter(Patient.email == current_patient.email).first()
-        if not patient_record:
-            raise HTTPException(status_code=404, detail="Patient record not found")
-        patient_id = patient_record.id
-    else:
-        patient_id = current_patient.id
-
     try:
         # predict_seizure_risk retourne un objet Prediction déjà sauvegardé
         prediction = await prediction_service.predict_seizure_risk(
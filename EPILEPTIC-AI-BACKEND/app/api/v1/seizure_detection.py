@@ -8,16 +8,15 @@ Routes pour le flux complet de détection de crise:
 4. POST /healthkit-sync - Récupérer et analyser les données depuis HealthKit
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Header
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any, Optional
 from pydantic import BaseModel, Field
 
-from app.core.database import get_db
-from app.api.deps import get_current_patient, get_current_patient_user
+from app.core.database import get_async_db
+from app.api.deps import get_current_admin, get_current_patient, get_current_patient_id, admit_ingestion
 from app.services.seizure_detection_service import get_seizure_detection_service
-from app.models.patient import Patient
-from app.models.user import User
+from app.services.rate_limiter import get_rate_limiter
 
 router = APIRouter()
 
@@ -58,8 +57,9 @@ class ConfirmSafetyRequest(BaseModel):
 @router.post("/detect", response_model=Dict[str, Any])
 async def detect_seizure_risk(
     biometric_data: BiometricDataInput,
-    current_patient = Depends(get_current_patient_user),
-    db: Session = Depends(get_db)
+    patient_id: int = Depends(get_current_patient_id),
+    db: AsyncSession = Depends(get_async_db),
+    x_device_id: Optional[str] = Header(None)
 ):
     """
     Analyse les données biométriques et détecte les risques de crise
@@ -68,25 +68,27 @@ async def detect_seizure_risk(
     - Démarre un countdown de 30 secondes
     - Le patient doit confirmer qu'il va bien via /confirm
     - Si pas de confirmation: SMS automatique aux contacts d'urgence
-    """
-    # Récupérer l'ID du patient
-    if isinstance(current_patient, User):
-        patient_record = db.query(Patient).filter(Patient.email == current_patient.email).first()
-        if not patient_record:
-            raise HTTPException(status_code=404, detail="Patient record not found")
-        patient_id = patient_record.id
-    else:
-        patient_id = current_patient.id
 
+    Au-delà du débit autorisé pour l'appareil, l'échantillon est enregistré
+    sans prédiction (status "coalesced") et compte dans la suivante.
+
+    Avec le write-behind, une prédiction sans alerte (status "ok") est
+    écrite par lot après la réponse: "prediction_id" n'est alors pas
+    renvoyé (utiliser /predictions/latest).
+    """
     # Récupérer le service de détection
     detection_service = get_seizure_detection_service()
 
+    # Au-delà du plafond dur seulement: 429
+    admission = admit_ingestion("detect", patient_id, x_device_id)
+
     try:
         # Analyser les données
         result = await detection_service.process_biometric_data(
             db=db,
             patient_id=patient_id,
-            biometric_data=biometric_data.dict()
+            biometric_data=biometric_data.dict(),
+            run_prediction=admission.allowed
         )
 
         return result
@@ -106,23 +108,14 @@ async def detect_seizure_risk(
 @router.post("/confirm", response_model=Dict[str, Any])
 async def confirm_patient_safety(
     request: ConfirmSafetyRequest,
-    current_patient = Depends(get_current_patient_user),
-    db: Session = Depends(get_db)
+    patient_id: int = Depends(get_current_patient_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Le patient confirme qu'il va bien
 
     Annule le countdown et empêche l'envoi de SMS aux contacts d'urgence
     """
-    # Récupérer l'ID du patient
-    if isinstance(current_patient, User):
-        patient_record = db.query(Patient).filter(Patient.email == current_patient.email).first()
-        if not patient_record:
-            raise HTTPException(status_code=404, detail="Patient record not found")
-        patient_id = patient_record.id
-    else:
-        patient_id = current_patient.id
-
     # Récupérer le service
     detection_service = get_seizure_detection_service()
 
@@ -149,23 +142,13 @@ async def confirm_patient_safety(
 
 @router.get("/countdown-status", response_model=Dict[str, Any])
 async def get_countdown_status(
-    current_patient = Depends(get_current_patient_user),
-    db: Session = Depends(get_db)
+    patient_id: int = Depends(get_current_patient_id)
 ):
     """
     Obtient le statut du countdown actif pour le patient
 
     Utilisé par le frontend pour afficher le timer et le bouton de confirmation
     """
-    # Récupérer l'ID du patient
-    if isinstance(current_patient, User):
-        patient_record = db.query(Patient).filter(Patient.email == current_patient.email).first()
-        if not patient_record:
-            raise HTTPException(status_code=404, detail="Patient record not found")
-        patient_id = patient_record.id
-    else:
-        patient_id = current_patient.id
-
     # Récupérer le service
     detection_service = get_seizure_detection_service()
 
@@ -186,8 +169,9 @@ async def get_countdown_status(
 @router.post("/healthkit-sync", response_model=Dict[str, Any])
 async def sync_healthkit_data(
     request: HealthKitSyncRequest,
-    current_patient = Depends(get_current_patient_user),
-    db: Session = Depends(get_db)
+    patient_id: int = Depends(get_current_patient_id),
+    db: AsyncSession = Depends(get_async_db),
+    x_device_id: Optional[str] = Header(None)
 ):
     """
     Récupère les données depuis HealthKit et lance l'analyse
@@ -195,14 +179,7 @@ async def sync_healthkit_data(
     Utilisé par l'application iOS pour synchroniser automatiquement
     les données de l'Apple Watch
     """
-    # Récupérer l'ID du patient
-    if isinstance(current_patient, User):
-        patient_record = db.query(Patient).filter(Patient.email == current_patient.email).first()
-        if not patient_record:
-            raise HTTPException(status_code=404, detail="Patient record not found")
-        patient_id = patient_record.id
-    else:
-        patient_id = current_patient.id
+    admission = admit_ingestion("healthkit_sync", patient_id, x_device_id)
 
     # Récupérer le service
     detection_service = get_seizure_detection_service()
@@ -211,7 +188,8 @@ async def sync_healthkit_data(
         result = await detection_service.fetch_healthkit_data_and_analyze(
             db=db,
             patient_id=patient_id,
-            user_token=request.healthkit_token
+            user_token=request.healthkit_token,
+            run_prediction=admission.allowed
         )
 
         return result
@@ -231,8 +209,9 @@ async def sync_healthkit_data(
 @router.post("/predict-simple", response_model=Dict[str, Any])
 async def predict_simple(
     data: SimplePredictionInput,
-    current_patient = Depends(get_current_patient_user),
-    db: Session = Depends(get_db)
+    patient_id: int = Depends(get_current_patient_id),
+    db: AsyncSession = Depends(get_async_db),
+    x_device_id: Optional[str] = Header(None)
 ):
     """
     Endpoint de test simplifié pour Postman
@@ -253,15 +232,6 @@ async def predict_simple(
     }
     ```
     """
-    # Récupérer l'ID du patient
-    if isinstance(current_patient, User):
-        patient_record = db.query(Patient).filter(Patient.email == current_patient.email).first()
-        if not patient_record:
-            raise HTTPException(status_code=404, detail="Patient record not found")
-        patient_id = patient_record.id
-    else:
-        patient_id = current_patient.id
-
     # Convertir en format biométrique compatible
     biometric_data = {
         "heart_rate": data.heart_rate,
@@ -278,12 +248,16 @@ async def predict_simple(
     # Récupérer le service de détection
     detection_service = get_seizure_detection_service()
 
+    # Au-delà du plafond dur seulement: 429
+    admission = admit_ingestion("detect", patient_id, x_device_id)
+
     try:
         # Analyser les données
         result = await detection_service.process_biometric_data(
             db=db,
             patient_id=patient_id,
-            biometric_data=biometric_data
+            biometric_data=biometric_data,
+            run_prediction=admission.allowed
         )
 
         # Ajouter les valeurs brutes dans la réponse pour debug
@@ -306,3 +280,15 @@ async def predict_simple(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error analyzing data: {str(e)}"
         )
+
+
+@router.get("/throttle-stats", response_model=Dict[str, Any])
+async def get_throttle_stats(
+    current_admin = Depends(get_current_admin)
+):
+    """
+    Compteurs de limitation de débit (admis / limités par route)
+
+    Réservé aux administrateurs (exploitation)
+    """
+    return get_rate_limiter().stats()
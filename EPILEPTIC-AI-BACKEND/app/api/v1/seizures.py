@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime, timedelta
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.pagination import keyset, page_limit, page_of
 from app.models.seizure import Seizure
 from app.schemas.seizure import SeizureCreate, SeizureUpdate, SeizureInDB
 from app.api.deps import get_current_patient
@@ -41,17 +43,24 @@ async def create_seizure(
 
 @router.get("/", response_model=List[SeizureInDB])
 async def get_seizures(
+    response: Response,
     days: int = 30,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped server-side)"),
     current_patient=Depends(get_current_patient),
     db: Session = Depends(get_db)
 ):
     """Get seizure history"""
     start_date = datetime.utcnow() - timedelta(days=days)
+    limit = page_limit(limit, default=settings.MAX_PAGE_SIZE)
     
-    seizures = db.query(Seizure).filter(
-        Seizure.patient_id == current_patient.id,
-        Seizure.start_time >= start_date
-    ).order_by(Seizure.start_time.desc()).all()
+    seizures, _ = page_of(keyset(
+        db.query(Seizure).filter(
+            Seizure.patient_id == current_patient.id,
+            Seizure.start_time >= start_date
+        ),
+        Seizure.start_time, Seizure.id, cursor, limit
+    ).all(), "start_time", limit, response)
     
     return seizures
 
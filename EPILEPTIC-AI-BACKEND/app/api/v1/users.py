@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy import or_
 from typing import Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from app.core.database import get_db
+from app.core.pagination import keyset, page_of
 from app.core.security import get_password_hash, get_current_user
+from app.models.doctor import Doctor
+from app.models.patient import Patient
 from app.models.user import User, UserRole
 from app.schemas.user import (
     UserCreate,
@@ -16,6 +19,7 @@ from app.schemas.user import (
     UserStats,
     UserPasswordUpdate
 )
+from app.services.admin_snapshot import user_stats_snapshot
 
 router = APIRouter()
 
@@ -36,7 +40,8 @@ def get_current_admin_user(current_user: User = Depends(get_current_user)) -> Us
 # GET /users - List all users with pagination and filters
 @router.get("/", response_model=UserListResponse)
 async def list_users(
-    page: int = Query(1, ge=1, description="Page number"),
+    cursor: Optional[str] = Query(None, description="Cursor from next_cursor; takes precedence over page"),
+    page: int = Query(1, ge=1, description="Page number (offset pagination, prefer cursor)"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
     role: Optional[UserRole] = Query(None, description="Filter by role"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
@@ -71,9 +76,11 @@ async def list_users(
     # Get total count
     total = query.count()
 
-    # Apply pagination
-    offset = (page - 1) * page_size
-    users = query.order_by(User.created_at.desc()).offset(offset).limit(page_size).all()
+    # Apply pagination: keyset on (created_at, id), OFFSET only for page numbers
+    query = keyset(query, User.created_at, User.id, cursor, page_size)
+    if not cursor:
+        query = query.offset((page - 1) * page_size)
+    users, next_cursor = page_of(query.all(), "created_at", page_size)
 
     # Calculate total pages
     total_pages = (total + page_size - 1) // page_size
@@ -83,7 +90,8 @@ async def list_users(
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=next_cursor
     )
 
 
@@ -96,26 +104,10 @@ async def get_user_stats(
     """
     Get statistics about users.
     Only accessible by admins.
+    Served from the admin snapshot (one aggregate query, refreshed
+    periodically and on user changes).
     """
-    total_users = db.query(User).count()
-    active_users = db.query(User).filter(User.is_active == True).count()
-    verified_users = db.query(User).filter(User.is_verified == True).count()
-
-    # Count users by role
-    role_counts = db.query(User.role, func.count(User.id)).group_by(User.role).all()
-    users_by_role = {role.value: count for role, count in role_counts}
-
-    # Recent registrations (last 7 days)
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    recent_registrations = db.query(User).filter(User.created_at >= seven_days_ago).count()
-
-    return UserStats(
-        total_users=total_users,
-        active_users=active_users,
-        verified_users=verified_users,
-        users_by_role=users_by_role,
-        recent_registrations=recent_registrations
-    )
+    return user_stats_snapshot(db)
 
 
 # GET /users/{user_id} - Get user by ID
@@ -158,18 +150,38 @@ async def create_user(
         )
 
     # Create new user
+    hashed_password = get_password_hash(user_data.password)
     new_user = User(
         email=user_data.email,
         full_name=user_data.full_name,
         phone=user_data.phone,
         role=user_data.role,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=hashed_password,
         is_active=True,
         is_verified=False,
         is_superuser=user_data.is_superuser
     )
 
     db.add(new_user)
+
+    # Doctors need a profile in the Doctor table to be scoped to their patients
+    if user_data.role == UserRole.DOCTOR:
+        doctor = db.query(Doctor).filter(Doctor.email == user_data.email).first()
+        if doctor is None:
+            doctor = Doctor(
+                email=user_data.email,
+                full_name=user_data.full_name,
+                phone=user_data.phone,
+                hashed_password=hashed_password,
+                is_active=True
+            )
+            db.add(doctor)
+            db.flush()
+        # Patients who already chose this doctor by email
+        db.query(Patient).filter(
+            Patient.treating_neurologist == user_data.email, Patient.doctor_id.is_(None)
+        ).update({Patient.doctor_id: doctor.id}, synchronize_session=False)
+
     db.commit()
     db.refresh(new_user)
 
@@ -5,7 +5,8 @@ from .security import (
     verify_password,
     get_password_hash,
     verify_token,
-    get_current_user
+    get_current_user,
+    get_current_principal
 )
 
 __all__ = [
@@ -18,5 +19,6 @@ __all__ = [
     'verify_password',
     'get_password_hash',
     'verify_token',
-    'get_current_user'
+    'get_current_user',
+    'get_current_principal'
 ]
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""
+Compressed request bodies
+
+ASGI middleware that accepts gzip / deflate / zstd `Content-Encoding` on
+ingestion routes. Body chunks are decompressed as they arrive, with a hard
+cap on the decompressed size so a small compressed payload cannot expand
+into an unbounded buffer (zip bomb).
+"""
+
+import logging
+import zlib
+from typing import Iterable, Optional
+
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+
+class BodyTooLarge(Exception):
+    """Decompressed body exceeds the configured limit"""
+
+
+class InvalidCompressedBody(Exception):
+    """Body does not match its Content-Encoding"""
+
+
+class _LimitedBuffer:
+    """Output sink that refuses to grow past max_size bytes"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.data = bytearray()
+
+    def write(self, chunk: bytes) -> int:
+        if len(self.data) + len(chunk) > self.max_size:
+            raise BodyTooLarge()
+        self.data += chunk
+        return len(chunk)
+
+    @property
+    def remaining(self) -> int:
+        return self.max_size - len(self.data)
+
+
+class _ZlibDecoder:
+    """gzip (wbits 16+) or zlib-wrapped deflate"""
+
+    def __init__(self, sink: _LimitedBuffer, wbits: int):
+        self.sink = sink
+        self._decompressor = zlib.decompressobj(wbits)
+
+    def feed(self, chunk: bytes) -> None:
+        data = chunk
+        try:
+            while data:
+                # +1 so that hitting the limit exactly is still detected
+                self.sink.write(self._decompressor.decompress(data, self.sink.remaining + 1))
+                data = self._decompressor.unconsumed_tail
+        except zlib.error as e:
+            raise InvalidCompressedBody(str(e))
+
+    def finish(self) -> None:
+        try:
+            self.sink.write(self._decompressor.flush())
+        except zlib.error as e:
+            raise InvalidCompressedBody(str(e))
+        if not self._decompressor.eof:
+            raise InvalidCompressedBody("Truncated compressed body")
+
+
+class _ZstdDecoder:
+    """zstd via the optional `zstandard` package"""
+
+    # decompressobj has no output limit: input is fed in small slices so a
+    # highly compressible frame overshoots the cap by a few MB at most
+    # (a 128 KB RLE block is ~4 compressed bytes)
+    INPUT_SLICE = 128
+
+    def __init__(self, sink: _LimitedBuffer):
+        import zstandard
+
+        self.sink = sink
+        self._error = zstandard.ZstdError
+        self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+
+    def feed(self, chunk: bytes) -> None:
+        view = memoryview(chunk)
+        try:
+            for start in range(0, len(view), self.INPUT_SLICE):
+                if self._decompressor.eof:
+                    break
+                self.sink.write(self._decompressor.decompress(view[start:start + self.INPUT_SLICE]))
+        except self._error as e:
+            raise InvalidCompressedBody(str(e))
+
+    def finish(self) -> None:
+        if not self._decompressor.eof:
+            raise InvalidCompressedBody("Truncated compressed body")
+
+
+def make_decoder(encoding: str, max_size: int):
+    """
+    Build a streaming decoder for a Content-Encoding value.
+
+    Returns:
+        (decoder, sink) or None if the encoding is not supported
+    """
+    sink = _LimitedBuffer(max_size)
+    if encoding in ("gzip", "x-gzip"):
+        return _ZlibDecoder(sink, 16 + zlib.MAX_WBITS), sink
+    if encoding == "deflate":
+        return _ZlibDecoder(sink, zlib.MAX_WBITS), sink
+    if encoding == "zstd":
+        try:
+            return _ZstdDecoder(sink), sink
+        except ImportError:
+            logger.warning("zstd request body received but zstandard is not installed")
+            return None
+    return None
+
+
+class RequestDecompressionMiddleware:
+    """
+    Decompress request bodies before they reach the route handlers.
+
+    Only requests whose path starts with one of `paths` are handled; other
+    requests are passed through untouched.
+    """
+
+    def __init__(self, app, max_size: int, paths: Optional[Iterable[str]] = None):
+        self.app = app
+        self.max_size = max_size
+        self.paths = tuple(paths or ())
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = None
+        for name, value in scope["headers"]:
+            if name == b"content-encoding":
+                encoding = value.decode("latin-1").strip().lower()
+                break
+
+        if not encoding or encoding == "identity" or (
+            self.paths and not scope["path"].startswith(self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        built = make_decoder(encoding, self.max_size)
+        if built is None:
+            response = JSONResponse(
+                {"detail": f"Unsupported Content-Encoding: {encoding}"}, status_code=415
+            )
+            await response(scope, receive, send)
+            return
+        decoder, sink = built
+
+        try:
+            more_body = True
+            while more_body:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                decoder.feed(message.get("body", b""))
+                more_body = message.get("more_body", False)
+            decoder.finish()
+        except BodyTooLarge:
+            response = JSONResponse(
+                {"detail": f"Decompressed body exceeds {self.max_size} bytes"}, status_code=413
+            )
+            await response(scope, receive, send)
+            return
+        except InvalidCompressedBody as e:
+            response = JSONResponse(
+                {"detail": f"Invalid {encoding} body: {e}"}, status_code=400
+            )
+            await response(scope, receive, send)
+            return
+
+        body = bytes(sink.data)
+        headers = [
+            (name, value) for name, value in scope["headers"]
+            if name not in (b"content-encoding", b"content-length")
+        ]
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(dict(scope, headers=headers), replay_receive, send)
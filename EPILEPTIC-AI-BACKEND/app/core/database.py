@@ -1,6 +1,8 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from app.core.config import settings
 
@@ -19,6 +21,50 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create base class for models
 Base = declarative_base()
 
+# Async drivers for the API layer (same database as DATABASE_URL)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url: str) -> str:
+    """
+    Map a sync database URL to its async driver (psycopg2 -> asyncpg, pysqlite -> aiosqlite).
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+# Created on first use so the async drivers are only needed by the API process
+_async_engine = None
+_async_session_factory = None
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            to_async_url(settings.DATABASE_URL),
+            pool_pre_ping=True,
+            pool_size=20,
+            max_overflow=30,
+            echo=settings.DEBUG
+        )
+    return _async_engine
+
+def AsyncSessionLocal() -> AsyncSession:
+    """
+    New AsyncSession. Objects stay loaded after commit (no lazy refresh
+    outside of an await).
+    """
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(
+            get_async_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _async_session_factory()
+
 def get_db() -> Generator:
     """
     Dependency to get database session.
@@ -27,4 +73,11 @@ def get_db() -> Generator:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get an async database session (does not block the event loop).
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
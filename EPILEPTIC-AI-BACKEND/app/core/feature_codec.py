@@ -0,0 +1,135 @@
+"""
+Prediction feature vectors
+
+Compact encoding of a prediction's features (predictions.features_vector)
+instead of the nested JSON dict built by _extract_features_with_trends:
+- 4-byte header: schema version (uint16) + value count (uint16)
+- little-endian float32 vector in the fixed order of FEATURE_SCHEMAS[version]
+  (NaN = missing value)
+- only numeric fields are kept; ISO timestamps and the device source are
+  already in the biometrics table
+
+Adding or reordering a field means a new schema version; older versions
+stay decodable.
+"""
+
+import struct
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_HEADER = struct.Struct("<HH")
+
+# version -> (group, key) paths, in vector order
+FEATURE_SCHEMAS: Dict[int, Tuple[Tuple[str, str], ...]] = {
+    1: (
+        ("heart_rate", "mean"),
+        ("heart_rate", "std"),
+        ("heart_rate", "min"),
+        ("heart_rate", "max"),
+        ("heart_rate", "current"),
+        ("heart_rate", "slope"),
+        ("heart_rate", "acceleration"),
+        ("heart_rate", "data_points"),
+        ("heart_rate_variability", "mean"),
+        ("heart_rate_variability", "std"),
+        ("heart_rate_variability", "current"),
+        ("heart_rate_variability", "slope"),
+        ("heart_rate_variability", "rmssd"),
+        ("movement", "intensity_mean"),
+        ("movement", "intensity_std"),
+        ("movement", "current"),
+        ("movement", "slope"),
+        ("stress", "level_mean"),
+        ("stress", "level_std"),
+        ("stress", "max"),
+        ("stress", "current"),
+        ("stress", "slope"),
+        ("metadata", "total_biometric_records"),
+        ("metadata", "window_minutes"),
+        ("metadata", "data_completeness"),
+    ),
+}
+
+FEATURE_SCHEMA_VERSION = max(FEATURE_SCHEMAS)
+
+# Fields decoded back to integers
+_INTEGER_FIELDS = {
+    ("heart_rate", "data_points"),
+    ("metadata", "total_biometric_records"),
+    ("metadata", "window_minutes"),
+}
+
+
+def feature_names(version: int = FEATURE_SCHEMA_VERSION) -> Tuple[str, ...]:
+    """Flat names ("heart_rate.mean", ...) of the vector columns"""
+    return tuple(f"{group}.{key}" for group, key in FEATURE_SCHEMAS[version])
+
+
+def _number(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return float(value)
+
+
+def encode_features(features: Optional[Dict[str, Any]], version: int = FEATURE_SCHEMA_VERSION) -> Optional[bytes]:
+    """
+    Encode a features dict as a schema vector.
+
+    Fields outside the schema or non-numeric are dropped; missing fields
+    are stored as NaN.
+
+    Returns:
+        Bytes to store, or None when there are no features
+    """
+    if not features:
+        return None
+    fields = FEATURE_SCHEMAS[version]
+    vector = np.array(
+        [_number((features.get(group) or {}).get(key)) for group, key in fields],
+        dtype="<f4"
+    )
+    return _HEADER.pack(version, len(fields)) + vector.tobytes()
+
+
+def _vector(blob: bytes) -> Tuple[int, np.ndarray]:
+    version, count = _HEADER.unpack_from(blob)
+    if version not in FEATURE_SCHEMAS or count != len(FEATURE_SCHEMAS[version]):
+        raise ValueError(f"Unknown feature vector schema: version={version}, count={count}")
+    return version, np.frombuffer(blob, dtype="<f4", count=count, offset=_HEADER.size)
+
+
+def decode_features(blob: Optional[bytes]) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Nested {group: {key: value}} dict of a vector (NaN fields omitted)"""
+    if blob is None:
+        return None
+    version, vector = _vector(bytes(blob))
+    features: Dict[str, Dict[str, Any]] = {}
+    for (group, key), value in zip(FEATURE_SCHEMAS[version], vector.tolist()):
+        if value != value:  # NaN
+            continue
+        features.setdefault(group, {})[key] = int(value) if (group, key) in _INTEGER_FIELDS else value
+    return features
+
+
+def features_matrix(blobs: Iterable[Optional[bytes]], version: int = FEATURE_SCHEMA_VERSION) -> np.ndarray:
+    """
+    Stack vectors into an (n, n_features) float32 matrix for training;
+    rows without a vector are all NaN.
+
+    Raises:
+        ValueError: If a vector has another schema version
+    """
+    width = len(FEATURE_SCHEMAS[version])
+    rows: List[np.ndarray] = []
+    for blob in blobs:
+        if blob is None:
+            rows.append(np.full(width, np.nan, dtype=np.float32))
+            continue
+        blob_version, vector = _vector(bytes(blob))
+        if blob_version != version:
+            raise ValueError(f"Feature vector version {blob_version}, expected {version}")
+        rows.append(vector)
+    if not rows:
+        return np.empty((0, width), dtype=np.float32)
+    return np.vstack(rows).astype(np.float32, copy=False)
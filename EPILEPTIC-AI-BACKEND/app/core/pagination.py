@@ -0,0 +1,119 @@
+"""
+Keyset pagination
+
+List endpoints are ordered by (timestamp, id) descending, or by another
+(sort value, id) key such as a risk score. The opaque cursor encodes the
+key of the last row of the previous page, so every page is an index range
+scan whatever its depth (no OFFSET), and rows inserted meanwhile never
+shift the following pages. Page sizes are capped server-side.
+
+When the sort column is nullable, rows without a sort value come last
+(NULLS LAST on every dialect) and are paged by id alone: a tuple
+comparison against NULL is NULL, which would otherwise drop them.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import or_, tuple_
+from sqlalchemy.sql.elements import Label
+
+from app.core.config import settings
+
+# Response header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def page_limit(
+    limit: Optional[int],
+    maximum: Optional[int] = None,
+    default: Optional[int] = None
+) -> int:
+    """
+    Requested page size, defaulted and capped (DEFAULT_PAGE_SIZE / MAX_PAGE_SIZE
+    unless given).
+    """
+    maximum = maximum or settings.MAX_PAGE_SIZE
+    if limit is None:
+        limit = default or settings.DEFAULT_PAGE_SIZE
+    return max(1, min(limit, maximum))
+
+
+SortValue = Union[datetime, float, None]
+
+
+def encode_cursor(value: SortValue, row_id: int) -> str:
+    """Opaque cursor for the row (timestamp or numeric sort value, id)"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[SortValue, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        HTTPException 400: malformed cursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        elif value is not None:
+            value = float(value)
+        return value, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _nullable(column) -> bool:
+    """Whether a sort column or expression may be NULL (True when unknown)"""
+    expression = getattr(column, "expression", column)
+    while isinstance(expression, Label):
+        expression = expression.element
+    return getattr(expression, "nullable", True)
+
+
+def keyset(statement, timestamp_column, id_column, cursor: Optional[str], limit: int):
+    """
+    Apply the cursor, the (timestamp, id) DESC order and limit + 1 to a
+    Query or a select(); the extra row tells whether a next page exists.
+    """
+    nullable = _nullable(timestamp_column)
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        if timestamp is None:
+            # Already among the rows without a sort value
+            statement = statement.filter(timestamp_column.is_(None), id_column < row_id)
+        else:
+            after = tuple_(timestamp_column, id_column) < tuple_(timestamp, row_id)
+            statement = statement.filter(or_(after, timestamp_column.is_(None)) if nullable else after)
+    order = timestamp_column.desc().nulls_last() if nullable else timestamp_column.desc()
+    return statement.order_by(order, id_column.desc()).limit(limit + 1)
+
+
+def page_of(
+    rows: Sequence[Any],
+    timestamp_attr: str,
+    limit: int,
+    response: Optional[Response] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Split the rows fetched by keyset() into the page and the next cursor.
+    With a response, the cursor is also set in the X-Next-Cursor header.
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    next_cursor = encode_cursor(getattr(last, timestamp_attr), last.id)
+    if response is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return page, next_cursor
@@ -8,9 +8,9 @@ from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import get_db
-from app.models.patient import Patient
-from app.models.doctor import Doctor
-from app.models.user import User
+from app.services.principal_cache import (
+    PRINCIPAL_MODELS, Principal, build_principal, get_principal_cache, load_principal, resolve_principal
+)
 
 # OAuth2 password bearer
 oauth2_scheme = OAuth2PasswordBearer(
@@ -21,10 +21,12 @@ oauth2_scheme = OAuth2PasswordBearer(
 def create_access_token(
     subject: Union[str, Any],
     expires_delta: Optional[timedelta] = None,
-    user_type: str = "patient"
+    user_type: str = "patient",
+    principal: Optional[Principal] = None
 ) -> str:
     """
     Create JWT access token.
+    With a principal, the token also carries the resolved account ids.
     """
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -39,6 +41,8 @@ def create_access_token(
         "user_type": user_type,
         "iat": datetime.utcnow()
     }
+    if principal is not None:
+        to_encode.update(principal.claims())
     
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
@@ -63,12 +67,14 @@ def get_password_hash(password: str) -> str:
     hashed = bcrypt.hashpw(password_bytes, bcrypt.gensalt())
     return hashed.decode('utf-8')
 
-def get_current_user(
+def get_current_principal(
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme)
-):
+) -> Principal:
     """
-    Get current user from JWT token.
+    Get the authenticated principal from the JWT token.
+    Tokens carrying account ids are served from the principal cache
+    (no database query on a hit); older tokens are resolved by email.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -83,39 +89,58 @@ def get_current_user(
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        
-        email: str = payload.get("sub")
-        user_type: str = payload.get("user_type")
-        
-        if email is None or user_type is None:
-            raise credentials_exception
-        
-        # First check the User table (for admin and new users)
-        user = db.query(User).filter(User.email == email).first()
-
-        # Fallback to legacy tables for backward compatibility
-        if not user:
-            if user_type == "patient":
-                user = db.query(Patient).filter(Patient.email == email).first()
-            elif user_type == "doctor":
-                user = db.query(Doctor).filter(Doctor.email == email).first()
-            else:
-                raise credentials_exception
-        
-        if user is None:
-            raise credentials_exception
-        
-        if not getattr(user, 'is_active', True):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Inactive user"
-            )
-        
-        return user
-        
     except JWTError:
         raise credentials_exception
 
+    email: str = payload.get("sub")
+    user_type: str = payload.get("user_type")
+    
+    if email is None or user_type is None:
+        raise credentials_exception
+
+    kind = payload.get("kind")
+    principal_id = payload.get("uid")
+    cache = get_principal_cache()
+
+    if kind in PRINCIPAL_MODELS and principal_id is not None:
+        principal = cache.get(kind, principal_id)
+        if principal is None:
+            principal = load_principal(db, kind, principal_id)
+            if principal is not None:
+                cache.set(principal)
+    else:
+        # Token issued before account ids were embedded
+        account = resolve_principal(db, email, user_type)
+        principal = build_principal(db, account) if account is not None else None
+
+    if principal is None:
+        raise credentials_exception
+    
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    
+    return principal
+
+def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """
+    Get current user from JWT token (User, Patient or Doctor object).
+    """
+    user = db.get(PRINCIPAL_MODELS[principal.kind], principal.id)
+    if user is None:
+        get_principal_cache().invalidate(principal.kind, principal.id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
 def verify_token(token: str) -> Optional[str]:
     """
     Verify JWT token and return email if valid.
@@ -12,17 +12,14 @@ logger = logging.getLogger(__name__)
 
 def auto_assign_orphan_patients():
     """
-    Automatically assign patients without a treating neurologist
+    Automatically assign patients without an assigned doctor
     to the first available active doctor.
     This runs on application startup.
     """
     db = SessionLocal()
     try:
-        # Find patients without a treating neurologist
-        orphan_patients = db.query(Patient).filter(
-            (Patient.treating_neurologist == None) |
-            (Patient.treating_neurologist == '')
-        ).all()
+        # Find patients without an assigned doctor (indexed doctor_id)
+        orphan_patients = db.query(Patient).filter(Patient.doctor_id == None).all()
 
         if not orphan_patients:
             logger.info("No orphan patients found. All patients are assigned.")
@@ -40,6 +37,7 @@ def auto_assign_orphan_patients():
         # Assign all orphan patients to the first doctor
         count = 0
         for patient in orphan_patients:
+            patient.doctor_id = first_doctor.id
             patient.treating_neurologist = first_doctor.email
             count += 1
 
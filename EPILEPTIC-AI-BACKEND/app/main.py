@@ -1,12 +1,19 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from datetime import datetime
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.compression import RequestDecompressionMiddleware
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.database import engine, Base, SessionLocal
 from app.api.v1.api import api_router
 from app.core.startup import auto_assign_orphan_patients
+from app.services.write_behind import get_write_behind_buffer
+from app.services.admin_snapshot import get_admin_snapshot_refresher
+from app.services.alert_inbox import bind_event_loop, start_fanout, stop_fanout
+from app.services.partitioning import ensure_partitions
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -21,6 +28,15 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"{datetime.now().isoformat()} - Error creating database tables: {e}")
 
+    # Create upcoming monthly partitions (no-op unless tables are partitioned)
+    db = SessionLocal()
+    try:
+        ensure_partitions(db)
+    except Exception as e:
+        print(f"{datetime.now().isoformat()} - Error creating partitions: {e}")
+    finally:
+        db.close()
+
     # Auto-assign orphan patients to first available doctor
     try:
         auto_assign_orphan_patients()
@@ -28,11 +44,34 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"{datetime.now().isoformat()} - Error during orphan patients auto-assignment: {e}")
 
+    # Replay write-behind spool and start periodic flushing (also carries the
+    # samples coalesced by the ingestion rate limiter)
+    get_write_behind_buffer().start()
+    print(f"{datetime.now().isoformat()} - Write-behind buffer started")
+
+    # Keep the admin dashboard counters warm in the stats cache
+    if settings.STATS_CACHE_ENABLED:
+        get_admin_snapshot_refresher().start()
+
+    # Push alert inbox changes to connected doctors: from this process, and from
+    # every worker and Celery through Redis pub/sub when REDIS_URL is configured
+    bind_event_loop(asyncio.get_running_loop())
+    start_fanout()
+
     yield
 
     # Shutdown
     print(f"{datetime.now().isoformat()} - Shutting down {settings.APP_NAME}...")
 
+    await stop_fanout()
+    bind_event_loop(None)
+
+    if settings.STATS_CACHE_ENABLED:
+        await get_admin_snapshot_refresher().stop()
+
+    # Flush pending biometrics/predictions before exit
+    await get_write_behind_buffer().stop()
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
@@ -51,8 +90,16 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
+# Accept gzip/zstd request bodies on ingestion routes
+app.add_middleware(
+    RequestDecompressionMiddleware,
+    max_size=settings.MAX_DECOMPRESSED_BODY_SIZE,
+    paths=settings.DECOMPRESSION_PATH_PREFIXES,
+)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -6,6 +6,11 @@ from .seizure import Seizure
 from .medication import Medication
 from .alert import Alert
 from .prediction import Prediction
+from .clinical_note import ClinicalNote
+from .sync_cursor import SyncCursor
+from .biometric_rollup import BiometricRollupMinute, BiometricRollupHour, BiometricRollupDay
+from .retention_checkpoint import RetentionCheckpoint
+from .patient_latest_state import PatientLatestState
 
 __all__ = [
     'User',
@@ -16,5 +21,12 @@ __all__ = [
     'Seizure',
     'Medication',
     'Alert',
-    'Prediction'
+    'Prediction',
+    'ClinicalNote',
+    'SyncCursor',
+    'BiometricRollupMinute',
+    'BiometricRollupHour',
+    'BiometricRollupDay',
+    'RetentionCheckpoint',
+    'PatientLatestState'
 ]
\ No newline at end of file
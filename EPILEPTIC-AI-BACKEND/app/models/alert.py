@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, ForeignKey, Float, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -6,6 +6,16 @@ from app.core.database import Base
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        Index("ix_alerts_patient_id_triggered_at_is_active", "patient_id", "triggered_at", "is_active"),
+        # Active, unacknowledged alerts are a small, hot subset
+        Index(
+            "ix_alerts_active_unacknowledged",
+            "patient_id", "triggered_at",
+            postgresql_where=text("is_active AND NOT acknowledged"),
+            sqlite_where=text("is_active = 1 AND acknowledged = 0"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
@@ -54,7 +64,7 @@ class Alert(Base):
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    triggered_at = Column(DateTime(timezone=True), server_default=func.now())
+    triggered_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     expires_at = Column(DateTime(timezone=True), nullable=True)
 
     # Relationships
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, DateTime, String, ForeignKey
+from sqlalchemy import Column, Integer, Float, DateTime, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -6,6 +6,10 @@ from app.core.database import Base
 
 class Biometric(Base):
     __tablename__ = "biometrics"
+    __table_args__ = (
+        # Sliding window, /latest and history: patient_id then recorded_at range/sort
+        Index("ix_biometrics_patient_id_recorded_at", "patient_id", "recorded_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
@@ -22,6 +26,11 @@ class Biometric(Base):
     # Derived Metrics
     movement_intensity = Column(Float, nullable=True)
     stress_level = Column(Float, nullable=True)
+
+    # Motion stream window aggregates (raw 25-50 Hz samples live in cold storage)
+    accel_magnitude_mean = Column(Float, nullable=True)
+    accel_energy = Column(Float, nullable=True)
+    accel_dominant_freq = Column(Float, nullable=True)
     
     # Sleep Data
     sleep_duration = Column(Float, nullable=True)
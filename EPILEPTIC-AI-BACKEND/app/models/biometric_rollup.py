@@ -0,0 +1,80 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import declared_attr
+
+from app.core.database import Base
+
+# Signals aggregated in the rollup tables
+ROLLUP_SIGNALS = (
+    "heart_rate",
+    "heart_rate_variability",
+    "movement_intensity",
+    "stress_level",
+)
+
+
+class BiometricRollupMixin:
+    """
+    Per-patient aggregates of biometric signals over a fixed time bucket.
+    For each signal: sample count, mean, min, max and sum of squares
+    (variance = sumsq / count - mean ** 2).
+    """
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    @declared_attr
+    def patient_id(cls):
+        return Column(Integer, ForeignKey("patients.id"), nullable=False)
+
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+
+    heart_rate_count = Column(Integer, nullable=False, default=0)
+    heart_rate_mean = Column(Float, nullable=True)
+    heart_rate_min = Column(Float, nullable=True)
+    heart_rate_max = Column(Float, nullable=True)
+    heart_rate_sumsq = Column(Float, nullable=True)
+
+    heart_rate_variability_count = Column(Integer, nullable=False, default=0)
+    heart_rate_variability_mean = Column(Float, nullable=True)
+    heart_rate_variability_min = Column(Float, nullable=True)
+    heart_rate_variability_max = Column(Float, nullable=True)
+    heart_rate_variability_sumsq = Column(Float, nullable=True)
+
+    movement_intensity_count = Column(Integer, nullable=False, default=0)
+    movement_intensity_mean = Column(Float, nullable=True)
+    movement_intensity_min = Column(Float, nullable=True)
+    movement_intensity_max = Column(Float, nullable=True)
+    movement_intensity_sumsq = Column(Float, nullable=True)
+
+    stress_level_count = Column(Integer, nullable=False, default=0)
+    stress_level_mean = Column(Float, nullable=True)
+    stress_level_min = Column(Float, nullable=True)
+    stress_level_max = Column(Float, nullable=True)
+    stress_level_sumsq = Column(Float, nullable=True)
+
+    @declared_attr
+    def __table_args__(cls):
+        return (
+            UniqueConstraint("patient_id", "bucket_start", name=f"uq_{cls.__tablename__}_patient_bucket"),
+        )
+
+    def __repr__(self):
+        return f"<{type(self).__name__}(patient_id={self.patient_id}, bucket_start={self.bucket_start})>"
+
+
+class BiometricRollupMinute(BiometricRollupMixin, Base):
+    __tablename__ = "biometric_rollups_1m"
+    bucket_seconds = 60
+
+
+class BiometricRollupHour(BiometricRollupMixin, Base):
+    __tablename__ = "biometric_rollups_1h"
+    bucket_seconds = 3600
+
+
+class BiometricRollupDay(BiometricRollupMixin, Base):
+    __tablename__ = "biometric_rollups_1d"
+    bucket_seconds = 86400
+
+
+# Finest to coarsest
+ROLLUP_MODELS = (BiometricRollupMinute, BiometricRollupHour, BiometricRollupDay)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -6,6 +6,9 @@ from app.core.database import Base
 
 class ClinicalNote(Base):
     __tablename__ = "clinical_notes"
+    __table_args__ = (
+        Index("ix_clinical_notes_patient_id_created_at", "patient_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, Text, Float
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, Text, Float, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -24,6 +24,8 @@ class Patient(Base):
     emergency_contacts = Column(JSON, default=list)
     
     # Medical Team
+    # doctor_id scopes doctor queries; treating_neurologist keeps the doctor's email for display
+    doctor_id = Column(Integer, ForeignKey("doctors.id", ondelete="SET NULL"), nullable=True, index=True)
     treating_neurologist = Column(String, nullable=True)
     hospital = Column(String, nullable=True)
 
@@ -61,6 +63,11 @@ class Patient(Base):
     predictions = relationship("Prediction", back_populates="patient", cascade="all, delete-orphan")
     alerts = relationship("Alert", back_populates="patient", cascade="all, delete-orphan")
     clinical_notes = relationship("ClinicalNote", back_populates="patient", cascade="all, delete-orphan")
+    sync_cursors = relationship("SyncCursor", back_populates="patient", cascade="all, delete-orphan")
+    latest_state = relationship(
+        "PatientLatestState", back_populates="patient", uselist=False,
+        cascade="all, delete-orphan", passive_deletes=True
+    )
     
     def __repr__(self):
         return f"<Patient(id={self.id}, email={self.email})>"
\ No newline at end of file
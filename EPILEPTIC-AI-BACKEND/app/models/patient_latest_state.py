@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class PatientLatestState(Base):
+    """
+    One row per patient with the newest biometric values, the newest
+    prediction and the count of open alerts, maintained in the transaction
+    that writes them (see services.patient_state). Serves /latest lookups
+    and the doctor dashboard without scanning biometrics or predictions.
+    """
+    __tablename__ = "patient_latest_state"
+
+    patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), primary_key=True)
+
+    # Newest biometric sample (recorded_at locates the full row)
+    biometric_recorded_at = Column(DateTime(timezone=True), nullable=True)
+    heart_rate = Column(Float, nullable=True)
+    heart_rate_variability = Column(Float, nullable=True)
+    movement_intensity = Column(Float, nullable=True)
+    stress_level = Column(Float, nullable=True)
+
+    # Newest prediction
+    predicted_at = Column(DateTime(timezone=True), nullable=True)
+    risk_score = Column(Float, nullable=True)
+    confidence = Column(Float, nullable=True)
+    risk_level = Column(String, nullable=True)  # low, medium, high, critical
+
+    # Alerts still open (is_active and not resolved)
+    active_alert_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    patient = relationship("Patient", back_populates="latest_state")
+
+    def __repr__(self):
+        return f"<PatientLatestState(patient_id={self.patient_id}, risk_level={self.risk_level})>"
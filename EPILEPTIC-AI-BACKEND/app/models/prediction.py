@@ -1,11 +1,15 @@
-from sqlalchemy import Column, Integer, Float, DateTime, Boolean, JSON, ForeignKey, String
+from sqlalchemy import Column, Integer, Float, DateTime, Boolean, JSON, ForeignKey, String, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.core.feature_codec import decode_features
 
 class Prediction(Base):
     __tablename__ = "predictions"
+    __table_args__ = (
+        Index("ix_predictions_patient_id_predicted_at", "patient_id", "predicted_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
@@ -16,10 +20,13 @@ class Prediction(Base):
     prediction_window = Column(Integer, default=30)
     
     # Timing
-    predicted_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Part of the partitioned primary key (migration 006): never NULL
+    predicted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     predicted_for = Column(DateTime(timezone=True), nullable=True)
     
-    # Features
+    # Features: float32 vector (see feature_codec); features_used only holds
+    # legacy JSON rows that have not been migrated
+    features_vector = Column(LargeBinary, nullable=True)
     features_used = Column(JSON, nullable=True)
     model_version = Column(String, nullable=True)
     
@@ -38,5 +45,12 @@ class Prediction(Base):
     # Relationships
     patient = relationship("Patient", back_populates="predictions")
     
+    @property
+    def features(self):
+        """Decoded feature dict (vector first, legacy JSON otherwise)"""
+        if self.features_vector is not None:
+            return decode_features(self.features_vector)
+        return self.features_used
+
     def __repr__(self):
         return f"<Prediction(id={self.id}, risk_score={self.risk_score})>"
\ No newline at end of file
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class RetentionCheckpoint(Base):
+    """
+    Progress of the batched retention cleanup per table.
+    last_id is the highest primary key already scanned in the current pass;
+    it is reset to 0 once a pass reaches the end of the table.
+    """
+    __tablename__ = "retention_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    table_name = Column(String, nullable=False, unique=True)
+
+    last_id = Column(Integer, nullable=False, default=0)
+    cutoff = Column(DateTime(timezone=True), nullable=True)
+    rows_deleted = Column(Integer, nullable=False, default=0)  # current pass
+
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
+    last_completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<RetentionCheckpoint(table_name={self.table_name}, last_id={self.last_id})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -6,6 +6,10 @@ from app.core.database import Base
 
 class Seizure(Base):
     __tablename__ = "seizures"
+    __table_args__ = (
+        Index("ix_seizures_patient_id_start_time", "patient_id", "start_time"),
+        Index("ix_seizures_start_time_id", "start_time", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class SyncCursor(Base):
+    """
+    Last successfully imported sample timestamp per patient and HealthKit data type.
+    Advanced in the same transaction as the inserted biometrics.
+    """
+    __tablename__ = "sync_cursors"
+    __table_args__ = (
+        UniqueConstraint("patient_id", "data_type", name="uq_sync_cursors_patient_data_type"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False, index=True)
+    data_type = Column(String, nullable=False)  # heart_rate, heart_rate_variability, activity, sleep
+
+    last_synced_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    patient = relationship("Patient", back_populates="sync_cursors")
+
+    def __repr__(self):
+        return f"<SyncCursor(patient_id={self.patient_id}, data_type={self.data_type})>"
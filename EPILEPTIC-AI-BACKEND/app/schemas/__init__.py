@@ -7,7 +7,9 @@ from .patient import (
     EmergencyContact, MedicationSchema, Token, TokenData
 )
 from .doctor import DoctorBase, DoctorCreate, DoctorUpdate, DoctorInDB, DoctorLogin
-from .biometric import BiometricBase, BiometricCreate, BiometricUpdate, BiometricInDB
+from .biometric import (
+    BiometricBase, BiometricCreate, BiometricUpdate, BiometricInDB, MotionChunkCreate, MotionChunkResult
+)
 from .seizure import SeizureBase, SeizureCreate, SeizureUpdate, SeizureInDB
 from .medication import MedicationBase, MedicationCreate, MedicationUpdate, MedicationInDB
 from .alert import AlertBase, AlertCreate, AlertUpdate, AlertInDB
@@ -26,6 +28,7 @@ __all__ = [
 
     # Biometric
     'BiometricBase', 'BiometricCreate', 'BiometricUpdate', 'BiometricInDB',
+    'MotionChunkCreate', 'MotionChunkResult',
 
     # Seizure
     'SeizureBase', 'SeizureCreate', 'SeizureUpdate', 'SeizureInDB',
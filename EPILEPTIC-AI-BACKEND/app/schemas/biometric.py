@@ -23,9 +23,27 @@ class BiometricUpdate(BaseModel):
     stress_level: Optional[float] = None
     sleep_quality: Optional[float] = None
 
+class MotionChunkCreate(BaseModel):
+    """High-rate accelerometer chunk: float32 little-endian x/y/z interleaved, base64 encoded"""
+    started_at: datetime
+    sample_rate_hz: float = Field(..., ge=1, le=200)
+    samples: str = Field(..., description="base64 of packed <f4 [x, y, z] * n")
+    device_id: Optional[str] = None
+    source: str = "apple_watch"
+
+class MotionChunkResult(BaseModel):
+    samples_received: int
+    windows_stored: int
+    window_seconds: float
+    max_movement_intensity: Optional[float] = None
+    max_dominant_freq: Optional[float] = None
+
 class BiometricInDB(BiometricBase):
     id: int
     patient_id: int
+    accel_magnitude_mean: Optional[float] = None
+    accel_energy: Optional[float] = None
+    accel_dominant_freq: Optional[float] = None
     recorded_at: datetime
     created_at: datetime
     
@@ -69,3 +69,20 @@ class SeizureHistoryItem(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class AlertInboxItem(BaseModel):
+    """Open alert in the doctor's inbox"""
+    id: int
+    patient_id: int
+    patient_name: str
+    patient_email: str
+    alert_type: str
+    severity: str
+    title: str
+    message: str
+    risk_score: Optional[float] = None
+    triggered_at: datetime
+
+    class Config:
+        from_attributes = True
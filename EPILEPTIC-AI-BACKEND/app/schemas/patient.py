@@ -85,6 +85,7 @@ class PatientLogin(BaseModel):
 
 class PatientInDB(PatientBase):
     id: int
+    doctor_id: Optional[int] = None
     is_active: bool
     is_verified: bool
     created_at: datetime
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
@@ -6,7 +6,10 @@ class PredictionBase(BaseModel):
     risk_score: float = Field(..., ge=0.0, le=1.0)
     confidence: Optional[float] = Field(None, ge=0.0, le=1.0)
     prediction_window: int = Field(default=30, gt=0)
-    features_used: Optional[Dict[str, Any]] = None
+    # ORM rows expose the decoded vector as Prediction.features
+    features_used: Optional[Dict[str, Any]] = Field(
+        default=None, validation_alias=AliasChoices("features", "features_used")
+    )
 
 class PredictionCreate(PredictionBase):
     patient_id: int
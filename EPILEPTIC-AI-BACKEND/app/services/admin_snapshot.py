@@ -0,0 +1,186 @@
+"""
+Admin Snapshot
+
+Instantané des compteurs du tableau de bord admin, servi depuis le cache
+(StatsCache) au lieu d'être recalculé à chaque rafraîchissement:
+- Statistiques utilisateurs (UserStats) en une seule requête d'agrégats
+  conditionnels: total, actifs, vérifiés, par rôle et inscriptions des
+  7 derniers jours, en un parcours de la table users
+- Compteurs du tableau de bord sur tous les patients (dashboard_stats,
+  vue admin)
+
+Les compteurs sont recalculés toutes les ADMIN_SNAPSHOT_REFRESH_SECONDS
+par une tâche de fond, et invalidés (recalculés à la demande suivante)
+au commit d'un utilisateur créé, supprimé ou changeant de rôle / statut.
+Les invalidations de dashboard_stats (crises, alertes, patients)
+s'appliquent aussi à la vue admin.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.user import User, UserRole
+from app.services.dashboard_stats import compute_dashboard_stats
+from app.services.stats_cache import get_stats_cache
+
+logger = logging.getLogger(__name__)
+
+RECENT_REGISTRATIONS = timedelta(days=7)
+
+USER_STATS_KEY = ("user_stats",)
+
+# Attributs dont la modification change les statistiques utilisateurs
+_COUNTED_ATTRS = ("role", "is_active", "is_verified")
+
+# Statistiques utilisateurs à invalider au commit
+_PENDING_KEY = "admin_snapshot_pending"
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def compute_user_stats(db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Calcule les statistiques utilisateurs en une requête.
+
+    Args:
+        db: Session DB
+        now: Date de référence (tests)
+
+    Returns:
+        Dict au format UserStats (tous les rôles présents, 0 compris)
+    """
+    since = (now or datetime.utcnow()) - RECENT_REGISTRATIONS
+    stmt = select(
+        func.count(User.id).label("total_users"),
+        _count_if(User.is_active == True).label("active_users"),  # noqa: E712
+        _count_if(User.is_verified == True).label("verified_users"),  # noqa: E712
+        _count_if(User.created_at >= since).label("recent_registrations"),
+        *(_count_if(User.role == role).label(f"role_{role.value}") for role in UserRole),
+    )
+    row = db.execute(stmt).mappings().one()
+    return {
+        "total_users": int(row["total_users"]),
+        "active_users": int(row["active_users"]),
+        "verified_users": int(row["verified_users"]),
+        "users_by_role": {role.value: int(row[f"role_{role.value}"]) for role in UserRole},
+        "recent_registrations": int(row["recent_registrations"]),
+    }
+
+
+# Clé de cache -> calcul du compteur
+SNAPSHOT_COUNTERS: Dict[Tuple, Callable[[Session], Any]] = {
+    USER_STATS_KEY: compute_user_stats,
+    ("dashboard", None): lambda db: compute_dashboard_stats(db, None),
+}
+
+
+def _ttl() -> int:
+    # Marge d'un intervalle: l'instantané n'expire pas entre deux rafraîchissements
+    return 2 * settings.ADMIN_SNAPSHOT_REFRESH_SECONDS
+
+
+def get_snapshot(db: Session, key: Tuple) -> Any:
+    """Compteur de l'instantané, calculé et mis en cache s'il est absent"""
+    return get_stats_cache().get_or_compute(key, lambda: SNAPSHOT_COUNTERS[key](db), _ttl())
+
+
+def user_stats_snapshot(db: Session) -> Dict[str, Any]:
+    """Statistiques utilisateurs depuis l'instantané"""
+    return get_snapshot(db, USER_STATS_KEY)
+
+
+def refresh_snapshot(db: Session) -> None:
+    """Recalcule tous les compteurs de l'instantané"""
+    cache = get_stats_cache()
+    for key, compute in SNAPSHOT_COUNTERS.items():
+        cache.set(key, compute(db), _ttl())
+
+
+class AdminSnapshotRefresher:
+    """Rafraîchissement périodique de l'instantané dans la boucle asyncio"""
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval or settings.ADMIN_SNAPSHOT_REFRESH_SECONDS
+        self._task: Optional[asyncio.Task] = None
+
+    def refresh(self) -> None:
+        db = SessionLocal()
+        try:
+            refresh_snapshot(db)
+        except Exception as e:
+            logger.error(f"Admin snapshot refresh failed: {e}")
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.to_thread(self.refresh)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Démarre le rafraîchissement périodique (à appeler dans la boucle asyncio)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def _queue(target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info[_PENDING_KEY] = True
+
+
+def _user_added_or_removed(mapper, connection, target) -> None:
+    _queue(target)
+
+
+def _user_updated(mapper, connection, target) -> None:
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _COUNTED_ATTRS):
+        _queue(target)
+
+
+def _after_commit(session) -> None:
+    # Au commit: un rafraîchissement entre le flush et le commit remettrait
+    # sinon en cache les statistiques d'avant la modification
+    if session.info.pop(_PENDING_KEY, False):
+        get_stats_cache().invalidate(USER_STATS_KEY)
+
+
+def _after_rollback(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+event.listen(User, "after_insert", _user_added_or_removed)
+event.listen(User, "after_delete", _user_added_or_removed)
+event.listen(User, "after_update", _user_updated)
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
+
+
+# Instance singleton
+_admin_snapshot_refresher_instance = None
+
+def get_admin_snapshot_refresher() -> AdminSnapshotRefresher:
+    """Récupère l'instance singleton du rafraîchissement de l'instantané admin"""
+    global _admin_snapshot_refresher_instance
+    if _admin_snapshot_refresher_instance is None:
+        _admin_snapshot_refresher_instance = AdminSnapshotRefresher()
+    return _admin_snapshot_refresher_instance
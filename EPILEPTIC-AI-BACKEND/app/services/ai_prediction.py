@@ -20,12 +20,16 @@ import joblib
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.feature_codec import encode_features
 from app.models.biometric import Biometric
 from app.models.prediction import Prediction
 from app.models.patient import Patient
+from app.services.patient_state import record_predictions
+from app.services.write_behind import get_write_behind_buffer, naive_utc
 
 logger = logging.getLogger(__name__)
 
@@ -80,9 +84,10 @@ class AIPredictionService:
 
     async def predict_seizure_risk(
         self,
-        db: Session,
+        db: AsyncSession,
         patient_id: int,
-        window_minutes: int = 30
+        window_minutes: int = 30,
+        persist: bool = True
     ) -> Prediction:
         """
         Prédiction TEMPS RÉEL avec fenêtre glissante.
@@ -91,9 +96,10 @@ class AIPredictionService:
         pour détecter les tendances et évolutions avant de prédire.
 
         Args:
-            db: Session de base de données
+            db: Session async de base de données
             patient_id: ID du patient
             window_minutes: Taille de la fenêtre en minutes (défaut: 30)
+            persist: Si False, la prédiction n'est pas commitée (write-behind)
 
         Returns:
             Prediction object avec risk_score, confidence, etc.
@@ -119,7 +125,7 @@ class AIPredictionService:
         features = await self._extract_features_with_trends(biometrics)
 
         # Étape 3 : Récupérer contexte patient
-        patient = db.query(Patient).filter(Patient.id == patient_id).first()
+        patient = await db.get(Patient, patient_id)
         if not patient:
             raise ValueError(f"Patient {patient_id} not found")
 
@@ -133,16 +139,18 @@ class AIPredictionService:
             risk_score=prediction_result["risk_score"],
             confidence=prediction_result["confidence"],
             prediction_window=30,  # 30 minutes par défaut
-            features_used=features,
+            features_vector=encode_features(features),
             model_version=self.model_version,
             predicted_at=datetime.utcnow(),
             predicted_for=datetime.utcnow() + timedelta(minutes=30)
         )
 
-        # Étape 6 : Sauvegarder en base
-        db.add(prediction)
-        db.commit()
-        db.refresh(prediction)
+        # Étape 6 : Sauvegarder en base (sauf si l'appelant gère la persistance)
+        if persist:
+            db.add(prediction)
+            await db.run_sync(record_predictions, [prediction])
+            await db.commit()
+            await db.refresh(prediction)
 
         logger.info(
             f"Prediction created for patient {patient_id}: "
@@ -154,7 +162,7 @@ class AIPredictionService:
 
     async def _get_sliding_window_biometrics(
         self,
-        db: Session,
+        db: AsyncSession,
         patient_id: int,
         window_minutes: int
     ) -> List[Biometric]:
@@ -162,7 +170,7 @@ class AIPredictionService:
         Récupère les données de la fenêtre glissante.
 
         Args:
-            db: Session DB
+            db: Session DB async
             patient_id: ID patient
             window_minutes: Taille fenêtre en minutes (ex: 30)
 
@@ -171,10 +179,22 @@ class AIPredictionService:
         """
         cutoff_time = datetime.utcnow() - timedelta(minutes=window_minutes)
 
-        biometrics = db.query(Biometric).filter(
-            Biometric.patient_id == patient_id,
-            Biometric.recorded_at >= cutoff_time
-        ).order_by(Biometric.recorded_at.asc()).all()  # ASC pour avoir ordre chronologique
+        result = await db.execute(
+            select(Biometric).where(
+                Biometric.patient_id == patient_id,
+                Biometric.recorded_at >= cutoff_time
+            ).order_by(Biometric.recorded_at.asc())  # ASC pour avoir ordre chronologique
+        )
+        biometrics = list(result.scalars().all())
+
+        # Ajouter les échantillons acquittés mais pas encore écrits par le write-behind
+        if settings.WRITE_BEHIND_ENABLED:
+            pending = get_write_behind_buffer().pending_biometrics(patient_id, cutoff_time)
+            if pending:
+                biometrics = sorted(
+                    biometrics + pending,
+                    key=lambda b: naive_utc(b.recorded_at)
+                )
 
         logger.debug(
             f"Retrieved {len(biometrics)} biometrics for patient {patient_id} "
@@ -355,20 +375,33 @@ class AIPredictionService:
         return features
 
     def _calculate_accel_magnitude(self, biometrics: List[Biometric]) -> float:
-        """Calcule la magnitude moyenne de l'accéléromètre"""
-        magnitudes = []
-        for b in biometrics:
-            if (b.accelerometer_x is not None and
-                b.accelerometer_y is not None and
-                b.accelerometer_z is not None):
-                mag = np.sqrt(
-                    b.accelerometer_x**2 +
-                    b.accelerometer_y**2 +
-                    b.accelerometer_z**2
-                )
-                magnitudes.append(mag)
+        """
+        Calcule la magnitude moyenne de l'accéléromètre.
 
-        return float(np.mean(magnitudes)) if magnitudes else 0.0
+        Les fenêtres issues du flux haute fréquence portent déjà leur magnitude
+        moyenne (accel_magnitude_mean); les échantillons x/y/z isolés sont
+        calculés en un seul passage vectorisé.
+        """
+        window_means = [
+            b.accel_magnitude_mean for b in biometrics
+            if getattr(b, "accel_magnitude_mean", None) is not None
+        ]
+        xyz = np.array(
+            [
+                (b.accelerometer_x, b.accelerometer_y, b.accelerometer_z)
+                for b in biometrics
+                if getattr(b, "accel_magnitude_mean", None) is None
+            ],
+            dtype=np.float64
+        ).reshape(-1, 3)
+        xyz = xyz[~np.isnan(xyz).any(axis=1)]
+
+        magnitudes = np.concatenate([
+            np.asarray(window_means, dtype=np.float64),
+            np.sqrt(np.einsum("ij,ij->i", xyz, xyz))
+        ])
+
+        return float(magnitudes.mean()) if magnitudes.size else 0.0
 
     def _calculate_completeness(self, biometrics: List[Biometric]) -> float:
         """Calcule le taux de complétude des données (0.0 à 1.0)"""
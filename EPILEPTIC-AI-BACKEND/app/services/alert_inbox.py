@@ -0,0 +1,276 @@
+"""
+Alert Inbox
+
+Boîte de réception des alertes ouvertes (actives, non acquittées, non
+résolues) de tous les patients d'un médecin:
+- Page jointe aux patients (nom, email), plus récentes d'abord, par curseur
+  sur (triggered_at, id); parcours de l'index partiel
+  ix_alerts_active_unacknowledged (patient_id, triggered_at), qui ne
+  contient que les alertes ouvertes
+- Poussée en temps réel: une alerte qui entre dans la boîte (créée) ou en
+  sort (désactivée, acquittée, résolue ou supprimée) est envoyée aux connexions
+  WebSocket du médecin après le commit, au lieu d'un rafraîchissement
+  périodique du tableau de bord
+
+Les événements ORM sont mis en file par session et publiés au commit:
+- Avec Redis (REDIS_URL configuré): sur le canal pub/sub alert_inbox, depuis
+  n'importe quel processus (workers uvicorn, worker Celery, scripts). Chaque
+  worker de l'API y est abonné (start_fanout) et envoie aux connexions
+  WebSocket qu'il détient. Pub/sub ne rejoue rien: un message publié pendant
+  une reconnexion est perdu, la boîte reste la source de vérité
+- Sans Redis: directement sur la boucle asyncio du processus
+  (bind_event_loop au démarrage), quel que soit le thread de la session.
+  Seules les connexions de ce processus sont servies et les alertes créées
+  ailleurs (Celery) n'apparaissent qu'à la lecture suivante de la boîte
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import Select, event, inspect, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.core.pagination import keyset, page_of
+from app.models.alert import Alert
+from app.models.patient import Patient
+from app.websockets.events import send_alert_inbox_update
+
+logger = logging.getLogger(__name__)
+
+# Événements en attente du commit: (doctor_id, "new" / "resolved", alerte)
+_PENDING_KEY = "alert_inbox_pending"
+
+# Attributs qui font entrer ou sortir une alerte de la boîte
+_INBOX_ATTRS = ("is_active", "acknowledged", "resolved")
+
+# Colonnes de AlertInboxItem
+INBOX_COLUMNS = (
+    Alert.id,
+    Alert.patient_id,
+    Patient.full_name.label("patient_name"),
+    Patient.email.label("patient_email"),
+    Alert.alert_type,
+    Alert.severity,
+    Alert.title,
+    Alert.message,
+    Alert.risk_score,
+    Alert.triggered_at,
+)
+
+# Canal pub/sub partagé par les processus
+INBOX_CHANNEL = "alert_inbox"
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_redis = None  # client de publication, créé au premier commit
+_subscriber: Optional[asyncio.Task] = None
+
+# Envois en cours: la boucle ne garde qu'une référence faible des tâches
+_send_tasks: Set[asyncio.Task] = set()
+
+
+def is_open(is_active: Optional[bool], acknowledged: Optional[bool], resolved: Optional[bool]) -> bool:
+    """Alerte dans la boîte (valeurs par défaut des colonnes si None)"""
+    return (is_active is None or is_active) and not acknowledged and not resolved
+
+
+def inbox_query(doctor_id: Optional[int], severity: Optional[str] = None) -> Select:
+    """Alertes ouvertes des patients du médecin (tous si None), jointes au patient"""
+    # Prédicat de l'index partiel, écrit comme lui pour que le planificateur l'utilise
+    stmt = select(*INBOX_COLUMNS).join(Patient, Patient.id == Alert.patient_id).where(
+        Alert.is_active == True,  # noqa: E712
+        Alert.acknowledged == False,  # noqa: E712
+        Alert.resolved.isnot(True),
+    )
+    if doctor_id is not None:
+        stmt = stmt.where(Patient.doctor_id == doctor_id)
+    if severity is not None:
+        stmt = stmt.where(Alert.severity == severity)
+    return stmt
+
+
+def inbox_page(
+    db: Session,
+    doctor_id: Optional[int],
+    limit: int,
+    cursor: Optional[str] = None,
+    severity: Optional[str] = None
+) -> Tuple[List[Row], Optional[str]]:
+    """
+    Page de la boîte de réception, plus récentes d'abord.
+
+    Args:
+        db: Session DB
+        doctor_id: Médecin (tous les patients si None, pour un admin)
+        limit: Taille de page (déjà plafonnée)
+        cursor: Curseur de la page précédente
+        severity: Gravité
+
+    Returns:
+        (lignes au format AlertInboxItem, curseur suivant ou None)
+    """
+    stmt = keyset(inbox_query(doctor_id, severity), Alert.triggered_at, Alert.id, cursor, limit)
+    return page_of(db.execute(stmt).all(), "triggered_at", limit)
+
+
+# ----------------------------------------------------------------------
+# Poussée WebSocket
+# ----------------------------------------------------------------------
+
+def bind_event_loop(loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """Boucle asyncio sur laquelle envoyer les mises à jour (None pour arrêter)"""
+    global _loop
+    _loop = loop
+
+
+def _payload(target: Alert) -> Dict[str, Any]:
+    # Attributs déjà chargés uniquement: pas de requête pendant le flush
+    values = inspect(target).dict
+    triggered_at = values.get("triggered_at") or datetime.utcnow()
+    return {
+        "id": target.id,
+        "patient_id": values.get("patient_id"),
+        "alert_type": values.get("alert_type"),
+        "severity": values.get("severity"),
+        "title": values.get("title"),
+        "message": values.get("message"),
+        "risk_score": values.get("risk_score"),
+        "triggered_at": triggered_at.isoformat(),
+    }
+
+
+def _queue(target: Alert, connection, kind: str) -> None:
+    session = object_session(target)
+    if session is None:
+        return
+    doctor_id = connection.execute(
+        select(Patient.doctor_id).where(Patient.id == target.patient_id)
+    ).scalar()
+    if doctor_id is not None:
+        session.info.setdefault(_PENDING_KEY, []).append((doctor_id, kind, _payload(target)))
+
+
+def _alert_inserted(mapper, connection, target) -> None:
+    if is_open(target.is_active, target.acknowledged, target.resolved):
+        _queue(target, connection, "new")
+
+
+def _alert_updated(mapper, connection, target) -> None:
+    state = inspect(target)
+    before = {}
+    for name in _INBOX_ATTRS:
+        history = state.attrs[name].history
+        before[name] = history.deleted[0] if history.deleted else getattr(target, name)
+    was_open = is_open(*(before[name] for name in _INBOX_ATTRS))
+    if was_open and not is_open(target.is_active, target.acknowledged, target.resolved):
+        _queue(target, connection, "resolved")
+
+
+def _alert_deleted(mapper, connection, target) -> None:
+    # Valeurs chargées seulement: la ligne n'existe plus
+    values = inspect(target).dict
+    if is_open(*(values.get(name) for name in _INBOX_ATTRS)):
+        _queue(target, connection, "resolved")
+
+
+def _spawn(loop: asyncio.AbstractEventLoop, coro) -> None:
+    task = loop.create_task(coro)
+    _send_tasks.add(task)
+    task.add_done_callback(_send_tasks.discard)
+
+
+def _publisher():
+    """Client Redis de publication, None si la poussée reste locale au processus"""
+    global _redis
+    if _redis is None and settings.resolve_backend(settings.ALERT_INBOX_PUSH_BACKEND) == "redis":
+        try:
+            import redis
+        except ImportError:
+            logger.warning("redis package not installed, alert inbox pushed to this process only")
+            return None
+        _redis = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+    return _redis
+
+
+def _deliver(loop: asyncio.AbstractEventLoop, data: bytes) -> None:
+    """Envoie un événement reçu du canal aux connexions de ce processus"""
+    message = json.loads(data)
+    _spawn(loop, send_alert_inbox_update(message["doctor_id"], message["event"], message["alert"]))
+
+
+async def _subscribe() -> None:
+    import redis.asyncio as aioredis
+
+    loop = asyncio.get_running_loop()
+    while True:
+        client = aioredis.Redis.from_url(settings.REDIS_URL)
+        try:
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(INBOX_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        _deliver(loop, message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Alert inbox subscription lost, reconnecting: {e}")
+            await asyncio.sleep(1)
+        finally:
+            await client.aclose()
+
+
+def start_fanout() -> None:
+    """Abonne ce worker au canal Redis (à appeler dans la boucle asyncio)"""
+    global _subscriber
+    if _publisher() is not None and _subscriber is None:
+        _subscriber = asyncio.create_task(_subscribe())
+
+
+async def stop_fanout() -> None:
+    """Arrête l'abonnement au canal"""
+    global _subscriber
+    if _subscriber is not None:
+        _subscriber.cancel()
+        try:
+            await _subscriber
+        except asyncio.CancelledError:
+            pass
+        _subscriber = None
+
+
+def _after_commit(session) -> None:
+    pending = session.info.pop(_PENDING_KEY, ())
+    if not pending:
+        return
+
+    publisher = _publisher()
+    if publisher is not None:
+        try:
+            for doctor_id, kind, alert in pending:
+                publisher.publish(INBOX_CHANNEL, json.dumps(
+                    {"doctor_id": doctor_id, "event": kind, "alert": alert}
+                ))
+            return
+        except Exception as e:
+            logger.warning(f"Alert inbox publish failed, pushing to this process only: {e}")
+
+    loop = _loop
+    if loop is None or loop.is_closed():
+        return
+    for doctor_id, kind, alert in pending:
+        loop.call_soon_threadsafe(_spawn, loop, send_alert_inbox_update(doctor_id, kind, alert))
+
+
+def _after_rollback(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+event.listen(Alert, "after_insert", _alert_inserted)
+event.listen(Alert, "after_update", _alert_updated)
+event.listen(Alert, "after_delete", _alert_deleted)
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
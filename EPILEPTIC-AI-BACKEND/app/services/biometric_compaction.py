@@ -0,0 +1,241 @@
+"""
+Biometric Compaction
+
+Compaction de l'historique biométrique au lieu de sa suppression:
+1. Au-delà de COMPACTION_HOURLY_AFTER_DAYS jours, les lignes brutes et les
+   rollups 1 minute sont supprimés; il reste les rollups 1h et 1d
+2. Au-delà de COMPACTION_DAILY_AFTER_DAYS jours, les rollups 1h sont
+   supprimés à leur tour; il reste un rollup par jour
+
+L'historique long terme (tendances de fréquence des crises) coûte ainsi une
+taille constante par patient et par jour. Les rollups étant maintenus à
+l'insertion (voir biometric_rollups), la compaction vérifie seulement, jour
+par jour, que le rollup journalier couvre les lignes brutes et le recalcule
+depuis celles-ci sinon, avant de les supprimer (une transaction par jour).
+Les rollups 1 minute et 1h restants au-delà de leur horizon sont purgés par
+le moteur de rétention (lots bornés, reprise sur checkpoint).
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.models.biometric import Biometric
+from app.models.biometric_rollup import (
+    ROLLUP_SIGNALS, BiometricRollupDay, BiometricRollupHour, BiometricRollupMinute
+)
+from app.services.biometric_rollups import bucket_floor, rebuild_rollups
+from app.services.partitioning import drop_expired_partitions, is_partitioned
+from app.services.retention import RetentionEngine, RetentionPolicy
+
+logger = logging.getLogger(__name__)
+
+# Tables dont la taille est suivie avant/après compaction
+STORAGE_TABLES = ("biometrics",) + tuple(
+    model.__tablename__ for model in (BiometricRollupMinute, BiometricRollupHour, BiometricRollupDay)
+)
+
+
+def measure_storage(db: Session) -> Dict[str, Dict[str, Optional[int]]]:
+    """
+    Nombre de lignes et taille disque des tables biométriques. Sur
+    PostgreSQL, partitions comprises, le nombre de lignes est l'estimation
+    du catalogue (pg_class.reltuples, mise à jour par ANALYZE/autovacuum):
+    un count(*) parcourrait toutes les tables à chaque run.
+
+    Returns:
+        {table: {"rows": n, "bytes": n | None}}
+    """
+    postgres = db.bind.dialect.name == "postgresql"
+    storage = {}
+    for table in STORAGE_TABLES:
+        if postgres:
+            # reltuples vaut -1 pour une table jamais analysée
+            rows, size = db.execute(text(
+                "SELECT coalesce(sum(greatest(c.reltuples, 0)), 0)::bigint, "
+                "coalesce(sum(pg_total_relation_size(c.oid)), 0) FROM pg_class c "
+                "WHERE c.oid = to_regclass(:table) "
+                "OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(:table))"
+            ), {"table": table}).one()
+            storage[table] = {"rows": rows, "bytes": size}
+        else:
+            storage[table] = {
+                "rows": db.execute(text(f'SELECT count(*) FROM "{table}"')).scalar(),
+                "bytes": None,
+            }
+    return storage
+
+
+def rollup_policies(hourly_after_days: int, daily_after_days: int) -> List[RetentionPolicy]:
+    """Rétention des rollups 1 minute (horizon horaire) et 1h (horizon journalier)"""
+    return [
+        RetentionPolicy(
+            table=BiometricRollupMinute.__tablename__,
+            model=BiometricRollupMinute,
+            retention_days=hourly_after_days,
+            expired=lambda cutoff: (BiometricRollupMinute.bucket_start < cutoff,),
+        ),
+        RetentionPolicy(
+            table=BiometricRollupHour.__tablename__,
+            model=BiometricRollupHour,
+            retention_days=daily_after_days,
+            expired=lambda cutoff: (BiometricRollupHour.bucket_start < cutoff,),
+        ),
+    ]
+
+
+def _day_covered(db: Session, patient_id: int, day: datetime, day_end: datetime) -> bool:
+    """Le rollup journalier compte-t-il autant d'échantillons que les lignes brutes ?"""
+    raw = db.query(*[func.count(getattr(Biometric, signal)) for signal in ROLLUP_SIGNALS]).filter(
+        Biometric.patient_id == patient_id,
+        Biometric.recorded_at >= day,
+        Biometric.recorded_at < day_end
+    ).one()
+    rollup = db.query(BiometricRollupDay).filter(
+        BiometricRollupDay.patient_id == patient_id,
+        BiometricRollupDay.bucket_start == day
+    ).first()
+    if rollup is None:
+        return not any(raw)
+    return all(
+        (getattr(rollup, f"{signal}_count") or 0) == count
+        for signal, count in zip(ROLLUP_SIGNALS, raw)
+    )
+
+
+def compact_patient(db: Session, patient_id: int, hourly_cutoff: datetime) -> Dict[str, int]:
+    """
+    Supprime les lignes brutes et rollups 1 minute d'un patient antérieurs à
+    hourly_cutoff (aligné sur le jour), un jour et une transaction à la fois.
+
+    Returns:
+        {"days": jours compactés, "rows_deleted": lignes brutes, "days_rebuilt": n}
+    """
+    result = {"days": 0, "rows_deleted": 0, "days_rebuilt": 0}
+
+    while True:
+        oldest = db.query(func.min(Biometric.recorded_at)).filter(
+            Biometric.patient_id == patient_id,
+            Biometric.recorded_at < hourly_cutoff
+        ).scalar()
+        if oldest is None:
+            break
+
+        day = bucket_floor(oldest, 86400)
+        day_end = day + timedelta(days=1)
+        try:
+            if not _day_covered(db, patient_id, day, day_end):
+                # Lignes antérieures aux rollups ou importées sans mise à jour
+                rebuild_rollups(
+                    db, patient_id, day, day,
+                    models=(BiometricRollupHour, BiometricRollupDay)
+                )
+                result["days_rebuilt"] += 1
+
+            result["rows_deleted"] += db.query(Biometric).filter(
+                Biometric.patient_id == patient_id,
+                Biometric.recorded_at >= day,
+                Biometric.recorded_at < day_end
+            ).delete(synchronize_session=False)
+            db.query(BiometricRollupMinute).filter(
+                BiometricRollupMinute.patient_id == patient_id,
+                BiometricRollupMinute.bucket_start >= day,
+                BiometricRollupMinute.bucket_start < day_end
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        result["days"] += 1
+
+    return result
+
+
+def compact_biometrics(
+    db: Session,
+    hourly_after_days: Optional[int] = None,
+    daily_after_days: Optional[int] = None,
+    now: Optional[datetime] = None,
+    measure: bool = True
+) -> Dict[str, Any]:
+    """
+    Compacte l'historique biométrique de tous les patients.
+
+    Args:
+        db: Session DB
+        hourly_after_days: Âge au-delà duquel seuls les rollups 1h/1d restent
+        daily_after_days: Âge au-delà duquel seul le rollup 1d reste
+        now: Date de référence (tests)
+        measure: Mesurer le stockage avant et après
+
+    Returns:
+        {"patients", "days", "rows_deleted", "days_rebuilt",
+         "hourly_rollups_deleted", "rollup_purge", "elapsed_seconds",
+         "storage_before", "storage_after"}
+
+    Raises:
+        ValueError: daily_after_days inférieur à hourly_after_days
+    """
+    hourly_after_days = settings.COMPACTION_HOURLY_AFTER_DAYS if hourly_after_days is None else hourly_after_days
+    daily_after_days = settings.COMPACTION_DAILY_AFTER_DAYS if daily_after_days is None else daily_after_days
+    if daily_after_days < hourly_after_days:
+        raise ValueError("daily_after_days must be >= hourly_after_days")
+
+    today = bucket_floor(now or datetime.utcnow(), 86400)
+    hourly_cutoff = today - timedelta(days=hourly_after_days)
+    daily_cutoff = today - timedelta(days=daily_after_days)
+    started = time.perf_counter()
+
+    result: Dict[str, Any] = {
+        "hourly_cutoff": hourly_cutoff.isoformat(),
+        "daily_cutoff": daily_cutoff.isoformat(),
+        "patients": 0,
+        "days": 0,
+        "rows_deleted": 0,
+        "days_rebuilt": 0,
+    }
+    if measure:
+        result["storage_before"] = measure_storage(db)
+
+    patient_ids: List[int] = [
+        pid for (pid,) in db.query(Biometric.patient_id).filter(
+            Biometric.recorded_at < hourly_cutoff
+        ).distinct().order_by(Biometric.patient_id)
+    ]
+    for pid in patient_ids:
+        compacted = compact_patient(db, pid, hourly_cutoff)
+        for key in ("days", "rows_deleted", "days_rebuilt"):
+            result[key] += compacted[key]
+        logger.info(f"Compacted {compacted['days']} days of biometrics for patient {pid}")
+    result["patients"] = len(patient_ids)
+
+    # Rollups 1 minute sans lignes brutes (jours supprimés avant la compaction)
+    # et rollups 1h au-delà de l'horizon journalier: lots bornés, un run
+    # interrompu reprend au checkpoint. Les purges passent par leurs propres
+    # sessions: la transaction en lecture de db est close d'abord
+    db.commit()
+    engine = RetentionEngine(
+        session_factory=sessionmaker(bind=db.get_bind()),
+        policies=rollup_policies(hourly_after_days, daily_after_days),
+    )
+    result["rollup_purge"] = engine.run(now=today)
+    result["hourly_rollups_deleted"] = result["rollup_purge"][BiometricRollupHour.__tablename__].get("rows_deleted", 0)
+
+    if is_partitioned(db, "biometrics"):
+        # Partitions désormais vides
+        result["partitions_dropped"] = drop_expired_partitions(db, "biometrics", hourly_cutoff)
+
+    if measure:
+        result["storage_after"] = measure_storage(db)
+    result["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+
+    logger.info(
+        f"Biometric compaction: {result['rows_deleted']} raw rows over {result['days']} days, "
+        f"{result['hourly_rollups_deleted']} hourly rollups removed"
+    )
+    return result
@@ -0,0 +1,395 @@
+"""
+Biometric Rollups
+
+Agrégats biométriques par patient sur des créneaux de 1 minute, 1 heure et
+1 jour (count, mean, min, max, sumsq par signal), pour que les tableaux de
+bord et courbes de tendance ne scannent plus les lignes brutes.
+
+1. update_rollups: mise à jour incrémentale, dans la transaction qui insère
+   les échantillons (upsert qui fusionne les statistiques)
+2. rebuild_rollups / backfill_rollups: recalcul depuis les lignes brutes
+3. query_rollups: lit le rollup le plus grossier compatible avec la plage
+   et la résolution demandées, puis regroupe à la résolution voulue
+"""
+
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.models.biometric import Biometric
+from app.models.biometric_rollup import ROLLUP_MODELS, ROLLUP_SIGNALS
+from app.services.write_behind import naive_utc
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Lignes par INSERT multi-valeurs (limite de variables SQLite)
+_UPSERT_CHUNK = 200
+
+# Statistiques d'un signal sur un créneau: [count, sum, min, max, sumsq]
+Stats = List[float]
+
+
+def bucket_floor(value: datetime, bucket_seconds: int) -> datetime:
+    """Début du créneau (UTC naïf) contenant value"""
+    seconds = int((naive_utc(value) - _EPOCH).total_seconds())
+    return _EPOCH + timedelta(seconds=seconds - seconds % bucket_seconds)
+
+
+def _field(row: Any, name: str) -> Any:
+    return row.get(name) if isinstance(row, dict) else getattr(row, name, None)
+
+
+def _merge(target: Stats, other: Stats) -> None:
+    target[0] += other[0]
+    target[1] += other[1]
+    target[2] = other[2] if target[2] is None else min(target[2], other[2])
+    target[3] = other[3] if target[3] is None else max(target[3], other[3])
+    target[4] += other[4]
+
+
+def aggregate_rows(
+    rows: Iterable[Any],
+    bucket_seconds: int
+) -> Dict[Tuple[int, datetime], Dict[str, Stats]]:
+    """
+    Agrège des échantillons bruts (dicts ou objets Biometric) par créneau.
+
+    Returns:
+        {(patient_id, début du créneau): {signal: [count, sum, min, max, sumsq]}}
+    """
+    buckets: Dict[Tuple[int, datetime], Dict[str, Stats]] = {}
+    for row in rows:
+        recorded_at = _field(row, "recorded_at")
+        if recorded_at is None:
+            continue
+        key = (_field(row, "patient_id"), bucket_floor(recorded_at, bucket_seconds))
+        signals = buckets.setdefault(key, {})
+        for signal in ROLLUP_SIGNALS:
+            value = _field(row, signal)
+            if value is None:
+                continue
+            value = float(value)
+            stats = signals.get(signal)
+            if stats is None:
+                signals[signal] = [1, value, value, value, value * value]
+            else:
+                _merge(stats, [1, value, value, value, value * value])
+    return buckets
+
+
+def _records(
+    buckets: Dict[Tuple[int, datetime], Dict[str, Stats]]
+) -> List[Dict[str, Any]]:
+    """Créneaux agrégés -> lignes de la table de rollup"""
+    records = []
+    for (patient_id, bucket_start), signals in buckets.items():
+        record = {"patient_id": patient_id, "bucket_start": bucket_start}
+        for signal in ROLLUP_SIGNALS:
+            count, total, low, high, sumsq = signals.get(signal, [0, 0.0, None, None, 0.0])
+            record[f"{signal}_count"] = count
+            record[f"{signal}_mean"] = total / count if count else None
+            record[f"{signal}_min"] = low
+            record[f"{signal}_max"] = high
+            record[f"{signal}_sumsq"] = sumsq if count else None
+        records.append(record)
+    return records
+
+
+def _dialect_insert(db: Session):
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
+
+
+def _merged_values(table, excluded) -> Dict[str, Any]:
+    """Expressions de fusion (ligne existante + nouvelle) pour l'upsert"""
+    values = {}
+    for signal in ROLLUP_SIGNALS:
+        old_count, new_count = table.c[f"{signal}_count"], excluded[f"{signal}_count"]
+        old_mean, new_mean = table.c[f"{signal}_mean"], excluded[f"{signal}_mean"]
+        old_min, new_min = table.c[f"{signal}_min"], excluded[f"{signal}_min"]
+        old_max, new_max = table.c[f"{signal}_max"], excluded[f"{signal}_max"]
+        old_sumsq, new_sumsq = table.c[f"{signal}_sumsq"], excluded[f"{signal}_sumsq"]
+        total = old_count + new_count
+
+        values[f"{signal}_count"] = total
+        values[f"{signal}_mean"] = case(
+            (total > 0,
+             (func.coalesce(old_mean, 0.0) * old_count + func.coalesce(new_mean, 0.0) * new_count) / total),
+            else_=None
+        )
+        values[f"{signal}_min"] = case(
+            (old_min.is_(None), new_min),
+            (new_min.is_(None), old_min),
+            (new_min < old_min, new_min),
+            else_=old_min
+        )
+        values[f"{signal}_max"] = case(
+            (old_max.is_(None), new_max),
+            (new_max.is_(None), old_max),
+            (new_max > old_max, new_max),
+            else_=old_max
+        )
+        values[f"{signal}_sumsq"] = case(
+            (total > 0, func.coalesce(old_sumsq, 0.0) + func.coalesce(new_sumsq, 0.0)),
+            else_=None
+        )
+    return values
+
+
+def _upsert_fallback(db: Session, model, records: List[Dict[str, Any]]) -> None:
+    """Autres dialectes: lecture puis mise à jour / insertion ligne à ligne"""
+    for record in records:
+        existing = db.query(model).filter(
+            model.patient_id == record["patient_id"],
+            model.bucket_start == record["bucket_start"]
+        ).with_for_update().first()
+        if existing is None:
+            db.add(model(**record))
+            continue
+        for signal in ROLLUP_SIGNALS:
+            stats = [
+                getattr(existing, f"{signal}_count") or 0,
+                (getattr(existing, f"{signal}_mean") or 0.0) * (getattr(existing, f"{signal}_count") or 0),
+                getattr(existing, f"{signal}_min"),
+                getattr(existing, f"{signal}_max"),
+                getattr(existing, f"{signal}_sumsq") or 0.0,
+            ]
+            count = record[f"{signal}_count"]
+            if not count:
+                continue
+            _merge(stats, [
+                count, record[f"{signal}_mean"] * count,
+                record[f"{signal}_min"], record[f"{signal}_max"], record[f"{signal}_sumsq"]
+            ])
+            setattr(existing, f"{signal}_count", stats[0])
+            setattr(existing, f"{signal}_mean", stats[1] / stats[0])
+            setattr(existing, f"{signal}_min", stats[2])
+            setattr(existing, f"{signal}_max", stats[3])
+            setattr(existing, f"{signal}_sumsq", stats[4])
+    db.flush()
+
+
+def update_rollups(db: Session, rows: Sequence[Any], models: Sequence[Any] = ROLLUP_MODELS) -> int:
+    """
+    Fusionne de nouveaux échantillons dans les tables de rollup.
+
+    À appeler dans la transaction qui insère les échantillons (pas de commit ici).
+
+    Args:
+        db: Session DB
+        rows: Échantillons insérés (dicts de colonnes ou objets Biometric)
+        models: Résolutions à mettre à jour (défaut: 1m, 1h et 1d)
+
+    Returns:
+        Nombre de créneaux mis à jour, toutes résolutions confondues
+    """
+    if not rows:
+        return 0
+
+    dialect_insert = _dialect_insert(db)
+    updated = 0
+    for model in models:
+        records = _records(aggregate_rows(rows, model.bucket_seconds))
+        if not records:
+            continue
+        updated += len(records)
+
+        if dialect_insert is None:
+            _upsert_fallback(db, model, records)
+            continue
+
+        for i in range(0, len(records), _UPSERT_CHUNK):
+            stmt = dialect_insert(model).values(records[i:i + _UPSERT_CHUNK])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["patient_id", "bucket_start"],
+                set_=_merged_values(model.__table__, stmt.excluded)
+            )
+            db.execute(stmt)
+
+    return updated
+
+
+def rebuild_rollups(
+    db: Session,
+    patient_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    chunk_size: int = 5000,
+    models: Sequence[Any] = ROLLUP_MODELS
+) -> int:
+    """
+    Recalcule les rollups d'un patient depuis les lignes brutes.
+
+    La plage est élargie aux jours entiers pour ne jamais laisser de créneau
+    partiel. Pas de commit ici.
+
+    Returns:
+        Nombre d'échantillons bruts relus
+    """
+    start = bucket_floor(start, 86400) if start else None
+    end = bucket_floor(end, 86400) + timedelta(days=1) if end else None
+
+    for model in models:
+        query = db.query(model).filter(model.patient_id == patient_id)
+        if start:
+            query = query.filter(model.bucket_start >= start)
+        if end:
+            query = query.filter(model.bucket_start < end)
+        query.delete(synchronize_session=False)
+
+    columns = [Biometric.id, Biometric.patient_id, Biometric.recorded_at] + [
+        getattr(Biometric, signal) for signal in ROLLUP_SIGNALS
+    ]
+    last_id = 0
+    scanned = 0
+    while True:
+        query = db.query(*columns).filter(
+            Biometric.patient_id == patient_id,
+            Biometric.id > last_id
+        )
+        if start:
+            query = query.filter(Biometric.recorded_at >= start)
+        if end:
+            query = query.filter(Biometric.recorded_at < end)
+        chunk = [row._asdict() for row in query.order_by(Biometric.id).limit(chunk_size).all()]
+        if not chunk:
+            break
+        update_rollups(db, chunk, models)
+        last_id = chunk[-1]["id"]
+        scanned += len(chunk)
+
+    return scanned
+
+
+def backfill_rollups(
+    db: Session,
+    patient_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    chunk_size: int = 5000
+) -> Dict[str, Any]:
+    """
+    Reconstruit l'historique des rollups, un patient et une transaction à la fois.
+
+    Returns:
+        {"patients": n, "samples": n}
+    """
+    if patient_id is not None:
+        patient_ids = [patient_id]
+    else:
+        patient_ids = [
+            pid for (pid,) in db.query(Biometric.patient_id).distinct().order_by(Biometric.patient_id)
+        ]
+
+    samples = 0
+    for pid in patient_ids:
+        try:
+            samples += rebuild_rollups(db, pid, start, end, chunk_size)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        logger.info(f"Rollups rebuilt for patient {pid}")
+
+    return {"patients": len(patient_ids), "samples": samples}
+
+
+def select_rollup_model(start: datetime, end: datetime, resolution_seconds: int):
+    """
+    Rollup le plus grossier dont le créneau divise la résolution demandée
+    et qui est aligné sur les bornes de la plage.
+    """
+    for model in reversed(ROLLUP_MODELS):
+        size = model.bucket_seconds
+        if (
+            resolution_seconds % size == 0
+            and bucket_floor(start, size) == naive_utc(start)
+            and bucket_floor(end, size) == naive_utc(end)
+        ):
+            return model
+    # Bornes non alignées sur la minute: approximation à la minute près
+    return ROLLUP_MODELS[0]
+
+
+def query_rollups(
+    db: Session,
+    patient_id: int,
+    start: datetime,
+    end: datetime,
+    resolution_seconds: int,
+    signals: Sequence[str] = ROLLUP_SIGNALS
+) -> Dict[str, Any]:
+    """
+    Série agrégée d'un patient sur [start, end[ à la résolution demandée.
+
+    Args:
+        resolution_seconds: Taille des créneaux de sortie (>= 60)
+
+    Returns:
+        {"source": table lue, "resolution_seconds": n,
+         "buckets": [{"bucket_start": dt, signal: {count, mean, min, max, std}}]}
+
+    Raises:
+        ValueError: Résolution inférieure à la minute ou signal inconnu
+    """
+    if resolution_seconds < 60:
+        raise ValueError("Resolution must be at least 60 seconds")
+    unknown = set(signals) - set(ROLLUP_SIGNALS)
+    if unknown:
+        raise ValueError(f"Unknown signals: {sorted(unknown)}")
+
+    model = select_rollup_model(start, end, resolution_seconds)
+    rows = db.query(model).filter(
+        model.patient_id == patient_id,
+        model.bucket_start >= naive_utc(start),
+        model.bucket_start < naive_utc(end)
+    ).order_by(model.bucket_start).all()
+
+    merged: Dict[datetime, Dict[str, Stats]] = {}
+    for row in rows:
+        target = merged.setdefault(bucket_floor(row.bucket_start, resolution_seconds), {})
+        for signal in signals:
+            count = getattr(row, f"{signal}_count") or 0
+            if not count:
+                continue
+            stats = [
+                count, getattr(row, f"{signal}_mean") * count,
+                getattr(row, f"{signal}_min"), getattr(row, f"{signal}_max"),
+                getattr(row, f"{signal}_sumsq")
+            ]
+            if signal in target:
+                _merge(target[signal], stats)
+            else:
+                target[signal] = stats
+
+    buckets = []
+    for bucket_start in sorted(merged):
+        bucket = {"bucket_start": bucket_start}
+        for signal, (count, total, low, high, sumsq) in merged[bucket_start].items():
+            mean = total / count
+            bucket[signal] = {
+                "count": count,
+                "mean": mean,
+                "min": low,
+                "max": high,
+                "std": math.sqrt(max(sumsq / count - mean * mean, 0.0)),
+            }
+        buckets.append(bucket)
+
+    return {
+        "source": model.__tablename__,
+        "resolution_seconds": resolution_seconds,
+        "buckets": buckets,
+    }
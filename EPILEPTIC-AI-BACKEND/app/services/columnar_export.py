@@ -0,0 +1,337 @@
+"""
+Columnar Export
+
+Export des biométries et prédictions vers le stockage froid en colonnes,
+pour la recherche, le backtesting et le réentraînement:
+- Lecture en flux par curseur serveur (stream_results / yield_per), triée
+  par (patient_id, horodatage): aucune ligne ORM, mémoire bornée par un
+  patient-jour
+- Un fichier Arrow IPC non compressé par table, patient et jour:
+  {COLUMNAR_EXPORT_DIR}/{table}/patient_id={id}/{YYYY-MM-DD}.arrow
+- Signaux en float32 (NaN = valeur absente, sans bitmap de validité),
+  horodatages en timestamp[us, UTC], source / device_id / model_version
+  encodés en dictionnaire, vecteur de features binaire tel que stocké
+  (voir app.core.feature_codec.features_matrix)
+
+Les fichiers sont relus par memory-map: les colonnes numériques deviennent
+des tableaux NumPy sans copie (load_day), ou concaténés sur une plage de
+jours (load_arrays).
+"""
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.biometric import Biometric
+from app.models.prediction import Prediction
+from app.services.write_behind import naive_utc
+
+logger = logging.getLogger(__name__)
+
+_TIMESTAMP = pa.timestamp("us", tz="UTC")
+_DICTIONARY = pa.dictionary(pa.int32(), pa.string())
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    """Colonnes exportées d'une table et leur type Arrow"""
+    table: str
+    model: type
+    time_column: str
+    # (colonne, type): "int64", "timestamp", "float32", "int32", "int8",
+    # "bool", "dictionary", "binary" ou "json"
+    columns: Tuple[Tuple[str, str], ...]
+
+
+BIOMETRIC_EXPORT = ExportSpec(
+    table="biometrics",
+    model=Biometric,
+    time_column="recorded_at",
+    columns=(
+        ("id", "int64"),
+        ("recorded_at", "timestamp"),
+        ("heart_rate", "float32"),
+        ("heart_rate_variability", "float32"),
+        ("accelerometer_x", "float32"),
+        ("accelerometer_y", "float32"),
+        ("accelerometer_z", "float32"),
+        ("movement_intensity", "float32"),
+        ("stress_level", "float32"),
+        ("accel_magnitude_mean", "float32"),
+        ("accel_energy", "float32"),
+        ("accel_dominant_freq", "float32"),
+        ("sleep_duration", "float32"),
+        ("sleep_quality", "float32"),
+        ("device_id", "dictionary"),
+        ("source", "dictionary"),
+    ),
+)
+
+PREDICTION_EXPORT = ExportSpec(
+    table="predictions",
+    model=Prediction,
+    time_column="predicted_at",
+    columns=(
+        ("id", "int64"),
+        ("predicted_at", "timestamp"),
+        ("predicted_for", "timestamp"),
+        ("risk_score", "float32"),
+        ("confidence", "float32"),
+        ("prediction_window", "int32"),
+        ("alert_generated", "bool"),
+        ("seizure_occurred", "int8"),  # -1 inconnu, 0 non, 1 oui
+        ("model_version", "dictionary"),
+        ("features_vector", "binary"),
+        ("features_used", "json"),  # lignes historiques non migrées
+    ),
+)
+
+EXPORT_SPECS = {spec.table: spec for spec in (BIOMETRIC_EXPORT, PREDICTION_EXPORT)}
+
+
+def _array(kind: str, values: List[Any]) -> pa.Array:
+    """Colonne Python -> tableau Arrow du type exporté"""
+    if kind == "float32":
+        return pa.array(np.array([np.nan if v is None else v for v in values], dtype=np.float32))
+    if kind == "timestamp":
+        return pa.array([naive_utc(v) if v is not None else None for v in values], type=_TIMESTAMP)
+    if kind == "int64":
+        return pa.array(np.array(values, dtype=np.int64))
+    if kind == "int32":
+        return pa.array(np.array([0 if v is None else v for v in values], dtype=np.int32))
+    if kind == "int8":
+        return pa.array(np.array([-1 if v is None else int(v) for v in values], dtype=np.int8))
+    if kind == "bool":
+        return pa.array([bool(v) for v in values], type=pa.bool_())
+    if kind == "dictionary":
+        return pa.array(values, type=pa.string()).dictionary_encode()
+    if kind == "binary":
+        return pa.array([bytes(v) if v is not None else None for v in values], type=pa.binary())
+    if kind == "json":
+        return pa.array([json.dumps(v, separators=(",", ":")) if v is not None else None for v in values],
+                        type=pa.string())
+    raise ValueError(f"Unknown column kind: {kind}")
+
+
+def _schema(spec: ExportSpec) -> pa.Schema:
+    types = {
+        "float32": pa.float32(), "timestamp": _TIMESTAMP, "int64": pa.int64(), "int32": pa.int32(),
+        "int8": pa.int8(), "bool": pa.bool_(), "dictionary": _DICTIONARY, "binary": pa.binary(),
+        "json": pa.string(),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in spec.columns])
+
+
+def day_path(root: Path, table: str, patient_id: int, day: date) -> Path:
+    return Path(root) / table / f"patient_id={patient_id}" / f"{day.isoformat()}.arrow"
+
+
+def _write_day(path: Path, spec: ExportSpec, schema: pa.Schema, rows: List[Any]) -> int:
+    """Écrit un patient-jour (un seul record batch) de façon atomique"""
+    columns = list(zip(*rows))
+    batch = pa.RecordBatch.from_arrays(
+        [_array(kind, list(values)) for (_, kind), values in zip(spec.columns, columns[1:])],
+        schema=schema
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".arrow.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            writer.write_batch(batch)
+    os.replace(tmp, path)
+    return path.stat().st_size
+
+
+def _stream(
+    db: Session,
+    spec: ExportSpec,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    patient_id: Optional[int],
+    batch_size: int
+) -> Iterator[Any]:
+    """Lignes (patient_id, colonnes...) triées par patient puis horodatage, en flux"""
+    table = spec.model.__table__
+    time_column = table.c[spec.time_column]
+    stmt = select(table.c.patient_id, *[table.c[name] for name, _ in spec.columns])
+    if start is not None:
+        stmt = stmt.where(time_column >= start)
+    if end is not None:
+        stmt = stmt.where(time_column < end)
+    if patient_id is not None:
+        stmt = stmt.where(table.c.patient_id == patient_id)
+    stmt = stmt.order_by(table.c.patient_id, time_column, table.c.id)
+
+    # Curseur serveur (PostgreSQL): le résultat n'est jamais chargé en entier
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    for partition in result.partitions():
+        yield from partition
+
+
+def export_table(
+    db: Session,
+    spec: ExportSpec,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    patient_id: Optional[int] = None,
+    root: Optional[str] = None,
+    batch_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Exporte une table vers un fichier Arrow par patient et par jour.
+
+    Un jour déjà exporté est réécrit en entier: la plage doit couvrir des
+    jours complets pour ne pas tronquer un fichier existant.
+
+    Args:
+        db: Session DB
+        spec: BIOMETRIC_EXPORT ou PREDICTION_EXPORT
+        start: Début inclus (tout l'historique si None)
+        end: Fin exclue
+        patient_id: Un seul patient (tous si None)
+        root: Répertoire d'export (défaut: COLUMNAR_EXPORT_DIR)
+        batch_size: Lignes lues par aller-retour du curseur
+
+    Returns:
+        {"rows", "files", "bytes", "elapsed_seconds"}
+    """
+    root = Path(root or settings.COLUMNAR_EXPORT_DIR)
+    batch_size = batch_size or settings.COLUMNAR_EXPORT_BATCH_SIZE
+    schema = _schema(spec)
+    time_index = 1 + [name for name, _ in spec.columns].index(spec.time_column)
+    started = time.perf_counter()
+    result = {"rows": 0, "files": 0, "bytes": 0}
+
+    current_key = None
+    rows: List[Any] = []
+
+    def flush():
+        if rows:
+            result["bytes"] += _write_day(day_path(root, spec.table, *current_key), spec, schema, rows)
+            result["rows"] += len(rows)
+            result["files"] += 1
+
+    for row in _stream(db, spec, start, end, patient_id, batch_size):
+        timestamp = row[time_index]
+        if timestamp is None:
+            continue
+        key = (row[0], naive_utc(timestamp).date())
+        if key != current_key:
+            flush()
+            current_key, rows = key, []
+        rows.append(row)
+    flush()
+
+    result["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(
+        f"Columnar export {spec.table}: {result['rows']} rows in {result['files']} files "
+        f"({result['bytes']} bytes, {result['elapsed_seconds']}s)"
+    )
+    return result
+
+
+def export_history(
+    db: Session,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    patient_id: Optional[int] = None,
+    root: Optional[str] = None,
+    tables: Sequence[str] = tuple(EXPORT_SPECS)
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Exporte biométries et prédictions (voir export_table).
+
+    Returns:
+        {table: métriques}
+    """
+    return {
+        table: export_table(db, EXPORT_SPECS[table], start, end, patient_id, root)
+        for table in tables
+    }
+
+
+def export_files(
+    table: str,
+    patient_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    root: Optional[str] = None
+) -> List[Path]:
+    """
+    Fichiers exportés d'une table, triés par patient puis par jour.
+
+    Args:
+        start: Premier jour inclus
+        end: Dernier jour inclus
+    """
+    base = Path(root or settings.COLUMNAR_EXPORT_DIR) / table
+    pattern = f"patient_id={patient_id}/*.arrow" if patient_id is not None else "patient_id=*/*.arrow"
+    files = []
+    for path in base.glob(pattern):
+        day = date.fromisoformat(path.stem)
+        if (start is None or day >= start) and (end is None or day <= end):
+            files.append((int(path.parent.name.split("=", 1)[1]), day, path))
+    return [path for _, _, path in sorted(files)]
+
+
+def load_day(path: Path, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Relit un fichier exporté par memory-map.
+
+    Les colonnes float32, entières et les horodatages (datetime64[us]) sont
+    des vues sans copie sur le fichier; les colonnes dictionnaire, binaires
+    et JSON sont décodées en tableaux d'objets.
+    """
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(list(columns))
+
+    arrays = {}
+    for name in table.column_names:
+        column = table.column(name).combine_chunks()
+        if pa.types.is_dictionary(column.type):
+            column = column.dictionary_decode()
+        # Horodatages -> datetime64[us] UTC naïf (NaT si absent)
+        arrays[name] = column.to_numpy(zero_copy_only=False)
+    return arrays
+
+
+def load_arrays(
+    table: str,
+    patient_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    columns: Optional[Sequence[str]] = None,
+    root: Optional[str] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Colonnes d'une plage de jours (et d'un patient) concaténées en NumPy,
+    avec une colonne patient_id, pour le backtesting et l'entraînement.
+
+    Returns:
+        {colonne: tableau}, vide si aucun fichier
+    """
+    parts = []
+    for path in export_files(table, patient_id, start, end, root):
+        arrays = load_day(path, columns)
+        length = len(next(iter(arrays.values()))) if arrays else 0
+        arrays["patient_id"] = np.full(length, int(path.parent.name.split("=", 1)[1]), dtype=np.int64)
+        parts.append(arrays)
+
+    if not parts:
+        return {}
+    if len(parts) == 1:
+        return parts[0]
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
@@ -0,0 +1,142 @@
+"""
+Dashboard Stats
+
+Compteurs du tableau de bord médecin (DashboardStats) en une seule requête
+agrégée sur ses patients:
+- patients et niveaux de risque / alertes ouvertes depuis
+  patient_latest_state (une ligne par patient)
+- crises des 7 et 30 derniers jours en sous-requêtes scalaires de la même
+  requête (parcours de l'index patient_id, start_time sur la fenêtre)
+
+Le résultat est mis en cache par médecin (StatsCache, TTL court) et
+invalidé au commit des événements ORM: crise ou alerte créée / modifiée /
+supprimée, patient créé, réassigné ou supprimé. Un nouveau score de risque
+n'invalide pas le cache (une prédiction toutes les 5 minutes par patient):
+il apparaît au plus tard après DASHBOARD_STATS_TTL_SECONDS.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.models.alert import Alert
+from app.models.patient import Patient
+from app.models.patient_latest_state import PatientLatestState
+from app.models.seizure import Seizure
+from app.services.stats_cache import get_stats_cache
+
+logger = logging.getLogger(__name__)
+
+WEEK = timedelta(days=7)
+MONTH = timedelta(days=30)
+
+_STATE = PatientLatestState.__table__
+
+# Médecins dont le tableau de bord est à invalider au commit
+_PENDING_KEY = "dashboard_stats_pending"
+
+
+def compute_dashboard_stats(db: Session, doctor_id: Optional[int], now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Calcule les compteurs du tableau de bord en une requête.
+
+    Args:
+        db: Session DB
+        doctor_id: Médecin (tous les patients si None, pour un admin)
+        now: Date de référence (tests)
+
+    Returns:
+        Dict au format DashboardStats
+    """
+    now = now or datetime.utcnow()
+    week_start, month_start = now - WEEK, now - MONTH
+
+    def seizures_since(start: datetime):
+        query = select(func.count()).select_from(Seizure).where(Seizure.start_time >= start)
+        if doctor_id is not None:
+            query = query.join(Patient, Patient.id == Seizure.patient_id).where(Patient.doctor_id == doctor_id)
+        return query.scalar_subquery()
+
+    stmt = select(
+        func.count(Patient.id).label("total_patients"),
+        seizures_since(week_start).label("recent_seizures_this_week"),
+        seizures_since(month_start).label("recent_seizures_this_month"),
+        func.coalesce(func.sum(case((_STATE.c.risk_level == "critical", 1), else_=0)), 0).label("critical_patients"),
+        func.coalesce(func.sum(case((_STATE.c.risk_level == "high", 1), else_=0)), 0).label("high_risk_patients"),
+        func.coalesce(func.sum(_STATE.c.active_alert_count), 0).label("active_alerts"),
+    ).select_from(Patient).outerjoin(_STATE, _STATE.c.patient_id == Patient.id)
+    if doctor_id is not None:
+        stmt = stmt.where(Patient.doctor_id == doctor_id)
+
+    row = db.execute(stmt).mappings().one()
+    return {key: int(value) for key, value in row.items()}
+
+
+def get_dashboard_stats(db: Session, doctor_id: Optional[int]) -> Dict[str, int]:
+    """Compteurs du tableau de bord, depuis le cache du médecin si présent"""
+    return get_stats_cache().get_or_compute(
+        ("dashboard", doctor_id),
+        lambda: compute_dashboard_stats(db, doctor_id),
+        settings.DASHBOARD_STATS_TTL_SECONDS
+    )
+
+
+def invalidate_dashboard(doctor_id: Optional[int]) -> None:
+    """Invalide le tableau de bord d'un médecin et la vue admin (tous les patients)"""
+    cache = get_stats_cache()
+    if doctor_id is not None:
+        cache.invalidate(("dashboard", doctor_id))
+    cache.invalidate(("dashboard", None))
+
+
+def _queue(target, doctor_id: Optional[int]) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(doctor_id)
+
+
+def _patient_event(mapper, connection, target) -> None:
+    """Crise ou alerte modifiée: invalide le médecin du patient"""
+    doctor_id = connection.execute(
+        select(Patient.doctor_id).where(Patient.id == target.patient_id)
+    ).scalar()
+    _queue(target, doctor_id)
+
+
+def _patient_added_or_removed(mapper, connection, target) -> None:
+    _queue(target, target.doctor_id)
+
+
+def _patient_updated(mapper, connection, target) -> None:
+    """Patient réassigné: invalide l'ancien et le nouveau médecin"""
+    history = inspect(target).attrs.doctor_id.history
+    if history.has_changes():
+        for doctor_id in {target.doctor_id, *history.deleted}:
+            _queue(target, doctor_id)
+
+
+def _after_commit(session) -> None:
+    # Une lecture entre le flush et le commit remettrait sinon en cache les
+    # compteurs d'avant la modification
+    for doctor_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_dashboard(doctor_id)
+
+
+def _after_rollback(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+for _model in (Seizure, Alert):
+    event.listen(_model, "after_insert", _patient_event)
+    event.listen(_model, "after_update", _patient_event)
+    event.listen(_model, "after_delete", _patient_event)
+
+event.listen(Patient, "after_insert", _patient_added_or_removed)
+event.listen(Patient, "after_update", _patient_updated)
+event.listen(Patient, "after_delete", _patient_added_or_removed)
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
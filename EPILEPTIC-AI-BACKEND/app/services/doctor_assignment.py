@@ -0,0 +1,34 @@
+"""
+Doctor Assignment
+
+Le médecin d'un patient est désigné par son email (treating_neurologist,
+affiché et modifiable par les clients) et par doctor_id, qui restreint les
+requêtes des médecins à leurs patients. Toute modification de
+treating_neurologist passe par assign_treating_neurologist pour que les
+deux restent cohérents.
+"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+
+logger = logging.getLogger(__name__)
+
+
+def assign_treating_neurologist(db: Session, patient: Patient, email: Optional[str]) -> None:
+    """
+    Assigne le patient au médecin de cet email.
+
+    Args:
+        db: Session DB
+        patient: Patient à réassigner
+        email: Email du médecin (None ou inconnu: patient sans médecin)
+    """
+    patient.treating_neurologist = email
+    patient.doctor_id = db.query(Doctor.id).filter(Doctor.email == email).scalar() if email else None
+    if email and patient.doctor_id is None:
+        logger.warning(f"No doctor with email {email}, patient {patient.id} left unassigned")
@@ -0,0 +1,396 @@
+"""
+HealthKit Export Import
+
+Import de l'archive Apple Health (export.xml ou export.zip, souvent plusieurs Go)
+pour les patients qui arrivent avec des années d'historique Apple Watch.
+
+1. Parsing en flux (iterparse) à mémoire constante: seuls les types utilisés
+   sont retenus et écrits dans des fichiers binaires par (série, mois)
+2. Mois par mois: tri, fusion en lignes Biometric denses (align_series_arrays)
+   et chargement en masse par chunks, une transaction par mois
+3. L'avancement est sauvegardé dans state.json: un import interrompu reprend
+   au premier mois non chargé (un mois rechargé remplace ses lignes)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.biometric import Biometric
+from app.services.healthkit_merge import align_series_arrays
+from app.services.biometric_rollups import rebuild_rollups
+
+logger = logging.getLogger(__name__)
+
+EXPORT_SOURCE = "healthkit_export"
+
+# Type HealthKit -> série interne
+RECORD_TYPES = {
+    "HKQuantityTypeIdentifierHeartRate": "heart_rate",
+    "HKQuantityTypeIdentifierHeartRateVariabilitySDNN": "heart_rate_variability",
+    "HKQuantityTypeIdentifierAppleExerciseTime": "activity",
+    "HKCategoryTypeIdentifierSleepAnalysis": "sleep",
+}
+
+# Série -> champ Biometric (le sommeil est regroupé en nuits avant fusion)
+_SERIES_FIELDS = {
+    "heart_rate": "heart_rate",
+    "heart_rate_variability": "heart_rate_variability",
+    "activity": "movement_intensity",
+}
+
+_ASLEEP_PREFIX = "HKCategoryValueSleepAnalysisAsleep"
+
+# Écart max entre deux segments de sommeil d'une même nuit
+_SLEEP_SESSION_GAP_SECONDS = 2 * 3600
+
+# Lignes du spool: (timestamp epoch, valeur, début) en float64
+_SPOOL_COLUMNS = 3
+_SPOOL_FLUSH_ROWS = 100_000
+_PROGRESS_EVERY_RECORDS = 50_000
+
+
+def _parse_export_date(value: str) -> float:
+    """'2024-01-01 10:00:00 +0100' -> epoch seconds"""
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S %z").timestamp()
+
+
+def _month_key(ts: float) -> str:
+    tm = time.gmtime(ts)
+    return f"{tm.tm_year:04d}-{tm.tm_mon:02d}"
+
+
+def _month_bounds(month: str) -> Tuple[datetime, datetime]:
+    """Bornes UTC naïves [début, fin[ d'un mois 'YYYY-MM'"""
+    start = datetime.strptime(month, "%Y-%m")
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+def parse_record(attrib: Dict[str, str]) -> Optional[Tuple[str, float, float, float]]:
+    """
+    Convertit les attributs d'un <Record> en ligne de spool.
+
+    Returns:
+        (série, timestamp, valeur, début) ou None si le record est ignoré
+    """
+    series = RECORD_TYPES.get(attrib.get("type"))
+    if series is None:
+        return None
+
+    try:
+        start = _parse_export_date(attrib["startDate"])
+        if series in ("heart_rate", "heart_rate_variability"):
+            return series, start, float(attrib["value"]), start
+
+        end = _parse_export_date(attrib["endDate"])
+        if series == "activity":
+            # Minutes d'exercice sur l'intervalle du record, ramenées à 0-1
+            interval_minutes = max((end - start) / 60.0, 1.0)
+            return series, start, min(float(attrib["value"]) / interval_minutes, 1.0), start
+
+        # Sommeil: seuls les segments "endormi" comptent, horodatés à la fin
+        if not attrib.get("value", "").startswith(_ASLEEP_PREFIX) or end <= start:
+            return None
+        return series, end, end - start, start
+    except (KeyError, ValueError) as e:
+        logger.debug(f"Skipping malformed export record: {e}")
+        return None
+
+
+def _sleep_sessions(segments: np.ndarray) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Regroupe les segments de sommeil en nuits (durée sans double comptage
+    des segments qui se recouvrent, ex. montre + iPhone).
+
+    Returns:
+        (fins de nuit epoch int64, {"sleep_duration": heures})
+    """
+    ends, hours = [], []
+    current_end = None
+    asleep = 0.0
+    for end, _, start in segments[np.argsort(segments[:, 2], kind="stable")].tolist():
+        if current_end is not None and start - current_end > _SLEEP_SESSION_GAP_SECONDS:
+            ends.append(current_end)
+            hours.append(asleep / 3600.0)
+            current_end, asleep = None, 0.0
+        if current_end is None:
+            current_end, asleep = end, end - start
+        else:
+            asleep += max(0.0, end - max(start, current_end))
+            current_end = max(current_end, end)
+    if current_end is not None:
+        ends.append(current_end)
+        hours.append(asleep / 3600.0)
+
+    return np.asarray(ends, dtype=np.int64), {"sleep_duration": np.asarray(hours)}
+
+
+class _CountingReader:
+    """Fichier en lecture qui compte les octets lus (progression)"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class HealthKitExportImporter:
+    """Import reprenable d'un export Apple Health pour un patient"""
+
+    def __init__(
+        self,
+        patient_id: int,
+        export_path: str,
+        session_factory: Callable = SessionLocal,
+        work_dir: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        self.patient_id = patient_id
+        self.export_path = Path(export_path)
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size or settings.HEALTHKIT_IMPORT_CHUNK_SIZE
+        self.progress_callback = progress_callback
+
+        stat = self.export_path.stat()
+        fingerprint = hashlib.sha1(
+            f"{self.export_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}".encode()
+        ).hexdigest()[:16]
+        base = Path(work_dir or settings.HEALTHKIT_IMPORT_WORK_DIR)
+        self.state_dir = base / str(patient_id) / fingerprint
+        self.spool_dir = self.state_dir / "spool"
+        self.state_path = self.state_dir / "state.json"
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Lance ou reprend l'import.
+
+        Returns:
+            Résumé: mois chargés, lignes insérées, records retenus par série
+        """
+        state = self._load_state()
+        if state.get("completed"):
+            logger.info(f"HealthKit export for patient {self.patient_id} already imported")
+            return self._summary(state)
+
+        if not state.get("parsed"):
+            self._parse(state)
+        self._load(state)
+
+        return self._summary(state)
+
+    # ---- Phase 1: parsing en flux ----
+
+    def _open_export(self):
+        """Ouvre export.xml, directement ou dans l'archive export.zip"""
+        if zipfile.is_zipfile(self.export_path):
+            archive = zipfile.ZipFile(self.export_path)
+            member = next(
+                (info for info in archive.infolist() if info.filename.endswith("/export.xml")
+                 or info.filename == "export.xml"),
+                None
+            )
+            if member is None:
+                archive.close()
+                raise ValueError("export.xml not found in archive")
+            return archive.open(member), member.file_size
+        return open(self.export_path, "rb"), self.export_path.stat().st_size
+
+    def _parse(self, state: Dict[str, Any]) -> None:
+        # Un parsing interrompu repart de zéro: le spool partiel est jeté
+        if self.spool_dir.exists():
+            shutil.rmtree(self.spool_dir)
+        self.spool_dir.mkdir(parents=True)
+
+        buffers: Dict[Tuple[str, str], List[Tuple[float, float, float]]] = defaultdict(list)
+        buffered = 0
+        counts: Dict[str, int] = defaultdict(int)
+        months = set()
+        scanned = 0
+
+        stream, total_bytes = self._open_export()
+        with stream:
+            reader = _CountingReader(stream)
+            context = ET.iterparse(reader, events=("start", "end"))
+            _, root = next(context)
+            depth = 1
+
+            for event, elem in context:
+                if event == "start":
+                    depth += 1
+                    continue
+                depth -= 1
+
+                if elem.tag == "Record":
+                    scanned += 1
+                    parsed = parse_record(elem.attrib)
+                    if parsed is not None:
+                        series, ts, value, start = parsed
+                        month = _month_key(ts)
+                        buffers[(series, month)].append((ts, value, start))
+                        counts[series] += 1
+                        months.add(month)
+                        buffered += 1
+
+                    if scanned % _PROGRESS_EVERY_RECORDS == 0:
+                        self._report({
+                            "phase": "parsing",
+                            "bytes_read": reader.bytes_read,
+                            "total_bytes": total_bytes,
+                            "records_scanned": scanned,
+                        })
+
+                # Libère chaque élément de premier niveau une fois traité
+                if depth == 1:
+                    root.clear()
+
+                if buffered >= _SPOOL_FLUSH_ROWS:
+                    self._flush_spool(buffers)
+                    buffered = 0
+
+        self._flush_spool(buffers)
+
+        state.update({
+            "parsed": True,
+            "months": sorted(months),
+            "records": dict(counts),
+            "records_scanned": scanned,
+        })
+        self._save_state(state)
+        logger.info(
+            f"Parsed HealthKit export for patient {self.patient_id}: "
+            f"{scanned} records scanned, {sum(counts.values())} kept over {len(months)} months"
+        )
+
+    def _flush_spool(self, buffers: Dict[Tuple[str, str], List[Tuple[float, float, float]]]) -> None:
+        for (series, month), rows in buffers.items():
+            if rows:
+                with open(self.spool_dir / f"{series}_{month}.bin", "ab") as f:
+                    np.asarray(rows, dtype=np.float64).tofile(f)
+        buffers.clear()
+
+    # ---- Phase 2: fusion et chargement mois par mois ----
+
+    def _month_rows(self, month: str) -> List[Dict[str, Any]]:
+        series = {}
+        for name in RECORD_TYPES.values():
+            path = self.spool_dir / f"{name}_{month}.bin"
+            if not path.exists():
+                continue
+            data = np.fromfile(path, dtype=np.float64).reshape(-1, _SPOOL_COLUMNS)
+
+            if name == "sleep":
+                series[name] = _sleep_sessions(data)
+            else:
+                order = np.argsort(data[:, 0], kind="stable")
+                series[name] = (
+                    data[order, 0].astype(np.int64),
+                    {_SERIES_FIELDS[name]: data[order, 1]}
+                )
+
+        return align_series_arrays(
+            series,
+            settings.HEALTHKIT_MERGE_SLOT_MINUTES * 60,
+            settings.HEALTHKIT_MERGE_TOLERANCE_MINUTES * 60
+        )
+
+    def _write_month(self, month: str, rows: List[Dict[str, Any]]) -> None:
+        """Remplace les lignes importées du mois, en une transaction"""
+        start, end = _month_bounds(month)
+        db = self.session_factory()
+        try:
+            db.query(Biometric).filter(
+                Biometric.patient_id == self.patient_id,
+                Biometric.source == EXPORT_SOURCE,
+                Biometric.recorded_at >= start,
+                Biometric.recorded_at < end
+            ).delete(synchronize_session=False)
+
+            for i in range(0, len(rows), self.chunk_size):
+                db.execute(insert(Biometric), [
+                    dict(row, patient_id=self.patient_id, source=EXPORT_SOURCE)
+                    for row in rows[i:i + self.chunk_size]
+                ])
+            rebuild_rollups(db, self.patient_id, start, end - timedelta(microseconds=1))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _load(self, state: Dict[str, Any]) -> None:
+        months = state.get("months", [])
+        completed = set(state.get("completed_months", []))
+
+        for month in months:
+            if month in completed:
+                continue
+            rows = self._month_rows(month)
+            self._write_month(month, rows)
+
+            completed.add(month)
+            state["completed_months"] = sorted(completed)
+            state["rows_inserted"] = state.get("rows_inserted", 0) + len(rows)
+            self._save_state(state)
+            self._report({
+                "phase": "loading",
+                "month": month,
+                "months_done": len(completed),
+                "months_total": len(months),
+                "rows_inserted": state["rows_inserted"],
+            })
+
+        state["completed"] = True
+        self._save_state(state)
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+    # ---- État et progression ----
+
+    def _load_state(self) -> Dict[str, Any]:
+        if self.state_path.exists():
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        return {"patient_id": self.patient_id, "export_path": str(self.export_path)}
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _report(self, progress: Dict[str, Any]) -> None:
+        progress = dict(progress, patient_id=self.patient_id)
+        logger.info(f"HealthKit export import progress: {progress}")
+        if self.progress_callback:
+            self.progress_callback(progress)
+
+    def _summary(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "patient_id": self.patient_id,
+            "completed": state.get("completed", False),
+            "months_loaded": len(state.get("completed_months", [])),
+            "rows_inserted": state.get("rows_inserted", 0),
+            "records_kept": state.get("records", {}),
+            "records_scanned": state.get("records_scanned", 0),
+        }
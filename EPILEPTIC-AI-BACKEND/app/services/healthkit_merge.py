@@ -0,0 +1,224 @@
+"""
+HealthKit Merge
+
+Aligne les séries HealthKit (heart_rate, HRV, activity, sleep) sur une grille
+temporelle commune pour produire UNE ligne Biometric dense par créneau,
+au lieu d'une ligne par série avec la moitié des champs à NULL.
+
+L'alignement est un as-of join vectorisé (tri + np.searchsorted):
+pour chaque créneau occupé, on prend la dernière mesure de chaque série
+qui tombe dans la tolérance configurée.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.write_behind import naive_utc
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Champs Biometric produits par la fusion (ordre des colonnes de sortie)
+MERGED_FIELDS = (
+    "heart_rate",
+    "heart_rate_variability",
+    "movement_intensity",
+    "sleep_duration",
+    "sleep_quality",
+)
+
+
+def _active_fraction(sample: Dict[str, Any]) -> Optional[float]:
+    """Minutes actives sur l'heure de l'échantillon, ramenées à 0-1"""
+    minutes = sample.get("active_minutes")
+    if minutes is None:
+        return None
+    return min(max(float(minutes) / 60.0, 0.0), 1.0)
+
+
+# série HealthKit -> (clé d'horodatage, {champ Biometric: extracteur})
+_SERIES = {
+    "heart_rate": ("timestamp", {
+        "heart_rate": lambda s: s.get("value"),
+    }),
+    "heart_rate_variability": ("timestamp", {
+        "heart_rate_variability": lambda s: s.get("value"),
+    }),
+    "activity": ("timestamp", {
+        "movement_intensity": _active_fraction,
+    }),
+    # Le résumé de sommeil est connu au réveil: on l'horodate à end_time
+    "sleep": ("end_time", {
+        "sleep_duration": lambda s: s.get("duration_hours"),
+        "sleep_quality": lambda s: s.get("quality_score"),
+    }),
+}
+
+
+def _to_epoch_seconds(value: str) -> int:
+    parsed = naive_utc(datetime.fromisoformat(value.replace('Z', '+00:00')))
+    return int((parsed - _EPOCH).total_seconds())
+
+
+def filter_new_samples(
+    data: Dict[str, List[Dict[str, Any]]],
+    cursors: Dict[str, datetime]
+) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, datetime]]:
+    """
+    Ne garde que les mesures postérieures au curseur de chaque série.
+
+    Args:
+        data: Bloc "data" retourné par HealthKitService.fetch_health_data
+        cursors: {série: dernier horodatage déjà importé}
+
+    Returns:
+        (données filtrées, {série: horodatage le plus récent retenu})
+    """
+    filtered = {}
+    latest = {}
+    for name, samples in data.items():
+        if name not in _SERIES:
+            continue
+        ts_key = _SERIES[name][0]
+        cursor = cursors.get(name)
+        cursor_ts = int((naive_utc(cursor) - _EPOCH).total_seconds()) if cursor else None
+
+        kept = []
+        newest = None
+        for sample in samples or []:
+            try:
+                ts = _to_epoch_seconds(sample[ts_key])
+            except (KeyError, TypeError, ValueError, AttributeError):
+                continue
+            if cursor_ts is not None and ts <= cursor_ts:
+                continue
+            kept.append(sample)
+            newest = ts if newest is None else max(newest, ts)
+
+        filtered[name] = kept
+        if newest is not None:
+            latest[name] = _EPOCH + timedelta(seconds=newest)
+
+    return filtered, latest
+
+
+def _series_to_arrays(
+    data: Dict[str, List[Dict[str, Any]]]
+) -> Dict[str, Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+    """
+    Convertit chaque série en tableaux triés par horodatage.
+
+    Returns:
+        {série: (timestamps int64 triés, {champ: valeurs float64, NaN si absent})}
+    """
+    arrays = {}
+    for name, (ts_key, extractors) in _SERIES.items():
+        samples = data.get(name) or []
+        timestamps = []
+        columns = {field: [] for field in extractors}
+
+        for sample in samples:
+            try:
+                ts = _to_epoch_seconds(sample[ts_key])
+                values = {field: extract(sample) for field, extract in extractors.items()}
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                logger.warning(f"Skipping malformed HealthKit {name} sample: {e}")
+                continue
+            if all(v is None for v in values.values()):
+                continue
+            timestamps.append(ts)
+            for field, value in values.items():
+                columns[field].append(np.nan if value is None else float(value))
+
+        if not timestamps:
+            continue
+
+        ts_array = np.asarray(timestamps, dtype=np.int64)
+        order = np.argsort(ts_array, kind="stable")
+        arrays[name] = (
+            ts_array[order],
+            {field: np.asarray(values, dtype=np.float64)[order] for field, values in columns.items()}
+        )
+
+    return arrays
+
+
+def align_healthkit_series(
+    data: Dict[str, List[Dict[str, Any]]],
+    slot_minutes: Optional[float] = None,
+    tolerance_minutes: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Fusionne les séries HealthKit en lignes denses, une par créneau.
+
+    Args:
+        data: Bloc "data" retourné par HealthKitService.fetch_health_data
+        slot_minutes: Pas de la grille (défaut: HEALTHKIT_MERGE_SLOT_MINUTES)
+        tolerance_minutes: Ancienneté max d'une mesure reportée sur un créneau
+            (défaut: HEALTHKIT_MERGE_TOLERANCE_MINUTES)
+
+    Returns:
+        Liste de dicts (recorded_at + champs Biometric), triée par recorded_at.
+        Seuls les créneaux contenant au moins une mesure sont émis.
+    """
+    slot = int((slot_minutes or settings.HEALTHKIT_MERGE_SLOT_MINUTES) * 60)
+    tolerance = int(
+        (tolerance_minutes if tolerance_minutes is not None
+         else settings.HEALTHKIT_MERGE_TOLERANCE_MINUTES) * 60
+    )
+
+    return align_series_arrays(_series_to_arrays(data), slot, tolerance)
+
+
+def align_series_arrays(
+    series: Dict[str, Tuple[np.ndarray, Dict[str, np.ndarray]]],
+    slot_seconds: int,
+    tolerance_seconds: int
+) -> List[Dict[str, Any]]:
+    """
+    Cœur de la fusion, sur des séries déjà converties en tableaux.
+
+    Args:
+        series: {série: (timestamps epoch int64 triés, {champ: valeurs float64})}
+        slot_seconds: Pas de la grille
+        tolerance_seconds: Ancienneté max d'une mesure reportée sur un créneau
+
+    Returns:
+        Liste de dicts (recorded_at + champs Biometric), triée par recorded_at
+    """
+    if not series:
+        return []
+
+    slot = slot_seconds
+    tolerance = tolerance_seconds
+
+    # Créneaux occupés par au moins une mesure
+    all_ts = np.concatenate([ts for ts, _ in series.values()])
+    slot_starts = np.unique(all_ts // slot * slot)
+    slot_ends = slot_starts + slot
+
+    merged = np.full((len(slot_starts), len(MERGED_FIELDS)), np.nan)
+    for ts, columns in series.values():
+        # Dernière mesure strictement avant la fin du créneau (as-of join)
+        idx = np.searchsorted(ts, slot_ends, side="left") - 1
+        valid = idx >= 0
+        safe_idx = np.where(valid, idx, 0)
+        valid &= ts[safe_idx] >= slot_starts - tolerance
+
+        for field, values in columns.items():
+            col = MERGED_FIELDS.index(field)
+            merged[:, col] = np.where(valid, values[safe_idx], merged[:, col])
+
+    rows = []
+    for start, values in zip(slot_starts.tolist(), merged.tolist()):
+        row = {"recorded_at": _EPOCH + timedelta(seconds=start)}
+        for field, value in zip(MERGED_FIELDS, values):
+            row[field] = None if value != value else value  # NaN -> None
+        rows.append(row)
+
+    return rows
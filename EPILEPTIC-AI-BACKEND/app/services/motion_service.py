@@ -0,0 +1,177 @@
+"""
+Motion Stream Service
+
+Traitement serveur des flux accéléromètre haute fréquence (25-50 Hz):
+1. Décodage des chunks binaires (float32 little-endian, x/y/z entrelacés)
+2. Découpage en fenêtres et calcul vectorisé NumPy:
+   - magnitude moyenne
+   - énergie du signal dynamique (gravité retirée)
+   - fréquence dominante (rFFT), utile pour les crises tonico-cloniques (3-8 Hz)
+3. Seuls les agrégats par fenêtre sont stockés dans `biometrics`
+4. Les données brutes partent en stockage froid compressé (.npz) sur disque
+"""
+
+import base64
+import logging
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bande de fréquences considérée pour la fréquence dominante (Hz)
+_MIN_DOMINANT_FREQ_HZ = 0.5
+
+# Caractères remplacés dans l'identifiant d'appareil utilisé comme nom de fichier
+_UNSAFE_PATH_CHARS = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def decode_motion_chunk(payload_b64: str) -> np.ndarray:
+    """
+    Décode un chunk packé en tableau (n, 3) float32.
+
+    Raises:
+        ValueError: Si le payload n'est pas un multiple de 3 float32 ou
+            contient des valeurs NaN / infinies
+    """
+    try:
+        raw = base64.b64decode(payload_b64, validate=True)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid base64 motion payload: {e}")
+
+    if len(raw) % 12 != 0:
+        raise ValueError(
+            f"Motion payload size {len(raw)} is not a multiple of 12 bytes (3 x float32)"
+        )
+
+    samples = np.frombuffer(raw, dtype="<f4").reshape(-1, 3)
+    if not np.isfinite(samples).all():
+        raise ValueError("Motion payload contains NaN or infinite samples")
+    return samples
+
+
+def _window_features(windows: np.ndarray, sample_rate_hz: float) -> Dict[str, np.ndarray]:
+    """
+    Calcule les features de fenêtres de même longueur.
+
+    Args:
+        windows: Tableau (n_windows, window_len, 3) en g
+        sample_rate_hz: Fréquence d'échantillonnage
+
+    Returns:
+        {feature: tableau (n_windows,)}
+    """
+    magnitude = np.sqrt(np.einsum("wij,wij->wi", windows, windows, dtype=np.float64))
+    magnitude_mean = magnitude.mean(axis=1)
+
+    # Composante dynamique: on retire la gravité (moyenne de la fenêtre)
+    dynamic = magnitude - magnitude_mean[:, None]
+    energy = np.mean(dynamic ** 2, axis=1)
+
+    window_len = windows.shape[1]
+    if window_len >= 4:
+        spectrum = np.abs(np.fft.rfft(dynamic, axis=1))
+        freqs = np.fft.rfftfreq(window_len, d=1.0 / sample_rate_hz)
+        spectrum[:, freqs < _MIN_DOMINANT_FREQ_HZ] = 0.0
+        dominant = freqs[np.argmax(spectrum, axis=1)]
+        dominant = np.where(spectrum.max(axis=1) > 0, dominant, 0.0)
+    else:
+        dominant = np.zeros(len(windows))
+
+    return {
+        "accel_magnitude_mean": magnitude_mean,
+        "accel_energy": energy,
+        "accel_dominant_freq": dominant,
+        # RMS dynamique en g, borné à 1 (1 g RMS = secousses violentes)
+        "movement_intensity": np.minimum(np.sqrt(energy), 1.0),
+    }
+
+
+def compute_motion_windows(
+    samples: np.ndarray,
+    sample_rate_hz: float,
+    started_at: datetime,
+    window_seconds: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Découpe un chunk en fenêtres et retourne un agrégat par fenêtre.
+
+    La dernière fenêtre, si incomplète, est calculée séparément pour ne pas
+    perdre la fin du chunk.
+
+    Returns:
+        Liste de dicts {recorded_at, movement_intensity, accel_*}
+    """
+    window_seconds = window_seconds or settings.MOTION_WINDOW_SECONDS
+    window_len = max(int(round(window_seconds * sample_rate_hz)), 1)
+
+    n_full = len(samples) // window_len
+    groups = []
+    if n_full:
+        groups.append((0, samples[:n_full * window_len].reshape(n_full, window_len, 3)))
+    tail = samples[n_full * window_len:]
+    if len(tail) >= 2:
+        groups.append((n_full, tail[None, :, :]))
+
+    rows = []
+    for first_index, windows in groups:
+        features = _window_features(windows, sample_rate_hz)
+        for offset in range(len(windows)):
+            index = first_index + offset
+            row = {
+                "recorded_at": started_at + timedelta(seconds=index * window_len / sample_rate_hz)
+            }
+            for name, values in features.items():
+                row[name] = float(values[offset])
+            rows.append(row)
+
+    return rows
+
+
+def store_raw_chunk(
+    patient_id: int,
+    samples: np.ndarray,
+    sample_rate_hz: float,
+    started_at: datetime,
+    device_id: Optional[str] = None
+) -> Optional[str]:
+    """
+    Archive le chunk brut en stockage froid (.npz compressé, un fichier par
+    chunk et par appareil, rangé par patient et par jour).
+
+    Le fichier est écrit à côté puis renommé: une archive n'est jamais
+    lue à moitié écrite, et un renvoi du même chunk la remplace à l'identique.
+
+    Returns:
+        Chemin du fichier, ou None si le stockage froid est désactivé
+    """
+    if not settings.MOTION_COLD_STORAGE_DIR:
+        return None
+
+    day_dir = Path(settings.MOTION_COLD_STORAGE_DIR) / str(patient_id) / started_at.strftime("%Y-%m-%d")
+    day_dir.mkdir(parents=True, exist_ok=True)
+    device = _UNSAFE_PATH_CHARS.sub("_", device_id) if device_id else "unknown"
+    path = day_dir / f"{started_at.strftime('%H%M%S%f')}_{device}.npz"
+
+    fd, tmp_path = tempfile.mkstemp(dir=day_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(
+                f,
+                samples=samples.astype("<f4", copy=False),
+                sample_rate_hz=np.float32(sample_rate_hz),
+                started_at=np.datetime64(started_at.replace(tzinfo=None), "us"),
+                device_id=np.str_(device_id or ""),
+            )
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    return str(path)
@@ -0,0 +1,289 @@
+"""
+Time Partitioning
+
+Partitionnement mensuel par plage de temps des tables append-only
+(biometrics, predictions) sur PostgreSQL:
+1. Création anticipée des partitions des mois à venir. Les lignes d'un
+   mois déjà reçues par la partition DEFAULT (mois créé en retard) y sont
+   déplacées vers la nouvelle partition avant son attachement
+2. Rétention par DETACH / DROP de partitions entières, au lieu d'un
+   DELETE massif qui gonfle et verrouille la table; les lignes expirées de
+   la partition DEFAULT sont supprimées par lots
+3. Repli sur SQLite (tests) ou sur une table non partitionnée:
+   suppression classique par DELETE
+
+Les partitions sont nommées {table}_pYYYY_MM, plus {table}_default
+(voir migration 006).
+"""
+
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.biometric import Biometric
+from app.models.prediction import Prediction
+
+logger = logging.getLogger(__name__)
+
+# Table partitionnée -> (modèle, colonne de partition)
+PARTITIONED_TABLES = {
+    "biometrics": (Biometric, "recorded_at"),
+    "predictions": (Prediction, "predicted_at"),
+}
+
+_PARTITION_NAME = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + (value.month - 1) + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+def partition_bounds(month: datetime) -> Tuple[datetime, datetime]:
+    """Bornes [début, fin[ de la partition du mois"""
+    start = month_start(month)
+    return start, add_months(start, 1)
+
+
+def is_partitioned(db: Session, table: str) -> bool:
+    """La table est-elle une table partitionnée PostgreSQL ?"""
+    if db.bind.dialect.name != "postgresql":
+        return False
+    return db.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :table AND c.relnamespace = 'public'::regnamespace"
+        ),
+        {"table": table}
+    ).first() is not None
+
+
+def list_partitions(db: Session, table: str) -> List[Tuple[str, datetime]]:
+    """
+    Partitions mensuelles attachées à la table.
+
+    Returns:
+        [(nom, début du mois)], triées; la partition DEFAULT est ignorée
+    """
+    rows = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table}
+    ).scalars().all()
+
+    partitions = []
+    for name in rows:
+        match = _PARTITION_NAME.match(name)
+        if match and match.group("table") == table:
+            partitions.append((name, datetime(int(match.group("year")), int(match.group("month")), 1)))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def default_partition(db: Session, table: str) -> Optional[str]:
+    """Nom de la partition DEFAULT de la table, None si absente"""
+    return db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = :table "
+            "AND pg_get_expr(child.relpartbound, child.oid) = 'DEFAULT'"
+        ),
+        {"table": table}
+    ).scalar()
+
+
+def _bound(value: datetime) -> str:
+    return f"'{value.isoformat()}+00'"
+
+
+def _create_partition(db: Session, table: str, name: str, month: datetime, default: Optional[str]) -> int:
+    """
+    Crée la partition du mois. CREATE ... PARTITION OF échoue si la partition
+    DEFAULT contient déjà des lignes de ce mois: elles sont alors déplacées
+    dans une table créée à part, attachée ensuite comme partition.
+
+    Returns:
+        Nombre de lignes déplacées depuis DEFAULT
+    """
+    start, end = partition_bounds(month)
+    bounds = f"FOR VALUES FROM ({_bound(start)}) TO ({_bound(end)})"
+    column = PARTITIONED_TABLES[table][1]
+    in_month = f'"{column}" >= {_bound(start)} AND "{column}" < {_bound(end)}'
+
+    if default is not None:
+        # Aucune insertion dans DEFAULT entre le déplacement et l'attachement
+        db.execute(text(f'LOCK TABLE "{default}" IN SHARE ROW EXCLUSIVE MODE'))
+        if db.execute(text(f'SELECT 1 FROM "{default}" WHERE {in_month} LIMIT 1')).first() is not None:
+            db.execute(text(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+            moved = db.execute(text(
+                f'WITH moved AS (DELETE FROM "{default}" WHERE {in_month} RETURNING *) '
+                f'INSERT INTO "{name}" SELECT * FROM moved'
+            )).rowcount
+            db.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" {bounds}'))
+            logger.warning(f"Moved {moved} rows from {default} into new partition {name}")
+            return moved
+
+    db.execute(text(f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" {bounds}'))
+    return 0
+
+
+def ensure_partitions(
+    db: Session,
+    months_ahead: Optional[int] = None,
+    now: Optional[datetime] = None
+) -> Dict[str, List[str]]:
+    """
+    Crée les partitions du mois courant et des mois suivants si absentes.
+
+    Args:
+        db: Session DB
+        months_ahead: Nombre de mois futurs (défaut: PARTITION_PREMAKE_MONTHS)
+        now: Date de référence (tests)
+
+    Returns:
+        {table: [partitions créées]}
+    """
+    months_ahead = settings.PARTITION_PREMAKE_MONTHS if months_ahead is None else months_ahead
+    current = month_start(now or datetime.utcnow())
+    created = {}
+
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(db, table):
+            continue
+        existing = {name for name, _ in list_partitions(db, table)}
+        default = default_partition(db, table)
+        created[table] = []
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            name = partition_name(table, month)
+            if name in existing:
+                continue
+            _create_partition(db, table, name, month, default)
+            # Une transaction par partition: verrou court sur DEFAULT
+            db.commit()
+            created[table].append(name)
+
+    db.commit()
+    if any(created.values()):
+        logger.info(f"Created partitions: {created}")
+    return created
+
+
+def drop_expired_partitions(
+    db: Session,
+    table: str,
+    cutoff: datetime,
+    detach_only: Optional[bool] = None
+) -> List[str]:
+    """
+    Détache (et supprime, sauf detach_only) les partitions entièrement
+    antérieures à cutoff, une transaction courte par partition.
+
+    Returns:
+        Noms des partitions traitées
+    """
+    detach_only = settings.PARTITION_RETENTION_DETACH_ONLY if detach_only is None else detach_only
+    dropped = []
+    for name, month in list_partitions(db, table):
+        _, end = partition_bounds(month)
+        if end > cutoff:
+            break
+        db.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+        if not detach_only:
+            db.execute(text(f'DROP TABLE "{name}"'))
+        db.commit()
+        dropped.append(name)
+    return dropped
+
+
+def purge_default_partition(
+    db: Session,
+    table: str,
+    cutoff: datetime,
+    batch_size: Optional[int] = None
+) -> int:
+    """
+    Supprime par lots les lignes antérieures à cutoff de la partition
+    DEFAULT, que la suppression de partitions entières ne couvre pas.
+
+    Returns:
+        Nombre de lignes supprimées
+    """
+    default = default_partition(db, table)
+    if default is None:
+        return 0
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    column = PARTITIONED_TABLES[table][1]
+    deleted = 0
+    while True:
+        count = db.execute(
+            text(
+                f'DELETE FROM "{default}" WHERE ctid IN '
+                f'(SELECT ctid FROM "{default}" WHERE "{column}" < :cutoff LIMIT :limit)'
+            ),
+            {"cutoff": cutoff, "limit": batch_size}
+        ).rowcount
+        db.commit()
+        deleted += count
+        if count < batch_size:
+            return deleted
+
+
+def apply_retention(
+    db: Session,
+    retention_days: Optional[int] = None,
+    detach_only: Optional[bool] = None,
+    now: Optional[datetime] = None
+) -> Dict[str, Dict[str, object]]:
+    """
+    Applique la rétention sur biometrics et predictions.
+
+    Table partitionnée: les partitions entièrement antérieures à la date de
+    rétention sont détachées puis supprimées (ou seulement détachées si
+    detach_only, pour archivage). Les lignes plus récentes d'un mois
+    partiellement expiré sont conservées jusqu'à expiration du mois entier.
+    Les lignes expirées de la partition DEFAULT sont supprimées par lots.
+    Sinon: DELETE classique.
+
+    Returns:
+        {table: {"mode": "partitions" | "delete", ...}}
+    """
+    retention_days = settings.DATA_RETENTION_DAYS if retention_days is None else retention_days
+    detach_only = settings.PARTITION_RETENTION_DETACH_ONLY if detach_only is None else detach_only
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    result = {}
+
+    for table, (model, time_column) in PARTITIONED_TABLES.items():
+        if is_partitioned(db, table):
+            result[table] = {
+                "mode": "partitions",
+                "detached" if detach_only else "dropped": drop_expired_partitions(db, table, cutoff, detach_only),
+                "default_rows_deleted": purge_default_partition(db, table, cutoff),
+            }
+        else:
+            deleted = db.query(model).filter(
+                getattr(model, time_column) < cutoff
+            ).delete(synchronize_session=False)
+            db.commit()
+            result[table] = {"mode": "delete", "rows_deleted": deleted}
+
+    return result
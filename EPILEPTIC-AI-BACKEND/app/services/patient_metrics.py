@@ -0,0 +1,131 @@
+"""
+Patient Metrics
+
+Liste des patients d'un médecin avec leurs indicateurs (PatientMetrics) en
+une seule requête, quel que soit le nombre de patients:
+1. Page de patients: jointure patients -> patient_latest_state (score de
+   risque, fréquence cardiaque), filtrée et paginée par curseur sur
+   (score de risque, id) ou (created_at, id)
+2. Agrégats de crises (total, dernière, 30 derniers jours) groupés par
+   patient, limités aux patients de la page (index patient_id, start_time)
+3. Jointure des deux (la page est une CTE): aucune requête par patient
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.core.pagination import keyset, page_of
+from app.models.patient import Patient
+from app.models.patient_latest_state import PatientLatestState
+from app.models.seizure import Seizure
+from app.services.dashboard_stats import MONTH
+
+logger = logging.getLogger(__name__)
+
+_STATE = PatientLatestState.__table__
+
+# health_status de PatientMetrics -> niveaux de risque de patient_latest_state
+HEALTH_STATUS_LEVELS = {
+    "critical": ("critical",),
+    "high-risk": ("high",),
+    "stable": ("medium", "low"),
+    "unknown": (None,),
+}
+
+
+def health_status(risk_level: Optional[str]) -> str:
+    """health_status affiché pour un niveau de risque"""
+    for status, levels in HEALTH_STATUS_LEVELS.items():
+        if risk_level in levels:
+            return status
+    return "unknown"
+
+
+def _health_filter(status: str):
+    levels = HEALTH_STATUS_LEVELS[status]
+    if levels == (None,):
+        return _STATE.c.risk_level.is_(None)
+    return _STATE.c.risk_level.in_(levels)
+
+
+def patient_metrics_page(
+    db: Session,
+    doctor_id: Optional[int],
+    limit: int,
+    cursor: Optional[str] = None,
+    sort: str = "risk",
+    status: Optional[str] = None,
+    skip: int = 0,
+    now: Optional[datetime] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Page de patients avec leurs indicateurs, en une requête.
+
+    Args:
+        db: Session DB
+        doctor_id: Médecin (tous les patients si None, pour un admin)
+        limit: Taille de page (déjà plafonnée)
+        cursor: Curseur de la page précédente
+        sort: "risk" (score décroissant, patients sans prédiction en dernier)
+            ou "created_at" (plus récents d'abord)
+        status: Filtre health_status ("critical", "high-risk", "stable", "unknown")
+        skip: Décalage (ancien paramètre, ignoré avec un curseur)
+        now: Date de référence (tests)
+
+    Returns:
+        (lignes au format PatientMetrics, curseur suivant ou None)
+    """
+    now = now or datetime.utcnow()
+    sort_value = (
+        func.coalesce(_STATE.c.risk_score, -1.0) if sort == "risk" else Patient.created_at
+    ).label("sort_value")
+
+    page = select(
+        Patient.id, Patient.email, Patient.full_name, Patient.phone, Patient.epilepsy_type,
+        Patient.created_at, _STATE.c.risk_score, _STATE.c.risk_level,
+        _STATE.c.heart_rate.label("latest_heart_rate"), sort_value
+    ).select_from(Patient).outerjoin(_STATE, _STATE.c.patient_id == Patient.id)
+    if doctor_id is not None:
+        page = page.where(Patient.doctor_id == doctor_id)
+    if status is not None:
+        page = page.where(_health_filter(status))
+    page = keyset(page, sort_value, Patient.id, cursor, limit)
+    if skip and not cursor:
+        page = page.offset(skip)
+    page = page.cte("page")
+
+    seizures = select(
+        Seizure.patient_id.label("patient_id"),
+        func.count().label("total_seizures"),
+        func.max(Seizure.start_time).label("last_seizure_date"),
+        func.sum(case((Seizure.start_time >= now - MONTH, 1), else_=0)).label("seizures_this_month")
+    ).where(Seizure.patient_id.in_(select(page.c.id))).group_by(Seizure.patient_id).subquery("seizure_stats")
+
+    stmt = select(
+        page, seizures.c.total_seizures, seizures.c.last_seizure_date, seizures.c.seizures_this_month
+    ).outerjoin(seizures, seizures.c.patient_id == page.c.id).order_by(
+        page.c.sort_value.desc().nulls_last(), page.c.id.desc()
+    )
+
+    rows, next_cursor = page_of(db.execute(stmt).all(), "sort_value", limit)
+    return [
+        {
+            "id": row.id,
+            "email": row.email,
+            "full_name": row.full_name,
+            "phone": row.phone,
+            "epilepsy_type": row.epilepsy_type,
+            "risk_score": row.risk_score or 0.0,
+            "last_seizure_date": row.last_seizure_date,
+            "total_seizures": row.total_seizures or 0,
+            "seizures_this_month": row.seizures_this_month or 0,
+            "latest_heart_rate": row.latest_heart_rate,
+            "health_status": health_status(row.risk_level),
+            "created_at": row.created_at,
+        }
+        for row in rows
+    ], next_cursor
@@ -0,0 +1,255 @@
+"""
+Patient Latest State
+
+Une ligne par patient (patient_latest_state) avec les dernières valeurs
+biométriques, la dernière prédiction et le nombre d'alertes ouvertes, pour
+que /latest et le tableau de bord médecin ne trient plus les tables de
+séries temporelles:
+- record_biometrics / record_predictions: à appeler dans la transaction qui
+  insère les lignes (upsert qui n'avance que vers un horodatage plus récent;
+  un import d'historique plus ancien ne remplace donc pas l'état courant)
+- Le nombre d'alertes ouvertes est recalculé par les événements ORM de
+  Alert (création, changement de is_active / resolved, suppression)
+- Lecture: une recherche par clé primaire, ou un seul parcours joint aux
+  patients pour tout le panel d'un médecin (panel_states)
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import event, func, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.alert import Alert
+from app.models.biometric_rollup import ROLLUP_SIGNALS
+from app.models.patient import Patient
+from app.models.patient_latest_state import PatientLatestState
+from app.services.write_behind import naive_utc
+
+logger = logging.getLogger(__name__)
+
+# Signaux biométriques conservés (dernière valeur non nulle de chacun)
+LATEST_SIGNALS = ROLLUP_SIGNALS
+
+_TABLE = PatientLatestState.__table__
+
+
+def risk_level(risk_score: Optional[float]) -> Optional[str]:
+    """
+    Niveau de risque d'un score (mêmes seuils que la sévérité des alertes).
+
+    Returns:
+        "low" | "medium" | "high" | "critical", ou None sans score
+    """
+    if risk_score is None:
+        return None
+    if risk_score >= 0.80:
+        return "critical"
+    if risk_score >= 0.60:
+        return "high"
+    if risk_score >= 0.40:
+        return "medium"
+    return "low"
+
+
+def _field(row: Any, name: str) -> Any:
+    return row.get(name) if isinstance(row, dict) else getattr(row, name, None)
+
+
+def _dialect_insert(executor):
+    """insert() avec ON CONFLICT du dialecte (Session ou Connection), sinon None"""
+    dialect = getattr(executor, "dialect", None) or executor.bind.dialect
+    if dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
+
+
+def _upsert(executor, records: List[Dict[str, Any]], time_key: str, coalesce: Sequence[str] = ()) -> None:
+    """
+    Insère ou avance l'état de chaque patient si records[time_key] est au
+    moins aussi récent que l'état enregistré. Les colonnes de coalesce
+    gardent leur ancienne valeur quand la nouvelle est nulle.
+    """
+    columns = [key for key in records[0] if key != "patient_id"]
+    dialect_insert = _dialect_insert(executor)
+
+    if dialect_insert is not None:
+        stmt = dialect_insert(PatientLatestState).values(records)
+        excluded = stmt.excluded
+        set_ = {
+            column: func.coalesce(excluded[column], _TABLE.c[column]) if column in coalesce else excluded[column]
+            for column in columns
+        }
+        set_["updated_at"] = func.now()
+        executor.execute(stmt.on_conflict_do_update(
+            index_elements=["patient_id"],
+            set_=set_,
+            where=or_(_TABLE.c[time_key].is_(None), _TABLE.c[time_key] <= excluded[time_key])
+        ))
+        return
+
+    # Autres dialectes: lecture verrouillée puis mise à jour / insertion
+    for record in records:
+        existing = executor.execute(
+            select(_TABLE).where(_TABLE.c.patient_id == record["patient_id"]).with_for_update()
+        ).mappings().first()
+        if existing is None:
+            executor.execute(_TABLE.insert().values(active_alert_count=0, **record))
+            continue
+        if existing[time_key] is not None and naive_utc(existing[time_key]) > naive_utc(record[time_key]):
+            continue
+        values = {
+            column: existing[column] if column in coalesce and record[column] is None else record[column]
+            for column in columns
+        }
+        executor.execute(
+            update(_TABLE).where(_TABLE.c.patient_id == record["patient_id"]).values(**values)
+        )
+
+
+def record_biometrics(db: Session, rows: Sequence[Any]) -> int:
+    """
+    Avance l'état des patients avec de nouveaux échantillons biométriques.
+
+    À appeler dans la transaction qui insère les échantillons (pas de commit ici).
+
+    Args:
+        db: Session DB
+        rows: Échantillons insérés (dicts de colonnes ou objets Biometric)
+
+    Returns:
+        Nombre de patients mis à jour
+    """
+    latest: Dict[int, Dict[str, Any]] = {}
+    ordered = sorted(
+        (row for row in rows if _field(row, "recorded_at") is not None),
+        key=lambda row: naive_utc(_field(row, "recorded_at"))
+    )
+    for row in ordered:
+        record = latest.setdefault(_field(row, "patient_id"), dict.fromkeys(LATEST_SIGNALS))
+        record["biometric_recorded_at"] = _field(row, "recorded_at")
+        for signal in LATEST_SIGNALS:
+            value = _field(row, signal)
+            if value is not None:
+                record[signal] = value
+
+    if not latest:
+        return 0
+    _upsert(
+        db,
+        [dict(record, patient_id=patient_id) for patient_id, record in latest.items()],
+        "biometric_recorded_at",
+        coalesce=LATEST_SIGNALS
+    )
+    return len(latest)
+
+
+def record_predictions(db: Session, rows: Sequence[Any]) -> int:
+    """
+    Avance l'état des patients avec de nouvelles prédictions.
+
+    À appeler dans la transaction qui insère les prédictions (pas de commit ici).
+
+    Args:
+        db: Session DB
+        rows: Prédictions insérées (dicts de colonnes ou objets Prediction)
+
+    Returns:
+        Nombre de patients mis à jour
+    """
+    latest: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        predicted_at = _field(row, "predicted_at") or datetime.utcnow()
+        patient_id = _field(row, "patient_id")
+        current = latest.get(patient_id)
+        if current is not None and naive_utc(current["predicted_at"]) > naive_utc(predicted_at):
+            continue
+        risk_score = _field(row, "risk_score")
+        latest[patient_id] = {
+            "predicted_at": predicted_at,
+            "risk_score": risk_score,
+            "confidence": _field(row, "confidence"),
+            "risk_level": risk_level(risk_score),
+        }
+
+    if not latest:
+        return 0
+    _upsert(db, [dict(record, patient_id=patient_id) for patient_id, record in latest.items()], "predicted_at")
+    return len(latest)
+
+
+def count_open_alerts(executor, patient_id: int) -> int:
+    """Alertes actives et non résolues d'un patient"""
+    return executor.execute(
+        select(func.count()).select_from(Alert).where(
+            Alert.patient_id == patient_id,
+            Alert.is_active == True,
+            or_(Alert.resolved == False, Alert.resolved.is_(None))
+        )
+    ).scalar()
+
+
+def _sync_alert_count(connection, patient_id: int, create: bool) -> None:
+    count = count_open_alerts(connection, patient_id)
+    updated = connection.execute(
+        update(_TABLE).where(_TABLE.c.patient_id == patient_id).values(active_alert_count=count)
+    ).rowcount
+    if not updated and create:
+        # Première alerte d'un patient sans biométrie ni prédiction
+        connection.execute(_TABLE.insert().values(patient_id=patient_id, active_alert_count=count))
+
+
+def _alert_inserted(mapper, connection, target) -> None:
+    _sync_alert_count(connection, target.patient_id, create=True)
+
+
+def _alert_updated(mapper, connection, target) -> None:
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in ("is_active", "resolved", "patient_id")):
+        _sync_alert_count(connection, target.patient_id, create=True)
+
+
+def _alert_deleted(mapper, connection, target) -> None:
+    # Pas de création: la suppression du patient supprime aussi ses alertes
+    _sync_alert_count(connection, target.patient_id, create=False)
+
+
+event.listen(Alert, "after_insert", _alert_inserted)
+event.listen(Alert, "after_update", _alert_updated)
+event.listen(Alert, "after_delete", _alert_deleted)
+
+
+def get_latest_state(db: Session, patient_id: int) -> Optional[PatientLatestState]:
+    """État courant d'un patient (recherche par clé primaire)"""
+    return db.get(PatientLatestState, patient_id)
+
+
+def panel_states(db: Session, doctor_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    État courant de tous les patients d'un médecin (tous si doctor_id est
+    None), en un seul parcours joint.
+
+    Returns:
+        [{"patient_id", "full_name", "health_status", "heart_rate",
+          "risk_score", "risk_level", "active_alert_count", ...}]
+    """
+    query = db.query(Patient.id, Patient.full_name, Patient.health_status, PatientLatestState).outerjoin(
+        PatientLatestState, PatientLatestState.patient_id == Patient.id
+    )
+    if doctor_id is not None:
+        query = query.filter(Patient.doctor_id == doctor_id)
+
+    panel = []
+    for patient_id, full_name, health_status, state in query.order_by(Patient.id):
+        entry = {"patient_id": patient_id, "full_name": full_name, "health_status": health_status}
+        for column in _TABLE.columns.keys():
+            if column != "patient_id":
+                entry[column] = getattr(state, column) if state is not None else None
+        entry["active_alert_count"] = entry["active_alert_count"] or 0
+        panel.append(entry)
+    return panel
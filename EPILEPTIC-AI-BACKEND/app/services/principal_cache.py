@@ -0,0 +1,309 @@
+"""
+Principal Cache
+
+Identité résolue d'un token (utilisateur, patient ou médecin) mise en cache
+par (type, id), pour que les routes chaudes n'interrogent plus la base:
+- Le token porte les ids résolus à la connexion (kind, uid, pid, did)
+- Redis (partagé entre workers) par défaut quand REDIS_URL est configuré,
+  avec repli sur la base si Redis est indisponible; sinon cache en mémoire
+  (par processus) avec un TTL court
+- Invalidation au commit de chaque mise à jour ou suppression d'un User,
+  Patient ou Doctor (désactivation, changement de profil ou de rôle), et
+  de la création du profil Patient / Doctor d'un User, via les événements
+  ORM. Avec le backend mémoire, les autres workers voient le changement
+  au plus tard après PRINCIPAL_CACHE_MEMORY_TTL_SECONDS
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+# Type de principal -> modèle
+PRINCIPAL_MODELS = {
+    "user": User,
+    "patient": Patient,
+    "doctor": Doctor,
+}
+
+# Nettoyage des entrées expirées au-delà de ce nombre de clés
+_MAX_MEMORY_KEYS = 50_000
+
+
+@dataclass
+class Principal:
+    """Identité authentifiée, sans objet ORM"""
+    kind: str  # "user", "patient" ou "doctor" (table d'origine)
+    id: int
+    email: str
+    role: str  # "admin", "doctor" ou "patient"
+    is_active: bool = True
+    patient_id: Optional[int] = None
+    doctor_id: Optional[int] = None
+
+    def claims(self) -> Dict[str, Any]:
+        """Claims JWT portant les ids résolus"""
+        return {"kind": self.kind, "uid": self.id, "pid": self.patient_id, "did": self.doctor_id}
+
+
+def resolve_principal(db: Session, email: str, user_type: str):
+    """
+    Compte correspondant à un email: table users d'abord, puis tables
+    historiques patients / doctors selon user_type.
+
+    Returns:
+        User, Patient, Doctor ou None
+    """
+    user = db.query(User).filter(User.email == email).first()
+    if user:
+        return user
+    if user_type == "patient":
+        return db.query(Patient).filter(Patient.email == email).first()
+    if user_type == "doctor":
+        return db.query(Doctor).filter(Doctor.email == email).first()
+    return None
+
+
+def build_principal(db: Session, account) -> Principal:
+    """
+    Principal d'un compte, avec l'id patient / médecin associé.
+
+    Args:
+        db: Session DB
+        account: User, Patient ou Doctor
+    """
+    if isinstance(account, User):
+        patient_id = doctor_id = None
+        if account.role == UserRole.PATIENT:
+            patient_id = db.query(Patient.id).filter(Patient.email == account.email).scalar()
+        elif account.role == UserRole.DOCTOR:
+            doctor_id = db.query(Doctor.id).filter(Doctor.email == account.email).scalar()
+        return Principal(
+            kind="user", id=account.id, email=account.email, role=account.role.value,
+            is_active=bool(account.is_active), patient_id=patient_id, doctor_id=doctor_id
+        )
+    if isinstance(account, Patient):
+        return Principal(
+            kind="patient", id=account.id, email=account.email, role="patient",
+            is_active=bool(getattr(account, "is_active", True)), patient_id=account.id
+        )
+    return Principal(
+        kind="doctor", id=account.id, email=account.email, role="doctor",
+        is_active=bool(getattr(account, "is_active", True)), doctor_id=account.id
+    )
+
+
+def load_principal(db: Session, kind: str, principal_id: int) -> Optional[Principal]:
+    """Principal par clé primaire (None si le compte n'existe plus)"""
+    account = db.get(PRINCIPAL_MODELS[kind], principal_id)
+    return build_principal(db, account) if account is not None else None
+
+
+class MemoryPrincipalStore:
+    """Principals en mémoire du processus, avec expiration"""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, Principal]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Principal]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key: str, principal: Principal, ttl: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now + ttl, principal)
+            if len(self._entries) > _MAX_MEMORY_KEYS:
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class RedisPrincipalStore:
+    """Principals partagés entre workers via Redis"""
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.1, socket_connect_timeout=0.1)
+
+    def get(self, key: str) -> Optional[Principal]:
+        raw = self._client.get(f"principal:{key}")
+        return Principal(**json.loads(raw)) if raw else None
+
+    def set(self, key: str, principal: Principal, ttl: float) -> None:
+        self._client.set(f"principal:{key}", json.dumps(asdict(principal)), ex=max(1, int(ttl)))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(f"principal:{key}")
+
+
+class PrincipalCache:
+    """Cache des principals par (type, id), avec compteurs d'exploitation"""
+
+    def __init__(self, backend: Optional[str] = None, ttl: Optional[float] = None):
+        self.enabled = settings.PRINCIPAL_CACHE_ENABLED
+        self._memory = MemoryPrincipalStore()
+        self._redis = None
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0, "backend_errors": 0}
+        self._lock = threading.Lock()
+
+        backend = settings.resolve_backend(backend or settings.PRINCIPAL_CACHE_BACKEND)
+        if backend == "redis":
+            try:
+                self._redis = RedisPrincipalStore(settings.REDIS_URL)
+            except ImportError:
+                logger.warning("redis package not installed, using in-process principal cache")
+
+        if ttl is None:
+            # En mémoire, les invalidations ne touchent que ce worker: le TTL borne le délai des autres
+            ttl = (settings.PRINCIPAL_CACHE_TTL_SECONDS if self._redis is not None
+                   else settings.PRINCIPAL_CACHE_MEMORY_TTL_SECONDS)
+        self.ttl = ttl
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self._redis is not None else "memory"
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, kind: str, principal_id: int) -> Optional[Principal]:
+        """Principal en cache, ou None (absent, expiré ou cache désactivé)"""
+        if not self.enabled:
+            return None
+        key = f"{kind}:{principal_id}"
+        principal = None
+        if self._redis is not None:
+            try:
+                principal = self._redis.get(key)
+            except Exception as e:
+                self._count("backend_errors")
+                logger.warning(f"Redis principal cache unavailable: {e}")
+        else:
+            principal = self._memory.get(key)
+
+        self._count("hits" if principal is not None else "misses")
+        return principal
+
+    def set(self, principal: Principal) -> None:
+        if not self.enabled:
+            return
+        key = f"{principal.kind}:{principal.id}"
+        if self._redis is not None:
+            try:
+                self._redis.set(key, principal, self.ttl)
+            except Exception as e:
+                self._count("backend_errors")
+                logger.warning(f"Redis principal cache unavailable: {e}")
+        else:
+            self._memory.set(key, principal, self.ttl)
+
+    def invalidate(self, kind: str, principal_id: int) -> None:
+        key = f"{kind}:{principal_id}"
+        self._memory.delete(key)
+        if self._redis is not None:
+            try:
+                self._redis.delete(key)
+            except Exception as e:
+                self._count("backend_errors")
+                logger.warning(f"Redis principal cache unavailable, entry {key} expires with its TTL: {e}")
+        self._count("invalidations")
+
+    def stats(self) -> Dict[str, object]:
+        """Instantané des compteurs pour les opérations"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "backend": self.backend,
+                "ttl_seconds": self.ttl,
+                **self._counters,
+            }
+
+
+# Instance singleton
+_principal_cache_instance = None
+
+def get_principal_cache() -> PrincipalCache:
+    """Récupère l'instance singleton du cache de principals"""
+    global _principal_cache_instance
+    if _principal_cache_instance is None:
+        _principal_cache_instance = PrincipalCache()
+    return _principal_cache_instance
+
+
+# Principals à invalider au commit: {(type, id)}
+_PENDING_KEY = "principal_cache_pending"
+
+
+def _queue_account(target, connection, *, inserted: bool = False) -> None:
+    """Met en file l'invalidation du principal d'un compte modifié, supprimé ou créé"""
+    session = object_session(target)
+    if session is None:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    if isinstance(target, User):
+        if not inserted:
+            pending.add(("user", target.id))
+        return
+
+    if not inserted:
+        pending.add(("patient" if isinstance(target, Patient) else "doctor", target.id))
+    # Un User de même email porte l'id patient / médecin de ce compte (None
+    # s'il a été mis en cache avant la création du profil)
+    for (user_id,) in connection.execute(select(User.id).where(User.email == target.email)):
+        pending.add(("user", user_id))
+
+
+def _account_changed(mapper, connection, target) -> None:
+    _queue_account(target, connection)
+
+
+def _profile_inserted(mapper, connection, target) -> None:
+    _queue_account(target, connection, inserted=True)
+
+
+def _after_commit(session) -> None:
+    # Après le commit seulement: une lecture concurrente entre le flush et le
+    # commit remettrait sinon l'ancien principal en cache
+    pending = session.info.pop(_PENDING_KEY, ())
+    if pending:
+        cache = get_principal_cache()
+        for kind, principal_id in pending:
+            cache.invalidate(kind, principal_id)
+
+
+def _after_rollback(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+for _model in PRINCIPAL_MODELS.values():
+    event.listen(_model, "after_update", _account_changed)
+    event.listen(_model, "after_delete", _account_changed)
+event.listen(Patient, "after_insert", _profile_inserted)
+event.listen(Doctor, "after_insert", _profile_inserted)
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
@@ -0,0 +1,224 @@
+"""
+Ingestion Rate Limiter
+
+Contrôle d'admission par token bucket, pour qu'une application montre
+défaillante ne déclenche pas une prédiction et des écritures DB à chaque
+appel au détriment des autres patients:
+- Bucket par (route, patient) vérifié d'abord, avec la marge de
+  RATE_LIMIT_DEVICES_PER_PATIENT appareils: l'identifiant d'appareil vient
+  du client, en changer à chaque appel n'ouvre pas de nouveau bucket
+- Puis bucket par (route, patient, appareil), au débit d'un appareil
+
+Au-delà de ce débit, la requête n'est pas rejetée: l'échantillon est
+enregistré (en différé) et compte dans la prochaine prédiction. Seul le
+plafond dur, RATE_LIMIT_CEILING_FACTOR fois la marge du patient, renvoie 429.
+
+- Backend Redis (REDIS_URL) par défaut quand REDIS_URL est configuré,
+  atomique via un script Lua, avec repli sur le backend mémoire si Redis
+  est indisponible
+- Sinon backend en mémoire, par processus: avec N workers uvicorn, chaque
+  worker admet la limite complète (N fois la limite au total)
+- Compteurs admis / limités par route, exposés aux opérations
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Nettoyage des buckets inactifs au-delà de ce nombre de clés
+_MAX_MEMORY_KEYS = 10_000
+
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RateDecision(NamedTuple):
+    allowed: bool
+    retry_after: float  # secondes avant le prochain jeton (0 si admis)
+    rejected: bool = False  # plafond dur atteint: requête refusée (429)
+
+
+def _retry_after(tokens: float, cost: float, rate: float) -> float:
+    return max(0.0, (cost - tokens) / rate)
+
+
+class MemoryTokenBuckets:
+    """Buckets en mémoire du processus"""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> RateDecision:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+
+            if len(self._buckets) > _MAX_MEMORY_KEYS:
+                self._prune(now, rate, burst)
+
+        return RateDecision(allowed, 0.0 if allowed else _retry_after(tokens, cost, rate))
+
+    def _prune(self, now: float, rate: float, burst: float) -> None:
+        """Supprime les buckets redevenus pleins (équivalents à une clé absente)"""
+        refill_seconds = burst / rate
+        self._buckets = {
+            key: value for key, value in self._buckets.items()
+            if now - value[1] < refill_seconds
+        }
+
+
+class RedisTokenBuckets:
+    """Buckets partagés entre workers via Redis"""
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.1, socket_connect_timeout=0.1)
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> RateDecision:
+        allowed, tokens = self._script(
+            keys=[f"ratelimit:{key}"],
+            args=[rate, burst, time.time(), cost]
+        )
+        tokens = float(tokens)
+        return RateDecision(bool(allowed), 0.0 if allowed else _retry_after(tokens, cost, rate))
+
+
+class IngestionRateLimiter:
+    """Admission par (route, patient) puis (route, patient, appareil), avec compteurs d'exploitation"""
+
+    def __init__(self, backend: Optional[str] = None):
+        self.enabled = settings.RATE_LIMIT_ENABLED
+        self.limits = {
+            # route -> (jetons par seconde, rafale)
+            "detect": (settings.RATE_LIMIT_DETECT_PER_MINUTE / 60.0, settings.RATE_LIMIT_DETECT_BURST),
+            "healthkit_sync": (settings.RATE_LIMIT_DETECT_PER_MINUTE / 60.0, settings.RATE_LIMIT_DETECT_BURST),
+            "ingest": (settings.RATE_LIMIT_INGEST_PER_MINUTE / 60.0, settings.RATE_LIMIT_INGEST_BURST),
+        }
+        self._memory = MemoryTokenBuckets()
+        self._redis = None
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"admitted": 0, "throttled": 0, "rejected": 0}
+        )
+        self._backend_errors = 0
+        self._lock = threading.Lock()
+
+        backend = settings.resolve_backend(backend or settings.RATE_LIMIT_BACKEND)
+        if backend == "redis":
+            try:
+                self._redis = RedisTokenBuckets(settings.REDIS_URL)
+            except ImportError:
+                logger.warning("redis package not installed, using in-process rate limiting")
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self._redis is not None else "memory"
+
+    def check(self, scope: str, patient_id: int, device_id: Optional[str] = None) -> RateDecision:
+        """
+        Consomme un jeton pour (scope, patient, appareil).
+
+        Args:
+            scope: "detect", "healthkit_sync" ou "ingest"
+            patient_id: ID du patient
+            device_id: Identifiant de l'appareil, si connu
+
+        Returns:
+            RateDecision(allowed, retry_after, rejected): non admis, l'échantillon
+            est différé sans prédiction; rejeté, la requête est refusée
+        """
+        if not self.enabled:
+            return RateDecision(True, 0.0)
+
+        rate, burst = self.limits[scope]
+        devices = settings.RATE_LIMIT_DEVICES_PER_PATIENT
+        ceiling = devices * settings.RATE_LIMIT_CEILING_FACTOR
+        hard = self._take(f"ceiling:{scope}:{patient_id}", rate * ceiling, burst * ceiling)
+        if not hard.allowed:
+            with self._lock:
+                self._counters[scope]["rejected"] += 1
+            logger.warning(f"Rejected {scope}:{patient_id} over the hard ceiling (retry in {hard.retry_after:.1f}s)")
+            return RateDecision(False, hard.retry_after, True)
+
+        key = f"{scope}:{patient_id}"
+        decision = self._take(key, rate * devices, burst * devices)
+        if decision.allowed:
+            key = f"{scope}:{patient_id}:{device_id or '-'}"
+            decision = self._take(key, rate, burst)
+
+        with self._lock:
+            self._counters[scope]["admitted" if decision.allowed else "throttled"] += 1
+
+        if not decision.allowed:
+            logger.info(f"Throttled {key} (retry in {decision.retry_after:.1f}s)")
+        return decision
+
+    def _take(self, key: str, rate: float, burst: float) -> RateDecision:
+        if self._redis is not None:
+            try:
+                return self._redis.take(key, rate, burst)
+            except Exception as e:
+                with self._lock:
+                    self._backend_errors += 1
+                logger.warning(f"Redis rate limiter unavailable, falling back to memory: {e}")
+        return self._memory.take(key, rate, burst)
+
+    def stats(self) -> Dict[str, object]:
+        """Instantané des compteurs pour les opérations"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "backend": self.backend,
+                "backend_errors": self._backend_errors,
+                "limits": {
+                    scope: {"per_minute": rate * 60.0, "burst": burst}
+                    for scope, (rate, burst) in self.limits.items()
+                },
+                "scopes": {scope: dict(counts) for scope, counts in self._counters.items()},
+            }
+
+
+def retry_after_header(decision: RateDecision) -> Dict[str, str]:
+    """En-tête Retry-After (secondes entières, arrondi supérieur)"""
+    return {"Retry-After": str(max(1, math.ceil(decision.retry_after)))}
+
+
+# Instance singleton
+_rate_limiter_instance = None
+
+def get_rate_limiter() -> IngestionRateLimiter:
+    """Récupère l'instance singleton du rate limiter"""
+    global _rate_limiter_instance
+    if _rate_limiter_instance is None:
+        _rate_limiter_instance = IngestionRateLimiter()
+    return _rate_limiter_instance
@@ -0,0 +1,237 @@
+"""
+Retention Engine
+
+Suppression des données expirées par lots bornés sur la clé primaire:
+1. Sélection de N ids expirés au-delà du dernier id traité (id > last_id)
+2. DELETE ... WHERE id IN (...) dans une transaction courte
+3. Pause configurable entre les lots pour laisser passer le trafic
+   (verrous courts, WAL étalé, réplication qui suit)
+
+La progression est enregistrée par table dans retention_checkpoints après
+chaque lot: un run interrompu (budget de temps, redémarrage du worker)
+reprend au lot suivant. Sur PostgreSQL, les partitions mensuelles
+entièrement expirées sont d'abord supprimées d'un bloc (voir partitioning).
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.alert import Alert
+from app.models.biometric import Biometric
+from app.models.prediction import Prediction
+from app.models.retention_checkpoint import RetentionCheckpoint
+from app.services.partitioning import PARTITIONED_TABLES, drop_expired_partitions, is_partitioned
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RetentionPolicy:
+    """Règle de rétention d'une table"""
+    table: str
+    model: type
+    retention_days: int
+    # cutoff -> critère SQL des lignes expirées
+    expired: Callable[[datetime], object]
+    # Détache les références (clés étrangères) vers les ids avant suppression
+    detach: Optional[Callable[[Session, List[int]], None]] = None
+
+
+def _detach_predictions(db: Session, ids: List[int]) -> None:
+    db.query(Alert).filter(Alert.prediction_id.in_(ids)).update(
+        {Alert.prediction_id: None}, synchronize_session=False
+    )
+
+
+def _detach_alerts(db: Session, ids: List[int]) -> None:
+    db.query(Prediction).filter(Prediction.alert_id.in_(ids)).update(
+        {Prediction.alert_id: None}, synchronize_session=False
+    )
+
+
+def _closed_alerts(cutoff: datetime):
+    # Le flux countdown (annulation / confirmation) clôt une alerte avec
+    # is_active=False et resolved_at sans passer resolved à True
+    return (
+        or_(Alert.resolved == True, Alert.is_active == False),
+        Alert.resolved_at < cutoff,
+    )
+
+
+def default_policies() -> List[RetentionPolicy]:
+    """
+    Politiques par défaut: biometrics (sauf si la compaction biométrique est
+    active, elle supprime alors les lignes brutes), predictions, alertes clôturées
+    """
+    policies = []
+    if not settings.BIOMETRIC_COMPACTION_ENABLED:
+        policies.append(RetentionPolicy(
+            table="biometrics",
+            model=Biometric,
+            retention_days=settings.DATA_RETENTION_DAYS,
+            expired=lambda cutoff: (Biometric.recorded_at < cutoff,),
+        ))
+    return policies + [
+        RetentionPolicy(
+            table="predictions",
+            model=Prediction,
+            retention_days=settings.DATA_RETENTION_DAYS,
+            expired=lambda cutoff: (Prediction.predicted_at < cutoff,),
+            detach=_detach_predictions,
+        ),
+        RetentionPolicy(
+            table="alerts",
+            model=Alert,
+            retention_days=settings.ALERT_RETENTION_DAYS,
+            expired=_closed_alerts,
+            detach=_detach_alerts,
+        ),
+    ]
+
+
+class RetentionEngine:
+    """Nettoyage de rétention par lots, avec reprise et métriques par table"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        policies: Optional[List[RetentionPolicy]] = None,
+        batch_size: Optional[int] = None,
+        pause_seconds: Optional[float] = None,
+        max_runtime_seconds: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.session_factory = session_factory
+        self.policies = policies if policies is not None else default_policies()
+        self.batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+        self.pause_seconds = settings.RETENTION_BATCH_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+        self.max_runtime_seconds = (
+            settings.RETENTION_MAX_RUNTIME_SECONDS if max_runtime_seconds is None else max_runtime_seconds
+        )
+        self.sleep = sleep
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, Dict[str, object]]:
+        """
+        Applique toutes les politiques dans le budget de temps du run.
+
+        Args:
+            now: Date de référence (tests)
+
+        Returns:
+            {table: métriques} (rows_deleted, batches, elapsed_seconds,
+            rows_per_second, completed, last_id, ...)
+        """
+        now = now or datetime.utcnow()
+        deadline = time.monotonic() + self.max_runtime_seconds
+        metrics = {}
+
+        for policy in self.policies:
+            db = self.session_factory()
+            try:
+                metrics[policy.table] = self._run_policy(db, policy, now, deadline)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Retention failed for {policy.table}: {e}")
+                metrics[policy.table] = {"error": str(e)}
+            finally:
+                db.close()
+
+        return metrics
+
+    def _checkpoint(self, db: Session, table: str) -> RetentionCheckpoint:
+        checkpoint = db.query(RetentionCheckpoint).filter(
+            RetentionCheckpoint.table_name == table
+        ).first()
+        if checkpoint is None:
+            checkpoint = RetentionCheckpoint(table_name=table, last_id=0, rows_deleted=0)
+            db.add(checkpoint)
+            db.commit()
+        return checkpoint
+
+    def _run_policy(
+        self,
+        db: Session,
+        policy: RetentionPolicy,
+        now: datetime,
+        deadline: float
+    ) -> Dict[str, object]:
+        cutoff = now - timedelta(days=policy.retention_days)
+        checkpoint = self._checkpoint(db, policy.table)
+        started = time.perf_counter()
+        result = {
+            "cutoff": cutoff.isoformat(),
+            "resumed_from_id": checkpoint.last_id,
+            "rows_deleted": 0,
+            "batches": 0,
+            "completed": False,
+        }
+
+        if policy.table in PARTITIONED_TABLES and is_partitioned(db, policy.table):
+            result["partitions_dropped"] = drop_expired_partitions(db, policy.table, cutoff)
+        # Les lots ci-dessous lisent la table parente: ils couvrent le mois
+        # partiellement expiré et les lignes expirées de la partition DEFAULT
+
+        model = policy.model
+        criteria = policy.expired(cutoff)
+        last_id = checkpoint.last_id
+
+        while True:
+            if time.monotonic() >= deadline:
+                break
+
+            ids = [row[0] for row in db.query(model.id).filter(
+                *criteria, model.id > last_id
+            ).order_by(model.id).limit(self.batch_size).all()]
+
+            if not ids:
+                result["completed"] = True
+                break
+
+            if policy.detach:
+                policy.detach(db, ids)
+            deleted = db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+
+            last_id = ids[-1]
+            checkpoint.last_id = last_id
+            checkpoint.cutoff = cutoff
+            checkpoint.rows_deleted = (checkpoint.rows_deleted or 0) + deleted
+            checkpoint.last_run_at = now
+            db.commit()
+
+            result["rows_deleted"] += deleted
+            result["batches"] += 1
+            logger.debug(f"Retention {policy.table}: batch of {deleted} rows, last id {last_id}")
+
+            if len(ids) < self.batch_size:
+                result["completed"] = True
+                break
+            if self.pause_seconds:
+                self.sleep(self.pause_seconds)
+
+        if result["completed"]:
+            # Passe terminée: la prochaine repart du début de la table
+            result["pass_rows_deleted"] = checkpoint.rows_deleted or 0
+            checkpoint.last_id = 0
+            checkpoint.rows_deleted = 0
+            checkpoint.last_completed_at = now
+        checkpoint.last_run_at = now
+        db.commit()
+
+        elapsed = time.perf_counter() - started
+        result["last_id"] = last_id
+        result["elapsed_seconds"] = round(elapsed, 3)
+        result["rows_per_second"] = round(result["rows_deleted"] / elapsed, 1) if elapsed > 0 else 0.0
+
+        logger.info(
+            f"Retention {policy.table}: {result['rows_deleted']} rows in {result['batches']} batches, "
+            f"{result['rows_per_second']} rows/s, completed={result['completed']}"
+        )
+        return result
@@ -12,11 +12,17 @@ import logging
 import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.database import SessionLocal
 from app.services.healthkit_service import HealthKitService
 from app.services.ai_prediction import get_prediction_service
 from app.services.emergency_service import get_emergency_service
+from app.services.write_behind import get_write_behind_buffer
+from app.services.biometric_rollups import update_rollups
+from app.services.patient_state import record_biometrics, record_predictions
 from app.models.patient import Patient
 from app.models.biometric import Biometric
 from app.models.alert import Alert
@@ -37,17 +43,20 @@ class SeizureDetectionService:
 
     async def process_biometric_data(
         self,
-        db: Session,
+        db: AsyncSession,
         patient_id: int,
-        biometric_data: Dict[str, Any]
+        biometric_data: Dict[str, Any],
+        run_prediction: bool = True
     ) -> Dict[str, Any]:
         """
         Traite les données biométriques reçues depuis HealthKit/Apple Watch
 
         Args:
-            db: Session DB
+            db: Session DB async
             patient_id: ID du patient
             biometric_data: Données biométriques au format JSON
+            run_prediction: False si l'appareil est limité: l'échantillon est
+                sauvegardé et sera pris en compte par la prochaine prédiction
 
         Returns:
             Résultat du traitement avec statut de risque
@@ -55,6 +64,9 @@ class SeizureDetectionService:
         logger.info(f"Processing biometric data for patient {patient_id}")
 
         # Étape 1: Sauvegarder les données biométriques
+        # Avec le write-behind, l'échantillon est mis en tampon (écrit par lots plus tard)
+        write_behind = get_write_behind_buffer() if settings.WRITE_BEHIND_ENABLED else None
+
         biometric = Biometric(
             patient_id=patient_id,
             heart_rate=biometric_data.get("heart_rate"),
@@ -70,33 +82,47 @@ class SeizureDetectionService:
             recorded_at=datetime.utcnow()
         )
 
-        db.add(biometric)
-        db.commit()
-        db.refresh(biometric)
+        if write_behind is not None:
+            write_behind.add(biometric)
+        else:
+            db.add(biometric)
+            await db.run_sync(update_rollups, [biometric])
+            await db.run_sync(record_biometrics, [biometric])
+            await db.commit()
+
+        if not run_prediction:
+            return {
+                "status": "coalesced",
+                "message": "Échantillon enregistré, inclus dans la prochaine prédiction",
+                "biometric_saved": True
+            }
 
         # Étape 2: Faire une prédiction avec le modèle AI
         try:
             prediction = await self.ai_service.predict_seizure_risk(
                 db=db,
                 patient_id=patient_id,
-                window_minutes=30
+                window_minutes=30,
+                persist=write_behind is None
             )
+            risk_score = prediction.risk_score
+            confidence = prediction.confidence
 
             logger.info(
                 f"Prediction for patient {patient_id}: "
-                f"risk_score={prediction.risk_score:.2f}, "
-                f"confidence={prediction.confidence:.2f}"
+                f"risk_score={risk_score:.2f}, "
+                f"confidence={confidence:.2f}"
             )
 
             # Étape 3: Vérifier si risque élevé
             should_alert = self.ai_service.should_trigger_alert(
-                prediction.risk_score,
-                prediction.confidence
+                risk_score,
+                confidence
             )
 
             logger.info(
-                f"🔍 Alert check: risk_score={prediction.risk_score:.6f}, "
-                f"confidence={prediction.confidence:.2f}, should_alert={should_alert}"
+                f"🔍 Alert check: risk_score={risk_score:.6f}, "
+                f"confidence={confidence:.2f}, should_alert={should_alert}"
             )
 
             if should_alert:
@@ -106,6 +132,14 @@ class SeizureDetectionService:
                     f"Starting 30-second countdown..."
                 )
 
+                # Chemin synchrone: la prédiction (si en tampon) et l'alerte
+                # sont écrites dans la même transaction, avec l'état courant
+                # du patient (sinon fait par predict_seizure_risk)
+                if write_behind is not None:
+                    db.add(prediction)
+                    await db.flush()
+                    await db.run_sync(record_predictions, [prediction])
+
                 # Créer l'alerte
                 alert = Alert(
                     patient_id=patient_id,
@@ -113,9 +147,9 @@ class SeizureDetectionService:
                     alert_type="SEIZURE_PREDICTION",
                     severity="high",
                     title="Risque de crise détecté",
-                    message=f"Risque de crise élevé détecté (score: {prediction.risk_score:.0%})",
-                    risk_score=prediction.risk_score,
-                    confidence=prediction.confidence,
+                    message=f"Risque de crise élevé détecté (score: {risk_score:.0%})",
+                    risk_score=risk_score,
+                    confidence=confidence,
                     is_active=True,
                     requires_user_confirmation=True,
                     confirmation_deadline=datetime.utcnow() + timedelta(seconds=self.countdown_duration),
@@ -123,34 +157,46 @@ class SeizureDetectionService:
                 )
 
                 db.add(alert)
-                db.commit()
-                db.refresh(alert)
+                await db.flush()
+                alert_id = alert.id
+                prediction_id = prediction.id
+                await db.commit()
 
-                # Démarrer le countdown asynchrone
+                # Démarrer le countdown asynchrone (sa propre session:
+                # celle de la requête est fermée avant la fin du countdown)
                 asyncio.create_task(
-                    self._start_countdown(db, patient_id, alert.id, prediction.risk_score)
+                    self._start_countdown(patient_id, alert_id, risk_score)
                 )
 
                 return {
                     "status": "alert_triggered",
-                    "alert_id": alert.id,
-                    "prediction_id": prediction.id,
-                    "risk_score": prediction.risk_score,
-                    "confidence": prediction.confidence,
+                    "alert_id": alert_id,
+                    "prediction_id": prediction_id,
+                    "risk_score": risk_score,
+                    "confidence": confidence,
                     "countdown_seconds": self.countdown_duration,
                     "message": "Risque de crise détecté! Veuillez confirmer que vous allez bien.",
                     "biometric_saved": True
                 }
             else:
-                return {
+                result = {
                     "status": "ok",
-                    "prediction_id": prediction.id,
-                    "risk_score": prediction.risk_score,
-                    "confidence": prediction.confidence,
+                    "risk_score": risk_score,
+                    "confidence": confidence,
                     "message": "Données biométriques normales",
                     "biometric_saved": True
                 }
 
+                # La prédiction suit le même chemin différé que l'échantillon:
+                # son id n'existe qu'une fois écrite, il n'est donc renvoyé
+                # que sans write-behind
+                if write_behind is not None:
+                    write_behind.add(prediction)
+                else:
+                    result["prediction_id"] = prediction.id
+
+                return result
+
         except ValueError as e:
             logger.warning(f"Insufficient data for prediction: {e}")
             return {
@@ -164,7 +210,6 @@ class SeizureDetectionService:
 
     async def _start_countdown(
         self,
-        db: Session,
         patient_id: int,
         alert_id: int,
         risk_score: float
@@ -185,6 +230,20 @@ class SeizureDetectionService:
         # Attendre 30 secondes
         await asyncio.sleep(self.countdown_duration)
 
+        db = SessionLocal()
+        try:
+            await self._finish_countdown(db, patient_id, alert_id, risk_score)
+        finally:
+            db.close()
+
+    async def _finish_countdown(
+        self,
+        db: Session,
+        patient_id: int,
+        alert_id: int,
+        risk_score: float
+    ):
+        """Fin du countdown: clôture l'alerte confirmée ou déclenche l'urgence"""
         # Vérifier si l'alerte a été confirmée
         alert = db.query(Alert).filter(Alert.id == alert_id).first()
 
@@ -246,7 +305,7 @@ class SeizureDetectionService:
 
     async def confirm_patient_safety(
         self,
-        db: Session,
+        db: AsyncSession,
         patient_id: int,
         alert_id: int
     ) -> Dict[str, Any]:
@@ -254,17 +313,20 @@ class SeizureDetectionService:
         Le patient confirme qu'il va bien (annule le countdown)
 
         Args:
-            db: Session DB
+            db: Session DB async
             patient_id: ID du patient
             alert_id: ID de l'alerte à confirmer
 
         Returns:
             Résultat de la confirmation
         """
-        alert = db.query(Alert).filter(
-            Alert.id == alert_id,
-            Alert.patient_id == patient_id
-        ).first()
+        result = await db.execute(
+            select(Alert).where(
+                Alert.id == alert_id,
+                Alert.patient_id == patient_id
+            )
+        )
+        alert = result.scalars().first()
 
         if not alert:
             raise ValueError(f"Alert {alert_id} not found for patient {patient_id}")
@@ -275,7 +337,7 @@ class SeizureDetectionService:
         alert.is_active = False
         alert.resolved_at = datetime.utcnow()
 
-        db.commit()
+        await db.commit()
 
         logger.info(f"✅ Patient {patient_id} confirmed safety for alert {alert_id}")
 
@@ -318,17 +380,19 @@ class SeizureDetectionService:
 
     async def fetch_healthkit_data_and_analyze(
         self,
-        db: Session,
+        db: AsyncSession,
         patient_id: int,
-        user_token: str
+        user_token: str,
+        run_prediction: bool = True
     ) -> Dict[str, Any]:
         """
         Récupère les données depuis HealthKit et lance l'analyse
 
         Args:
-            db: Session DB
+            db: Session DB async
             patient_id: ID du patient
             user_token: Token d'autorisation HealthKit
+            run_prediction: False si l'appareil est limité (voir process_biometric_data)
 
         Returns:
             Résultat de l'analyse
@@ -361,7 +425,8 @@ class SeizureDetectionService:
         result = await self.process_biometric_data(
             db=db,
             patient_id=patient_id,
-            biometric_data=latest_biometric
+            biometric_data=latest_biometric,
+            run_prediction=run_prediction
         )
 
         return result
@@ -0,0 +1,89 @@
+"""
+Seizure History
+
+Historique des crises de tous les patients d'un médecin (SeizureHistoryItem)
+en une requête jointe par page:
+- Projection des seules colonnes affichées (crise + nom et email du
+  patient): pas d'objets Seizure ni de chargement paresseux de patient
+- Pagination par curseur sur (start_time, id) décroissant: index
+  (start_time, id), ou (patient_id, start_time) avec un filtre patient,
+  parcouru à partir du curseur quelle que soit la profondeur de la page
+- Filtres: patient, type de crise, plage de dates
+"""
+
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.core.pagination import keyset, page_of
+from app.models.patient import Patient
+from app.models.seizure import Seizure
+
+logger = logging.getLogger(__name__)
+
+# Colonnes de SeizureHistoryItem
+HISTORY_COLUMNS = (
+    Seizure.id,
+    Seizure.patient_id,
+    Patient.full_name.label("patient_name"),
+    Patient.email.label("patient_email"),
+    Seizure.start_time,
+    Seizure.end_time,
+    Seizure.duration_minutes,
+    Seizure.seizure_type,
+    Seizure.intensity,
+    Seizure.location,
+    Seizure.confirmed_by_doctor,
+    Seizure.doctor_notes,
+    Seizure.reported_at,
+)
+
+
+def history_page(
+    db: Session,
+    doctor_id: Optional[int],
+    limit: int,
+    cursor: Optional[str] = None,
+    patient_id: Optional[int] = None,
+    seizure_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    skip: int = 0
+) -> Tuple[List[Row], Optional[str]]:
+    """
+    Page de l'historique des crises, plus récentes d'abord.
+
+    Args:
+        db: Session DB
+        doctor_id: Médecin (tous les patients si None, pour un admin)
+        limit: Taille de page (déjà plafonnée)
+        cursor: Curseur de la page précédente
+        patient_id: Un seul patient (ignoré s'il n'est pas au médecin)
+        seizure_type: Type de crise
+        start: start_time minimum inclus
+        end: start_time maximum exclu
+        skip: Décalage (ancien paramètre, ignoré avec un curseur)
+
+    Returns:
+        (lignes au format SeizureHistoryItem, curseur suivant ou None)
+    """
+    stmt = select(*HISTORY_COLUMNS).join(Patient, Patient.id == Seizure.patient_id)
+    if doctor_id is not None:
+        stmt = stmt.where(Patient.doctor_id == doctor_id)
+    if patient_id is not None:
+        stmt = stmt.where(Seizure.patient_id == patient_id)
+    if seizure_type is not None:
+        stmt = stmt.where(Seizure.seizure_type == seizure_type)
+    if start is not None:
+        stmt = stmt.where(Seizure.start_time >= start)
+    if end is not None:
+        stmt = stmt.where(Seizure.start_time < end)
+
+    stmt = keyset(stmt, Seizure.start_time, Seizure.id, cursor, limit)
+    if skip and not cursor:
+        stmt = stmt.offset(skip)
+    return page_of(db.execute(stmt).all(), "start_time", limit)
@@ -0,0 +1,263 @@
+"""
+Seizure Statistics
+
+Séries de crises par jour, semaine (lundi) et mois pour les graphiques du
+tableau de bord (SeizureStatistics):
+- PostgreSQL: comptage groupé par date_trunc(granularité, start_time UTC)
+  côté base, une ligne par intervalle
+- SQLite: lecture de la seule colonne start_time (texte brut) et
+  regroupement vectorisé NumPy (datetime64)
+- Les intervalles sans crise sont complétés par des zéros
+
+Chaque série est mise en cache par (médecin, granularité, premier jour,
+dernier jour). Une crise enregistrée incrémente en place les intervalles
+des séries en cache qui la contiennent, une crise supprimée les
+décrémente, au commit de la transaction: la plage n'est jamais recalculée.
+Une crise déplacée (start_time ou patient modifié) ou un patient réassigné
+invalide les séries des médecins concernés, au commit également.
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import String, event, func, inspect, select, type_coerce
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.models.patient import Patient
+from app.models.seizure import Seizure
+from app.services.stats_cache import get_stats_cache
+from app.services.write_behind import naive_utc
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("day", "week", "month")
+
+# Variations de comptage en attente du commit: (doctor_id, start_time, +1 / -1)
+_PENDING_KEY = "seizure_statistics_pending"
+# Médecins dont les séries sont à invalider au commit (None: admin)
+_INVALIDATE_KEY = "seizure_statistics_invalidate"
+
+
+def truncate_dates(values: np.ndarray, granularity: str) -> np.ndarray:
+    """
+    Début d'intervalle (datetime64[D]) de chaque horodatage.
+
+    Args:
+        values: Horodatages UTC (datetime64)
+        granularity: "day", "week" (semaines commençant le lundi) ou "month"
+    """
+    days = values.astype("datetime64[D]")
+    if granularity == "day":
+        return days
+    if granularity == "week":
+        # 1970-01-01 est un jeudi: (jours + 3) % 7 = rang dans la semaine ISO
+        return days - ((days.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+    if granularity == "month":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def bucket_start(value: datetime, granularity: str) -> date:
+    """Début d'intervalle d'un horodatage (même découpage que truncate_dates)"""
+    day = np.array([np.datetime64(naive_utc(value), "us")])
+    return truncate_dates(day, granularity)[0].astype(date)
+
+
+def _buckets(first: date, last: date, granularity: str) -> List[date]:
+    """Débuts d'intervalles de first à last inclus"""
+    buckets = []
+    current = bucket_start(datetime.combine(first, time()), granularity)
+    while current <= last:
+        buckets.append(current)
+        if granularity == "day":
+            current += timedelta(days=1)
+        elif granularity == "week":
+            current += timedelta(days=7)
+        else:
+            current = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+    return buckets
+
+
+def bucket_counts(
+    db: Session,
+    doctor_id: Optional[int],
+    start: datetime,
+    end: datetime,
+    granularity: str
+) -> Dict[date, int]:
+    """
+    Nombre de crises par intervalle non vide, pour start <= start_time < end.
+
+    Args:
+        db: Session DB
+        doctor_id: Médecin (tous les patients si None, pour un admin)
+        start: Début inclus (UTC)
+        end: Fin exclue (UTC)
+        granularity: "day", "week" ou "month"
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+
+    def scoped(stmt):
+        stmt = stmt.where(Seizure.start_time >= start, Seizure.start_time < end)
+        if doctor_id is not None:
+            stmt = stmt.join(Patient, Patient.id == Seizure.patient_id).where(Patient.doctor_id == doctor_id)
+        return stmt
+
+    if db.get_bind().dialect.name == "postgresql":
+        bucket = func.date_trunc(granularity, func.timezone("UTC", Seizure.start_time))
+        rows = db.execute(scoped(select(bucket, func.count()).select_from(Seizure)).group_by(bucket)).all()
+        return {naive_utc(value).date(): int(count) for value, count in rows}
+
+    # Texte brut de SQLite ("YYYY-MM-DD HH:MM:SS.ffffff"), parsé par NumPy
+    # sans passer par un datetime Python par ligne
+    times = db.execute(scoped(select(type_coerce(Seizure.start_time, String)))).scalars().all()
+    if not times:
+        return {}
+    buckets, counts = np.unique(
+        truncate_dates(np.array(times, dtype="datetime64[us]"), granularity), return_counts=True
+    )
+    return {bucket.astype(date): int(count) for bucket, count in zip(buckets, counts)}
+
+
+def series(
+    db: Session,
+    doctor_id: Optional[int],
+    first_day: date,
+    last_day: date,
+    granularity: str
+) -> Dict[date, int]:
+    """
+    Série complète (zéros compris) du premier au dernier jour inclus,
+    depuis le cache si présente.
+
+    Le premier intervalle ne compte que les crises à partir de first_day.
+    """
+    def compute():
+        counts = bucket_counts(
+            db, doctor_id,
+            datetime.combine(first_day, time()), datetime.combine(last_day + timedelta(days=1), time()),
+            granularity
+        )
+        return {
+            "first_day": first_day,
+            "last_day": last_day,
+            "counts": {bucket: counts.get(bucket, 0) for bucket in _buckets(first_day, last_day, granularity)},
+        }
+
+    entry = get_stats_cache().get_or_compute(
+        ("seizure_statistics", doctor_id, granularity, first_day, last_day),
+        compute,
+        settings.SEIZURE_STATISTICS_TTL_SECONDS
+    )
+    return dict(entry["counts"])
+
+
+def seizure_statistics(
+    db: Session,
+    doctor_id: Optional[int],
+    days: int = 30,
+    now: Optional[datetime] = None
+) -> Dict[str, object]:
+    """
+    Statistiques des crises sur les `days` derniers jours (aujourd'hui inclus).
+
+    Returns:
+        Dict au format SeizureStatistics
+    """
+    last_day = naive_utc(now or datetime.utcnow()).date()
+    first_day = last_day - timedelta(days=days - 1)
+    result: Dict[str, object] = {}
+    for granularity, field in zip(GRANULARITIES, ("daily_counts", "weekly_counts", "monthly_counts")):
+        counts = series(db, doctor_id, first_day, last_day, granularity)
+        result[field] = [{"date": bucket, "count": count} for bucket, count in counts.items()]
+
+    total = sum(point["count"] for point in result["daily_counts"])
+    result["total_count"] = total
+    result["average_per_week"] = round(total / (days / 7), 2)
+    return result
+
+
+# ----------------------------------------------------------------------
+# Mise à jour incrémentale du cache
+# ----------------------------------------------------------------------
+
+def apply_seizure_delta(doctor_id: Optional[int], start_time: datetime, delta: int) -> None:
+    """Ajoute delta à l'intervalle de start_time dans les séries en cache du médecin et de l'admin"""
+    day = naive_utc(start_time).date()
+
+    def update(key: Tuple, entry: Dict) -> None:
+        if not entry["first_day"] <= day <= entry["last_day"]:
+            return
+        bucket = bucket_start(start_time, key[2])
+        if bucket in entry["counts"]:
+            entry["counts"][bucket] += delta
+
+    cache = get_stats_cache()
+    for scope in {doctor_id, None}:
+        cache.update_prefix(("seizure_statistics", scope), update)
+
+
+def _doctor_of(connection, patient_id: int) -> Optional[int]:
+    return connection.execute(select(Patient.doctor_id).where(Patient.id == patient_id)).scalar()
+
+
+def _queue(target, connection, delta: int) -> None:
+    session = object_session(target)
+    if session is None or target.start_time is None:
+        return
+    session.info.setdefault(_PENDING_KEY, []).append(
+        (_doctor_of(connection, target.patient_id), target.start_time, delta)
+    )
+
+
+def _seizure_inserted(mapper, connection, target) -> None:
+    _queue(target, connection, +1)
+
+
+def _seizure_deleted(mapper, connection, target) -> None:
+    _queue(target, connection, -1)
+
+
+def _queue_invalidation(target, doctor_ids) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_INVALIDATE_KEY, set()).update(doctor_ids)
+
+
+def _seizure_updated(mapper, connection, target) -> None:
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in ("start_time", "patient_id")):
+        return
+    patients = {target.patient_id, *state.attrs.patient_id.history.deleted}
+    _queue_invalidation(target, {None, *(_doctor_of(connection, patient_id) for patient_id in patients)})
+
+
+def _patient_updated(mapper, connection, target) -> None:
+    history = inspect(target).attrs.doctor_id.history
+    if history.has_changes():
+        _queue_invalidation(target, {target.doctor_id, *history.deleted})
+
+
+def _after_commit(session) -> None:
+    cache = get_stats_cache()
+    for doctor_id in session.info.pop(_INVALIDATE_KEY, ()):
+        cache.invalidate_prefix(("seizure_statistics", doctor_id))
+    for doctor_id, start_time, delta in session.info.pop(_PENDING_KEY, ()):
+        apply_seizure_delta(doctor_id, start_time, delta)
+
+
+def _after_rollback(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_INVALIDATE_KEY, None)
+
+
+event.listen(Seizure, "after_insert", _seizure_inserted)
+event.listen(Seizure, "after_delete", _seizure_deleted)
+event.listen(Seizure, "after_update", _seizure_updated)
+event.listen(Patient, "after_update", _patient_updated)
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
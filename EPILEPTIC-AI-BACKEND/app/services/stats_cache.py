@@ -0,0 +1,146 @@
+"""
+Stats Cache
+
+Cache en mémoire (par processus) des agrégats des tableaux de bord, par clé
+tuple ("dashboard", doctor_id, ...):
+- Chaque entrée expire après son TTL: les autres workers voient une
+  modification au plus tard après ce délai
+- Les services invalident leurs clés sur les événements ORM qui changent
+  les agrégats (nouvelle crise, nouvelle alerte, patient réassigné...)
+- invalidate_prefix supprime toutes les clés d'un préfixe, par exemple
+  toutes les plages d'un médecin; update_prefix les met à jour en place
+- Chaque écriture (invalidation, mise à jour en place) incrémente la
+  génération de sa clé ou de son préfixe: get_or_compute ne met pas en
+  cache une valeur calculée pendant qu'une écriture concernait sa clé, qui
+  pourrait manquer cette modification
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Nettoyage des entrées expirées au-delà de ce nombre de clés
+_MAX_KEYS = 50_000
+
+
+class StatsCache:
+    """Agrégats en cache par clé tuple, avec expiration et compteurs"""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self.enabled = settings.STATS_CACHE_ENABLED if enabled is None else enabled
+        self._entries: Dict[Tuple, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        # Génération par clé ou préfixe écrit; () pour clear()
+        self._generations: Dict[Tuple, int] = defaultdict(int)
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0, "discarded": 0}
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Valeur en cache, ou None (absente, expirée ou cache désactivé)"""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            self._counters["hits" if entry is not None else "misses"] += 1
+            return entry[1] if entry is not None else None
+
+    def set(self, key: Tuple, value: Any, ttl: float) -> None:
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now + ttl, value)
+            if len(self._entries) > _MAX_KEYS:
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], Any], ttl: float) -> Any:
+        """
+        Valeur en cache, sinon calculée par compute() puis mise en cache.
+
+        Args:
+            key: Clé tuple
+            compute: Calcul de la valeur (requête DB)
+            ttl: Durée de vie en secondes
+        """
+        value = self.get(key)
+        if value is None:
+            generation = self._generation(key)
+            value = compute()
+            if self._generation(key) == generation:
+                self.set(key, value, ttl)
+            else:
+                # Écriture concurrente: la valeur calculée peut déjà être dépassée
+                with self._lock:
+                    self._counters["discarded"] += 1
+        return value
+
+    def _generation(self, key: Tuple) -> Tuple[int, ...]:
+        """Générations de la clé et de tous ses préfixes"""
+        with self._lock:
+            return tuple(self._generations.get(key[:size], 0) for size in range(len(key) + 1))
+
+    def invalidate(self, key: Tuple) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generations[key] += 1
+            self._counters["invalidations"] += 1
+
+    def invalidate_prefix(self, prefix: Tuple) -> int:
+        """Supprime les clés commençant par prefix; retourne leur nombre"""
+        size = len(prefix)
+        with self._lock:
+            keys = [key for key in self._entries if key[:size] == prefix]
+            for key in keys:
+                del self._entries[key]
+            self._generations[prefix] += 1
+            self._counters["invalidations"] += 1
+        return len(keys)
+
+    def update_prefix(self, prefix: Tuple, update: Callable[[Tuple, Any], None]) -> int:
+        """
+        Applique update(clé, valeur) en place à chaque entrée non expirée du
+        préfixe (mise à jour incrémentale au lieu d'une invalidation).
+
+        Returns:
+            Nombre d'entrées mises à jour
+        """
+        size = len(prefix)
+        now = time.monotonic()
+        updated = 0
+        with self._lock:
+            for key, (expires, value) in self._entries.items():
+                if key[:size] == prefix and expires > now:
+                    update(key, value)
+                    updated += 1
+            self._generations[prefix] += 1
+        return updated
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations[()] += 1
+
+    def stats(self) -> Dict[str, object]:
+        """Instantané des compteurs pour les opérations"""
+        with self._lock:
+            return {"enabled": self.enabled, "keys": len(self._entries), **self._counters}
+
+
+# Instance singleton
+_stats_cache_instance = None
+
+def get_stats_cache() -> StatsCache:
+    """Récupère l'instance singleton du cache d'agrégats"""
+    global _stats_cache_instance
+    if _stats_cache_instance is None:
+        _stats_cache_instance = StatsCache()
+    return _stats_cache_instance
@@ -0,0 +1,413 @@
+"""
+Write-Behind Buffer
+
+Tampon en mémoire pour la persistance différée des données biométriques
+et des prédictions:
+1. Les lignes validées sont acceptées immédiatement (le patient reçoit sa réponse)
+2. Durabilité: chaque ligne est d'abord ajoutée au spool local (append-only)
+   du worker, un fichier par processus à côté de WRITE_BEHIND_SPOOL_PATH
+3. Le tampon est vidé par lots, en une seule transaction, sur seuil de taille ou de temps
+4. Au démarrage, les spools des workers arrêtés brutalement sont rejoués pour ne
+   perdre aucune donnée acquittée. Chaque worker tient un verrou (flock) sur son
+   fichier .lock tant qu'il vit: seuls les spools dont le verrou est libre sont
+   orphelins, jamais les segments qu'un autre worker est en train de vider
+
+Seul le chemin de création d'alerte reste synchrone (voir SeizureDetectionService).
+"""
+
+import asyncio
+import base64
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import DateTime, insert
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.biometric import Biometric
+from app.models.prediction import Prediction
+
+logger = logging.getLogger(__name__)
+
+# Tables acceptées par le tampon
+_MODELS = {
+    Biometric.__tablename__: Biometric,
+    Prediction.__tablename__: Prediction,
+}
+
+# Colonnes remplies par la base (clé primaire, server_default)
+_DB_GENERATED = {"id", "created_at"}
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Ramène un datetime en UTC naïf pour pouvoir comparer DB et tampon"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _row_from_instance(instance) -> Dict[str, Any]:
+    """Convertit un objet ORM transient en ligne complète pour un INSERT groupé"""
+    row = {}
+    for column in instance.__table__.columns:
+        if column.key in _DB_GENERATED:
+            continue
+        value = getattr(instance, column.key, None)
+        if value is None and column.default is not None and column.default.is_scalar:
+            value = column.default.arg
+        elif value is None and column.server_default is not None and isinstance(column.type, DateTime):
+            # Horodatage d'acceptation (clé de partition, ne doit pas être NULL)
+            value = datetime.utcnow()
+        row[column.key] = value
+    return row
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__dt__": value.isoformat()}
+    if isinstance(value, bytes):
+        return {"__b64__": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Type non sérialisable dans le spool: {type(value)!r}")
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "__dt__" in value:
+            return datetime.fromisoformat(value["__dt__"])
+        if "__b64__" in value:
+            return base64.b64decode(value["__b64__"])
+    return value
+
+
+def _decode(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: _decode_value(value) for key, value in row.items()}
+
+
+def _try_lock(path: Path):
+    """Ouvre et verrouille path sans attendre; None si un processus vivant le détient"""
+    handle = open(path, "a")
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        handle.close()
+        return None
+    return handle
+
+
+class WriteBehindBuffer:
+    """Tampon d'écriture différée pour biometrics et predictions"""
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        max_batch: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        spool_path: Optional[str] = None,
+        fsync: Optional[bool] = None
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max_batch or settings.WRITE_BEHIND_MAX_BATCH
+        self.flush_interval = flush_interval or settings.WRITE_BEHIND_FLUSH_INTERVAL_SECONDS
+        spool_path = spool_path if spool_path is not None else settings.WRITE_BEHIND_SPOOL_PATH
+        self.spool_path = Path(spool_path) if spool_path else None
+        self.fsync = settings.WRITE_BEHIND_SPOOL_FSYNC if fsync is None else fsync
+        # Identifiant du worker dans les noms de fichiers (le PID seul peut être réutilisé)
+        self.owner = f"w{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        self._lock = threading.Lock()        # protège _pending et le spool
+        self._flush_lock = threading.Lock()  # un seul flush à la fois
+        self._pending: Dict[str, List[Dict[str, Any]]] = {name: [] for name in _MODELS}
+        self._spool_file = None
+        self._owner_lock = None              # verrou tenu tant que le worker vit
+        self._segments: List[Path] = []      # segments dont les lignes sont dans _pending
+        self._segment_seq = 0
+        self._task: Optional[asyncio.Task] = None
+        self._flush_tasks: Set[asyncio.Task] = set()  # références des flushs sur seuil
+
+        self.stats = {"enqueued": 0, "flushed": 0, "flushes": 0, "failures": 0}
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+
+    def add(self, instance) -> None:
+        """
+        Accepte un objet Biometric ou Prediction transient (non ajouté à une session).
+
+        La ligne est acquittée dès le retour: elle est en mémoire et, si le spool
+        est activé, déjà écrite sur disque.
+        """
+        table = instance.__tablename__
+        if table not in _MODELS:
+            raise ValueError(f"Table {table} non gérée par le write-behind buffer")
+
+        row = _row_from_instance(instance)
+
+        with self._lock:
+            if self.spool_path is not None:
+                self._append_to_spool(table, row)
+            self._pending[table].append(row)
+            self.stats["enqueued"] += 1
+            size = self._size_locked()
+
+        if size >= self.max_batch:
+            self._schedule_flush()
+
+    def pending_biometrics(self, patient_id: int, since: datetime) -> List[Biometric]:
+        """Retourne les échantillons encore en tampon pour la fenêtre glissante"""
+        since = naive_utc(since)
+        with self._lock:
+            rows = [
+                row for row in self._pending[Biometric.__tablename__]
+                if row["patient_id"] == patient_id
+                and row["recorded_at"] is not None
+                and naive_utc(row["recorded_at"]) >= since
+            ]
+        return [Biometric(**row) for row in rows]
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._size_locked()
+
+    def _size_locked(self) -> int:
+        return sum(len(rows) for rows in self._pending.values())
+
+    def _schedule_flush(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        # La boucle ne garde qu'une référence faible des tâches
+        task = loop.create_task(asyncio.to_thread(self.flush))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    # ------------------------------------------------------------------
+    # Flush
+    # ------------------------------------------------------------------
+
+    def flush(self) -> int:
+        """
+        Écrit tout le contenu du tampon en une transaction.
+
+        En cas d'échec, les lignes sont remises en tête du tampon et les
+        segments de spool sont conservés pour le prochain essai.
+
+        Returns:
+            Nombre de lignes persistées
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = self._pending
+                segments = self._segments
+                self._pending = {name: [] for name in _MODELS}
+                self._segments = []
+                if self._spool_file is not None:
+                    segments.append(self._rotate_spool_locked())
+
+            total = sum(len(rows) for rows in batch.values())
+            if total == 0:
+                self._remove_segments(segments)
+                return 0
+
+            db = self.session_factory()
+            try:
+                for table, rows in batch.items():
+                    if rows:
+                        db.execute(insert(_MODELS[table]), rows)
+                # Rollups et état courant mis à jour dans la même transaction que les lignes
+                from app.services.biometric_rollups import update_rollups
+                from app.services.patient_state import record_biometrics, record_predictions
+                if batch[Biometric.__tablename__]:
+                    update_rollups(db, batch[Biometric.__tablename__])
+                    record_biometrics(db, batch[Biometric.__tablename__])
+                if batch[Prediction.__tablename__]:
+                    record_predictions(db, batch[Prediction.__tablename__])
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Write-behind flush failed ({total} rows kept): {e}")
+                with self._lock:
+                    for table, rows in batch.items():
+                        self._pending[table][:0] = rows
+                    self._segments[:0] = segments
+                    self.stats["failures"] += 1
+                return 0
+            finally:
+                db.close()
+
+            self._remove_segments(segments)
+            self.stats["flushed"] += total
+            self.stats["flushes"] += 1
+            logger.debug(f"Write-behind flushed {total} rows")
+            return total
+
+    # ------------------------------------------------------------------
+    # Spool (durabilité)
+    # ------------------------------------------------------------------
+
+    def _worker_file(self, owner: str, suffix: str = "") -> Path:
+        return self.spool_path.with_name(f"{self.spool_path.name}.{owner}{suffix}")
+
+    def _acquire_owner_lock_locked(self) -> None:
+        if self._owner_lock is None:
+            self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+            self._owner_lock = _try_lock(self._worker_file(self.owner, ".lock"))
+            if self._owner_lock is None:
+                raise RuntimeError(f"Write-behind spool owner {self.owner} already locked")
+
+    def _append_to_spool(self, table: str, row: Dict[str, Any]) -> None:
+        if self._spool_file is None:
+            self._acquire_owner_lock_locked()
+            self._spool_file = open(self._worker_file(self.owner), "a", encoding="utf-8")
+        self._spool_file.write(json.dumps({"table": table, "row": row}, default=_encode) + "\n")
+        self._spool_file.flush()
+        if self.fsync:
+            os.fsync(self._spool_file.fileno())
+
+    def _rotate_spool_locked(self) -> Path:
+        """Ferme le spool courant et le renomme en segment en cours de flush"""
+        if self._spool_file is not None:
+            self._spool_file.close()
+            self._spool_file = None
+        segment = self._next_segment_locked()
+        os.replace(self._worker_file(self.owner), segment)
+        return segment
+
+    def _next_segment_locked(self) -> Path:
+        self._segment_seq += 1
+        return self._worker_file(self.owner, f".{int(time.time() * 1000)}-{self._segment_seq:06d}.flushing")
+
+    def _remove_segments(self, segments: List[Path]) -> None:
+        for segment in segments:
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+
+    def recover(self) -> int:
+        """
+        Rejoue les spools laissés par des workers arrêtés brutalement.
+
+        Les fichiers orphelins sont renommés en segments de ce worker avant
+        d'être relus: s'il s'arrête à son tour avant le flush, ils seront
+        repris par le suivant. Un verrou global sérialise les reprises.
+
+        Returns:
+            Nombre de lignes remises en tampon
+        """
+        if self.spool_path is None or not self.spool_path.parent.exists():
+            return 0
+
+        name = self.spool_path.name
+        parent = self.spool_path.parent
+        recovered = 0
+        with self._lock:
+            self._acquire_owner_lock_locked()
+            with open(self._worker_file("recovery"), "a") as guard:
+                fcntl.flock(guard.fileno(), fcntl.LOCK_EX)
+
+                # Ancien spool partagé, antérieur aux spools par worker
+                orphans = sorted(parent.glob(f"{name}.[0-9]*.flushing"))
+                if self.spool_path.exists():
+                    orphans.append(self.spool_path)
+                for path in orphans:
+                    recovered += self._adopt_locked(path)
+
+                for lock_path in sorted(parent.glob(f"{name}.w*.lock")):
+                    owner = lock_path.name[len(name) + 1:-len(".lock")]
+                    if owner == self.owner:
+                        continue
+                    handle = _try_lock(lock_path)
+                    if handle is None:
+                        continue  # worker vivant: ses segments ne sont pas orphelins
+                    try:
+                        orphans = sorted(parent.glob(f"{name}.{owner}.*.flushing"))
+                        if self._worker_file(owner).exists():
+                            orphans.append(self._worker_file(owner))
+                        for path in orphans:
+                            recovered += self._adopt_locked(path)
+                        lock_path.unlink()
+                    finally:
+                        handle.close()
+
+        if recovered:
+            logger.info(f"Write-behind recovered {recovered} rows from spool")
+        return recovered
+
+    def _adopt_locked(self, path: Path) -> int:
+        """Reprend un fichier orphelin comme segment de ce worker et recharge ses lignes"""
+        segment = self._next_segment_locked()
+        os.replace(path, segment)
+        recovered = 0
+        with open(segment, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Dernière ligne tronquée par le crash: jamais acquittée
+                    logger.warning(f"Skipping truncated spool line in {path}")
+                    continue
+                self._pending[entry["table"]].append(_decode(entry["row"]))
+                recovered += 1
+        self._segments.append(segment)
+        return recovered
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await asyncio.to_thread(self.flush)
+
+    def start(self) -> None:
+        """Rejoue le spool et démarre le flush périodique (à appeler dans la boucle asyncio)"""
+        self.recover()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Arrête le flush périodique et vide le tampon"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush)
+        with self._lock:
+            if self._spool_file is not None:
+                self._spool_file.close()
+                self._spool_file = None
+            if self._owner_lock is not None:
+                # Segments restants (flush en échec): repris au prochain démarrage
+                if not self._segments:
+                    self._worker_file(self.owner, ".lock").unlink(missing_ok=True)
+                self._owner_lock.close()
+                self._owner_lock = None
+
+
+# Instance singleton
+_write_behind_buffer_instance = None
+
+def get_write_behind_buffer() -> WriteBehindBuffer:
+    """Récupère l'instance singleton du tampon write-behind"""
+    global _write_behind_buffer_instance
+    if _write_behind_buffer_instance is None:
+        _write_behind_buffer_instance = WriteBehindBuffer()
+    return _write_behind_buffer_instance
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import create_engine
 
 from app.core.config import settings
+from app.core.feature_codec import encode_features
 from app.core.database import SessionLocal
 from app.models.patient import Patient
 from app.models.biometric import Biometric
@@ -13,6 +14,8 @@ from app.models.prediction import Prediction
 from app.models.alert import Alert
 from app.services.ai_prediction import AIPredictionService
 from app.services.alert_service import AlertService
+from app.services.biometric_rollups import update_rollups
+from app.services.patient_state import record_biometrics, record_predictions
 
 prediction_service = AIPredictionService()
 alert_service = AlertService()
@@ -41,12 +44,13 @@ def analyze_patient_data(patient_id: int):
                 patient_id=patient_id,
                 risk_score=result["risk_score"],
                 confidence=result.get("confidence", 0),
-                features_used=result.get("features", {}),
+                features_vector=encode_features(result.get("features")),
                 predicted_at=datetime.utcnow(),
                 predicted_for=datetime.utcnow() + timedelta(minutes=30)
             )
             
             db.add(prediction)
+            record_predictions(db, [prediction])
             db.commit()
             db.refresh(prediction)
             
@@ -75,18 +79,21 @@ def process_biometric_batch(biometric_data: List[Dict[str, Any]]):
     """Process batch of biometric data"""
     db = SessionLocal()
     try:
-        created_count = 0
+        created = []
         
         for data in biometric_data:
             try:
                 biometric = Biometric(**data)
                 db.add(biometric)
-                created_count += 1
+                created.append(biometric)
             except Exception as e:
                 print(f"Error creating biometric record: {e}")
                 continue
         
+        update_rollups(db, created)
+        record_biometrics(db, created)
         db.commit()
+        created_count = len(created)
         
         # Trigger analysis for each unique patient
         patient_ids = set(data.get("patient_id") for data in biometric_data if data.get("patient_id"))
@@ -1,16 +1,26 @@
 from celery import shared_task
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
+import asyncio
+import time
+from typing import Dict, Any, List, Optional
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import SessionLocal
 from app.models.biometric import Biometric
-from app.models.alert import Alert
-from app.models.prediction import Prediction
 from app.models.medication import Medication
 from app.models.patient import Patient
+from app.models.sync_cursor import SyncCursor
 from app.services.healthkit_service import HealthKitService
+from app.services.healthkit_merge import MERGED_FIELDS, align_healthkit_series, filter_new_samples
+from app.services.healthkit_export_import import HealthKitExportImporter
+from app.services.partitioning import ensure_partitions
+from app.services.retention import RetentionEngine
+from app.services.biometric_rollups import backfill_rollups, update_rollups
+from app.services.patient_state import record_biometrics
+from app.services.biometric_compaction import compact_biometrics
+from app.services.write_behind import naive_utc
 from app.services.alert_service import AlertService
 from app.services.notification_service import NotificationService
 
@@ -18,18 +28,34 @@ healthkit_service = HealthKitService()
 alert_service = AlertService()
 notification_service = NotificationService()
 
+# HealthKit series synced incrementally (one cursor per patient and data type)
+HEALTHKIT_DATA_TYPES = [
+    "heart_rate",
+    "heart_rate_variability",
+    "sleep",
+    "activity"
+]
+
 @shared_task(name="sync_healthkit_data")
 def sync_healthkit_data(patient_id: int, user_token: str = None):
     """Sync HealthKit data for a patient"""
-    db = SessionLocal()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
     try:
-        # Check if patient exists and is active
-        patient = db.query(Patient).filter(
-            Patient.id == patient_id,
-            Patient.is_active == True
-        ).first()
-        
-        if not patient:
+        return loop.run_until_complete(_sync_patient(patient_id, user_token))
+    finally:
+        loop.close()
+
+async def _sync_patient(patient_id: int, user_token: str = None) -> Dict[str, Any]:
+    """
+    Fetch only the HealthKit data newer than the patient's sync cursors,
+    insert it and advance the cursors in the same transaction.
+    Database work runs in a worker thread (blocking session), so concurrent
+    syncs overlap on their HealthKit fetches without stalling the loop.
+    """
+    try:
+        cursors = await asyncio.to_thread(_load_sync_cursors, patient_id)
+        if cursors is None:
             return {"error": "Patient not found or inactive"}
         
         # Configure HealthKit service if credentials are available
@@ -47,19 +73,15 @@ def sync_healthkit_data(patient_id: int, user_token: str = None):
             )
         else:
             # Use mock data if HealthKit not configured
-            return _mock_healthkit_sync(db, patient_id)
-        
-        # Define data types to fetch
-        data_types = [
-            "heart_rate",
-            "heart_rate_variability",
-            "sleep",
-            "activity"
-        ]
+            return await asyncio.to_thread(_run_mock_healthkit_sync, patient_id)
         
-        # Define time range (last 24 hours)
+        # Fetch from the oldest cursor, default to the last 24 hours
         end_date = datetime.utcnow()
-        start_date = end_date - timedelta(hours=24)
+        default_start = end_date - timedelta(hours=24)
+        start_date = min(
+            naive_utc(cursors[t]) if t in cursors else default_start
+            for t in HEALTHKIT_DATA_TYPES
+        )
         
         # Generate JWT token for HealthKit
         jwt_token = healthkit_service.generate_jwt()
@@ -67,80 +89,149 @@ def sync_healthkit_data(patient_id: int, user_token: str = None):
             return {"error": "Failed to generate HealthKit authentication token"}
         
         # Fetch data
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(
-            healthkit_service.fetch_health_data(
-                user_token=user_token or "mock_token",
-                data_types=data_types,
-                start_date=start_date,
-                end_date=end_date
-            )
+        result = await healthkit_service.fetch_health_data(
+            user_token=user_token or "mock_token",
+            data_types=HEALTHKIT_DATA_TYPES,
+            start_date=start_date,
+            end_date=end_date
         )
         
-        # Process and store the data
-        processed_count = 0
-        if result.get("success") and "data" in result:
-            # Process heart rate data
-            if "heart_rate" in result["data"]:
-                for hr_data in result["data"]["heart_rate"]:
-                    try:
-                        recorded_at = datetime.fromisoformat(
-                            hr_data.get("timestamp").replace('Z', '+00:00')
-                        )
-                        biometric = Biometric(
-                            patient_id=patient_id,
-                            heart_rate=hr_data.get("value"),
-                            recorded_at=recorded_at,
-                            source="healthkit"
-                        )
-                        db.add(biometric)
-                        processed_count += 1
-                    except Exception as e:
-                        print(f"Error processing heart rate data: {e}")
-            
-            # Process HRV data
-            if "heart_rate_variability" in result["data"]:
-                for hrv_data in result["data"]["heart_rate_variability"]:
-                    try:
-                        recorded_at = datetime.fromisoformat(
-                            hrv_data.get("timestamp").replace('Z', '+00:00')
-                        )
-                        biometric = Biometric(
-                            patient_id=patient_id,
-                            heart_rate_variability=hrv_data.get("value"),
-                            recorded_at=recorded_at,
-                            source="healthkit"
-                        )
-                        db.add(biometric)
-                        processed_count += 1
-                    except Exception as e:
-                        print(f"Error processing HRV data: {e}")
-            
-            db.commit()
+        if not (result.get("success") and "data" in result):
+            return {"error": "Failed to fetch HealthKit data", "details": result.get("error")}
+
+        # Drop samples already imported, then merge into dense rows
+        new_data, latest = filter_new_samples(result["data"], cursors)
+        rows = align_healthkit_series(new_data)
+        for row in rows:
+            row.update(patient_id=patient_id, source="healthkit")
+
+        processed_count = await asyncio.to_thread(_store_synced_rows, patient_id, rows, cursors, latest)
             
-            # Trigger analysis if we got data
-            if processed_count > 0:
-                from .ai_analysis import analyze_patient_data
-                analyze_patient_data.delay(patient_id)
+        # Trigger analysis if we got data
+        if processed_count > 0:
+            from .ai_analysis import analyze_patient_data
+            analyze_patient_data.delay(patient_id)
             
-            return {
-                "success": True,
-                "synced_count": processed_count,
-                "data_types": data_types,
-                "period": {
-                    "start": start_date.isoformat(),
-                    "end": end_date.isoformat()
-                },
-                "patient_id": patient_id
-            }
-        else:
-            return {"error": "Failed to fetch HealthKit data", "details": result.get("error")}
+        return {
+            "success": True,
+            "synced_count": processed_count,
+            "data_types": HEALTHKIT_DATA_TYPES,
+            "period": {
+                "start": start_date.isoformat(),
+                "end": end_date.isoformat()
+            },
+            "cursors": {t: ts.isoformat() for t, ts in latest.items()},
+            "patient_id": patient_id
+        }
             
     except Exception as e:
         return {"error": str(e), "traceback": str(e.__traceback__)}
+
+def _load_sync_cursors(patient_id: int) -> Optional[Dict[str, datetime]]:
+    """Sync cursors of an active patient ({data type: last synced at}), None if not found"""
+    db = SessionLocal()
+    try:
+        patient_found = db.query(Patient.id).filter(
+            Patient.id == patient_id,
+            Patient.is_active == True
+        ).first()
+        if not patient_found:
+            return None
+
+        return {
+            c.data_type: c.last_synced_at for c in db.query(SyncCursor).filter(
+                SyncCursor.patient_id == patient_id,
+                SyncCursor.data_type.in_(HEALTHKIT_DATA_TYPES)
+            ).all()
+        }
+    finally:
+        db.close()
+
+def _merge_into_existing_slots(
+    db: Session,
+    patient_id: int,
+    rows: List[Dict[str, Any]],
+    cursors: Dict[str, datetime]
+) -> List[Dict[str, Any]]:
+    """
+    Fill slots already imported by a previous sync instead of inserting a
+    second row. A slot can be partly imported when another series' cursor
+    was ahead, so only slots up to the newest cursor are looked up.
+
+    Returns:
+        Rows still to insert
+    """
+    if not rows or not cursors:
+        return rows
+    overlap_end = max(naive_utc(ts) for ts in cursors.values())
+    overlapping = [row["recorded_at"] for row in rows if row["recorded_at"] <= overlap_end]
+    if not overlapping:
+        return rows
+
+    existing = {
+        naive_utc(biometric.recorded_at): biometric for biometric in db.query(Biometric).filter(
+            Biometric.patient_id == patient_id,
+            Biometric.source == "healthkit",
+            Biometric.recorded_at.in_(overlapping)
+        ).all()
+    }
+    to_insert = []
+    for row in rows:
+        biometric = existing.get(row["recorded_at"])
+        if biometric is None:
+            to_insert.append(row)
+            continue
+        for field in MERGED_FIELDS:
+            if row.get(field) is not None:
+                setattr(biometric, field, row[field])
+    return to_insert
+
+def _store_synced_rows(
+    patient_id: int,
+    rows: List[Dict[str, Any]],
+    cursors: Dict[str, datetime],
+    latest: Dict[str, datetime]
+) -> int:
+    """Insert (or merge) synced rows and advance the cursors in one transaction"""
+    db = SessionLocal()
+    try:
+        if rows:
+            new_rows = _merge_into_existing_slots(db, patient_id, rows, cursors)
+            if new_rows:
+                db.execute(insert(Biometric), new_rows)
+            # Merged slots only carry the new samples: rollups count them once
+            update_rollups(db, rows)
+            record_biometrics(db, rows)
+
+        # Advance cursors in the same transaction as the inserts
+        cursor_rows = {
+            c.data_type: c for c in db.query(SyncCursor).filter(
+                SyncCursor.patient_id == patient_id,
+                SyncCursor.data_type.in_(list(latest))
+            ).all()
+        } if latest else {}
+        for data_type, synced_at in latest.items():
+            if data_type in cursor_rows:
+                cursor_rows[data_type].last_synced_at = synced_at
+            else:
+                db.add(SyncCursor(
+                    patient_id=patient_id,
+                    data_type=data_type,
+                    last_synced_at=synced_at
+                ))
+
+        db.commit()
+        return len(rows)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def _run_mock_healthkit_sync(patient_id: int) -> Dict[str, Any]:
+    db = SessionLocal()
+    try:
+        return _mock_healthkit_sync(db, patient_id)
     finally:
         db.close()
 
@@ -149,6 +240,7 @@ def _mock_healthkit_sync(db: Session, patient_id: int) -> Dict[str, Any]:
     try:
         # Generate mock biometric data
         processed_count = 0
+        created = []
         now = datetime.utcnow()
         
         # Create mock heart rate data for last 24 hours
@@ -176,6 +268,7 @@ def _mock_healthkit_sync(db: Session, patient_id: int) -> Dict[str, Any]:
                     source="mock_healthkit"
                 )
                 db.add(biometric)
+                created.append(biometric)
                 processed_count += 1
         
         # Add sleep data for last night
@@ -190,8 +283,11 @@ def _mock_healthkit_sync(db: Session, patient_id: int) -> Dict[str, Any]:
             source="mock_healthkit"
         )
         db.add(sleep_biometric)
+        created.append(sleep_biometric)
         processed_count += 1
-        
+
+        update_rollups(db, created)
+        record_biometrics(db, created)
         db.commit()
         
         # Trigger analysis
@@ -213,44 +309,101 @@ def _mock_healthkit_sync(db: Session, patient_id: int) -> Dict[str, Any]:
     except Exception as e:
         return {"error": f"Mock sync failed: {str(e)}"}
 
+@shared_task(name="import_healthkit_export", bind=True, time_limit=6 * 60 * 60, soft_time_limit=None)
+def import_healthkit_export(self, patient_id: int, export_path: str):
+    """Import an Apple Health export (export.xml or export.zip); resumes if re-run"""
+    def report(progress: Dict[str, Any]):
+        self.update_state(state="PROGRESS", meta=progress)
+
+    try:
+        importer = HealthKitExportImporter(patient_id, export_path, progress_callback=report)
+        summary = importer.run()
+        return {"status": "success", **summary}
+    except Exception as e:
+        return {"status": "error", "patient_id": patient_id, "message": str(e)}
+
 @shared_task(name="cleanup_old_data")
 def cleanup_old_data():
-    """Clean up old data based on retention policy"""
-    db = SessionLocal()
+    """Clean up old data based on retention policy, in bounded batches"""
     try:
-        retention_date = datetime.utcnow() - timedelta(days=settings.DATA_RETENTION_DAYS)
-        
-        # Clean up old biometric data
-        biometric_deleted = db.query(Biometric).filter(
-            Biometric.recorded_at < retention_date
-        ).delete(synchronize_session=False)
-        
-        # Clean up resolved alerts older than 30 days
-        alert_retention_date = datetime.utcnow() - timedelta(days=30)
-        alert_deleted = db.query(Alert).filter(
-            Alert.resolved == True,
-            Alert.resolved_at < alert_retention_date
-        ).delete(synchronize_session=False)
-        
-        # Clean up old predictions
-        prediction_deleted = db.query(Prediction).filter(
-            Prediction.predicted_at < retention_date
-        ).delete(synchronize_session=False)
-        
-        db.commit()
-        
+        # Aged raw biometrics are compacted into hourly/daily rollups
+        # rather than deleted
+        compaction = None
+        if settings.BIOMETRIC_COMPACTION_ENABLED:
+            db = SessionLocal()
+            try:
+                compaction = compact_biometrics(db)
+            finally:
+                db.close()
+
+        # Expired monthly partitions are dropped first (PostgreSQL), remaining
+        # rows are deleted batch by batch. Progress is checkpointed so an
+        # interrupted run resumes.
+        metrics = RetentionEngine().run()
+
         return {
             "success": True,
-            "biometric_records_deleted": biometric_deleted,
-            "alerts_deleted": alert_deleted,
-            "predictions_deleted": prediction_deleted,
+            "compaction": compaction,
+            "tables": metrics,
             "retention_days": settings.DATA_RETENTION_DAYS,
+            "alert_retention_days": settings.ALERT_RETENTION_DAYS,
             "cleanup_date": datetime.utcnow().isoformat()
         }
-        
+
     except Exception as e:
-        db.rollback()
         return {"error": str(e), "traceback": str(e.__traceback__)}
+
+@shared_task(name="backfill_biometric_rollups")
+def backfill_biometric_rollups(patient_id: int = None, days: int = None):
+    """Rebuild 1m/1h/1d biometric rollups from raw rows (all history by default)"""
+    db = SessionLocal()
+    try:
+        start = datetime.utcnow() - timedelta(days=days) if days else None
+        result = backfill_rollups(db, patient_id=patient_id, start=start)
+        return {"success": True, **result}
+    except Exception as e:
+        return {"error": str(e)}
+    finally:
+        db.close()
+
+@shared_task(name="compact_biometric_history")
+def compact_biometric_history(hourly_after_days: int = None, daily_after_days: int = None):
+    """Compact aged raw biometrics into hourly, then daily rollups"""
+    db = SessionLocal()
+    try:
+        result = compact_biometrics(db, hourly_after_days, daily_after_days)
+        return {"success": True, **result}
+    except Exception as e:
+        db.rollback()
+        return {"error": str(e)}
+    finally:
+        db.close()
+
+@shared_task(name="export_columnar_history", time_limit=2 * 60 * 60, soft_time_limit=None)
+def export_columnar_history(days: int = 1, patient_id: int = None):
+    """Export the last full days of biometrics and predictions to Arrow files"""
+    from app.services.columnar_export import export_history
+
+    db = SessionLocal()
+    try:
+        end = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        result = export_history(db, start=end - timedelta(days=days), end=end, patient_id=patient_id)
+        return {"success": True, **result}
+    except Exception as e:
+        return {"error": str(e)}
+    finally:
+        db.close()
+
+@shared_task(name="maintain_partitions")
+def maintain_partitions():
+    """Create upcoming monthly partitions for biometrics and predictions"""
+    db = SessionLocal()
+    try:
+        created = ensure_partitions(db)
+        return {"success": True, "created": created}
+    except Exception as e:
+        db.rollback()
+        return {"error": str(e)}
     finally:
         db.close()
 
@@ -319,33 +472,64 @@ def send_medication_reminders():
 
 @shared_task(name="sync_all_active_patients")
 def sync_all_active_patients():
-    """Sync HealthKit data for all active patients"""
+    """Sync HealthKit data for all active patients in rate-limited concurrent batches"""
     db = SessionLocal()
     try:
-        active_patients = db.query(Patient).filter(
-            Patient.is_active == True
-        ).all()
-        
-        results = []
-        for patient in active_patients:
-            result = sync_healthkit_data.delay(patient.id)
-            results.append({
-                "patient_id": patient.id,
-                "patient_name": patient.full_name,
-                "task_id": result.id
-            })
-        
-        return {
-            "success": True,
-            "patients_count": len(active_patients),
-            "tasks_created": results
-        }
-        
+        patient_ids = [
+            patient_id for (patient_id,) in db.query(Patient.id).filter(
+                Patient.is_active == True
+            ).order_by(Patient.id).all()
+        ]
     except Exception as e:
         return {"error": str(e)}
     finally:
         db.close()
 
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        results = loop.run_until_complete(_sync_patients_in_batches(patient_ids))
+    finally:
+        loop.close()
+
+    failed = [r for r in results if "error" in r]
+    return {
+        "success": True,
+        "patients_count": len(patient_ids),
+        "synced_rows": sum(r.get("synced_count", 0) for r in results),
+        "failed_count": len(failed),
+        "failures": [
+            {"patient_id": r.get("patient_id"), "error": r["error"]} for r in failed
+        ]
+    }
+
+async def _sync_patients_in_batches(patient_ids: List[int]) -> List[Dict[str, Any]]:
+    """
+    Run patient syncs concurrently, at most HEALTHKIT_SYNC_CONCURRENCY at a time,
+    starting a new batch of HEALTHKIT_SYNC_BATCH_SIZE patients no more often than
+    every HEALTHKIT_SYNC_BATCH_INTERVAL_SECONDS.
+    """
+    semaphore = asyncio.Semaphore(settings.HEALTHKIT_SYNC_CONCURRENCY)
+    batch_size = settings.HEALTHKIT_SYNC_BATCH_SIZE
+
+    async def run_one(patient_id: int) -> Dict[str, Any]:
+        async with semaphore:
+            result = await _sync_patient(patient_id)
+            result.setdefault("patient_id", patient_id)
+            return result
+
+    results = []
+    for offset in range(0, len(patient_ids), batch_size):
+        batch_started = time.monotonic()
+        batch = patient_ids[offset:offset + batch_size]
+        results.extend(await asyncio.gather(*(run_one(pid) for pid in batch)))
+
+        remaining = settings.HEALTHKIT_SYNC_BATCH_INTERVAL_SECONDS - (time.monotonic() - batch_started)
+        if remaining > 0 and offset + batch_size < len(patient_ids):
+            await asyncio.sleep(remaining)
+
+    return results
+
 @shared_task(name="backup_database")
 def backup_database():
     """Create database backup"""
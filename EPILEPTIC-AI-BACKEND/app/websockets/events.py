@@ -138,4 +138,18 @@ async def send_seizure_detection(patient_id: int, seizure_data: Dict[str, Any]):
         }
     }
     
-    await manager.send_to_patient(patient_id, message)
\ No newline at end of file
+    await manager.send_to_patient(patient_id, message)
+
+
+async def send_alert_inbox_update(doctor_id: int, event: str, alert_data: Dict[str, Any]):
+    """Send an alert entering ("new") or leaving ("resolved") the doctor's inbox"""
+    message = {
+        "type": "alert_inbox",
+        "timestamp": datetime.utcnow().isoformat(),
+        "data": {
+            "event": event,
+            "alert": alert_data
+        }
+    }
+    
+    await manager.send_to_doctor(doctor_id, message)
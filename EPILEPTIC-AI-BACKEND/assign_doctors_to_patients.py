@@ -26,7 +26,7 @@ def assign_doctors_to_patients():
 
         # Get all patients without an assigned doctor
         patients = db.query(Patient).filter(
-            (Patient.treating_neurologist == None) | (Patient.treating_neurologist == "")
+            Patient.doctor_id == None
         ).all()
 
         if not patients:
@@ -41,6 +41,7 @@ def assign_doctors_to_patients():
         print("\nAssigning doctors to patients...")
         for i, patient in enumerate(patients):
             doctor = doctors[i % len(doctors)]  # Round-robin assignment
+            patient.doctor_id = doctor.id
             patient.treating_neurologist = doctor.email
             print(f"  ✓ Assigned {doctor.full_name} to {patient.full_name}")
 
@@ -52,7 +53,7 @@ def assign_doctors_to_patients():
         print("\nSummary:")
         for doctor in doctors:
             count = db.query(Patient).filter(
-                Patient.treating_neurologist == doctor.email
+                Patient.doctor_id == doctor.id
             ).count()
             print(f"  Dr. {doctor.full_name}: {count} patients")
 
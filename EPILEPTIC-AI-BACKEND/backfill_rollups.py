@@ -0,0 +1,34 @@
+"""
+Script to rebuild the 1-minute / 1-hour / 1-day biometric rollup tables
+from raw biometrics (one patient and one transaction at a time).
+
+Usage:
+    python backfill_rollups.py                 # all patients, all history
+    python backfill_rollups.py --patient-id 12 --days 30
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+from app.core.database import SessionLocal
+from app.services.biometric_rollups import backfill_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--patient-id", type=int, default=None)
+    parser.add_argument("--days", type=int, default=None, help="Only rebuild the last N days")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    start = datetime.utcnow() - timedelta(days=args.days) if args.days else None
+    db = SessionLocal()
+    try:
+        result = backfill_rollups(db, patient_id=args.patient_id, start=start, chunk_size=args.chunk_size)
+        print(f"Rebuilt rollups for {result['patients']} patients from {result['samples']} samples")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
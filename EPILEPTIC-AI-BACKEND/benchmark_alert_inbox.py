@@ -0,0 +1,93 @@
+"""
+Benchmark: doctor alert inbox, per-patient /alerts/ calls (is_active
+filtered at query time, acknowledged filtered in Python, patient loaded
+per alert) vs inbox_page over the partial index of open alerts.
+
+Seeds --patients patients (half of them for the benchmarked doctor) with
+--alerts alerts each, of which only the most recent few are still open,
+then times the first inbox page of --limit alerts both ways.
+Runs on SQLite by default; --pg uses DATABASE_URL (PostgreSQL).
+
+Usage:
+    python benchmark_alert_inbox.py --patients 2000 --alerts 200
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import Session
+
+import app.main  # noqa: F401  (registers every model)
+from app.core.config import settings
+from app.core.database import Base
+from app.models.alert import Alert
+from app.models.patient import Patient
+from app.services.alert_inbox import inbox_page
+
+
+def per_patient_pages(db, doctor_id, limit):
+    """Naive version: the dashboard polls /alerts/ for every patient and merges"""
+    alerts = []
+    for patient in db.query(Patient).filter(Patient.doctor_id == doctor_id).all():
+        alerts += [
+            alert for alert in db.query(Alert).filter(
+                Alert.patient_id == patient.id, Alert.is_active == True  # noqa: E712
+            ).order_by(Alert.triggered_at.desc()).limit(settings.MAX_PAGE_SIZE).all()
+            if not alert.acknowledged
+        ]
+    alerts.sort(key=lambda alert: (alert.triggered_at, alert.id), reverse=True)
+    items = [(alert.id, alert.patient.full_name) for alert in alerts[:limit]]
+    db.expire_all()
+    return items
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--patients", type=int, default=2000)
+    parser.add_argument("--alerts", type=int, default=200, help="alerts per patient")
+    parser.add_argument("--open", type=int, default=2, help="open alerts per patient")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--pg", action="store_true", help="use DATABASE_URL (PostgreSQL)")
+    args = parser.parse_args()
+
+    url = settings.DATABASE_URL if args.pg else f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Patient), [
+            {"id": i, "email": f"patient{i}@example.com", "full_name": f"Patient {i}",
+             "hashed_password": "x", "doctor_id": 1 + i % 2}
+            for i in range(1, args.patients + 1)
+        ])
+        for offset in range(0, args.patients, 100):
+            conn.execute(insert(Alert), [
+                {"patient_id": p, "alert_type": "prediction", "severity": "high", "title": "t", "message": "m",
+                 "triggered_at": now - timedelta(hours=i, minutes=p % 60),
+                 "is_active": i < 2 * args.open, "acknowledged": i >= args.open}
+                for p in range(offset + 1, min(args.patients, offset + 100) + 1) for i in range(args.alerts)
+            ])
+        conn.execute(text("ANALYZE"))
+
+    with Session(engine) as db:
+        print(f"{args.patients * args.alerts} alerts, {args.patients // 2 * args.open} open for the doctor, "
+              f"first page of {args.limit} (ms)")
+        print(f"{'per-patient /alerts/':28s} {timed(lambda: per_patient_pages(db, 1, args.limit), args.repeat):9.1f}")
+        print(f"{'inbox_page':28s} {timed(lambda: inbox_page(db, 1, args.limit), args.repeat):9.1f}")
+
+
+if __name__ == "__main__":
+    main()
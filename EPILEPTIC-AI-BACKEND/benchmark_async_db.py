@@ -0,0 +1,118 @@
+"""
+Benchmark: concurrent throughput of one worker, sync Session vs AsyncSession.
+
+Two `async def` endpoints run the same "latest biometric" query, one through
+the synchronous SessionLocal pattern (blocks the event loop), the other
+through an AsyncSession (the loop keeps serving while the query runs).
+A per-query round trip is emulated with a SQL sleep() function on SQLite;
+with a PostgreSQL DATABASE_URL, --pg uses pg_sleep against the real server.
+
+Usage:
+    python benchmark_async_db.py --requests 400 --concurrency 50 --latency-ms 5
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+import app.main  # noqa: F401  (registers every model)
+from app.core.config import settings
+from app.core.database import Base, to_async_url
+from app.models.biometric import Biometric
+
+
+def build_app(url, latency_ms, postgres):
+    sync_engine = create_engine(url, pool_size=20, max_overflow=30)
+    async_engine = create_async_engine(to_async_url(url), pool_size=20, max_overflow=30)
+
+    if not postgres:
+        def install_sleep(dbapi_connection, _):
+            dbapi_connection.create_function("sleep", 1, lambda ms: time.sleep(ms / 1000) or 0)
+        event.listen(sync_engine, "connect", install_sleep)
+        event.listen(async_engine.sync_engine, "connect", install_sleep)
+
+    roundtrip = text("SELECT pg_sleep(:ms / 1000.0)" if postgres else "SELECT sleep(:ms)")
+    latest = select(Biometric).where(Biometric.patient_id == 1).order_by(Biometric.recorded_at.desc()).limit(1)
+
+    SyncSession = sessionmaker(bind=sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    bench = FastAPI()
+
+    @bench.get("/sync")
+    async def sync_route(db: Session = Depends(get_sync_db)):
+        db.execute(roundtrip, {"ms": latency_ms})
+        return {"id": db.execute(latest).scalars().first().id}
+
+    @bench.get("/async")
+    async def async_route(db: AsyncSession = Depends(get_async_db)):
+        await db.execute(roundtrip, {"ms": latency_ms})
+        return {"id": (await db.execute(latest)).scalars().first().id}
+
+    return bench, sync_engine, async_engine
+
+
+async def run(bench, path, requests, concurrency):
+    transport = httpx.ASGITransport(app=bench)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        await one()  # warm-up (pool, first connection)
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return requests / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--pg", action="store_true", help="use DATABASE_URL (PostgreSQL)")
+    args = parser.parse_args()
+
+    if args.pg:
+        url = settings.DATABASE_URL
+    else:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    bench, sync_engine, async_engine = build_app(url, args.latency_ms, args.pg)
+    Base.metadata.create_all(bind=sync_engine)
+    with Session(sync_engine) as db:
+        db.add(Biometric(patient_id=1, heart_rate=72, recorded_at=datetime.utcnow()))
+        db.commit()
+
+    for path in ("/sync", "/async"):
+        throughput = asyncio.run(run(bench, path, args.requests, args.concurrency))
+        print(f"{path:7s} {throughput:8.1f} req/s ({args.concurrency} concurrent, {args.latency_ms} ms per query)")
+
+    asyncio.run(async_engine.dispose())
+    sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: loading months of biometrics for training, ORM vs columnar export.
+
+Seeds --patients x --days of 5-minute samples, then compares:
+- ORM: query(Biometric).all() and conversion of the signals to NumPy
+- Export: streamed export to Arrow files (one per patient and day), then
+  load_arrays() through memory-mapped files
+reporting wall time and peak Python memory (tracemalloc) for each step.
+Runs on SQLite by default; --pg uses DATABASE_URL (PostgreSQL).
+
+Usage:
+    python benchmark_columnar_export.py --patients 20 --days 90
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+import app.main  # noqa: F401  (registers every model)
+from app.core.config import settings
+from app.core.database import Base
+from app.models.biometric import Biometric
+from app.services.columnar_export import BIOMETRIC_EXPORT, export_table, load_arrays
+
+SIGNALS = ("heart_rate", "heart_rate_variability", "movement_intensity", "stress_level")
+
+
+def measure(label, fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    value = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:28s} {elapsed:8.2f} s   peak {peak / 1e6:8.1f} MB")
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--patients", type=int, default=20)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--pg", action="store_true", help="use DATABASE_URL (PostgreSQL)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    url = settings.DATABASE_URL if args.pg else f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+
+    start = datetime(2026, 1, 1)
+    per_day = 288
+    rng = np.random.default_rng(0)
+    with engine.begin() as conn:
+        for pid in range(1, args.patients + 1):
+            n = per_day * args.days
+            values = rng.normal(70, 10, size=(n, len(SIGNALS)))
+            conn.execute(insert(Biometric), [
+                {"patient_id": pid, "recorded_at": start + timedelta(minutes=5 * i), "source": "apple_watch",
+                 **dict(zip(SIGNALS, map(float, values[i])))}
+                for i in range(n)
+            ])
+    total = args.patients * per_day * args.days
+    print(f"{total} biometric rows ({args.patients} patients x {args.days} days)")
+
+    def orm_load():
+        with Session(engine) as db:
+            rows = db.query(Biometric).all()
+            return {s: np.array([getattr(r, s) for r in rows], dtype=np.float32) for s in SIGNALS}
+
+    root = os.path.join(workdir, "columnar")
+
+    def export():
+        with Session(engine) as db:
+            return export_table(db, BIOMETRIC_EXPORT, root=root)
+
+    orm = measure("ORM load -> NumPy", orm_load)
+    result = measure("streamed export (once)", export)
+    arrays = measure("memory-mapped load_arrays", lambda: load_arrays("biometrics", root=root, columns=SIGNALS))
+
+    assert len(arrays["heart_rate"]) == len(orm["heart_rate"]) == total
+    print(f"export: {result['files']} files, {result['bytes'] / 1e6:.1f} MB on disk")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: storage of the biometric history before and after compaction.
+
+Seeds a scratch SQLite database with raw samples (and their rollups) for
+a number of patients over a number of days, runs compact_biometrics, then
+reports row counts per table and the database file size (after VACUUM).
+
+Usage:
+    python benchmark_compaction.py --patients 5 --days 730 --interval-minutes 15
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+import app.main  # noqa: F401  (registers every model)
+from app.core.database import Base
+from app.models.biometric import Biometric
+from app.services.biometric_compaction import compact_biometrics
+from app.services.biometric_rollups import update_rollups
+
+
+def file_size(engine):
+    with engine.connect() as conn:
+        conn.execute(text("VACUUM"))
+    return os.path.getsize(engine.url.database)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--patients", type=int, default=5)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--interval-minutes", type=int, default=15)
+    parser.add_argument("--hourly-after-days", type=int, default=90)
+    parser.add_argument("--daily-after-days", type=int, default=365)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "compaction.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    now = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    per_day = 24 * 60 // args.interval_minutes
+    for patient_id in range(1, args.patients + 1):
+        for day in range(args.days):
+            start = now - timedelta(days=day + 1)
+            rows = [
+                {
+                    "patient_id": patient_id,
+                    "recorded_at": start + timedelta(minutes=args.interval_minutes * i),
+                    "heart_rate": 60.0 + (i * 7) % 40,
+                    "heart_rate_variability": 40.0 + i % 20,
+                    "movement_intensity": (i % 10) / 10,
+                    "stress_level": (i % 5) / 5,
+                }
+                for i in range(per_day)
+            ]
+            db.execute(insert(Biometric), rows)
+            update_rollups(db, rows)
+        db.commit()
+
+    before = file_size(engine)
+    started = time.perf_counter()
+    result = compact_biometrics(db, args.hourly_after_days, args.daily_after_days)
+    elapsed = time.perf_counter() - started
+    db.close()
+    after = file_size(engine)
+
+    for table, stats in result["storage_before"].items():
+        print(f"{table:24s} {stats['rows']:>10d} -> {result['storage_after'][table]['rows']:>10d} rows")
+    print(f"database file: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+    print(f"compaction: {result['rows_deleted']} raw rows over {result['days']} days in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
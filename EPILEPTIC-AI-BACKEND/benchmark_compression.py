@@ -0,0 +1,92 @@
+"""
+Benchmark: compressed vs plain request bodies for batch biometric uploads.
+
+Measures, for a realistic /biometrics/batch payload:
+- body size on the wire (plain, gzip, zstd)
+- server-side time to decompress + parse + validate (in-process ASGI app)
+- estimated end-to-end time on a mobile uplink (--uplink-kbps)
+
+Usage:
+    python benchmark_compression.py --records 2000 --uplink-kbps 1000
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import zstandard
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.compression import RequestDecompressionMiddleware
+from app.schemas.biometric import BiometricCreate
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestDecompressionMiddleware, max_size=64 * 1024 * 1024, paths=["/batch"])
+
+    @app.post("/batch")
+    async def batch(items: List[BiometricCreate]):
+        return {"count": len(items)}
+
+    return app
+
+
+def build_payload(records: int) -> bytes:
+    start = datetime(2025, 1, 1)
+    rng = random.Random(42)
+    return json.dumps([
+        {
+            "heart_rate": round(rng.gauss(72, 6), 1),
+            "heart_rate_variability": round(rng.gauss(45, 8), 1),
+            "accelerometer_x": round(rng.gauss(0, 0.05), 4),
+            "accelerometer_y": round(rng.gauss(0, 0.05), 4),
+            "accelerometer_z": round(rng.gauss(1, 0.05), 4),
+            "movement_intensity": round(rng.random() * 0.2, 3),
+            "recorded_at": (start + timedelta(seconds=5 * i)).isoformat(),
+            "source": "apple_watch",
+        }
+        for i in range(records)
+    ]).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--uplink-kbps", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    client = TestClient(build_app())
+    raw = build_payload(args.records)
+    bodies = {
+        "plain": (raw, {}),
+        "gzip": (gzip.compress(raw, compresslevel=6), {"Content-Encoding": "gzip"}),
+        "zstd": (zstandard.ZstdCompressor(level=3).compress(raw), {"Content-Encoding": "zstd"}),
+    }
+
+    print(f"{args.records} records, uplink {args.uplink_kbps:.0f} kbit/s")
+    print(f"{'encoding':<8} {'bytes':>10} {'ratio':>7} {'server ms':>10} {'e2e ms':>10}")
+    for name, (body, headers) in bodies.items():
+        headers = {"Content-Type": "application/json", **headers}
+        assert client.post("/batch", content=body, headers=headers).json()["count"] == args.records
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            client.post("/batch", content=body, headers=headers)
+        server_ms = (time.perf_counter() - started) / args.repeat * 1000
+
+        transfer_ms = len(body) * 8 / args.uplink_kbps
+        print(
+            f"{name:<8} {len(body):>10} {len(raw) / len(body):>6.1f}x "
+            f"{server_ms:>10.1f} {server_ms + transfer_ms:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
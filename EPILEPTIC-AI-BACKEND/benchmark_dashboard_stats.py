@@ -0,0 +1,127 @@
+"""
+Benchmark: /doctors/dashboard/stats, six separate counts vs one aggregate
+query vs the per-doctor cache.
+
+Seeds --patients patients over --doctors doctors (the benchmarked doctor
+gets --panel of them), --seizures seizures per patient over 90 days and a
+latest-state row per patient, then reports p50 / p99 latency of each way.
+Runs on SQLite by default; --pg uses DATABASE_URL (PostgreSQL).
+
+Usage:
+    python benchmark_dashboard_stats.py --patients 50000 --panel 5000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert, or_
+from sqlalchemy.orm import Session
+
+import app.main  # noqa: F401  (registers every model)
+from app.core.config import settings
+from app.core.database import Base
+from app.models.alert import Alert
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+from app.models.patient_latest_state import PatientLatestState
+from app.models.seizure import Seizure
+from app.services.dashboard_stats import compute_dashboard_stats, get_dashboard_stats
+from app.services.patient_state import risk_level
+from app.services.stats_cache import get_stats_cache
+
+
+def percentiles(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+
+
+def six_counts(db, doctor_id, now):
+    """Naive version: one count per dashboard counter"""
+    patients = db.query(Patient.id).filter(Patient.doctor_id == doctor_id)
+    return {
+        "total_patients": patients.count(),
+        "recent_seizures_this_week": db.query(func.count(Seizure.id)).filter(
+            Seizure.patient_id.in_(patients), Seizure.start_time >= now - timedelta(days=7)).scalar(),
+        "recent_seizures_this_month": db.query(func.count(Seizure.id)).filter(
+            Seizure.patient_id.in_(patients), Seizure.start_time >= now - timedelta(days=30)).scalar(),
+        "critical_patients": db.query(func.count()).select_from(PatientLatestState).filter(
+            PatientLatestState.patient_id.in_(patients), PatientLatestState.risk_level == "critical").scalar(),
+        "high_risk_patients": db.query(func.count()).select_from(PatientLatestState).filter(
+            PatientLatestState.patient_id.in_(patients), PatientLatestState.risk_level == "high").scalar(),
+        "active_alerts": db.query(func.count(Alert.id)).filter(
+            Alert.patient_id.in_(patients), Alert.is_active == True,
+            or_(Alert.resolved == False, Alert.resolved.is_(None))).scalar(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--patients", type=int, default=50_000)
+    parser.add_argument("--doctors", type=int, default=50)
+    parser.add_argument("--panel", type=int, default=5_000, help="patients of the benchmarked doctor")
+    parser.add_argument("--seizures", type=int, default=10, help="seizures per patient over 90 days")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--pg", action="store_true", help="use DATABASE_URL (PostgreSQL)")
+    args = parser.parse_args()
+
+    url = settings.DATABASE_URL if args.pg else f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+
+    now = datetime.utcnow()
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        conn.execute(insert(Doctor), [
+            {"id": d, "email": f"doctor{d}@example.com", "full_name": f"Doctor {d}", "hashed_password": "x"}
+            for d in range(1, args.doctors + 1)
+        ])
+        for offset in range(0, args.patients, 10_000):
+            ids = range(offset + 1, min(args.patients, offset + 10_000) + 1)
+            conn.execute(insert(Patient), [
+                {"id": i, "email": f"patient{i}@example.com", "full_name": f"Patient {i}", "hashed_password": "x",
+                 "doctor_id": 1 if i <= args.panel else rng.randint(2, args.doctors)}
+                for i in ids
+            ])
+            conn.execute(insert(Seizure), [
+                {"patient_id": i, "start_time": now - timedelta(minutes=rng.randint(0, 90 * 24 * 60))}
+                for i in ids for _ in range(args.seizures)
+            ])
+            scores = {i: rng.random() for i in ids}
+            conn.execute(insert(PatientLatestState), [
+                {"patient_id": i, "predicted_at": now, "risk_score": score, "risk_level": risk_level(score),
+                 "active_alert_count": 1 if score >= 0.8 else 0}
+                for i, score in scores.items()
+            ])
+            conn.execute(insert(Alert), [
+                {"patient_id": i, "alert_type": "seizure_prediction", "severity": "critical",
+                 "title": "t", "message": "m", "is_active": True, "resolved": False}
+                for i, score in scores.items() if score >= 0.8
+            ])
+
+    with Session(engine) as db:
+        assert six_counts(db, 1, now) == compute_dashboard_stats(db, 1, now)
+        cache = get_stats_cache()
+        cache.clear()
+        ways = {
+            "six counts": lambda: six_counts(db, 1, now),
+            "one aggregate query": lambda: compute_dashboard_stats(db, 1, now),
+            "cached": lambda: get_dashboard_stats(db, 1),
+        }
+        print(f"{args.patients} patients, panel of {args.panel}, {args.seizures} seizures per patient (ms)")
+        print(f"{'way':22s} {'p50':>8s} {'p99':>8s}")
+        for name, fn in ways.items():
+            p50, p99 = percentiles(fn, args.repeat)
+            print(f"{name:22s} {p50:8.2f} {p99:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
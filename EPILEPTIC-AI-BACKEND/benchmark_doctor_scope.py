@@ -0,0 +1,90 @@
+"""
+Benchmark: doctor-scoped patient queries, treating_neurologist email vs
+indexed doctor_id foreign key.
+
+Seeds --patients patients spread over --doctors doctors, then times the
+three doctor-scoped queries of doctors.py both ways:
+- panel: first page of the doctor's patients (list endpoint)
+- access check: one patient by id, restricted to the doctor
+- count: size of the doctor's panel
+Runs on SQLite by default; --pg uses DATABASE_URL (PostgreSQL).
+
+Usage:
+    python benchmark_doctor_scope.py --patients 100000 --doctors 500
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import Session
+
+import app.main  # noqa: F401  (registers every model)
+from app.core.config import settings
+from app.core.database import Base
+from app.core.pagination import keyset
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--patients", type=int, default=100_000)
+    parser.add_argument("--doctors", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--pg", action="store_true", help="use DATABASE_URL (PostgreSQL)")
+    args = parser.parse_args()
+
+    url = settings.DATABASE_URL if args.pg else f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(insert(Doctor), [
+            {"id": d, "email": f"doctor{d}@example.com", "full_name": f"Doctor {d}", "hashed_password": "x"}
+            for d in range(1, args.doctors + 1)
+        ])
+        rng = random.Random(0)
+        for offset in range(0, args.patients, 20_000):
+            rows = []
+            for i in range(offset, min(args.patients, offset + 20_000)):
+                d = rng.randint(1, args.doctors)
+                rows.append({"email": f"patient{i}@example.com", "full_name": f"Patient {i}",
+                             "hashed_password": "x", "doctor_id": d,
+                             "treating_neurologist": f"doctor{d}@example.com"})
+            conn.execute(insert(Patient), rows)
+
+    doctor_id = args.doctors // 2
+    email = f"doctor{doctor_id}@example.com"
+    with Session(engine) as db:
+        patient_id = db.query(Patient.id).filter(Patient.doctor_id == doctor_id).first()[0]
+        scopes = {
+            "treating_neurologist": Patient.treating_neurologist == email,
+            "doctor_id": Patient.doctor_id == doctor_id,
+        }
+        print(f"{args.patients} patients, {args.doctors} doctors (ms per query)")
+        print(f"{'scope':22s} {'panel page':>11s} {'access check':>13s} {'count':>8s}")
+        for name, scope in scopes.items():
+            panel = timed(lambda: keyset(db.query(Patient).filter(scope), Patient.created_at, Patient.id,
+                                         None, 100).all(), args.repeat)
+            access = timed(lambda: db.query(Patient.id).filter(Patient.id == patient_id, scope).first(),
+                           args.repeat)
+            count = timed(lambda: db.query(func.count(Patient.id)).filter(scope).scalar(), args.repeat)
+            db.expunge_all()
+            print(f"{name:22s} {panel:11.3f} {access:13.3f} {count:8.3f}")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
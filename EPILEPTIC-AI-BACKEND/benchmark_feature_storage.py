@@ -0,0 +1,120 @@
+"""
+Benchmark: storage of Prediction features, nested JSON (features_used)
+vs versioned float32 vector (features_vector).
+
+Inserts --rows predictions carrying the features dict built by
+_extract_features_with_trends, once per encoding, and reports the column
+payload and the predictions table size, both extrapolated to one million
+predictions, plus the cost of reading the features back as dicts.
+Runs on SQLite by default; --pg uses DATABASE_URL (PostgreSQL).
+
+Usage:
+    python benchmark_feature_storage.py --rows 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select, text
+
+import app.main  # noqa: F401  (registers every model)
+from app.core.config import settings
+from app.core.database import Base
+from app.core.feature_codec import decode_features, encode_features
+from app.models.patient import Patient
+from app.models.prediction import Prediction
+
+START = datetime(2026, 3, 1)
+MILLION = 1_000_000
+
+
+def sample_features(rng: random.Random, at: datetime):
+    """Same shape as AIPredictionService._extract_features_with_trends"""
+    hr = [rng.gauss(75, 8) for _ in range(6)]
+    return {
+        "heart_rate": {"mean": sum(hr) / 6, "std": rng.random() * 5, "min": min(hr), "max": max(hr),
+                       "current": hr[-1], "slope": rng.gauss(0, 2), "acceleration": rng.gauss(0, 1),
+                       "data_points": 6},
+        "heart_rate_variability": {"mean": rng.gauss(45, 10), "std": rng.random() * 4,
+                                   "current": rng.gauss(45, 10), "slope": rng.gauss(0, 1),
+                                   "rmssd": rng.random() * 6},
+        "movement": {"intensity_mean": rng.random(), "intensity_std": rng.random() / 4,
+                     "current": rng.random(), "slope": rng.gauss(0, 0.1)},
+        "stress": {"level_mean": rng.random() * 10, "level_std": rng.random(), "max": rng.random() * 10,
+                   "current": rng.random() * 10, "slope": rng.gauss(0, 0.5)},
+        "metadata": {"total_biometric_records": 6, "window_minutes": 30, "data_completeness": 1.0,
+                     "first_recorded": (at - timedelta(minutes=25)).isoformat(),
+                     "last_recorded": at.isoformat(), "device_source": "apple_watch"},
+    }
+
+
+def table_bytes(engine, pg: bool) -> int:
+    with engine.connect() as conn:
+        if pg:
+            return conn.execute(text("SELECT pg_total_relation_size('predictions')")).scalar()
+        return conn.execute(text("SELECT SUM(pgsize) FROM dbstat WHERE name = 'predictions'")).scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--pg", action="store_true", help="use DATABASE_URL (PostgreSQL)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    samples = [
+        (START + timedelta(minutes=5 * i), sample_features(rng, START + timedelta(minutes=5 * i)))
+        for i in range(args.rows)
+    ]
+    encodings = {
+        "json (features_used)": lambda f: {"features_used": f},
+        "float32 (features_vector)": lambda f: {"features_vector": encode_features(f)},
+    }
+
+    scale = MILLION / args.rows
+    print(f"{args.rows} predictions, sizes extrapolated to 1M predictions")
+    print(f"{'encoding':27s} {'payload MB':>11s} {'table MB':>9s} {'read us/row':>12s}")
+    for name, encode in encodings.items():
+        url = settings.DATABASE_URL if args.pg else f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+        engine = create_engine(url)
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+
+        payload = 0
+        with engine.begin() as conn:
+            conn.execute(insert(Patient), [{"id": 1, "email": "p@example.com", "full_name": "P", "hashed_password": "x"}])
+            for offset in range(0, args.rows, 10_000):
+                rows = []
+                for at, features in samples[offset:offset + 10_000]:
+                    values = encode(features)
+                    column = next(iter(values.values()))
+                    payload += len(column) if isinstance(column, bytes) else len(json.dumps(column))
+                    rows.append({"patient_id": 1, "risk_score": 0.5, "confidence": 0.8,
+                                 "predicted_at": at, **values})
+                conn.execute(insert(Prediction), rows)
+        if not args.pg:
+            with engine.connect() as conn:
+                conn.execute(text("VACUUM"))
+
+        # Read back as dicts: the JSON type parses while fetching
+        started = time.perf_counter()
+        with engine.connect() as conn:
+            if "vector" in name:
+                decoded = [decode_features(v) for v in conn.execute(select(Prediction.features_vector)).scalars()]
+            else:
+                decoded = conn.execute(select(Prediction.features_used)).scalars().all()
+        read_us = (time.perf_counter() - started) / len(decoded) * 1e6
+
+        print(f"{name:27s} {payload * scale / 1e6:11.1f} {table_bytes(engine, args.pg) * scale / 1e6:9.1f} "
+              f"{read_us:12.2f}")
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
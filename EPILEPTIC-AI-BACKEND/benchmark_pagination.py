@@ -0,0 +1,98 @@
+"""
+Benchmark: OFFSET vs keyset (cursor) pagination on a large biometric history.
+
+One patient gets --rows samples (one per second). The script times fetching
+a page at increasing depths with OFFSET and with the (recorded_at, id)
+keyset used by the API, then compares the size of the serialized 24h
+response before (every row at once) and after pagination (one capped page).
+Runs on SQLite by default; --pg uses DATABASE_URL (PostgreSQL).
+
+Usage:
+    python benchmark_pagination.py --rows 500000 --page-size 500
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+import app.main  # noqa: F401  (registers every model)
+from app.core.config import settings
+from app.core.database import Base
+from app.core.pagination import encode_cursor, keyset
+from app.models.biometric import Biometric
+from app.schemas.biometric import BiometricInDB
+
+
+def seed(engine, rows):
+    start = datetime.utcnow() - timedelta(seconds=rows)
+    with engine.begin() as conn:
+        for offset in range(0, rows, 50_000):
+            conn.execute(insert(Biometric), [
+                {"patient_id": 1, "heart_rate": 60 + i % 40, "spo2": 97.0,
+                 "recorded_at": start + timedelta(seconds=i)}
+                for i in range(offset, min(rows, offset + 50_000))
+            ])
+
+
+def timed(db, statement, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = db.execute(statement).scalars().all()
+        best = min(best, time.perf_counter() - started)
+        db.expunge_all()
+    return best * 1000, rows
+
+
+def serialized_size(rows):
+    return len(json.dumps([BiometricInDB.model_validate(r).model_dump(mode="json") for r in rows]))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--page-size", type=int, default=settings.TIME_SERIES_MAX_PAGE_SIZE)
+    parser.add_argument("--pg", action="store_true", help="use DATABASE_URL (PostgreSQL)")
+    args = parser.parse_args()
+
+    url = settings.DATABASE_URL if args.pg else f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    seed(engine, args.rows)
+
+    base = select(Biometric).where(Biometric.patient_id == 1)
+    ordered = base.order_by(Biometric.recorded_at.desc(), Biometric.id.desc())
+
+    with Session(engine) as db:
+        print(f"{args.rows} rows, page size {args.page_size}")
+        print(f"{'depth':>10s} {'OFFSET ms':>10s} {'keyset ms':>10s}")
+        for fraction in (0.0, 0.1, 0.5, 0.9):
+            depth = int(args.rows * fraction)
+            offset_ms, _ = timed(db, ordered.offset(depth).limit(args.page_size))
+
+            # Cursor of the row just before the page, as a client would hold it
+            cursor = None
+            if depth:
+                previous = db.execute(ordered.offset(depth - 1).limit(1)).scalars().one()
+                cursor = encode_cursor(previous.recorded_at, previous.id)
+            keyset_ms, _ = timed(db, keyset(base, Biometric.recorded_at, Biometric.id, cursor, args.page_size))
+            print(f"{depth:>10d} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+
+        since = datetime.utcnow() - timedelta(hours=24)
+        day = base.where(Biometric.recorded_at >= since)
+        full_ms, full_rows = timed(db, day.order_by(Biometric.recorded_at.desc()), repeat=1)
+        page_ms, page_rows = timed(db, keyset(day, Biometric.recorded_at, Biometric.id, None, args.page_size))
+        print(f"24h unpaginated: {len(full_rows)} rows, {serialized_size(full_rows) / 1024:.0f} KiB, {full_ms:.1f} ms")
+        print(f"24h first page:  {len(page_rows) - 1} rows, {serialized_size(page_rows[:-1]) / 1024:.0f} KiB, {page_ms:.1f} ms")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
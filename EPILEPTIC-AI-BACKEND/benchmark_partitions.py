@@ -0,0 +1,102 @@
+"""
+Benchmark: plain vs monthly-partitioned biometrics on PostgreSQL.
+
+Builds two scratch tables in a `bench` schema with the same rows
+(generate_series, ~288 rows per patient per day), then times:
+- the 30-minute sliding window query for one patient
+- retention of the oldest months: DELETE vs DETACH + DROP PARTITION
+
+Usage (needs a PostgreSQL DATABASE_URL; drops and recreates schema `bench`):
+    python benchmark_partitions.py --rows 100000000 --patients 3000
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.services.partitioning import add_months, month_start, partition_bounds
+
+
+def timed(conn, sql, params=None):
+    started = time.perf_counter()
+    result = conn.execute(text(sql), params or {})
+    elapsed = time.perf_counter() - started
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--patients", type=int, default=1000)
+    parser.add_argument("--drop-months", type=int, default=2)
+    args = parser.parse_args()
+
+    engine = create_engine(settings.DATABASE_URL)
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("This benchmark needs PostgreSQL (set DATABASE_URL)")
+
+    rows_per_patient = args.rows // args.patients
+    # One sample every 5 minutes
+    span = timedelta(minutes=5 * rows_per_patient)
+    end = datetime.utcnow()
+    start = end - span
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA IF EXISTS bench CASCADE"))
+        conn.execute(text("CREATE SCHEMA bench"))
+        columns = "id bigserial, patient_id int NOT NULL, heart_rate float, recorded_at timestamptz NOT NULL"
+        conn.execute(text(f"CREATE TABLE bench.plain ({columns}, PRIMARY KEY (id))"))
+        conn.execute(text(f"CREATE TABLE bench.parted ({columns}, PRIMARY KEY (id, recorded_at)) PARTITION BY RANGE (recorded_at)"))
+
+        month = month_start(start)
+        partitions = []
+        while month <= end:
+            lower, upper = partition_bounds(month)
+            name = f"parted_p{month.year:04d}_{month.month:02d}"
+            conn.execute(text(
+                f"CREATE TABLE bench.{name} PARTITION OF bench.parted "
+                f"FOR VALUES FROM ('{lower.isoformat()}+00') TO ('{upper.isoformat()}+00')"
+            ))
+            partitions.append((name, upper))
+            month = add_months(month, 1)
+
+        seed = (
+            "SELECT p, 60 + random() * 40, :start + (i * interval '5 minutes') "
+            "FROM generate_series(1, :patients) p, generate_series(0, :per_patient - 1) i"
+        )
+        params = {"start": start, "patients": args.patients, "per_patient": rows_per_patient}
+        for table in ("plain", "parted"):
+            seconds, _ = timed(conn, f"INSERT INTO bench.{table} (patient_id, heart_rate, recorded_at) {seed}", params)
+            conn.execute(text(f"CREATE INDEX ON bench.{table} (patient_id, recorded_at)"))
+            conn.execute(text(f"ANALYZE bench.{table}"))
+            print(f"seeded {table}: {rows_per_patient * args.patients} rows in {seconds:.1f}s")
+
+    window = (
+        "SELECT * FROM bench.{table} WHERE patient_id = :patient "
+        "AND recorded_at >= :since ORDER BY recorded_at"
+    )
+    since = end - timedelta(minutes=30)
+    with engine.connect() as conn:
+        for table in ("plain", "parted"):
+            runs = [timed(conn, window.format(table=table), {"patient": p, "since": since})[0] for p in range(1, 51)]
+            print(f"window query {table}: median {sorted(runs)[len(runs) // 2] * 1000:.2f} ms")
+
+    expired = partitions[:args.drop_months]
+    cutoff = expired[-1][1]
+    with engine.begin() as conn:
+        seconds, result = timed(conn, "DELETE FROM bench.plain WHERE recorded_at < :cutoff", {"cutoff": cutoff})
+        print(f"retention plain (DELETE {result.rowcount} rows): {seconds:.2f}s")
+
+    with engine.begin() as conn:
+        started = time.perf_counter()
+        for name, _ in expired:
+            conn.execute(text(f"ALTER TABLE bench.parted DETACH PARTITION bench.{name}"))
+            conn.execute(text(f"DROP TABLE bench.{name}"))
+        print(f"retention parted (DROP {len(expired)} partitions): {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
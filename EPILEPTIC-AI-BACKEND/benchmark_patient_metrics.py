@@ -0,0 +1,119 @@
+"""
+Benchmark: /doctors/patients/with-metrics, per-patient queries (N+1) vs
+the set-based page query.
+
+For each panel size, seeds the doctor's patients with seizures,
+predictions and biometrics, then counts the SQL statements and times one
+page of --limit patients computed both ways. Asserts that the set-based
+version issues the same number of statements whatever the panel size.
+Runs on SQLite by default; --pg uses DATABASE_URL (PostgreSQL).
+
+Usage:
+    python benchmark_patient_metrics.py --panels 100 1000 5000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, func, insert
+from sqlalchemy.orm import Session
+
+import app.main  # noqa: F401  (registers every model)
+from app.core.config import settings
+from app.core.database import Base
+from app.models.biometric import Biometric
+from app.models.patient import Patient
+from app.models.prediction import Prediction
+from app.models.seizure import Seizure
+from app.services.patient_metrics import health_status, patient_metrics_page
+from app.services.patient_state import record_biometrics, record_predictions, risk_level
+
+
+def per_patient(db, doctor_id, limit, now):
+    """Naive version: the page, then five queries per patient"""
+    patients = db.query(Patient).filter(Patient.doctor_id == doctor_id).order_by(Patient.id.desc()).limit(limit).all()
+    rows = []
+    for patient in patients:
+        prediction = db.query(Prediction).filter(Prediction.patient_id == patient.id).order_by(
+            Prediction.predicted_at.desc()).first()
+        biometric = db.query(Biometric).filter(Biometric.patient_id == patient.id).order_by(
+            Biometric.recorded_at.desc()).first()
+        seizures = db.query(Seizure).filter(Seizure.patient_id == patient.id)
+        rows.append({
+            "id": patient.id,
+            "risk_score": prediction.risk_score if prediction else 0.0,
+            "last_seizure_date": db.query(func.max(Seizure.start_time)).filter(
+                Seizure.patient_id == patient.id).scalar(),
+            "total_seizures": seizures.count(),
+            "seizures_this_month": seizures.filter(Seizure.start_time >= now - timedelta(days=30)).count(),
+            "latest_heart_rate": biometric.heart_rate if biometric else None,
+            "health_status": health_status(risk_level(prediction.risk_score) if prediction else None),
+        })
+    return sorted(rows, key=lambda row: (row["risk_score"], row["id"]), reverse=True)
+
+
+def measure(engine, fn):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    started = time.perf_counter()
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return len(statements), (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--panels", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--pg", action="store_true", help="use DATABASE_URL (PostgreSQL)")
+    args = parser.parse_args()
+
+    url = settings.DATABASE_URL if args.pg else f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    now = datetime.utcnow()
+    rng = random.Random(0)
+    next_id = 1
+    print(f"page of {args.limit} patients (statements / ms)")
+    print(f"{'panel':>6s} {'per patient':>18s} {'set-based':>16s}")
+    set_based_statements = set()
+    for doctor_id, panel in enumerate(args.panels, start=1):
+        ids = list(range(next_id, next_id + panel))
+        next_id += panel
+        with Session(engine) as db:
+            db.execute(insert(Patient), [
+                {"id": i, "email": f"patient{i}@example.com", "full_name": f"Patient {i}",
+                 "hashed_password": "x", "doctor_id": doctor_id}
+                for i in ids
+            ])
+            db.execute(insert(Seizure), [
+                {"patient_id": i, "start_time": now - timedelta(days=rng.randint(0, 120))}
+                for i in ids for _ in range(rng.randint(0, 8))
+            ])
+            predictions = [{"patient_id": i, "risk_score": rng.random(), "predicted_at": now} for i in ids]
+            biometrics = [{"patient_id": i, "recorded_at": now, "heart_rate": rng.gauss(75, 10)} for i in ids]
+            db.execute(insert(Prediction), predictions)
+            db.execute(insert(Biometric), biometrics)
+            record_predictions(db, predictions)
+            record_biometrics(db, biometrics)
+            db.commit()
+
+            naive_statements, naive_ms = measure(engine, lambda: per_patient(db, doctor_id, args.limit, now))
+            statements, ms = measure(engine, lambda: patient_metrics_page(db, doctor_id, args.limit))
+            set_based_statements.add(statements)
+        print(f"{panel:6d} {naive_statements:8d} / {naive_ms:7.1f} {statements:6d} / {ms:7.1f}")
+
+    assert len(set_based_statements) == 1, f"statement count varies with panel size: {set_based_statements}"
+
+
+if __name__ == "__main__":
+    main()
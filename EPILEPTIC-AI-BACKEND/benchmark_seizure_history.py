@@ -0,0 +1,93 @@
+"""
+Benchmark: /doctors/history, OFFSET pages of Seizure objects with lazy
+patient loads vs the joined projection with keyset pagination.
+
+Seeds --patients patients (half of them for the benchmarked doctor) with
+--seizures seizures each spread over years, then times one page of
+--limit rows at increasing depths both ways.
+Runs on SQLite by default; --pg uses DATABASE_URL (PostgreSQL).
+
+Usage:
+    python benchmark_seizure_history.py --patients 2000 --seizures 100
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+import app.main  # noqa: F401  (registers every model)
+from app.core.config import settings
+from app.core.database import Base
+from app.core.pagination import encode_cursor
+from app.models.patient import Patient
+from app.models.seizure import Seizure
+from app.services.seizure_history import history_page
+
+
+def offset_page(db, doctor_id, offset, limit):
+    """Naive version: Seizure objects, then patient.full_name / email per row"""
+    seizures = db.query(Seizure).join(Patient).filter(Patient.doctor_id == doctor_id).order_by(
+        Seizure.start_time.desc(), Seizure.id.desc()
+    ).offset(offset).limit(limit).all()
+    items = [(s.id, s.patient.full_name, s.patient.email) for s in seizures]
+    db.expire_all()  # no identity-map reuse between pages
+    return items
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--patients", type=int, default=2000)
+    parser.add_argument("--seizures", type=int, default=100, help="seizures per patient")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--pg", action="store_true", help="use DATABASE_URL (PostgreSQL)")
+    args = parser.parse_args()
+
+    url = settings.DATABASE_URL if args.pg else f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+
+    now = datetime.utcnow()
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        conn.execute(insert(Patient), [
+            {"id": i, "email": f"patient{i}@example.com", "full_name": f"Patient {i}",
+             "hashed_password": "x", "doctor_id": 1 + i % 2}
+            for i in range(1, args.patients + 1)
+        ])
+        for offset in range(0, args.patients, 500):
+            conn.execute(insert(Seizure), [
+                {"patient_id": i, "start_time": now - timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60)),
+                 "seizure_type": "focal", "symptoms": ["aura"], "after_effects": "x" * 200}
+                for i in range(offset + 1, min(args.patients, offset + 500) + 1) for _ in range(args.seizures)
+            ])
+
+    with Session(engine) as db:
+        history = db.query(Seizure.start_time, Seizure.id).join(Patient).filter(Patient.doctor_id == 1).order_by(
+            Seizure.start_time.desc(), Seizure.id.desc()
+        ).all()
+        print(f"{len(history)} seizures in the doctor's history, page of {args.limit} (ms)")
+        print(f"{'depth':>8s} {'offset + objects':>17s} {'keyset projection':>18s}")
+        for depth in (0, 1_000, 10_000, len(history) - args.limit - 1):
+            last = history[depth - 1] if depth else None
+            cursor = encode_cursor(*last) if last else None
+            naive = timed(lambda: offset_page(db, 1, depth, args.limit), args.repeat)
+            keyset = timed(lambda: history_page(db, 1, args.limit, cursor=cursor), args.repeat)
+            print(f"{depth:8d} {naive:17.2f} {keyset:18.2f}")
+
+
+if __name__ == "__main__":
+    main()
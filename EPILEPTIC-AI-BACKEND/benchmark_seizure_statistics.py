@@ -0,0 +1,106 @@
+"""
+Benchmark: /doctors/seizures/statistics, loading Seizure objects and
+bucketing in Python vs bucket_counts (date_trunc on PostgreSQL, NumPy on
+SQLite) vs the cached, incrementally updated series.
+
+Seeds --panel patients with --seizures seizures each over the last
+--days days, then times the three series (day, week, month) each way,
+and the cost of a new seizure: in-place update of the cached series vs
+recomputing the range.
+Runs on SQLite by default; --pg uses DATABASE_URL (PostgreSQL).
+
+Usage:
+    python benchmark_seizure_statistics.py --panel 2000 --seizures 25 --days 365
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+import app.main  # noqa: F401  (registers every model)
+from app.core.config import settings
+from app.core.database import Base
+from app.models.patient import Patient
+from app.models.seizure import Seizure
+from app.services.seizure_statistics import (
+    GRANULARITIES,
+    apply_seizure_delta,
+    bucket_start,
+    bucket_counts,
+    seizure_statistics,
+)
+from app.services.stats_cache import get_stats_cache
+
+
+def python_bucketing(db, doctor_id, start, end):
+    """Naive version: Seizure objects, one bucket lookup per row and granularity"""
+    seizures = db.query(Seizure).join(Patient).filter(
+        Patient.doctor_id == doctor_id, Seizure.start_time >= start, Seizure.start_time < end
+    ).all()
+    return {g: Counter(bucket_start(s.start_time, g) for s in seizures) for g in GRANULARITIES}
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--panel", type=int, default=2000)
+    parser.add_argument("--seizures", type=int, default=25, help="seizures per patient")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--pg", action="store_true", help="use DATABASE_URL (PostgreSQL)")
+    args = parser.parse_args()
+
+    url = settings.DATABASE_URL if args.pg else f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+
+    now = datetime.utcnow()
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        conn.execute(insert(Patient), [
+            {"id": i, "email": f"patient{i}@example.com", "full_name": f"Patient {i}",
+             "hashed_password": "x", "doctor_id": 1}
+            for i in range(1, args.panel + 1)
+        ])
+        conn.execute(insert(Seizure), [
+            {"patient_id": i, "start_time": now - timedelta(minutes=rng.randint(0, args.days * 24 * 60))}
+            for i in range(1, args.panel + 1) for _ in range(args.seizures)
+        ])
+
+    start = datetime.combine((now - timedelta(days=args.days - 1)).date(), datetime.min.time())
+    end = now + timedelta(days=1)
+    cache = get_stats_cache()
+    with Session(engine) as db:
+        rows = args.panel * args.seizures
+        print(f"{rows} seizures over {args.days} days, 3 series (ms)")
+        print(f"{'python bucketing':28s} {timed(lambda: python_bucketing(db, 1, start, end), args.repeat):9.1f}")
+        print(f"{'bucket_counts':28s} "
+              f"{timed(lambda: [bucket_counts(db, 1, start, end, g) for g in GRANULARITIES], args.repeat):9.1f}")
+        cache.clear()
+        seizure_statistics(db, 1, args.days)
+        print(f"{'cached':28s} {timed(lambda: seizure_statistics(db, 1, args.days), 100):9.3f}")
+
+        print("new seizure (ms)")
+        print(f"{'in-place update':28s} {timed(lambda: apply_seizure_delta(1, now, 0), 100):9.3f}")
+
+        def recompute():
+            cache.clear()
+            seizure_statistics(db, 1, args.days)
+        print(f"{'recompute range':28s} {timed(recompute, args.repeat):9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: /users/stats, five separate queries (total, active, verified,
+group by role, recent registrations) vs one conditional-aggregate query
+vs the cached admin snapshot.
+
+Seeds --users users with random roles, statuses and registration dates
+over the last year, then times the three ways.
+Runs on SQLite by default; --pg uses DATABASE_URL (PostgreSQL).
+
+Usage:
+    python benchmark_user_stats.py --users 200000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import Session
+
+import app.main  # noqa: F401  (registers every model)
+from app.core.config import settings
+from app.core.database import Base
+from app.models.user import User, UserRole
+from app.services.admin_snapshot import compute_user_stats, user_stats_snapshot
+from app.services.stats_cache import get_stats_cache
+
+
+def five_queries(db):
+    """Previous route body"""
+    since = datetime.utcnow() - timedelta(days=7)
+    return (
+        db.query(User).count(),
+        db.query(User).filter(User.is_active == True).count(),  # noqa: E712
+        db.query(User).filter(User.is_verified == True).count(),  # noqa: E712
+        db.query(User.role, func.count(User.id)).group_by(User.role).all(),
+        db.query(User).filter(User.created_at >= since).count(),
+    )
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--pg", action="store_true", help="use DATABASE_URL (PostgreSQL)")
+    args = parser.parse_args()
+
+    url = settings.DATABASE_URL if args.pg else f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+
+    now = datetime.utcnow()
+    rng = random.Random(0)
+    roles = list(UserRole)
+    with engine.begin() as conn:
+        for offset in range(0, args.users, 10_000):
+            conn.execute(insert(User), [
+                {"email": f"user{i}@example.com", "full_name": f"User {i}", "hashed_password": "x",
+                 "role": rng.choice(roles), "is_active": rng.random() < 0.9, "is_verified": rng.random() < 0.6,
+                 "created_at": now - timedelta(minutes=rng.randint(0, 365 * 24 * 60))}
+                for i in range(offset, min(args.users, offset + 10_000))
+            ])
+
+    with Session(engine) as db:
+        print(f"{args.users} users, /users/stats (ms)")
+        print(f"{'five queries':28s} {timed(lambda: five_queries(db), args.repeat):9.1f}")
+        print(f"{'one aggregate query':28s} {timed(lambda: compute_user_stats(db), args.repeat):9.1f}")
+        get_stats_cache().clear()
+        user_stats_snapshot(db)
+        print(f"{'snapshot':28s} {timed(lambda: user_stats_snapshot(db), 100):9.3f}")
+
+
+if __name__ == "__main__":
+    main()
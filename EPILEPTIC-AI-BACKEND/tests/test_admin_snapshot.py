@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.patient import Patient
+from app.models.user import User, UserRole
+from app.services.admin_snapshot import (
+    USER_STATS_KEY,
+    compute_user_stats,
+    refresh_snapshot,
+    user_stats_snapshot,
+)
+from app.services.stats_cache import get_stats_cache
+
+NOW = datetime.utcnow()
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'admin.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        User(email="admin@example.com", full_name="A", hashed_password="x", role=UserRole.ADMIN,
+             is_verified=True, created_at=NOW - timedelta(days=30)),
+        User(email="doc@example.com", full_name="D", hashed_password="x", role=UserRole.DOCTOR,
+             is_verified=True, created_at=NOW - timedelta(days=2)),
+        User(email="p1@example.com", full_name="P1", hashed_password="x", role=UserRole.PATIENT,
+             created_at=NOW - timedelta(days=1)),
+        User(email="p2@example.com", full_name="P2", hashed_password="x", role=UserRole.PATIENT,
+             is_active=False, created_at=NOW - timedelta(days=10)),
+        Patient(id=1, email="patient@example.com", full_name="P", hashed_password="x", doctor_id=1),
+    ])
+    session.commit()
+    get_stats_cache().clear()
+    yield session
+    get_stats_cache().clear()
+    session.close()
+    engine.dispose()
+
+
+def test_user_stats_in_one_query(db):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        stats = compute_user_stats(db, now=NOW)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    assert len(statements) == 1
+    assert stats == {
+        "total_users": 4,
+        "active_users": 3,
+        "verified_users": 2,
+        "users_by_role": {"admin": 1, "patient": 2, "doctor": 1},
+        "recent_registrations": 2,
+    }
+
+
+def test_snapshot_is_cached_and_invalidated_on_user_changes(db):
+    assert user_stats_snapshot(db)["total_users"] == 4
+    db.add(User(email="new@example.com", full_name="N", hashed_password="x"))
+    db.flush()
+    # Not before the commit: a refresh in between would cache the old counts
+    assert get_stats_cache().get(USER_STATS_KEY) is not None
+    db.rollback()
+    assert user_stats_snapshot(db)["total_users"] == 4
+    db.add(User(email="new@example.com", full_name="N", hashed_password="x"))
+    db.commit()
+    assert get_stats_cache().get(USER_STATS_KEY) is None
+    assert user_stats_snapshot(db)["total_users"] == 5
+
+    user = db.query(User).filter(User.email == "p2@example.com").one()
+    user.phone = "0600000000"
+    db.commit()
+    assert get_stats_cache().get(USER_STATS_KEY) is not None
+    user.is_active = True
+    db.commit()
+    assert user_stats_snapshot(db)["active_users"] == 5
+
+
+def test_refresh_fills_admin_counters(db):
+    refresh_snapshot(db)
+    cache = get_stats_cache()
+    assert cache.get(USER_STATS_KEY)["total_users"] == 4
+    assert cache.get(("dashboard", None))["total_patients"] == 1
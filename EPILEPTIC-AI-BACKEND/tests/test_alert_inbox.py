@@ -0,0 +1,202 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+from starlette.websockets import WebSocketDisconnect
+
+import app.api.v1.doctors as doctors_api
+from app.main import app
+from app.api.deps import get_doctor_scope
+from app.core.database import Base, get_db
+from app.core.pagination import NEXT_CURSOR_HEADER, keyset
+from app.models.alert import Alert
+from app.models.patient import Patient
+from app.models.user import UserRole
+from app.services import alert_inbox
+from app.services.alert_inbox import bind_event_loop, inbox_page, inbox_query
+from app.services.principal_cache import Principal
+from app.websockets.manager import manager
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+
+def _alert(patient_id, hours, **status):
+    return Alert(patient_id=patient_id, alert_type="prediction", severity="high", title="t", message="m",
+                 triggered_at=NOW - timedelta(hours=hours), **status)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'inbox.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add_all([
+        Patient(id=1, email="a@example.com", full_name="Alice", hashed_password="x", doctor_id=1),
+        Patient(id=2, email="b@example.com", full_name="Bob", hashed_password="x", doctor_id=1),
+        Patient(id=3, email="c@example.com", full_name="Carol", hashed_password="x", doctor_id=2),
+    ])
+    db.add_all([
+        _alert(1, 1), _alert(2, 2), _alert(1, 3), _alert(2, 4), _alert(3, 5),
+        _alert(1, 6, acknowledged=True),
+        _alert(2, 7, is_active=False),
+        _alert(1, 8, resolved=True),
+    ])
+    db.commit()
+    db.close()
+    yield Session
+    engine.dispose()
+
+
+def test_inbox_holds_open_alerts_of_the_doctor(session_factory):
+    db = session_factory()
+    rows, cursor = inbox_page(db, 1, limit=3)
+    assert [(row.id, row.patient_name) for row in rows] == [(1, "Alice"), (2, "Bob"), (3, "Alice")]
+    rows, cursor = inbox_page(db, 1, limit=3, cursor=cursor)
+    assert [row.id for row in rows] == [4]
+    assert cursor is None
+    assert len(inbox_page(db, None, limit=50)[0]) == 5
+    db.close()
+
+
+def test_inbox_reads_the_partial_index(session_factory):
+    db = session_factory()
+    # Mostly closed alerts, with statistics: the partial index is the selective one
+    db.execute(insert(Alert), [
+        {"patient_id": p, "alert_type": "prediction", "severity": "high", "title": "t", "message": "m",
+         "triggered_at": NOW - timedelta(days=i), "is_active": i % 2 == 0, "acknowledged": True}
+        for p in (1, 2, 3) for i in range(1, 300)
+    ])
+    db.execute(text("ANALYZE"))
+    db.commit()
+    stmt = keyset(inbox_query(1), Alert.triggered_at, Alert.id, None, 50)
+    compiled = stmt.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+    plan = " | ".join(row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}"))
+    assert "ix_alerts_active_unacknowledged" in plan
+    db.close()
+
+
+def test_changes_are_pushed_to_the_doctor_after_commit(session_factory, monkeypatch):
+    sent = []
+    release = asyncio.Event()
+
+    async def send_to_doctor(doctor_id, message):
+        await release.wait()
+        sent.append((doctor_id, message["type"], message["data"]["event"], message["data"]["alert"]["id"]))
+
+    monkeypatch.setattr(manager, "send_to_doctor", send_to_doctor)
+    loop = asyncio.new_event_loop()
+    bind_event_loop(loop)
+    db = session_factory()
+    try:
+        db.add(_alert(2, 0))
+        db.flush()
+        assert sent == []
+        db.rollback()
+        db.add(_alert(2, 0))
+        db.add(_alert(3, 0))
+        db.commit()
+        alert = db.get(Alert, 1)
+        alert.acknowledged = True
+        db.commit()
+        alert.resolved = True  # already out of the inbox
+        db.commit()
+        db.delete(db.get(Alert, 2))
+        db.delete(alert)  # closed: not announced again
+        db.commit()
+        loop.run_until_complete(asyncio.sleep(0))
+        # Pending sends are referenced until they complete
+        assert len(alert_inbox._send_tasks) == 4
+        release.set()
+        loop.run_until_complete(asyncio.sleep(0.01))
+        assert not alert_inbox._send_tasks
+    finally:
+        bind_event_loop(None)
+        loop.close()
+        db.close()
+
+    # The rolled back alert is never announced
+    assert sorted(sent) == [(1, "alert_inbox", "new", 9), (1, "alert_inbox", "resolved", 1),
+                            (1, "alert_inbox", "resolved", 2), (2, "alert_inbox", "new", 10)]
+
+
+def test_routes(session_factory, monkeypatch):
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides.update({get_db: override_get_db, get_doctor_scope: lambda: 1})
+    principals = {
+        "doctor": Principal(kind="user", id=5, email="d@example.com", role=UserRole.DOCTOR.value,
+                            doctor_id=1),
+    }
+
+    def fake_principal(db, token):
+        if token not in principals:
+            raise doctors_api.HTTPException(status_code=401)
+        return principals[token]
+
+    monkeypatch.setattr(doctors_api, "get_current_principal", fake_principal)
+    monkeypatch.setattr(doctors_api, "SessionLocal", session_factory)
+    try:
+        http = TestClient(app)
+        response = http.get("/api/v1/doctors/alerts/inbox", params={"limit": 2})
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()] == [1, 2]
+        assert NEXT_CURSOR_HEADER in response.headers
+
+        with pytest.raises(WebSocketDisconnect):
+            with http.websocket_connect("/api/v1/doctors/alerts/ws?token=bad") as socket:
+                socket.receive_json()
+        with http.websocket_connect("/api/v1/doctors/alerts/ws?token=doctor"):
+            assert manager.get_doctor_connection_count(1) == 1
+        assert manager.get_doctor_connection_count(1) == 0
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, data):
+        self.published.append((channel, data))
+
+
+def test_changes_fan_out_through_redis(session_factory, monkeypatch):
+    """With Redis, commits publish to the channel and each worker delivers to its own sockets"""
+    sent = []
+
+    async def send_to_doctor(doctor_id, message):
+        sent.append((doctor_id, message["data"]["event"], message["data"]["alert"]["id"]))
+
+    redis = _FakeRedis()
+    monkeypatch.setattr(alert_inbox, "_redis", redis)
+    monkeypatch.setattr(manager, "send_to_doctor", send_to_doctor)
+    loop = asyncio.new_event_loop()
+    bind_event_loop(loop)
+    db = session_factory()
+    try:
+        db.add(_alert(3, 0))
+        db.commit()
+        loop.run_until_complete(asyncio.sleep(0))
+        # Not pushed locally: this worker receives its own publication like the others
+        assert sent == []
+        assert [channel for channel, _ in redis.published] == [alert_inbox.INBOX_CHANNEL]
+
+        alert_inbox._deliver(loop, redis.published[0][1].encode())
+        loop.run_until_complete(asyncio.sleep(0.01))
+    finally:
+        bind_event_loop(None)
+        loop.close()
+        db.close()
+
+    assert sent == [(2, "new", 9)]
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.api.deps import get_current_patient_id
+from app.core.config import settings
+from app.core.database import Base, get_async_db, to_async_url
+from app.models.alert import Alert
+from app.models.biometric import Biometric
+from app.models.patient import Patient
+
+
+def test_async_url_mapping():
+    assert to_async_url("postgresql+psycopg2://u:p@db:5432/app") == "postgresql+asyncpg://u:p@db:5432/app"
+    assert to_async_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert to_async_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    with pytest.raises(ValueError):
+        to_async_url("mysql://u:p@db/app")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "WRITE_BEHIND_ENABLED", False)
+    path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    db = sessionmaker(bind=sync_engine)()
+    patient = Patient(email="async@example.com", full_name="Async Patient", hashed_password="x")
+    db.add(patient)
+    db.commit()
+    db.refresh(patient)
+
+    async_engine = create_async_engine(to_async_url(f"sqlite:///{path}"))
+    factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with factory() as session:
+            yield session
+
+    overrides = {
+        get_async_db: override_get_async_db,
+        get_current_patient_id: lambda: patient.id,
+    }
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides.update(overrides)
+    try:
+        yield TestClient(app), db, patient
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+        db.close()
+        sync_engine.dispose()
+
+
+def test_biometric_routes_use_async_session(client):
+    http, db, patient = client
+
+    response = http.post("/api/v1/biometrics/", json={"heart_rate": 71.0})
+    assert response.status_code == 200, response.text
+    assert response.json()["patient_id"] == patient.id
+
+    response = http.post("/api/v1/biometrics/batch", json=[{"heart_rate": 80.0}, {"heart_rate": 90.0}])
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == 2
+
+    assert db.query(Biometric).count() == 3
+    assert len(http.get("/api/v1/biometrics/?hours=1").json()) == 3
+    assert http.get("/api/v1/biometrics/latest").status_code == 200
+
+
+def test_alert_routes_use_async_session(client):
+    http, db, patient = client
+    alert = Alert(patient_id=patient.id, alert_type="prediction", severity="high",
+                  title="t", message="m", triggered_at=datetime.utcnow() - timedelta(minutes=1))
+    db.add(alert)
+    db.commit()
+
+    assert [a["id"] for a in http.get("/api/v1/alerts/unread").json()] == [alert.id]
+
+    response = http.put(f"/api/v1/alerts/{alert.id}/acknowledge")
+    assert response.status_code == 200, response.text
+    assert response.json()["acknowledged"] is True
+    assert http.get("/api/v1/alerts/unread").json() == []
+    assert http.put("/api/v1/alerts/999/acknowledge").status_code == 404
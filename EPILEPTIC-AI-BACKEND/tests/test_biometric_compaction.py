@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models.biometric import Biometric
+from app.models.biometric_rollup import BiometricRollupDay, BiometricRollupHour, BiometricRollupMinute
+from app.models.retention_checkpoint import RetentionCheckpoint
+from app.services.biometric_compaction import compact_biometrics
+from app.services.biometric_rollups import query_rollups, update_rollups
+
+NOW = datetime(2025, 6, 1, 12)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'compaction.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _seed(db, days_ago, count=48, patient_id=1, rollups=True):
+    """One sample every 30 minutes over one day"""
+    day = datetime(NOW.year, NOW.month, NOW.day) - timedelta(days=days_ago)
+    rows = [
+        {"patient_id": patient_id, "recorded_at": day + timedelta(minutes=30 * i), "heart_rate": 60.0 + i}
+        for i in range(count)
+    ]
+    for row in rows:
+        db.add(Biometric(**row))
+    if rollups:
+        update_rollups(db, rows)
+    db.commit()
+    return day
+
+
+def test_raw_rows_become_hourly_then_daily(db):
+    recent = _seed(db, days_ago=5)
+    hourly = _seed(db, days_ago=100)
+    daily = _seed(db, days_ago=400)
+
+    result = compact_biometrics(db, hourly_after_days=90, daily_after_days=365, now=NOW)
+
+    assert result["days"] == 2
+    assert result["rows_deleted"] == 96
+    assert result["days_rebuilt"] == 0
+    assert result["storage_before"]["biometrics"]["rows"] == 144
+    assert result["storage_after"]["biometrics"]["rows"] == 48
+
+    # Raw rows and minute rollups only remain for recent data
+    assert {row.recorded_at.date() for row in db.query(Biometric)} == {recent.date()}
+    assert {r.bucket_start.date() for r in db.query(BiometricRollupMinute)} == {recent.date()}
+    # Hourly rollups are kept until the daily horizon
+    assert {r.bucket_start.date() for r in db.query(BiometricRollupHour)} == {recent.date(), hourly.date()}
+    assert db.query(BiometricRollupDay).count() == 3
+
+    # Long-term history is still queryable with the same statistics
+    series = query_rollups(db, 1, daily, daily + timedelta(days=1), 86400, signals=["heart_rate"])
+    assert series["buckets"][0]["heart_rate"]["count"] == 48
+    assert series["buckets"][0]["heart_rate"]["mean"] == pytest.approx(60.0 + 23.5)
+
+
+def test_rows_without_rollups_are_rebuilt_before_deletion(db):
+    day = _seed(db, days_ago=120, rollups=False)
+
+    result = compact_biometrics(db, hourly_after_days=90, daily_after_days=365, now=NOW)
+
+    assert result["days_rebuilt"] == 1
+    assert db.query(Biometric).count() == 0
+    rollup = db.query(BiometricRollupDay).one()
+    assert rollup.bucket_start == day
+    assert rollup.heart_rate_count == 48
+    assert db.query(BiometricRollupHour).count() == 24
+
+
+def test_horizons_must_be_ordered(db):
+    with pytest.raises(ValueError):
+        compact_biometrics(db, hourly_after_days=90, daily_after_days=30, now=NOW)
+
+
+def test_rollups_are_purged_in_checkpointed_batches(db, monkeypatch):
+    monkeypatch.setattr(settings, "RETENTION_BATCH_SIZE", 10)
+    monkeypatch.setattr(settings, "RETENTION_BATCH_PAUSE_SECONDS", 0)
+    _seed(db, days_ago=400)
+    # Hourly rollups left behind by raw rows deleted before compaction
+    db.query(Biometric).delete()
+    db.commit()
+
+    result = compact_biometrics(db, hourly_after_days=90, daily_after_days=365, now=NOW, measure=False)
+
+    purge = result["rollup_purge"][BiometricRollupHour.__tablename__]
+    assert purge["completed"] and purge["batches"] == 3
+    assert result["hourly_rollups_deleted"] == 24
+    assert result["rollup_purge"][BiometricRollupMinute.__tablename__]["rows_deleted"] == 48
+    assert db.query(BiometricRollupHour).count() == 0
+    assert db.query(BiometricRollupMinute).count() == 0
+    assert db.query(BiometricRollupDay).count() == 1
+    # Passes completed: the next run starts over
+    assert {c.last_id for c in db.query(RetentionCheckpoint)} == {0}
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.biometric import Biometric
+from app.models.biometric_rollup import BiometricRollupDay, BiometricRollupHour, BiometricRollupMinute
+from app.services.biometric_rollups import backfill_rollups, query_rollups, update_rollups
+from app.services.write_behind import WriteBehindBuffer
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollups.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+START = datetime(2025, 3, 1)
+
+
+def _samples(count=240, patient_id=1):
+    """One sample every 30 s, HR ramps 60 -> 99"""
+    return [
+        {
+            "patient_id": patient_id,
+            "recorded_at": START + timedelta(seconds=30 * i),
+            "heart_rate": 60.0 + i % 40,
+            "heart_rate_variability": None if i % 2 else 50.0,
+        }
+        for i in range(count)
+    ]
+
+
+def _rollup_snapshot(db, model):
+    return [
+        (r.bucket_start, r.heart_rate_count, round(r.heart_rate_mean, 9), r.heart_rate_min,
+         r.heart_rate_max, round(r.heart_rate_sumsq, 6), r.heart_rate_variability_count)
+        for r in db.query(model).order_by(model.bucket_start)
+    ]
+
+
+def test_incremental_updates_match_backfill(session_factory):
+    samples = _samples()
+    db = session_factory()
+    try:
+        # Insert in three uneven batches, like successive commits
+        for batch in (samples[:7], samples[7:150], samples[150:]):
+            for row in batch:
+                db.add(Biometric(**row))
+            update_rollups(db, batch)
+            db.commit()
+
+        incremental = {m: _rollup_snapshot(db, m) for m in (BiometricRollupMinute, BiometricRollupHour, BiometricRollupDay)}
+        assert len(incremental[BiometricRollupMinute]) == 120
+        assert len(incremental[BiometricRollupHour]) == 2
+        assert len(incremental[BiometricRollupDay]) == 1
+
+        hr = np.array([s["heart_rate"] for s in samples])
+        day = db.query(BiometricRollupDay).one()
+        assert day.heart_rate_count == 240
+        assert day.heart_rate_mean == pytest.approx(hr.mean())
+        assert (day.heart_rate_min, day.heart_rate_max) == (60.0, 99.0)
+        assert day.heart_rate_sumsq == pytest.approx((hr ** 2).sum())
+        assert day.heart_rate_variability_count == 120
+        assert day.stress_level_count == 0 and day.stress_level_mean is None
+
+        assert backfill_rollups(db) == {"patients": 1, "samples": 240}
+        for model, snapshot in incremental.items():
+            assert _rollup_snapshot(db, model) == snapshot
+    finally:
+        db.close()
+
+
+def test_query_picks_coarsest_rollup(session_factory):
+    db = session_factory()
+    try:
+        samples = _samples()
+        update_rollups(db, samples)
+        db.commit()
+
+        hourly = query_rollups(db, 1, START, START + timedelta(days=1), 3600)
+        assert hourly["source"] == "biometric_rollups_1h"
+        assert [b["bucket_start"] for b in hourly["buckets"]] == [START, START + timedelta(hours=1)]
+        first_hour = np.array([s["heart_rate"] for s in samples[:120]])
+        assert hourly["buckets"][0]["heart_rate"]["mean"] == pytest.approx(first_hour.mean())
+        assert hourly["buckets"][0]["heart_rate"]["std"] == pytest.approx(first_hour.std())
+
+        # 15-minute buckets are re-aggregated from the minute rollup
+        quarter = query_rollups(db, 1, START, START + timedelta(hours=2), 900)
+        assert quarter["source"] == "biometric_rollups_1m"
+        assert len(quarter["buckets"]) == 8
+        assert quarter["buckets"][0]["heart_rate"]["count"] == 30
+
+        # Daily resolution over unaligned bounds falls back to finer rollups
+        unaligned = query_rollups(db, 1, START + timedelta(hours=1), START + timedelta(days=2), 86400)
+        assert unaligned["source"] == "biometric_rollups_1h"
+        assert unaligned["buckets"][0]["heart_rate"]["count"] == 120
+
+        with pytest.raises(ValueError):
+            query_rollups(db, 1, START, START + timedelta(hours=1), 30)
+    finally:
+        db.close()
+
+
+def test_write_behind_flush_updates_rollups(session_factory, tmp_path):
+    buffer = WriteBehindBuffer(session_factory=session_factory, max_batch=1000,
+                               spool_path=str(tmp_path / "write_behind.jsonl"))
+    for row in _samples(count=10):
+        buffer.add(Biometric(**row))
+    assert buffer.flush() == 10
+
+    db = session_factory()
+    try:
+        assert db.query(BiometricRollupHour).one().heart_rate_count == 10
+    finally:
+        db.close()
@@ -0,0 +1,68 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+pytest.importorskip("pyarrow")
+
+from app.core.database import Base
+from app.models.biometric import Biometric
+from app.models.prediction import Prediction
+from app.services.columnar_export import export_files, export_history, load_arrays, load_day
+
+START = datetime(2026, 3, 1, 22, 0)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    # 4 hours every 5 minutes for two patients: spans two days
+    session.execute(insert(Biometric), [
+        {"patient_id": pid, "recorded_at": START + timedelta(minutes=5 * i),
+         "heart_rate": None if i == 3 else 60.0 + i, "source": "apple_watch" if i % 2 else "healthkit"}
+        for pid in (1, 2) for i in range(48)
+    ])
+    session.execute(insert(Prediction), [
+        {"patient_id": 1, "predicted_at": START + timedelta(hours=i), "risk_score": 0.1 * i,
+         "features_used": {"hr_mean": 70}, "seizure_occurred": None if i else True}
+        for i in range(4)
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_export_partitions_by_patient_and_day(db, tmp_path):
+    root = tmp_path / "columnar"
+    result = export_history(db, root=str(root))
+
+    assert result["biometrics"]["rows"] == 96
+    assert result["biometrics"]["files"] == 4
+    assert result["predictions"]["files"] == 2
+    assert [p.name for p in export_files("biometrics", 1, root=str(root))] == ["2026-03-01.arrow", "2026-03-02.arrow"]
+    assert export_files("biometrics", 2, start=date(2026, 3, 2), root=str(root))[0].parent.name == "patient_id=2"
+
+
+def test_reader_memory_maps_float32_columns(db, tmp_path):
+    root = tmp_path / "columnar"
+    export_history(db, patient_id=1, root=str(root))
+
+    day = load_day(export_files("biometrics", 1, root=str(root))[0], ["recorded_at", "heart_rate", "source"])
+    assert day["heart_rate"].dtype == np.float32
+    assert np.isnan(day["heart_rate"][3])
+    assert day["recorded_at"].dtype == np.dtype("datetime64[us]")
+    assert set(day["source"]) == {"apple_watch", "healthkit"}
+
+    arrays = load_arrays("biometrics", 1, root=str(root))
+    assert len(arrays["heart_rate"]) == 48
+    assert np.all(np.diff(arrays["recorded_at"].astype(np.int64)) > 0)
+    assert set(arrays["patient_id"]) == {1}
+
+    predictions = load_arrays("predictions", root=str(root), columns=["risk_score", "seizure_occurred"])
+    assert predictions["risk_score"].dtype == np.float32
+    assert list(predictions["seizure_occurred"]) == [1, -1, -1, -1]
@@ -0,0 +1,82 @@
+import gzip
+import json
+import zlib
+
+import pytest
+import zstandard
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core.compression import RequestDecompressionMiddleware
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(RequestDecompressionMiddleware, max_size=64 * 1024, paths=["/ingest"])
+
+    @app.post("/ingest")
+    async def ingest(request: Request):
+        payload = await request.json()
+        return {"count": len(payload), "content_length": request.headers.get("content-length")}
+
+    @app.post("/other")
+    async def other(request: Request):
+        return {"size": len(await request.body())}
+
+    return TestClient(app)
+
+
+def _payload():
+    return json.dumps([
+        {"heart_rate": 70 + i % 5, "heart_rate_variability": 45.0, "recorded_at": "2025-01-01T10:00:00"}
+        for i in range(200)
+    ]).encode()
+
+
+@pytest.mark.parametrize("encoding,compress", [
+    ("gzip", gzip.compress),
+    ("deflate", zlib.compress),
+    ("zstd", lambda data: zstandard.ZstdCompressor().compress(data)),
+])
+def test_compressed_body_is_decoded(client, encoding, compress):
+    raw = _payload()
+    response = client.post("/ingest", content=compress(raw), headers={
+        "Content-Type": "application/json", "Content-Encoding": encoding
+    })
+    assert response.status_code == 200
+    assert response.json() == {"count": 200, "content_length": str(len(raw))}
+
+
+def test_plain_body_and_other_paths_untouched(client):
+    assert client.post("/ingest", content=_payload()).json()["count"] == 200
+
+    compressed = gzip.compress(b"x" * 1000)
+    response = client.post("/other", content=compressed, headers={"Content-Encoding": "gzip"})
+    assert response.json() == {"size": len(compressed)}
+
+
+@pytest.mark.parametrize("encoding,compress", [
+    ("gzip", gzip.compress),
+    ("zstd", lambda data: zstandard.ZstdCompressor().compress(data)),
+])
+def test_zip_bomb_rejected(client, encoding, compress):
+    bomb = compress(b"0" * (10 * 1024 * 1024))
+    response = client.post("/ingest", content=bomb, headers={"Content-Encoding": encoding})
+    assert response.status_code == 413
+
+
+def test_invalid_and_unsupported_encodings(client):
+    corrupt = client.post("/ingest", content=b"not gzip", headers={"Content-Encoding": "gzip"})
+    assert corrupt.status_code == 400
+
+    truncated = gzip.compress(_payload())[:-20]
+    response = client.post("/ingest", content=truncated, headers={"Content-Encoding": "gzip"})
+    assert response.status_code == 400
+
+    truncated = zstandard.ZstdCompressor().compress(_payload())[:-20]
+    response = client.post("/ingest", content=truncated, headers={"Content-Encoding": "zstd"})
+    assert response.status_code == 400
+
+    response = client.post("/ingest", content=b"{}", headers={"Content-Encoding": "br"})
+    assert response.status_code == 415
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.alert import Alert
+from app.models.patient import Patient
+from app.models.seizure import Seizure
+from app.services.dashboard_stats import compute_dashboard_stats, get_dashboard_stats
+from app.services.patient_state import record_predictions
+from app.services.stats_cache import get_stats_cache
+
+NOW = datetime.utcnow()
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'dashboard.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Patient(id=i, email=f"p{i}@example.com", full_name=f"P{i}", hashed_password="x", doctor_id=1 if i < 4 else 2)
+        for i in range(1, 6)
+    ])
+    session.add_all([
+        Seizure(patient_id=1, start_time=NOW - timedelta(days=2)),
+        Seizure(patient_id=1, start_time=NOW - timedelta(days=20)),
+        Seizure(patient_id=2, start_time=NOW - timedelta(days=3)),
+        Seizure(patient_id=2, start_time=NOW - timedelta(days=60)),
+        Seizure(patient_id=4, start_time=NOW - timedelta(days=1)),
+        Alert(patient_id=1, alert_type="seizure_prediction", severity="high", title="t", message="m"),
+        Alert(patient_id=3, alert_type="seizure_prediction", severity="high", title="t", message="m",
+              is_active=False),
+    ])
+    record_predictions(session, [
+        {"patient_id": 1, "risk_score": 0.9, "predicted_at": NOW},
+        {"patient_id": 2, "risk_score": 0.7, "predicted_at": NOW},
+        {"patient_id": 3, "risk_score": 0.1, "predicted_at": NOW},
+    ])
+    session.commit()
+    get_stats_cache().clear()
+    yield session
+    get_stats_cache().clear()
+    session.close()
+    engine.dispose()
+
+
+def test_counts_are_scoped_to_the_doctor(db):
+    assert compute_dashboard_stats(db, 1) == {
+        "total_patients": 3,
+        "recent_seizures_this_week": 2,
+        "recent_seizures_this_month": 3,
+        "critical_patients": 1,
+        "high_risk_patients": 1,
+        "active_alerts": 1,
+    }
+    assert compute_dashboard_stats(db, None)["total_patients"] == 5
+    assert compute_dashboard_stats(db, None)["recent_seizures_this_week"] == 3
+    assert compute_dashboard_stats(db, 99)["total_patients"] == 0
+
+
+def test_stats_are_one_query(db):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        compute_dashboard_stats(db, 1)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert len(statements) == 1
+
+
+def test_cache_is_invalidated_by_new_seizures_and_alerts(db):
+    assert get_dashboard_stats(db, 1)["recent_seizures_this_week"] == 2
+
+    db.add(Seizure(patient_id=3, start_time=NOW))
+    db.commit()
+    assert get_dashboard_stats(db, 1)["recent_seizures_this_week"] == 3
+
+    db.add(Alert(patient_id=2, alert_type="seizure_prediction", severity="high", title="t", message="m"))
+    db.commit()
+    assert get_dashboard_stats(db, 1)["active_alerts"] == 2
+
+    # Another doctor's seizure keeps this doctor's entry cached
+    hits = get_stats_cache().stats()["hits"]
+    db.add(Seizure(patient_id=5, start_time=NOW))
+    db.commit()
+    get_dashboard_stats(db, 1)
+    assert get_stats_cache().stats()["hits"] == hits + 1
+
+
+def test_reassignment_invalidates_both_doctors(db):
+    assert get_dashboard_stats(db, 1)["total_patients"] == 3
+    assert get_dashboard_stats(db, 2)["total_patients"] == 2
+
+    db.get(Patient, 3).doctor_id = 2
+    db.commit()
+    assert get_dashboard_stats(db, 1)["total_patients"] == 2
+    assert get_dashboard_stats(db, 2)["total_patients"] == 3
+
+
+def test_invalidation_waits_for_commit(db):
+    cache = get_stats_cache()
+    get_dashboard_stats(db, 1)
+    db.add(Seizure(patient_id=1, start_time=NOW))
+    db.flush()
+    assert cache.get(("dashboard", 1)) is not None
+    db.rollback()
+    assert cache.get(("dashboard", 1)) is not None
+
+    db.add(Seizure(patient_id=1, start_time=NOW))
+    db.flush()
+    assert cache.get(("dashboard", 1)) is not None
+    db.commit()
+    assert cache.get(("dashboard", 1)) is None
+    assert cache.get(("dashboard", None)) is None
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.tasks.data_sync as data_sync
+from app.core.database import Base
+from app.models.biometric import Biometric
+from app.models.patient import Patient
+from app.models.sync_cursor import SyncCursor
+
+SLOT = datetime(2026, 3, 1, 10, 0)
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sync.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(Patient(id=1, email="a@example.com", full_name="Alice", hashed_password="x"))
+    db.commit()
+    db.close()
+    monkeypatch.setattr(data_sync, "SessionLocal", Session)
+    yield Session
+    engine.dispose()
+
+
+def test_partly_imported_slot_is_filled_not_duplicated(session_factory):
+    # First sync: heart rate reached 10:00, HRV only 09:55
+    rows = [{"recorded_at": SLOT, "heart_rate": 70.0, "patient_id": 1, "source": "healthkit"}]
+    data_sync._store_synced_rows(1, rows, {}, {"heart_rate": SLOT, "heart_rate_variability": SLOT - timedelta(minutes=5)})
+
+    cursors = data_sync._load_sync_cursors(1)
+    assert cursors["heart_rate"] == SLOT
+
+    # Re-sync: the 10:00 HRV sample lands in the slot already imported
+    rows = [
+        {"recorded_at": SLOT, "heart_rate_variability": 50.0, "patient_id": 1, "source": "healthkit"},
+        {"recorded_at": SLOT + timedelta(minutes=5), "heart_rate": 72.0, "patient_id": 1, "source": "healthkit"},
+    ]
+    data_sync._store_synced_rows(1, rows, cursors, {"heart_rate_variability": SLOT, "heart_rate": rows[1]["recorded_at"]})
+
+    db = session_factory()
+    stored = db.query(Biometric).order_by(Biometric.recorded_at).all()
+    assert [(b.heart_rate, b.heart_rate_variability) for b in stored] == [(70.0, 50.0), (72.0, None)]
+    assert db.query(SyncCursor).count() == 2
+    db.close()
+
+
+def test_unknown_patient_has_no_cursors(session_factory):
+    assert data_sync._load_sync_cursors(42) is None
@@ -0,0 +1,130 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.api.v1.users import get_current_admin_user
+from app.api.deps import (
+    get_current_admin_or_doctor, get_current_doctor_user, get_current_patient_user, get_doctor_scope
+)
+from app.core.database import Base, get_db
+from app.models.doctor import Doctor
+from app.models.medication import Medication
+from app.models.patient import Patient
+from app.models.user import User, UserRole
+from app.services.principal_cache import build_principal
+
+
+@pytest.fixture
+def client(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'assign.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    doctors = [Doctor(email=f"doc{i}@example.com", full_name=f"Doc {i}", hashed_password="x") for i in (1, 2)]
+    db.add_all(doctors)
+    db.commit()
+    db.add_all([
+        Patient(email=f"p{i}@example.com", full_name=f"P{i}", hashed_password="x",
+                doctor_id=doctors[i % 2].id, treating_neurologist=doctors[i % 2].email)
+        for i in range(6)
+    ])
+    db.commit()
+
+    def override_get_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    scope = {"doctor_id": doctors[0].id}
+    caller = User(email=doctors[0].email, full_name="Doc 1", role=UserRole.DOCTOR, hashed_password="x")
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides.update({
+        get_db: override_get_db,
+        get_current_admin_or_doctor: lambda: caller,
+        get_current_doctor_user: lambda: caller,
+        get_doctor_scope: lambda: scope["doctor_id"],
+    })
+    try:
+        yield TestClient(app), db, doctors, scope
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+        db.close()
+        engine.dispose()
+
+
+def test_doctor_sees_only_assigned_patients(client):
+    http, db, doctors, scope = client
+    patients = http.get("/api/v1/doctors/patients").json()
+    assert sorted(p["email"] for p in patients) == ["p0@example.com", "p2@example.com", "p4@example.com"]
+    assert {p["doctor_id"] for p in patients} == {doctors[0].id}
+
+    other = db.query(Patient).filter(Patient.doctor_id == doctors[1].id).first()
+    assert http.get(f"/api/v1/doctors/patients/{other.id}").status_code == 404
+    assert http.get(f"/api/v1/doctors/patients/{other.id}/medications").status_code == 404
+    assert http.put(f"/api/v1/doctors/patients/{other.id}", json={"phone": "1"}).status_code == 403
+
+    medication = Medication(patient_id=other.id, name="Levetiracetam", dosage="500mg", frequency="twice daily")
+    db.add(medication)
+    db.commit()
+    path = f"/api/v1/doctors/patients/{other.id}/medications/{medication.id}"
+    assert http.put(path, json={"dosage": "1000mg"}).status_code == 404
+    assert http.delete(path).status_code == 404
+    db.refresh(medication)
+    assert medication.dosage == "500mg"
+
+    scope["doctor_id"] = None  # admin
+    assert len(http.get("/api/v1/doctors/patients").json()) == 6
+
+
+def test_reassignment_by_email_updates_doctor_id(client):
+    http, db, doctors, scope = client
+    mine = db.query(Patient).filter(Patient.doctor_id == doctors[0].id).first()
+
+    response = http.put(f"/api/v1/doctors/patients/{mine.id}", json={"treating_neurologist": doctors[1].email})
+    assert response.status_code == 200, response.text
+    assert response.json()["doctor_id"] == doctors[1].id
+    assert http.get(f"/api/v1/doctors/patients/{mine.id}").status_code == 404
+
+
+def test_patient_choosing_a_neurologist_updates_doctor_id(client):
+    http, db, doctors, scope = client
+    patient = db.query(Patient).filter(Patient.doctor_id == doctors[0].id).first()
+    app.dependency_overrides[get_current_patient_user] = lambda: User(
+        email=patient.email, full_name=patient.full_name, role=UserRole.PATIENT, hashed_password="x"
+    )
+
+    response = http.put("/api/v1/patients/me", json={"treating_neurologist": doctors[1].email})
+    assert response.status_code == 200, response.text
+    assert response.json()["doctor_id"] == doctors[1].id
+    assert http.get(f"/api/v1/doctors/patients/{patient.id}").status_code == 404
+
+    response = http.put("/api/v1/patients/me", json={"treating_neurologist": "nobody@example.com"})
+    assert response.json()["doctor_id"] is None
+
+
+def test_admin_created_doctor_gets_a_doctor_profile(client):
+    http, db, doctors, scope = client
+    waiting = db.query(Patient).first()
+    waiting.doctor_id, waiting.treating_neurologist = None, "new.doc@example.com"
+    db.commit()
+    app.dependency_overrides[get_current_admin_user] = lambda: User(
+        email="admin@example.com", full_name="Admin", role=UserRole.ADMIN, hashed_password="x"
+    )
+
+    response = http.post("/api/v1/users/", json={
+        "email": "new.doc@example.com", "full_name": "New Doc", "role": "doctor",
+        "password": "secret-pass", "confirm_password": "secret-pass",
+    })
+    assert response.status_code == 201, response.text
+
+    db.expire_all()
+    doctor = db.query(Doctor).filter(Doctor.email == "new.doc@example.com").one()
+    user = db.query(User).filter(User.email == "new.doc@example.com").one()
+    assert doctor.hashed_password == user.hashed_password
+    assert build_principal(db, user).doctor_id == doctor.id
+    assert db.get(Patient, waiting.id).doctor_id == doctor.id
@@ -0,0 +1,100 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.feature_codec import (
+    FEATURE_SCHEMA_VERSION,
+    decode_features,
+    encode_features,
+    feature_names,
+    features_matrix,
+)
+from app.models.prediction import Prediction
+from app.schemas.prediction import PredictionResult
+from app.services.write_behind import WriteBehindBuffer
+
+FEATURES = {
+    "heart_rate": {"mean": 82.5, "std": 3.25, "min": 78.0, "max": 88.0, "current": 88.0,
+                   "slope": 1.5, "acceleration": 0.25, "data_points": 6},
+    "heart_rate_variability": {"mean": 42.0, "std": 2.0, "current": 40.0, "slope": -0.5, "rmssd": 1.75},
+    "movement": {"intensity_mean": 0.5, "intensity_std": 0.125, "current": 0.75, "slope": 0.0},
+    "stress": {"level_mean": 4.5, "level_std": 0.5, "max": 5.0, "current": 5.0, "slope": 0.25},
+    "metadata": {"total_biometric_records": 6, "window_minutes": 30, "data_completeness": 1.0,
+                 "first_recorded": "2026-03-01T10:00:00", "last_recorded": "2026-03-01T10:25:00",
+                 "device_source": "apple_watch"},
+}
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'features.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def test_round_trip_keeps_numeric_fields_only():
+    blob = encode_features(FEATURES)
+    assert len(blob) == 4 + 4 * len(feature_names())
+
+    decoded = decode_features(blob)
+    assert decoded["heart_rate"] == FEATURES["heart_rate"]
+    assert decoded["heart_rate"]["data_points"] == 6
+    assert decoded["metadata"] == {"total_biometric_records": 6, "window_minutes": 30, "data_completeness": 1.0}
+
+
+def test_missing_fields_are_nan_and_omitted():
+    blob = encode_features({"heart_rate": {"mean": 70.0}, "unknown": {"x": 1.0}})
+    assert decode_features(blob) == {"heart_rate": {"mean": 70.0}}
+    assert encode_features({}) is None
+    assert decode_features(None) is None
+
+
+def test_matrix_stacks_vectors_in_schema_order():
+    matrix = features_matrix([encode_features(FEATURES), None])
+    assert matrix.shape == (2, len(feature_names()))
+    assert matrix.dtype == np.float32
+    assert matrix[0, feature_names().index("stress.max")] == 5.0
+    assert np.isnan(matrix[1]).all()
+
+
+def test_unknown_version_is_rejected():
+    blob = bytearray(encode_features(FEATURES))
+    blob[0] = FEATURE_SCHEMA_VERSION + 1
+    with pytest.raises(ValueError):
+        decode_features(bytes(blob))
+
+
+def test_api_schema_decodes_vector_and_legacy_json(session_factory):
+    db = session_factory()
+    db.add_all([
+        Prediction(patient_id=1, risk_score=0.4, features_vector=encode_features(FEATURES)),
+        Prediction(patient_id=1, risk_score=0.2, features_used={"hr_mean": 70}),
+    ])
+    db.commit()
+
+    results = [PredictionResult.model_validate(p) for p in db.query(Prediction).order_by(Prediction.id)]
+    assert results[0].features_used["stress"]["current"] == 5.0
+    assert results[1].features_used == {"hr_mean": 70}
+    db.close()
+
+
+def test_spool_recovery_keeps_vector_bytes(session_factory, tmp_path):
+    spool = tmp_path / "write_behind.jsonl"
+    crashed = WriteBehindBuffer(session_factory=session_factory, max_batch=100, spool_path=str(spool))
+    crashed.add(Prediction(patient_id=1, risk_score=0.3, predicted_at=datetime(2026, 3, 1),
+                           features_vector=encode_features(FEATURES)))
+    crashed._spool_file.close()
+    crashed._owner_lock.close()
+
+    restarted = WriteBehindBuffer(session_factory=session_factory, max_batch=100, spool_path=str(spool))
+    assert restarted.recover() == 1
+    assert restarted.flush() == 1
+
+    db = session_factory()
+    assert decode_features(db.query(Prediction).one().features_vector)["heart_rate"]["max"] == 88.0
+    db.close()
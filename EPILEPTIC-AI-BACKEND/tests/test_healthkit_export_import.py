@@ -0,0 +1,116 @@
+import zipfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.biometric import Biometric
+from app.services.healthkit_export_import import EXPORT_SOURCE, HealthKitExportImporter
+
+EXPORT_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE HealthData [
+<!ELEMENT HealthData (ExportDate,Me,(Record|Correlation|Workout)*)>
+]>
+<HealthData locale="en_US">
+ <ExportDate value="2025-02-02 12:00:00 +0000"/>
+ <Me HKCharacteristicTypeIdentifierDateOfBirth="1990-01-01"/>
+ <Record type="HKQuantityTypeIdentifierHeartRate" unit="count/min" startDate="2025-01-31 23:50:00 +0000" endDate="2025-01-31 23:50:00 +0000" value="62">
+  <MetadataEntry key="HKMetadataKeyHeartRateMotionContext" value="1"/>
+ </Record>
+ <Record type="HKQuantityTypeIdentifierHeartRate" unit="count/min" startDate="2025-02-01 09:00:00 +0100" endDate="2025-02-01 09:00:00 +0100" value="70"/>
+ <Record type="HKQuantityTypeIdentifierHeartRate" unit="count/min" startDate="2025-02-01 08:05:00 +0000" endDate="2025-02-01 08:05:00 +0000" value="75"/>
+ <Record type="HKQuantityTypeIdentifierHeartRateVariabilitySDNN" unit="ms" startDate="2025-02-01 08:00:00 +0000" endDate="2025-02-01 08:01:00 +0000" value="48"/>
+ <Record type="HKQuantityTypeIdentifierStepCount" unit="count" startDate="2025-02-01 08:00:00 +0000" endDate="2025-02-01 08:10:00 +0000" value="500"/>
+ <Record type="HKQuantityTypeIdentifierAppleExerciseTime" unit="min" startDate="2025-02-01 08:05:00 +0000" endDate="2025-02-01 08:07:00 +0000" value="1"/>
+ <Record type="HKCategoryTypeIdentifierSleepAnalysis" startDate="2025-01-31 22:00:00 +0000" endDate="2025-02-01 07:00:00 +0000" value="HKCategoryValueSleepAnalysisInBed"/>
+ <Record type="HKCategoryTypeIdentifierSleepAnalysis" startDate="2025-01-31 23:00:00 +0000" endDate="2025-02-01 03:00:00 +0000" value="HKCategoryValueSleepAnalysisAsleepCore"/>
+ <Record type="HKCategoryTypeIdentifierSleepAnalysis" startDate="2025-02-01 02:00:00 +0000" endDate="2025-02-01 06:00:00 +0000" value="HKCategoryValueSleepAnalysisAsleepREM"/>
+ <Correlation type="HKCorrelationTypeIdentifierBloodPressure" startDate="2025-02-01 08:00:00 +0000" endDate="2025-02-01 08:00:00 +0000">
+  <Record type="HKQuantityTypeIdentifierBloodPressureSystolic" unit="mmHg" startDate="2025-02-01 08:00:00 +0000" endDate="2025-02-01 08:00:00 +0000" value="120"/>
+ </Correlation>
+ <Record type="HKQuantityTypeIdentifierHeartRate" unit="count/min" startDate="broken" endDate="broken" value="80"/>
+</HealthData>
+"""
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'export_import.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def _rows(session_factory):
+    db = session_factory()
+    try:
+        return db.query(Biometric).order_by(Biometric.recorded_at).all()
+    finally:
+        db.close()
+
+
+def test_import_zip_export(tmp_path, session_factory):
+    archive = tmp_path / "export.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("apple_health_export/export.xml", EXPORT_XML)
+
+    progress = []
+    importer = HealthKitExportImporter(
+        1, str(archive), session_factory=session_factory,
+        work_dir=str(tmp_path / "work"), progress_callback=progress.append
+    )
+    summary = importer.run()
+
+    assert summary["completed"] is True
+    assert summary["records_kept"] == {
+        "heart_rate": 3, "heart_rate_variability": 1, "activity": 1, "sleep": 2
+    }
+    assert summary["months_loaded"] == 2
+    assert progress[-1]["phase"] == "loading"
+
+    rows = _rows(session_factory)
+    assert all(r.source == EXPORT_SOURCE and r.patient_id == 1 for r in rows)
+    by_time = {r.recorded_at.strftime("%m-%d %H:%M"): r for r in rows}
+    assert by_time["01-31 23:50"].heart_rate == 62
+    # Overlapping asleep segments 23:00-03:00 and 02:00-06:00 -> 7 h, at wake time
+    assert by_time["02-01 06:00"].sleep_duration == pytest.approx(7.0)
+    assert by_time["02-01 08:00"].heart_rate == 70                # +0100 converted to UTC
+    assert by_time["02-01 08:00"].heart_rate_variability == 48
+    assert by_time["02-01 08:05"].heart_rate == 75
+    assert by_time["02-01 08:05"].movement_intensity == pytest.approx(0.5)
+
+
+def test_resume_after_interruption(tmp_path, session_factory, monkeypatch):
+    export = tmp_path / "export.xml"
+    export.write_text(EXPORT_XML, encoding="utf-8")
+
+    importer = HealthKitExportImporter(
+        1, str(export), session_factory=session_factory, work_dir=str(tmp_path / "work")
+    )
+    original_write = HealthKitExportImporter._write_month
+
+    def crash_on_february(self, month, rows):
+        if month == "2025-02":
+            raise RuntimeError("worker killed")
+        original_write(self, month, rows)
+
+    monkeypatch.setattr(HealthKitExportImporter, "_write_month", crash_on_february)
+    with pytest.raises(RuntimeError):
+        importer.run()
+    assert len(_rows(session_factory)) == 1
+
+    monkeypatch.setattr(HealthKitExportImporter, "_write_month", original_write)
+    resumed = HealthKitExportImporter(
+        1, str(export), session_factory=session_factory, work_dir=str(tmp_path / "work")
+    )
+    summary = resumed.run()
+    assert summary["completed"] is True
+    first_count = len(_rows(session_factory))
+
+    # Re-running a completed import is a no-op
+    assert resumed.run()["rows_inserted"] == summary["rows_inserted"]
+    assert len(_rows(session_factory)) == first_count == summary["rows_inserted"]
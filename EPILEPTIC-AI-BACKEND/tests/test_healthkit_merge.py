@@ -0,0 +1,72 @@
+from datetime import datetime
+
+from app.services.healthkit_merge import align_healthkit_series
+
+
+def test_heart_rate_and_hrv_merge_into_dense_rows():
+    """HR every 5 min and HRV every 30 min give one row per slot"""
+    data = {
+        "heart_rate": [
+            {"timestamp": f"2025-01-01T10:{m:02d}:00", "value": 70 + m}
+            for m in range(0, 60, 5)
+        ],
+        "heart_rate_variability": [
+            {"timestamp": "2025-01-01T10:00:00", "value": 45},
+            {"timestamp": "2025-01-01T10:30:00", "value": 55},
+        ],
+    }
+
+    rows = align_healthkit_series(data, slot_minutes=5, tolerance_minutes=30)
+
+    assert len(rows) == 12
+    assert all(r["heart_rate"] is not None for r in rows)
+    assert all(r["heart_rate_variability"] is not None for r in rows)
+    assert rows[5]["heart_rate_variability"] == 45   # 10:25 -> as-of 10:00
+    assert rows[6]["heart_rate_variability"] == 55   # 10:30
+    assert rows[0]["recorded_at"] == datetime(2025, 1, 1, 10, 0)
+
+
+def test_tolerance_limits_carry_forward():
+    """Samples older than the tolerance are not carried forward"""
+    data = {
+        "heart_rate": [
+            {"timestamp": "2025-01-01T10:00:00Z", "value": 70},
+            {"timestamp": "2025-01-01T11:00:00Z", "value": 90},
+        ],
+        "heart_rate_variability": [
+            {"timestamp": "2025-01-01T10:00:00Z", "value": 50},
+        ],
+    }
+
+    rows = align_healthkit_series(data, slot_minutes=5, tolerance_minutes=15)
+
+    assert [r["heart_rate"] for r in rows] == [70, 90]
+    assert rows[1]["heart_rate_variability"] is None
+
+
+def test_sleep_and_activity_fields_and_malformed_samples():
+    """Sleep lands on its end slot; malformed samples are skipped"""
+    data = {
+        "sleep": [{
+            "start_time": "2025-01-01T22:00:00",
+            "end_time": "2025-01-02T06:00:00",
+            "duration_hours": 8,
+            "quality_score": 85,
+        }],
+        "activity": [
+            {"timestamp": "2025-01-02T06:00:00", "active_minutes": 30},
+            {"timestamp": "not-a-date", "active_minutes": 5},
+        ],
+    }
+
+    rows = align_healthkit_series(data, slot_minutes=5, tolerance_minutes=30)
+
+    assert len(rows) == 1
+    assert rows[0]["sleep_duration"] == 8
+    assert rows[0]["sleep_quality"] == 85
+    assert rows[0]["movement_intensity"] == 0.5
+    assert rows[0]["heart_rate"] is None
+
+
+def test_empty_input():
+    assert align_healthkit_series({}) == []
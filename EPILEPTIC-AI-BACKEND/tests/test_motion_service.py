@@ -0,0 +1,82 @@
+import base64
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.ai_prediction import AIPredictionService
+from app.services.motion_service import compute_motion_windows, decode_motion_chunk, store_raw_chunk
+
+
+def _packed(samples):
+    return base64.b64encode(np.asarray(samples, dtype="<f4").tobytes()).decode()
+
+
+def test_decode_rejects_partial_samples():
+    samples = decode_motion_chunk(_packed([[0.0, 0.0, 1.0], [0.1, 0.0, 1.0]]))
+    assert samples.shape == (2, 3)
+
+    with pytest.raises(ValueError):
+        decode_motion_chunk(base64.b64encode(b"\x00" * 10).decode())
+
+    for bad in (np.nan, np.inf):
+        with pytest.raises(ValueError):
+            decode_motion_chunk(_packed([[0.0, 0.0, 1.0], [bad, 0.0, 1.0]]))
+
+
+def test_windows_detect_tremor_frequency():
+    """A 5 Hz oscillation over gravity gives dominant freq 5 Hz and high energy"""
+    rate = 50.0
+    t = np.arange(int(rate * 25)) / rate  # 2 full 10 s windows + 5 s tail
+    z = 1.0 + 0.5 * np.sin(2 * np.pi * 5.0 * t)
+    samples = np.stack([np.zeros_like(t), np.zeros_like(t), z], axis=1)
+
+    rows = compute_motion_windows(samples, rate, datetime(2025, 1, 1, 10, 0), window_seconds=10)
+
+    assert [r["recorded_at"] for r in rows] == [
+        datetime(2025, 1, 1, 10, 0, 0),
+        datetime(2025, 1, 1, 10, 0, 10),
+        datetime(2025, 1, 1, 10, 0, 20),
+    ]
+    assert rows[0]["accel_dominant_freq"] == pytest.approx(5.0)
+    assert rows[0]["accel_magnitude_mean"] == pytest.approx(1.0, abs=0.01)
+    assert rows[0]["movement_intensity"] == pytest.approx(0.5 / np.sqrt(2), abs=0.01)
+
+
+def test_still_watch_has_no_motion():
+    samples = np.tile([0.0, 0.0, 1.0], (500, 1))
+    rows = compute_motion_windows(samples, 50.0, datetime(2025, 1, 1), window_seconds=10)
+    assert len(rows) == 1
+    assert rows[0]["accel_energy"] == pytest.approx(0.0)
+    assert rows[0]["accel_dominant_freq"] == 0.0
+
+
+def test_raw_chunk_cold_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MOTION_COLD_STORAGE_DIR", str(tmp_path))
+    samples = np.random.default_rng(0).normal(size=(100, 3)).astype("<f4")
+
+    path = store_raw_chunk(7, samples, 50.0, datetime(2025, 1, 1, 10, 0), "watch-1")
+
+    with np.load(path) as archive:
+        np.testing.assert_array_equal(archive["samples"], samples)
+        assert float(archive["sample_rate_hz"]) == 50.0
+
+    # Same start time from another device: separate archive, no temp file left
+    other = store_raw_chunk(7, samples[:10], 50.0, datetime(2025, 1, 1, 10, 0), "watch/2")
+    assert other != path and other.endswith("_watch_2.npz")
+    assert sorted(p.name for p in (tmp_path / "7" / "2025-01-01").iterdir()) == [
+        "100000000000_watch-1.npz", "100000000000_watch_2.npz"
+    ]
+
+
+def test_accel_magnitude_mixes_windows_and_raw_samples():
+    service = AIPredictionService.__new__(AIPredictionService)
+    biometrics = [
+        SimpleNamespace(accel_magnitude_mean=None, accelerometer_x=3.0, accelerometer_y=4.0, accelerometer_z=0.0),
+        SimpleNamespace(accel_magnitude_mean=None, accelerometer_x=None, accelerometer_y=1.0, accelerometer_z=1.0),
+        SimpleNamespace(accel_magnitude_mean=1.0, accelerometer_x=None, accelerometer_y=None, accelerometer_z=None),
+    ]
+    assert service._calculate_accel_magnitude(biometrics) == pytest.approx(3.0)
+    assert service._calculate_accel_magnitude([]) == 0.0
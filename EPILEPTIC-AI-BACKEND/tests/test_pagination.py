@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.api.deps import get_current_patient_id
+from app.core.config import settings
+from app.core.database import Base, get_async_db, to_async_url
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, keyset, page_limit, page_of
+from app.models.alert import Alert
+from app.models.biometric import Biometric
+from app.models.patient import Patient
+from app.models.prediction import Prediction
+
+
+def test_cursor_round_trip():
+    ts = datetime(2026, 3, 1, 12, 30, 15, 250000)
+    assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+
+
+def test_malformed_cursor_is_rejected():
+    for cursor in ("not-a-cursor", encode_cursor(None, 1)[:-3], "W10"):
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor(cursor)
+        assert exc.value.status_code == 400
+
+
+def test_page_limit_is_capped():
+    assert page_limit(None) == settings.DEFAULT_PAGE_SIZE
+    assert page_limit(10_000) == settings.MAX_PAGE_SIZE
+    assert page_limit(10_000, maximum=500) == 500
+    assert page_limit(None, maximum=500, default=500) == 500
+
+
+def test_rows_without_sort_value_are_paged_last(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'nulls.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    now = datetime(2026, 3, 1, 12)
+    db.add_all([
+        Patient(id=i, email=f"p{i}@example.com", full_name=f"P{i}", hashed_password="x",
+                created_at=now - timedelta(hours=i))
+        for i in range(1, 8)
+    ])
+    db.commit()
+    # Rows imported without a creation date
+    db.query(Patient).filter(Patient.id.in_([3, 6])).update({Patient.created_at: None})
+    db.commit()
+
+    seen, cursor = [], None
+    for _ in range(10):
+        rows, cursor = page_of(keyset(db.query(Patient), Patient.created_at, Patient.id, cursor, 2).all(),
+                               "created_at", 2)
+        seen += [row.id for row in rows]
+        if cursor is None:
+            break
+    assert seen == [1, 2, 4, 5, 7, 6, 3]
+    db.close()
+    engine.dispose()
+
+
+@pytest.mark.parametrize("model, column", [(Alert, Alert.triggered_at), (Prediction, Prediction.predicted_at)])
+def test_not_null_sort_columns_use_plain_tuple_comparison(model, column):
+    sql = str(keyset(select(model.id), column, model.id, encode_cursor(datetime(2026, 3, 1), 10), 5))
+    assert "NULLS" not in sql.upper()
+    assert "IS NULL" not in sql.upper()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = tmp_path / "pages.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    db = sessionmaker(bind=sync_engine)()
+    patient = Patient(email="pages@example.com", full_name="Paged Patient", hashed_password="x")
+    db.add(patient)
+    db.commit()
+    db.refresh(patient)
+
+    # Two rows share each timestamp: the id breaks the tie
+    now = datetime.utcnow().replace(microsecond=0)
+    db.add_all([
+        Biometric(patient_id=patient.id, heart_rate=60 + i, recorded_at=now - timedelta(minutes=i // 2))
+        for i in range(25)
+    ])
+    db.commit()
+
+    async_engine = create_async_engine(to_async_url(f"sqlite:///{path}"))
+    factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with factory() as session:
+            yield session
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides.update({
+        get_async_db: override_get_async_db,
+        get_current_patient_id: lambda: patient.id,
+    })
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+        db.close()
+        sync_engine.dispose()
+
+
+def test_biometrics_walk_all_pages(client):
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 10}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/biometrics/", params=params)
+        assert response.status_code == 200
+        seen.extend(row["id"] for row in response.json())
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert len(seen) == len(set(seen)) == 25
+
+
+def test_page_size_cap_and_bad_cursor(client, monkeypatch):
+    monkeypatch.setattr(settings, "TIME_SERIES_MAX_PAGE_SIZE", 5)
+    response = client.get("/api/v1/biometrics/", params={"limit": 1000})
+    assert len(response.json()) == 5
+    assert NEXT_CURSOR_HEADER in response.headers
+
+    assert client.get("/api/v1/biometrics/", params={"cursor": "garbage"}).status_code == 400
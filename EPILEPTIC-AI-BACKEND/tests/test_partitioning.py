@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.biometric import Biometric
+from app.models.prediction import Prediction
+from app.services import partitioning
+from app.services.partitioning import (
+    add_months, apply_retention, ensure_partitions, is_partitioned, partition_bounds, partition_name
+)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'partitioning.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_month_arithmetic():
+    assert add_months(datetime(2025, 11, 1), 3) == datetime(2026, 2, 1)
+    assert add_months(datetime(2025, 1, 1), -1) == datetime(2024, 12, 1)
+    assert partition_bounds(datetime(2025, 12, 17)) == (datetime(2025, 12, 1), datetime(2026, 1, 1))
+    assert partition_name("biometrics", datetime(2025, 3, 1)) == "biometrics_p2025_03"
+
+
+def test_sqlite_fallback_deletes_expired_rows(db):
+    now = datetime(2025, 6, 1)
+    for days in (10, 100, 200):
+        db.add(Biometric(patient_id=1, heart_rate=70, recorded_at=now - timedelta(days=days)))
+        db.add(Prediction(patient_id=1, risk_score=0.1, predicted_at=now - timedelta(days=days)))
+    db.commit()
+
+    assert not is_partitioned(db, "biometrics")
+    assert ensure_partitions(db, now=now) == {}
+
+    result = apply_retention(db, retention_days=90, now=now)
+
+    assert result["biometrics"] == {"mode": "delete", "rows_deleted": 2}
+    assert result["predictions"] == {"mode": "delete", "rows_deleted": 2}
+    assert db.query(Biometric).count() == 1
+    assert db.query(Prediction).count() == 1
+
+
+class _Result:
+    def __init__(self, row=None, rowcount=0):
+        self.row, self.rowcount = row, rowcount
+
+    def first(self):
+        return self.row
+
+
+class _RecordingSession:
+    """Records PostgreSQL DDL; the DEFAULT partition holds rows if default_rows"""
+
+    def __init__(self, default_rows):
+        self.default_rows = default_rows
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        if sql.startswith("SELECT 1 FROM"):
+            return _Result((1,) if self.default_rows else None)
+        return _Result(rowcount=self.default_rows)
+
+
+@pytest.mark.parametrize("default_rows", [0, 3])
+def test_late_partition_moves_rows_out_of_default(default_rows):
+    db = _RecordingSession(default_rows)
+    month = datetime(2026, 3, 1)
+    moved = partitioning._create_partition(db, "predictions", "predictions_p2026_03", month, "predictions_default")
+
+    assert moved == default_rows
+    kinds = [sql.split(" (")[0].split(" WHERE")[0] for sql in db.statements]
+    if default_rows:
+        assert kinds == [
+            'LOCK TABLE "predictions_default" IN SHARE ROW EXCLUSIVE MODE',
+            'SELECT 1 FROM "predictions_default"',
+            'CREATE TABLE "predictions_p2026_03"',
+            'WITH moved AS',
+            'ALTER TABLE "predictions" ATTACH PARTITION "predictions_p2026_03" FOR VALUES FROM',
+        ]
+    else:
+        assert db.statements[-1].startswith('CREATE TABLE IF NOT EXISTS "predictions_p2026_03" PARTITION OF')
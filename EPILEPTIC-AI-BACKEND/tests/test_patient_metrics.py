@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.api.deps import get_doctor_scope
+from app.core.database import Base, get_db
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.models.patient import Patient
+from app.models.seizure import Seizure
+from app.services.patient_metrics import patient_metrics_page
+from app.services.patient_state import record_biometrics, record_predictions
+
+NOW = datetime.utcnow()
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add_all([
+        Patient(id=i, email=f"p{i}@example.com", full_name=f"P{i}", hashed_password="x", doctor_id=1 if i < 6 else 2)
+        for i in range(1, 8)
+    ])
+    db.add_all([
+        Seizure(patient_id=1, start_time=NOW - timedelta(days=2)),
+        Seizure(patient_id=1, start_time=NOW - timedelta(days=45)),
+        Seizure(patient_id=3, start_time=NOW - timedelta(days=1)),
+    ])
+    # Patients 1..4 have a prediction, patient 5 has none
+    record_predictions(db, [
+        {"patient_id": pid, "risk_score": score, "predicted_at": NOW}
+        for pid, score in ((1, 0.5), (2, 0.9), (3, 0.65), (4, 0.1))
+    ])
+    record_biometrics(db, [{"patient_id": 2, "recorded_at": NOW, "heart_rate": 120.0}])
+    db.commit()
+    db.close()
+    yield Session
+    engine.dispose()
+
+
+def test_page_is_sorted_by_risk_with_seizure_metrics(session_factory):
+    db = session_factory()
+    rows, next_cursor = patient_metrics_page(db, 1, limit=10)
+    assert [row["id"] for row in rows] == [2, 3, 1, 4, 5]
+    assert next_cursor is None
+
+    by_id = {row["id"]: row for row in rows}
+    assert by_id[1]["total_seizures"] == 2
+    assert by_id[1]["seizures_this_month"] == 1
+    assert by_id[1]["last_seizure_date"].replace(tzinfo=None) == NOW - timedelta(days=2)
+    assert by_id[2]["latest_heart_rate"] == 120.0
+    assert by_id[2]["health_status"] == "critical"
+    assert by_id[3]["health_status"] == "high-risk"
+    assert (by_id[5]["risk_score"], by_id[5]["total_seizures"], by_id[5]["health_status"]) == (0.0, 0, "unknown")
+    db.close()
+
+
+def test_cursor_pages_and_filters(session_factory):
+    db = session_factory()
+    first, cursor = patient_metrics_page(db, 1, limit=2)
+    second, cursor = patient_metrics_page(db, 1, limit=2, cursor=cursor)
+    third, cursor = patient_metrics_page(db, 1, limit=2, cursor=cursor)
+    assert [row["id"] for row in first + second + third] == [2, 3, 1, 4, 5]
+    assert cursor is None
+
+    stable, _ = patient_metrics_page(db, 1, limit=10, status="stable")
+    assert [row["id"] for row in stable] == [1, 4]
+    newest, _ = patient_metrics_page(db, None, limit=3, sort="created_at")
+    assert len(newest) == 3
+    db.close()
+
+
+@pytest.mark.parametrize("panel", [5, 200])
+def test_query_count_does_not_grow_with_the_panel(session_factory, panel):
+    db = session_factory()
+    db.add_all([
+        Patient(email=f"extra{i}@example.com", full_name=f"E{i}", hashed_password="x", doctor_id=3)
+        for i in range(panel)
+    ])
+    db.commit()
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        rows, _ = patient_metrics_page(db, 3, limit=100)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert len(rows) == min(panel, 100)
+    assert len(statements) == 1
+    db.close()
+
+
+def test_route_sets_next_cursor(session_factory):
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides.update({get_db: override_get_db, get_doctor_scope: lambda: 1})
+    try:
+        http = TestClient(app)
+        response = http.get("/api/v1/doctors/patients/with-metrics", params={"limit": 3})
+        assert response.status_code == 200
+        assert [p["id"] for p in response.json()] == [2, 3, 1]
+        response = http.get("/api/v1/doctors/patients/with-metrics",
+                            params={"cursor": response.headers[NEXT_CURSOR_HEADER]})
+        assert [p["id"] for p in response.json()] == [4, 5]
+        assert http.get("/api/v1/doctors/patients/with-metrics", params={"sort": "name"}).status_code == 422
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
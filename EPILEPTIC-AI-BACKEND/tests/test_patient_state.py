@@ -0,0 +1,145 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.api.deps import get_current_patient_id
+from app.core.config import settings
+from app.core.database import Base, get_async_db, to_async_url
+from app.models.alert import Alert
+from app.models.patient import Patient
+from app.models.patient_latest_state import PatientLatestState
+from app.models.prediction import Prediction
+from app.services import write_behind
+from app.services.patient_state import panel_states, record_biometrics, record_predictions
+from app.services.seizure_detection_service import SeizureDetectionService
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'state.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    session.add_all([
+        Patient(id=1, email="a@example.com", full_name="A", hashed_password="x", doctor_id=7),
+        Patient(id=2, email="b@example.com", full_name="B", hashed_password="x"),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+
+def test_biometrics_advance_state_and_keep_last_non_null_signal(db):
+    record_biometrics(db, [
+        {"patient_id": 1, "recorded_at": NOW, "heart_rate": 70.0, "stress_level": 0.2},
+        {"patient_id": 1, "recorded_at": NOW + timedelta(minutes=1), "heart_rate": 75.0},
+    ])
+    db.commit()
+    record_biometrics(db, [{"patient_id": 1, "recorded_at": NOW + timedelta(minutes=2), "heart_rate": None,
+                            "heart_rate_variability": 40.0}])
+    # Older history (HealthKit backfill) does not replace the current state
+    record_biometrics(db, [{"patient_id": 1, "recorded_at": NOW - timedelta(days=1), "heart_rate": 50.0}])
+    db.commit()
+
+    state = db.get(PatientLatestState, 1)
+    db.refresh(state)
+    assert state.biometric_recorded_at == NOW + timedelta(minutes=2)
+    assert state.heart_rate == 75.0
+    assert state.heart_rate_variability == 40.0
+    assert state.stress_level == 0.2
+
+
+def test_predictions_set_risk_level(db):
+    record_predictions(db, [
+        Prediction(patient_id=1, risk_score=0.3, predicted_at=NOW),
+        Prediction(patient_id=1, risk_score=0.85, confidence=0.9, predicted_at=NOW + timedelta(minutes=5)),
+    ])
+    db.commit()
+
+    state = db.get(PatientLatestState, 1)
+    assert (state.risk_score, state.confidence, state.risk_level) == (0.85, 0.9, "critical")
+
+
+def test_alert_events_maintain_open_alert_count(db):
+    def alert():
+        return Alert(patient_id=2, alert_type="prediction", severity="high", title="t", message="m")
+
+    first, second = alert(), alert()
+    db.add_all([first, second])
+    db.commit()
+    assert db.get(PatientLatestState, 2).active_alert_count == 2
+
+    first.resolved = True
+    db.commit()
+    db.expire_all()
+    assert db.get(PatientLatestState, 2).active_alert_count == 1
+
+    db.delete(second)
+    db.commit()
+    db.expire_all()
+    assert db.get(PatientLatestState, 2).active_alert_count == 0
+
+
+def test_panel_states_single_scan_per_doctor(db):
+    record_predictions(db, [{"patient_id": 1, "risk_score": 0.65, "predicted_at": NOW}])
+    db.commit()
+
+    assert panel_states(db, 8) == []
+    panel = panel_states(db, 7)
+    assert [(p["patient_id"], p["risk_level"], p["active_alert_count"]) for p in panel] == [(1, "high", 0)]
+    assert [p["patient_id"] for p in panel_states(db)] == [1, 2]
+
+
+def test_alert_with_write_behind_updates_latest_state(db, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "WRITE_BEHIND_ENABLED", True)
+    monkeypatch.setattr(write_behind, "_write_behind_buffer_instance",
+                        write_behind.WriteBehindBuffer(session_factory=sessionmaker(bind=db.get_bind()),
+                                                       spool_path=str(tmp_path / "write_behind.jsonl")))
+    service = SeizureDetectionService()
+
+    async def predict_seizure_risk(db, patient_id, window_minutes=30, persist=True):
+        assert persist is False
+        return Prediction(patient_id=patient_id, risk_score=0.95, confidence=0.9, predicted_at=NOW)
+
+    async def start_countdown(*args):
+        pass
+
+    monkeypatch.setattr(service.ai_service, "predict_seizure_risk", predict_seizure_risk)
+    monkeypatch.setattr(service, "_start_countdown", start_countdown)
+
+    async_engine = create_async_engine(to_async_url(str(db.get_bind().url)))
+    factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def process():
+        async with factory() as session:
+            return await service.process_biometric_data(session, 1, {"heart_rate": 140.0})
+
+    async def override_get_async_db():
+        async with factory() as session:
+            yield session
+
+    result = asyncio.run(process())
+    assert result["status"] == "alert_triggered"
+
+    state = db.get(PatientLatestState, 1)
+    assert (state.predicted_at, state.risk_score, state.risk_level) == (NOW, 0.95, "critical")
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides.update({get_async_db: override_get_async_db, get_current_patient_id: lambda: 1})
+    try:
+        response = TestClient(app).get("/api/v1/predictions/latest")
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+        asyncio.run(async_engine.dispose())
+    assert response.status_code == 200
+    assert (response.json()["id"], response.json()["risk_score"]) == (result["prediction_id"], 0.95)
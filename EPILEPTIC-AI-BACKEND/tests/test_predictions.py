@@ -1,12 +1,13 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime, timedelta
 import json
 
 from app.main import app
-from app.core.database import Base, get_db
+from app.core.database import Base, get_async_db, get_db
 from app.core.security import get_password_hash
 from app.models.patient import Patient
 from app.models.biometric import Biometric
@@ -26,7 +27,15 @@ def override_get_db():
     finally:
         db.close()
 
+async_engine = create_async_engine("sqlite+aiosqlite:///./test_predictions.db")
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
 
 client = TestClient(app)
 
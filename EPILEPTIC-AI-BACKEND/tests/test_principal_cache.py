@@ -0,0 +1,110 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.security import create_access_token, get_current_principal, get_current_user
+from app.models.patient import Patient
+from app.models.user import User, UserRole
+from app.services import principal_cache
+from app.services.principal_cache import PrincipalCache, build_principal, resolve_principal
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(principal_cache, "_principal_cache_instance", PrincipalCache(backend="memory", ttl=60))
+    engine = create_engine(f"sqlite:///{tmp_path / 'principals.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: session.statements.append(statement))
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _login(db, email, user_type):
+    return create_access_token(
+        subject=email,
+        user_type=user_type,
+        principal=build_principal(db, resolve_principal(db, email, user_type))
+    )
+
+
+def test_users_table_patient_resolves_patient_id_without_queries(db):
+    db.add(User(email="p@example.com", full_name="P", hashed_password="x", role=UserRole.PATIENT))
+    db.add(Patient(email="p@example.com", full_name="P", hashed_password="x"))
+    db.commit()
+    token = _login(db, "p@example.com", "patient")
+
+    first = get_current_principal(db=db, token=token)
+    assert first.kind == "user"
+    assert first.patient_id == db.query(Patient.id).scalar()
+
+    db.statements.clear()
+    assert get_current_principal(db=db, token=token) == first
+    assert db.statements == []
+
+    # ORM object for the routes that still need it: one primary-key lookup
+    assert isinstance(get_current_user(principal=first, db=db), User)
+
+
+def test_deactivation_and_role_change_invalidate_the_cache(db):
+    user = User(email="d@example.com", full_name="D", hashed_password="x", role=UserRole.DOCTOR)
+    db.add(user)
+    db.commit()
+    token = _login(db, "d@example.com", "doctor")
+    assert get_current_principal(db=db, token=token).role == "doctor"
+
+    user.role = UserRole.ADMIN
+    db.commit()
+    assert get_current_principal(db=db, token=token).role == "admin"
+
+    user.is_active = False
+    db.commit()
+    with pytest.raises(HTTPException) as exc:
+        get_current_principal(db=db, token=token)
+    assert exc.value.status_code == 400
+
+
+def test_tokens_without_ids_are_resolved_by_email(db):
+    db.add(Patient(email="legacy@example.com", full_name="L", hashed_password="x"))
+    db.commit()
+    token = create_access_token(subject="legacy@example.com", user_type="patient")
+
+    principal = get_current_principal(db=db, token=token)
+    assert (principal.kind, principal.patient_id) == ("patient", principal.id)
+
+    with pytest.raises(HTTPException) as exc:
+        get_current_principal(db=db, token=create_access_token(subject="nobody@example.com", user_type="patient"))
+    assert exc.value.status_code == 401
+
+
+def test_invalidation_waits_for_commit_and_profile_creation(db):
+    db.add(User(email="new@example.com", full_name="N", hashed_password="x", role=UserRole.PATIENT))
+    db.commit()
+    token = _login(db, "new@example.com", "patient")
+    assert get_current_principal(db=db, token=token).patient_id is None
+
+    user = db.query(User).one()
+    user.full_name = "Renamed"
+    db.flush()
+    cache = principal_cache.get_principal_cache()
+    assert cache.get("user", user.id) is not None
+    db.rollback()
+    assert cache.get("user", user.id) is not None
+
+    # The profile row now exists: the cached principal without patient_id goes
+    db.add(Patient(email="new@example.com", full_name="N", hashed_password="x"))
+    db.flush()
+    assert cache.get("user", user.id) is not None
+    db.commit()
+    assert cache.get("user", user.id) is None
+    assert get_current_principal(db=db, token=token).patient_id == db.query(Patient.id).scalar()
+
+
+def test_memory_backend_uses_the_short_ttl():
+    assert PrincipalCache(backend="memory").ttl == principal_cache.settings.PRINCIPAL_CACHE_MEMORY_TTL_SECONDS
+    assert PrincipalCache(backend="memory", ttl=60).ttl == 60
@@ -0,0 +1,106 @@
+"""EXPLAIN QUERY PLAN checks that hot per-patient queries use the composite/partial indexes"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.alert import Alert
+from app.models.biometric import Biometric
+from app.models.prediction import Prediction
+from app.models.seizure import Seizure
+
+PATIENTS = 40
+ROWS_PER_PATIENT = 150
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('indexes') / 'seeded.db'}")
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+
+    with engine.begin() as conn:
+        for table, time_column, extra in (
+            (Biometric, "recorded_at", {"heart_rate": 70.0}),
+            (Prediction, "predicted_at", {"risk_score": 0.1}),
+            (Seizure, "start_time", {}),
+        ):
+            conn.execute(insert(table), [
+                {"patient_id": p, time_column: now - timedelta(minutes=i), **extra}
+                for p in range(1, PATIENTS + 1) for i in range(ROWS_PER_PATIENT)
+            ])
+        conn.execute(insert(Alert), [
+            {
+                "patient_id": p, "alert_type": "SEIZURE_PREDICTION", "severity": "high",
+                "title": "t", "message": "m", "triggered_at": now - timedelta(hours=i),
+                # Only the most recent alerts stay active and unacknowledged
+                "is_active": i < 3, "acknowledged": i >= 2,
+            }
+            for p in range(1, PATIENTS + 1) for i in range(ROWS_PER_PATIENT)
+        ])
+        conn.execute(text("ANALYZE"))
+
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _plan(db, query):
+    compiled = query.statement.compile(dialect=db.bind.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+def test_biometric_sliding_window_and_latest(db):
+    since = datetime.utcnow() - timedelta(minutes=30)
+    window = db.query(Biometric).filter(
+        Biometric.patient_id == 7,
+        Biometric.recorded_at >= since
+    ).order_by(Biometric.recorded_at.asc())
+    latest = db.query(Biometric).filter(
+        Biometric.patient_id == 7
+    ).order_by(Biometric.recorded_at.desc()).limit(1)
+
+    for query in (window, latest):
+        plan = _plan(db, query)
+        assert "ix_biometrics_patient_id_recorded_at" in plan
+        assert "TEMP B-TREE" not in plan  # ordered by the index, no sort step
+
+
+def test_prediction_latest(db):
+    plan = _plan(db, db.query(Prediction).filter(
+        Prediction.patient_id == 7
+    ).order_by(Prediction.predicted_at.desc()).limit(1))
+    assert "ix_predictions_patient_id_predicted_at" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_alert_history_with_active_filter(db):
+    plan = _plan(db, db.query(Alert).filter(
+        Alert.patient_id == 7,
+        Alert.triggered_at >= datetime.utcnow() - timedelta(days=7),
+        Alert.is_active == True
+    ).order_by(Alert.triggered_at.desc()))
+    assert "ix_alerts_patient_id_triggered_at_is_active" in plan or "ix_alerts_active_unacknowledged" in plan
+
+
+def test_active_unacknowledged_alerts_use_partial_index(db):
+    plan = _plan(db, db.query(Alert).filter(
+        Alert.patient_id == 7,
+        Alert.is_active == True,
+        Alert.acknowledged == False
+    ).order_by(Alert.triggered_at.desc()))
+    assert "ix_alerts_active_unacknowledged" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_seizure_history(db):
+    plan = _plan(db, db.query(Seizure).filter(
+        Seizure.patient_id == 7,
+        Seizure.start_time >= datetime.utcnow() - timedelta(days=30)
+    ).order_by(Seizure.start_time.desc()))
+    assert "ix_seizures_patient_id_start_time" in plan
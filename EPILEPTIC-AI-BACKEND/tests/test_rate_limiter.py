@@ -0,0 +1,99 @@
+import pytest
+
+from app.services import rate_limiter
+from app.services.rate_limiter import IngestionRateLimiter, MemoryTokenBuckets, retry_after_header
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_allows_burst_then_refills(clock):
+    buckets = MemoryTokenBuckets()
+    rate, burst = 1.0, 3
+
+    assert all(buckets.take("k", rate, burst).allowed for _ in range(3))
+    denied = buckets.take("k", rate, burst)
+    assert not denied.allowed
+    assert denied.retry_after == pytest.approx(1.0)
+    assert retry_after_header(denied) == {"Retry-After": "1"}
+
+    clock[0] += 1.0
+    assert buckets.take("k", rate, burst).allowed
+    # Other keys have their own bucket
+    assert buckets.take("other", rate, burst).allowed
+
+
+def test_limiter_counts_per_scope_and_device(clock):
+    limiter = IngestionRateLimiter(backend="memory")
+    limiter.enabled = True
+    limiter.limits["detect"] = (0.1, 2)
+
+    results = [limiter.check("detect", 1, "watch-a").allowed for _ in range(3)]
+    assert results == [True, True, False]
+    assert limiter.check("detect", 1, "watch-b").allowed
+    # The patient allowance (two devices) is spent: new device ids get nothing
+    assert not limiter.check("detect", 1, "watch-c").allowed
+    assert not limiter.check("detect", 1).allowed
+    assert limiter.check("detect", 2, "watch-a").allowed
+
+    stats = limiter.stats()
+    assert stats["backend"] == "memory"
+    assert stats["scopes"]["detect"] == {"admitted": 4, "throttled": 3, "rejected": 0}
+
+
+def test_rotating_device_ids_share_the_patient_bucket(clock):
+    limiter = IngestionRateLimiter(backend="memory")
+    limiter.enabled = True
+    limiter.limits["ingest"] = (0.1, 2)
+
+    results = [limiter.check("ingest", 1, f"device-{i}").allowed for i in range(10)]
+    assert results.count(True) == 2 * rate_limiter.settings.RATE_LIMIT_DEVICES_PER_PATIENT
+
+
+class _DownRedis:
+    def take(self, *args, **kwargs):
+        raise ConnectionError("redis down")
+
+
+def test_redis_failure_falls_back_to_memory(clock):
+    limiter = IngestionRateLimiter(backend="memory")
+    limiter.enabled = True
+    limiter._redis = _DownRedis()
+
+    assert limiter.check("ingest", 1).allowed
+    # Hard ceiling, patient bucket, then device bucket
+    assert limiter.stats()["backend_errors"] == 3
+
+
+def test_disabled_limiter_admits_everything():
+    limiter = IngestionRateLimiter(backend="memory")
+    limiter.enabled = False
+    limiter.limits["ingest"] = (0.001, 1)
+    assert all(limiter.check("ingest", 1).allowed for _ in range(10))
+
+
+def test_hard_ceiling_rejects(clock, monkeypatch):
+    monkeypatch.setattr(rate_limiter.settings, "RATE_LIMIT_DEVICES_PER_PATIENT", 1)
+    monkeypatch.setattr(rate_limiter.settings, "RATE_LIMIT_CEILING_FACTOR", 3)
+    limiter = IngestionRateLimiter(backend="memory")
+    limiter.enabled = True
+    limiter.limits["ingest"] = (0.1, 2)
+
+    decisions = [limiter.check("ingest", 1, "watch") for _ in range(8)]
+    # Two admitted, four coalesced, then rejected past 3x the allowance
+    assert [d.allowed for d in decisions] == [True, True] + [False] * 6
+    assert [d.rejected for d in decisions] == [False] * 6 + [True] * 2
+    assert limiter.stats()["scopes"]["ingest"] == {"admitted": 2, "throttled": 4, "rejected": 2}
+
+
+def test_auto_backend_follows_redis_url(monkeypatch):
+    from app.core.config import Settings
+
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    assert Settings(_env_file=None).resolve_backend("auto") == "memory"
+    assert Settings(_env_file=None, REDIS_URL="redis://redis:6379/0").resolve_backend("auto") == "redis"
+    assert Settings(_env_file=None, REDIS_URL="redis://redis:6379/0").resolve_backend("memory") == "memory"
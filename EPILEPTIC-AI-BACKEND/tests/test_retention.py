@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models.alert import Alert
+from app.models.biometric import Biometric
+from app.models.prediction import Prediction
+from app.models.retention_checkpoint import RetentionCheckpoint
+from app.services.retention import RetentionEngine
+
+NOW = datetime(2025, 6, 1)
+
+
+@pytest.fixture(autouse=True)
+def raw_biometrics_retention(monkeypatch):
+    # Raw biometrics are otherwise compacted rather than deleted
+    monkeypatch.setattr(settings, "BIOMETRIC_COMPACTION_ENABLED", False)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'retention.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    yield factory
+    engine.dispose()
+
+
+def _seed_biometrics(db, expired, fresh):
+    for i in range(expired):
+        db.add(Biometric(patient_id=1, heart_rate=70, recorded_at=NOW - timedelta(days=120, minutes=i)))
+    for i in range(fresh):
+        db.add(Biometric(patient_id=1, heart_rate=70, recorded_at=NOW - timedelta(days=1, minutes=i)))
+    db.commit()
+
+
+def test_deletes_in_bounded_batches_with_pauses(session_factory):
+    db = session_factory()
+    _seed_biometrics(db, expired=25, fresh=5)
+    pauses = []
+
+    engine = RetentionEngine(session_factory, batch_size=10, pause_seconds=0.5, sleep=pauses.append)
+    metrics = engine.run(now=NOW)
+
+    biometrics = metrics["biometrics"]
+    assert biometrics["rows_deleted"] == 25
+    assert biometrics["batches"] == 3
+    assert biometrics["completed"] is True
+    assert biometrics["rows_per_second"] >= 0
+    assert pauses == [0.5, 0.5]
+    assert db.query(Biometric).count() == 5
+
+    checkpoint = db.query(RetentionCheckpoint).filter_by(table_name="biometrics").one()
+    assert checkpoint.last_id == 0
+    assert checkpoint.last_completed_at is not None
+    db.close()
+
+
+def test_resumes_from_checkpoint_after_time_budget(session_factory):
+    db = session_factory()
+    _seed_biometrics(db, expired=25, fresh=0)
+
+    # Zero budget: nothing done, checkpoint stays at the start
+    metrics = RetentionEngine(session_factory, batch_size=10, max_runtime_seconds=0).run(now=NOW)
+    assert metrics["biometrics"]["rows_deleted"] == 0
+    assert metrics["biometrics"]["completed"] is False
+
+    # Simulate an interrupted pass that already scanned ids <= 10
+    checkpoint = db.query(RetentionCheckpoint).filter_by(table_name="biometrics").one()
+    checkpoint.last_id = 10
+    db.commit()
+
+    metrics = RetentionEngine(session_factory, batch_size=10, pause_seconds=0).run(now=NOW)
+    assert metrics["biometrics"]["resumed_from_id"] == 10
+    assert metrics["biometrics"]["rows_deleted"] == 15
+    assert db.query(Biometric).count() == 10
+    db.close()
+
+
+def test_alerts_closed_by_countdown_flow_are_expired(session_factory):
+    db = session_factory()
+    old = NOW - timedelta(days=40)
+    # Resolved through the alert service
+    db.add(Alert(patient_id=1, alert_type="seizure", severity="high", title="t", message="m",
+                 resolved=True, is_active=False, resolved_at=old))
+    # Cancelled by the countdown flow: inactive, resolved_at set, resolved left False
+    db.add(Alert(patient_id=1, alert_type="seizure", severity="high", title="t", message="m",
+                 resolved=False, is_active=False, resolved_at=old))
+    # Still active
+    db.add(Alert(patient_id=1, alert_type="seizure", severity="high", title="t", message="m",
+                 is_active=True))
+    # Closed recently
+    db.add(Alert(patient_id=1, alert_type="seizure", severity="high", title="t", message="m",
+                 is_active=False, resolved_at=NOW - timedelta(days=2)))
+    db.commit()
+    alert = db.query(Alert).first()
+    db.add(Prediction(patient_id=1, risk_score=0.9, predicted_at=NOW, alert_id=alert.id))
+    db.commit()
+
+    metrics = RetentionEngine(session_factory, pause_seconds=0).run(now=NOW)
+
+    assert metrics["alerts"]["rows_deleted"] == 2
+    assert db.query(Alert).count() == 2
+    assert db.query(Prediction).one().alert_id is None
+    db.close()
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.api.deps import get_doctor_scope
+from app.core.database import Base, get_db
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.models.patient import Patient
+from app.models.seizure import Seizure
+from app.services.seizure_history import history_page
+
+START = datetime(2026, 3, 1, 8, 0)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'history.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add_all([
+        Patient(id=1, email="a@example.com", full_name="Alice", hashed_password="x", doctor_id=1),
+        Patient(id=2, email="b@example.com", full_name="Bob", hashed_password="x", doctor_id=1),
+        Patient(id=3, email="c@example.com", full_name="Carol", hashed_password="x", doctor_id=2),
+    ])
+    # Seizure i starts i hours after START, patients 1, 2, 3 in turn
+    db.add_all([
+        Seizure(patient_id=i % 3 + 1, start_time=START + timedelta(hours=i),
+                seizure_type="focal" if i % 2 else "tonic-clonic")
+        for i in range(12)
+    ])
+    db.commit()
+    db.close()
+    yield Session
+    engine.dispose()
+
+
+def test_history_is_scoped_newest_first_with_patient_fields(session_factory):
+    db = session_factory()
+    rows, next_cursor = history_page(db, 1, limit=50)
+    assert next_cursor is None
+    assert [row.start_time.replace(tzinfo=None) for row in rows] == sorted(
+        (START + timedelta(hours=i) for i in range(12) if i % 3 != 2), reverse=True
+    )
+    assert {(row.patient_id, row.patient_name, row.patient_email) for row in rows} == {
+        (1, "Alice", "a@example.com"), (2, "Bob", "b@example.com")
+    }
+    assert len(history_page(db, None, limit=50)[0]) == 12
+    db.close()
+
+
+def test_filters(session_factory):
+    db = session_factory()
+    assert {row.patient_id for row in history_page(db, 1, limit=50, patient_id=2)[0]} == {2}
+    # Another doctor's patient yields nothing
+    assert history_page(db, 1, limit=50, patient_id=3)[0] == []
+    assert {row.seizure_type for row in history_page(db, None, limit=50, seizure_type="focal")[0]} == {"focal"}
+    window = history_page(db, None, limit=50, start=START + timedelta(hours=3), end=START + timedelta(hours=6))[0]
+    assert [row.id for row in window] == [6, 5, 4]
+    db.close()
+
+
+def test_keyset_pages_are_one_projection_query(session_factory):
+    db = session_factory()
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        seen, cursor = [], None
+        while True:
+            rows, cursor = history_page(db, None, limit=5, cursor=cursor)
+            seen += [row.id for row in rows]
+            if cursor is None:
+                break
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    assert seen == list(range(12, 0, -1))
+    assert len(statements) == 3
+    assert "symptoms" not in statements[0]
+    db.close()
+
+
+def test_route(session_factory):
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides.update({get_db: override_get_db, get_doctor_scope: lambda: 1})
+    try:
+        http = TestClient(app)
+        response = http.get("/api/v1/doctors/history", params={"limit": 3, "seizure_type": "focal"})
+        assert response.status_code == 200
+        first = response.json()
+        assert [item["patient_name"] for item in first] == ["Alice", "Bob", "Alice"]
+        response = http.get("/api/v1/doctors/history", params={
+            "limit": 3, "seizure_type": "focal", "cursor": response.headers[NEXT_CURSOR_HEADER]
+        })
+        assert len(response.json()) == 1
+        assert NEXT_CURSOR_HEADER not in response.headers
+
+        # days with a start date carrying an offset: 12:30+02:00 is 10:30 UTC
+        response = http.get("/api/v1/doctors/history", params={
+            "days": 3650, "start_date": "2026-03-01T12:30:00+02:00"
+        })
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()] == [11, 10, 8, 7, 5, 4]
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
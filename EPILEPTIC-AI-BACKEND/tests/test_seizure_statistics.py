@@ -0,0 +1,140 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.patient import Patient
+from app.models.seizure import Seizure
+from app.services.seizure_statistics import bucket_counts, seizure_statistics, truncate_dates
+from app.services.stats_cache import StatsCache, get_stats_cache
+
+# Wednesday
+NOW = datetime(2026, 3, 4, 15, 0)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'statistics.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Patient(id=1, email="a@example.com", full_name="A", hashed_password="x", doctor_id=1),
+        Patient(id=2, email="b@example.com", full_name="B", hashed_password="x", doctor_id=2),
+    ])
+    session.add_all([
+        Seizure(patient_id=1, start_time=datetime(2026, 3, 4, 9, 0)),
+        Seizure(patient_id=1, start_time=datetime(2026, 3, 4, 11, 0)),
+        Seizure(patient_id=1, start_time=datetime(2026, 3, 1, 23, 0)),   # Sunday
+        Seizure(patient_id=1, start_time=datetime(2026, 2, 20, 8, 0)),
+        Seizure(patient_id=1, start_time=datetime(2026, 1, 1, 8, 0)),    # out of range
+        Seizure(patient_id=2, start_time=datetime(2026, 3, 3, 8, 0)),
+    ])
+    session.commit()
+    get_stats_cache().clear()
+    yield session
+    get_stats_cache().clear()
+    session.close()
+    engine.dispose()
+
+
+def test_truncation_to_weeks_and_months():
+    values = np.array(["2026-03-01T23:00", "2026-03-02T00:00", "2026-03-04T15:00"], dtype="datetime64[us]")
+    assert truncate_dates(values, "week").astype(str).tolist() == ["2026-02-23", "2026-03-02", "2026-03-02"]
+    assert truncate_dates(values, "month").astype(str).tolist() == ["2026-03-01"] * 3
+
+
+def test_series_are_gap_filled_and_scoped(db):
+    stats = seizure_statistics(db, 1, days=14, now=NOW)
+
+    daily = {point["date"]: point["count"] for point in stats["daily_counts"]}
+    assert len(daily) == 14
+    assert daily[date(2026, 3, 4)] == 2
+    assert daily[date(2026, 3, 3)] == 0
+    assert daily[date(2026, 2, 20)] == 1
+
+    assert stats["weekly_counts"] == [
+        {"date": date(2026, 2, 16), "count": 1},
+        {"date": date(2026, 2, 23), "count": 1},
+        {"date": date(2026, 3, 2), "count": 2},
+    ]
+    assert [point["date"] for point in stats["monthly_counts"]] == [date(2026, 2, 1), date(2026, 3, 1)]
+    assert stats["total_count"] == 4
+    assert stats["average_per_week"] == 2.0
+
+    assert seizure_statistics(db, None, days=14, now=NOW)["total_count"] == 5
+
+
+def test_new_seizure_updates_cached_series_without_recomputing(db):
+    seizure_statistics(db, 1, days=14, now=NOW)
+
+    db.add(Seizure(patient_id=1, start_time=datetime(2026, 3, 3, 10, 0)))
+    db.commit()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        stats = seizure_statistics(db, 1, days=14, now=NOW)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    assert statements == []
+    assert stats["total_count"] == 5
+    assert stats["weekly_counts"][-1] == {"date": date(2026, 3, 2), "count": 3}
+    get_stats_cache().clear()
+    assert seizure_statistics(db, 1, days=14, now=NOW) == stats
+
+
+def test_rolled_back_and_deleted_seizures(db):
+    seizure_statistics(db, 1, days=14, now=NOW)
+
+    db.add(Seizure(patient_id=1, start_time=datetime(2026, 3, 3, 10, 0)))
+    db.flush()
+    db.rollback()
+    assert seizure_statistics(db, 1, days=14, now=NOW)["total_count"] == 4
+
+    db.delete(db.query(Seizure).filter(Seizure.start_time == datetime(2026, 2, 20, 8, 0)).one())
+    db.commit()
+    assert seizure_statistics(db, 1, days=14, now=NOW)["total_count"] == 3
+
+
+def test_reassignment_invalidates_at_commit(db):
+    seizure_statistics(db, 2, days=14, now=NOW)
+    cache = get_stats_cache()
+
+    db.get(Patient, 1).doctor_id = 2
+    db.flush()
+    # Not applied before commit, dropped on rollback
+    assert cache.stats()["keys"] == 3
+    db.rollback()
+    assert cache.stats()["keys"] == 3
+
+    db.get(Patient, 1).doctor_id = 2
+    db.commit()
+    assert cache.stats()["keys"] == 0
+    assert seizure_statistics(db, 2, days=14, now=NOW)["total_count"] == 5
+
+
+def test_bucket_counts_skip_empty_buckets(db):
+    counts = bucket_counts(db, 1, datetime(2026, 2, 1), datetime(2026, 3, 5), "week")
+    assert counts == {date(2026, 2, 16): 1, date(2026, 2, 23): 1, date(2026, 3, 2): 2}
+
+
+def test_value_computed_across_a_write_is_not_cached():
+    cache = StatsCache(enabled=True)
+    key = ("seizure_statistics", 1, "day", date(2026, 3, 1), date(2026, 3, 4))
+
+    def compute_during(write):
+        def compute():
+            write()  # a delta or invalidation committed while the query ran
+            return {"counts": {}}
+        return compute
+
+    cache.get_or_compute(key, compute_during(lambda: cache.update_prefix(("seizure_statistics", 1), lambda k, v: None)), 30)
+    assert cache.get(key) is None
+    cache.get_or_compute(key, compute_during(lambda: cache.invalidate_prefix(("seizure_statistics", None))), 30)
+    assert cache.get(key) is not None  # another scope: cached
+    assert cache.stats()["discarded"] == 1
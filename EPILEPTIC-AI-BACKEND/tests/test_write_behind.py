@@ -0,0 +1,202 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models.biometric import Biometric
+from app.models.prediction import Prediction
+from app.services.write_behind import WriteBehindBuffer
+
+
+def crash(buffer):
+    """Drop the buffer without flushing: files stay, the worker lock is released"""
+    buffer._spool_file.close()
+    buffer._owner_lock.close()
+
+
+def spool_files(directory):
+    return sorted(p.name for p in directory.iterdir() if not p.name.endswith((".lock", ".recovery")))
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    """Isolated SQLite database and spool directory per test"""
+    monkeypatch.setattr(settings, "WRITE_BEHIND_SPOOL_PATH", str(tmp_path / "default_spool" / "write_behind.jsonl"))
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'write_behind.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def _biometric(patient_id=1, minutes_ago=0, heart_rate=72.0):
+    return Biometric(
+        patient_id=patient_id,
+        heart_rate=heart_rate,
+        recorded_at=datetime.utcnow() - timedelta(minutes=minutes_ago)
+    )
+
+
+def test_flush_writes_batch_in_one_transaction(session_factory):
+    """Buffered rows are only visible after flush"""
+    buffer = WriteBehindBuffer(session_factory=session_factory, max_batch=100)
+    for i in range(5):
+        buffer.add(_biometric(minutes_ago=i))
+    buffer.add(Prediction(patient_id=1, risk_score=0.2, confidence=0.9))
+
+    db = session_factory()
+    try:
+        assert db.query(Biometric).count() == 0
+        assert buffer.flush() == 6
+        assert db.query(Biometric).count() == 5
+        prediction = db.query(Prediction).one()
+        assert prediction.prediction_window == 30  # column default applied
+        assert prediction.alert_generated is False
+    finally:
+        db.close()
+    assert buffer.pending_count() == 0
+
+
+def test_size_trigger_in_event_loop_keeps_flush_task(session_factory):
+    """The scheduled flush is referenced until it completes"""
+    buffer = WriteBehindBuffer(session_factory=session_factory, max_batch=2)
+
+    async def scenario():
+        buffer.add(_biometric(minutes_ago=1))
+        buffer.add(_biometric(minutes_ago=0))
+        tasks = set(buffer._flush_tasks)
+        assert len(tasks) == 1
+        await asyncio.gather(*tasks)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert buffer._flush_tasks == set()
+    assert buffer.pending_count() == 0
+
+
+def test_size_trigger_flushes(session_factory):
+    """Reaching max_batch flushes without an event loop"""
+    buffer = WriteBehindBuffer(session_factory=session_factory, max_batch=3)
+    for i in range(3):
+        buffer.add(_biometric(minutes_ago=i))
+
+    db = session_factory()
+    try:
+        assert db.query(Biometric).count() == 3
+    finally:
+        db.close()
+
+
+def test_pending_biometrics_for_sliding_window(session_factory):
+    """Pending samples are visible to the prediction window"""
+    buffer = WriteBehindBuffer(session_factory=session_factory, max_batch=100)
+    buffer.add(_biometric(patient_id=1, minutes_ago=5))
+    buffer.add(_biometric(patient_id=1, minutes_ago=60))
+    buffer.add(_biometric(patient_id=2, minutes_ago=5))
+
+    pending = buffer.pending_biometrics(1, datetime.utcnow() - timedelta(minutes=30))
+    assert len(pending) == 1
+    assert pending[0].patient_id == 1
+
+
+def test_spool_recovery_after_crash(session_factory, tmp_path):
+    """Acknowledged rows survive a crash through the spool file"""
+    spool = tmp_path / "spool" / "write_behind.jsonl"
+    crashed = WriteBehindBuffer(session_factory=session_factory, max_batch=100, spool_path=str(spool))
+    crashed.add(_biometric(heart_rate=80.0))
+    crashed.add(_biometric(heart_rate=81.0))
+    # Simulate a torn write at crash time
+    with open(crashed._worker_file(crashed.owner), "a", encoding="utf-8") as f:
+        f.write('{"table": "biometrics", "row": {"patient_id"')
+    crash(crashed)
+
+    restarted = WriteBehindBuffer(session_factory=session_factory, max_batch=100, spool_path=str(spool))
+    assert restarted.recover() == 2
+    assert restarted.flush() == 2
+    assert spool_files(spool.parent) == []
+    assert not any(crashed.owner in p.name for p in spool.parent.iterdir())
+
+    db = session_factory()
+    try:
+        values = sorted(b.heart_rate for b in db.query(Biometric).all())
+        assert values == [80.0, 81.0]
+    finally:
+        db.close()
+
+
+def test_failed_flush_keeps_rows(session_factory, tmp_path):
+    """A failed flush re-queues rows and keeps spool segments"""
+    spool = tmp_path / "write_behind.jsonl"
+
+    buffer = WriteBehindBuffer(session_factory=session_factory, max_batch=100, spool_path=str(spool))
+    buffer.add(_biometric())
+    buffer.session_factory = lambda: _BrokenSession()
+
+    assert buffer.flush() == 0
+    assert buffer.pending_count() == 1
+    assert buffer.stats["failures"] == 1
+    assert any(p.name.endswith(".flushing") for p in tmp_path.iterdir())
+
+    buffer.session_factory = session_factory
+    assert buffer.flush() == 1
+    assert not any(p.name.endswith(".flushing") for p in tmp_path.iterdir())
+
+
+def test_recovery_skips_live_workers(session_factory, tmp_path):
+    """Spools and flushing segments of a live worker are never replayed by another"""
+    spool = tmp_path / "write_behind.jsonl"
+    live = WriteBehindBuffer(session_factory=session_factory, max_batch=100, spool_path=str(spool))
+    live.add(_biometric(heart_rate=70.0))
+    live.session_factory = lambda: _BrokenSession()
+    assert live.flush() == 0  # leaves a .flushing segment
+    live.add(_biometric(heart_rate=71.0))
+
+    dead = WriteBehindBuffer(session_factory=session_factory, max_batch=100, spool_path=str(spool))
+    dead.add(_biometric(heart_rate=90.0))
+    crash(dead)
+
+    starting = WriteBehindBuffer(session_factory=session_factory, max_batch=100, spool_path=str(spool))
+    assert starting.recover() == 1
+    assert starting.flush() == 1
+    assert starting.recover() == 0
+
+    live.session_factory = session_factory
+    assert live.flush() == 2
+    assert spool_files(tmp_path) == ["write_behind.db"]
+
+    db = session_factory()
+    try:
+        assert sorted(b.heart_rate for b in db.query(Biometric).all()) == [70.0, 71.0, 90.0]
+    finally:
+        db.close()
+
+
+def test_legacy_shared_spool_is_recovered(session_factory, tmp_path):
+    """The single spool file used before per-worker spools is replayed once"""
+    spool = tmp_path / "write_behind.jsonl"
+    spool.write_text(
+        '{"table": "biometrics", "row": {"patient_id": 1, "heart_rate": 65.0,'
+        ' "recorded_at": {"__dt__": "2026-03-01T10:00:00"}}}\n',
+        encoding="utf-8"
+    )
+
+    buffer = WriteBehindBuffer(session_factory=session_factory, max_batch=100, spool_path=str(spool))
+    assert buffer.recover() == 1
+    assert buffer.flush() == 1
+    assert not spool.exists()
+
+
+class _BrokenSession:
+    def execute(self, *args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass